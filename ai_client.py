@@ -6,15 +6,40 @@ using OpenAI's API for AI-enhanced NPCs.
 """
 
 import os
+import re
+import json
 import hashlib
-from datetime import datetime, timedelta
-from collections import defaultdict
+import threading
+from datetime import datetime
 
-from utils.prompt_loader import load_prompt
+from utils.prompt_loader import get_prompt_registry, load_prompt
+from core.dialogue_service import get_dialogue_service
+from core.response_cache import get_response_cache
+from core.ai_limits import get_rate_limiter, get_usage_ledger
 
 
 def _get_npc_dialogue_system_prompt(npc_name, npc_title, personality, room_name, room_description, npc_home, reputation_desc, reputation, username, stats=None, traits=None):
     """Load and format the NPC dialogue system prompt."""
+    # The NPC's own fields are pre-rendered once per NPC; only the per-player parts are formatted here
+    template = get_prompt_registry().partial(
+        "npc_dialogue_system.txt",
+        npc_name=npc_name,
+        npc_title=npc_title,
+        personality=personality,
+        npc_home=npc_home,
+    )
+    if template is not None:
+        try:
+            return template.render(
+                room_name=room_name,
+                room_description=room_description,
+                reputation_desc=reputation_desc,
+                reputation=reputation,
+                username=username,
+            )
+        except (KeyError, ValueError) as e:
+            print(f"Could not format prompt template npc_dialogue_system.txt: {e!r}")
+    
     # Build stats summary if available
     stats_text = ""
     if stats:
@@ -73,19 +98,7 @@ IMPORTANT RULES:
 
 The player's name is {username}."""
     
-    return load_prompt(
-        "npc_dialogue_system.txt",
-        fallback_text=fallback,
-        npc_name=npc_name,
-        npc_title=npc_title,
-        personality=personality,
-        room_name=room_name,
-        room_description=room_description,
-        npc_home=npc_home,
-        reputation_desc=reputation_desc,
-        reputation=reputation,
-        username=username
-    )
+    return fallback
 
 
 def _get_npc_dialogue_user_message(is_reaction, username, player_input):
@@ -115,6 +128,41 @@ except ImportError:
     OPENAI_AVAILABLE = False
     OpenAI = None
 
+# Shared OpenAI clients, keyed by (api_key, base_url). Each client keeps its own
+# HTTP connection pool, which building a client per request threw away.
+_clients = {}
+_clients_lock = threading.Lock()
+_request_timeout = float(os.environ.get("AI_REQUEST_TIMEOUT", "8"))
+
+
+def get_openai_client(api_key=None):
+    """
+    Get the shared OpenAI client for an API key.
+    
+    OPENAI_BASE_URL points the client at another endpoint (e.g. a local mock
+    completion server for offline testing).
+    
+    Args:
+        api_key: API key (defaults to OPENAI_API_KEY)
+    
+    Returns:
+        OpenAI: Shared client, or None if the openai package isn't installed
+    """
+    if not OPENAI_AVAILABLE:
+        return None
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    base_url = os.environ.get("OPENAI_BASE_URL") or None
+    key = (api_key, base_url)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = OpenAI(api_key=api_key, base_url=base_url,
+                                                timeout=_request_timeout, max_retries=1)
+    return client
+
+
 # Global token usage tracking (shared across all users)
 _token_usage = {
     "total_tokens": 0,
@@ -127,15 +175,26 @@ _token_usage = {
 # Per-user token tracking (optional, for future per-user budgets)
 _user_token_usage = {}
 
-# Rate limiting: track requests per user per hour
-_rate_limit_window = timedelta(hours=1)
-_max_requests_per_hour = int(os.environ.get("AI_MAX_REQUESTS_PER_HOUR", "60"))  # Default 60 requests/hour
-_user_request_times = defaultdict(list)  # {username: [list of request timestamps]}
+# Filler words that don't change what the player asked (ignored in cache keys)
+_FILLER_WORDS = frozenset({"please", "um", "uh", "er", "erm", "hmm", "oh"})
+
+# Stands in for the player's name in cached replies, so they can be shared
+_PLAYER_PLACEHOLDER = "{player}"
 
-# Response cache: cache common responses to reduce API calls
-_response_cache = {}
-_cache_max_size = 100
-_cache_ttl = timedelta(hours=24)  # Cache for 24 hours
+# How the NPC feels about the player, by reputation band (see _reputation_band)
+_REPUTATION_DESCRIPTIONS = (
+    "You have an exceptional relationship with this player - they are a true friend and ally. You trust them completely.",
+    "You have a very strong positive relationship with this player - you trust and like them a great deal.",
+    "You have a positive relationship with this player - you trust and like them.",
+    "You have a moderately positive impression of this player - you think well of them.",
+    "You have a slightly positive impression of this player - they seem decent.",
+    "You have a neutral-to-positive impression of this player.",
+    "You don't know this player well yet.",
+    "You have a slightly negative impression of this player - you're a bit wary.",
+    "You have a negative impression of this player - you don't trust them much.",
+    "You have a strongly negative relationship with this player - you're very wary and dislike them.",
+    "You have an extremely negative relationship with this player - you consider them an enemy or threat.",
+)
 
 
 def _check_rate_limit(username, user_id=None, db_conn=None):
@@ -143,30 +202,10 @@ def _check_rate_limit(username, user_id=None, db_conn=None):
     if not username:
         return True, None
     
-    now = datetime.now()
-    # Clean old requests outside the window
-    _user_request_times[username] = [
-        req_time for req_time in _user_request_times[username]
-        if now - req_time < _rate_limit_window
-    ]
-    
-    # Also track in database for admin dashboard
-    if user_id and db_conn:
-        try:
-            db_conn.execute(
-                "INSERT INTO ai_rate_limits (user_id, request_time) VALUES (?, ?)",
-                (user_id, now)
-            )
-            # Clean old entries (older than 1 hour)
-            db_conn.execute(
-                "DELETE FROM ai_rate_limits WHERE request_time < datetime('now', '-1 hour')"
-            )
-        except Exception:
-            pass  # Don't fail if DB tracking fails
-    
-    # Check if limit exceeded
-    if len(_user_request_times[username]) >= _max_requests_per_hour:
-        return False, f"Rate limit exceeded. Maximum {_max_requests_per_hour} AI requests per hour."
+    # Sliding-window counter in memory (or Redis); no database writes per request
+    limiter = get_rate_limiter()
+    if not limiter.allow(username):
+        return False, f"Rate limit exceeded. Maximum {limiter.limit} AI requests per hour."
     
     return True, None
 
@@ -177,72 +216,82 @@ def _check_token_budget(user_id, db_conn=None):
         return True, None, None
     
     try:
-        # Get default budget from environment variable
-        default_budget = int(os.environ.get("AI_DEFAULT_TOKEN_BUDGET", "10000"))
-        
-        row = db_conn.execute(
-            "SELECT token_budget, tokens_used FROM ai_usage WHERE user_id = ?",
-            (user_id,)
-        ).fetchone()
-        
-        if row:
-            budget = row["token_budget"]
-            used = row["tokens_used"]
-            remaining = budget - used
-            
-            if remaining <= 0:
-                return False, remaining, "Your AI token budget has been exhausted. Please contact an administrator."
-            return True, remaining, None
-        else:
-            # No budget set - use default budget
-            # Initialize the user's budget with default
-            db_conn.execute(
-                """
-                INSERT INTO ai_usage (user_id, token_budget, tokens_used)
-                VALUES (?, ?, 0)
-                ON CONFLICT(user_id) DO NOTHING
-                """,
-                (user_id, default_budget)
-            )
-            db_conn.commit()
-            return True, default_budget, None
+        # Cached budget counter (re-read from ai_usage every few seconds)
+        allowed, remaining = get_usage_ledger().check(user_id, db_conn)
+        if not allowed:
+            return False, remaining, "Your AI token budget has been exhausted. Please contact an administrator."
+        return True, remaining, None
     except Exception:
         # If database check fails, allow the request
         return True, None, None
 
 
-def _get_cache_key(npc_id, player_input, npc_memory_hash):
-    """Generate a cache key for the request."""
-    # Create a hash of the input for caching
-    cache_str = f"{npc_id}:{player_input}:{npc_memory_hash}"
+def _reputation_band(reputation):
+    """Index into _REPUTATION_DESCRIPTIONS for a reputation score."""
+    if reputation > 0:
+        for band, threshold in enumerate((100, 50, 25, 15, 10)):
+            if reputation >= threshold:
+                return band
+        return 5
+    if reputation == 0:
+        return 6
+    for band, threshold in enumerate((-10, -25, -50), start=7):
+        if reputation >= threshold:
+            return band
+    return 10
+
+
+def _normalize_player_input(player_input):
+    """Lowercase, drop punctuation and filler words, collapse whitespace."""
+    words = re.sub(r"[^\w\s]", " ", player_input.lower()).split()
+    return " ".join(word for word in words if word not in _FILLER_WORDS)
+
+
+def _memory_digest(npc_memory):
+    """Digest of the conversation turns that go into the prompt (see _prepare_npc_reply)."""
+    turns = [
+        (mem.get("type"), mem.get("player_input") or mem.get("message", ""), mem.get("response", ""))
+        for mem in npc_memory[-5:]
+        if mem.get("type") in ("talked", "said")
+    ]
+    if not turns:
+        return "-"
+    return hashlib.md5(json.dumps(turns).encode()).hexdigest()
+
+
+def make_reply_cache_key(npc_id, player_input, reputation, npc_memory):
+    """
+    Build the response cache key for an NPC reply.
+    
+    Replies are shared between players (and workers) when the NPC, the
+    normalised input, the reputation band and the remembered conversation match.
+    
+    Args:
+        npc_id: NPC ID string
+        player_input: What the player said or did
+        reputation: The player's reputation with the NPC
+        npc_memory: The NPC's memory of the player
+    
+    Returns:
+        str: Cache key
+    """
+    cache_str = f"{npc_id}:{_reputation_band(reputation)}:{_memory_digest(npc_memory)}:{_normalize_player_input(player_input)}"
     return hashlib.md5(cache_str.encode()).hexdigest()
 
 
-def _check_cache(cache_key):
-    """Check if response is in cache. Returns cached response or None."""
-    if cache_key in _response_cache:
-        cached_entry = _response_cache[cache_key]
-        if datetime.now() - cached_entry["timestamp"] < _cache_ttl:
-            return cached_entry["response"]
-        else:
-            # Expired, remove from cache
-            del _response_cache[cache_key]
-    return None
-
-
-def _add_to_cache(cache_key, response):
-    """Add response to cache."""
-    # Clean cache if it's too large
-    if len(_response_cache) >= _cache_max_size:
-        # Remove oldest entries
-        sorted_cache = sorted(_response_cache.items(), key=lambda x: x[1]["timestamp"])
-        for key, _ in sorted_cache[:_cache_max_size // 2]:
-            del _response_cache[key]
-    
-    _response_cache[cache_key] = {
-        "response": response,
-        "timestamp": datetime.now(),
-    }
+def _check_cache(cache_key, username):
+    """Return the cached response (addressed to username) or None."""
+    cached = get_response_cache().get(cache_key)
+    if cached is None:
+        return None
+    return cached.replace(_PLAYER_PLACEHOLDER, username or "adventurer")
+
+
+def _add_to_cache(cache_key, response, username):
+    """Cache a response, with the player's name swapped for a placeholder."""
+    if username:
+        response = re.sub(rf"\b{re.escape(username)}\b", _PLAYER_PLACEHOLDER, response)
+    get_response_cache().set(cache_key, response)
 
 
 def generate_npc_reply(npc, room, game, username, player_input, recent_log=None, user_id=None, db_conn=None):
@@ -262,6 +311,79 @@ def generate_npc_reply(npc, room, game, username, player_input, recent_log=None,
     Returns:
         tuple: (response_string, error_message_or_none)
     """
+    reply, request = _prepare_npc_reply(npc, room, game, username, player_input, user_id=user_id, db_conn=db_conn)
+    if request is None:
+        return reply
+    return _complete_npc_reply(request, db_conn=db_conn)
+
+
+def request_npc_reply(npc, room, game, username, player_input, on_reply, recent_log=None, user_id=None, db_conn=None):
+    """
+    Non-blocking version of generate_npc_reply.
+    
+    Replies that are known straight away (cache hits, fallbacks, rate or budget
+    limits) are returned as usual. Replies that need the model are queued on the
+    dialogue service when it is running, and on_reply(response, error_message)
+    is called once they are ready; identical prompts already in flight share
+    one completion.
+    
+    Args:
+        npc, room, game, username, player_input, recent_log, user_id, db_conn: As for generate_npc_reply
+        on_reply: Called with (response_string, error_message_or_none) for a queued reply
+    
+    Returns:
+        tuple: (response_string, error_message_or_none), or (None, None) if the reply was queued
+    """
+    reply, request = _prepare_npc_reply(npc, room, game, username, player_input, user_id=user_id, db_conn=db_conn)
+    if request is None:
+        return reply
+    
+    service = get_dialogue_service()
+    if not service.running:
+        return _complete_npc_reply(request, db_conn=db_conn)
+    
+    def work(timeout):
+        # The command's connection is back in the pool by now; use our own
+        conn = service.connect() if service.connect else None
+        try:
+            return _complete_npc_reply(request, db_conn=conn, timeout=timeout)
+        finally:
+            if conn is not None:
+                conn.close()
+    
+    service.submit(
+        request.key, work,
+        fallback=lambda: (request.fallback, "AI service took too long to answer. Using fallback response."),
+        callback=lambda result: on_reply(*result),
+    )
+    return None, None
+
+
+class NpcReplyRequest:
+    """A prepared NPC dialogue completion: the prompt plus what's needed to account for and cache it."""
+    
+    __slots__ = ("npc_name", "username", "user_id", "model", "messages", "cache_key", "fallback", "key")
+    
+    def __init__(self, npc_name, username, user_id, model, messages, cache_key, fallback):
+        self.npc_name = npc_name
+        self.username = username
+        self.user_id = user_id
+        self.model = model
+        self.messages = messages
+        self.cache_key = cache_key
+        self.fallback = fallback
+        # Identical prompts (same model and messages) can share one completion
+        self.key = hashlib.md5(json.dumps([model, messages], sort_keys=True).encode()).hexdigest()
+
+
+def _prepare_npc_reply(npc, room, game, username, player_input, user_id=None, db_conn=None):
+    """
+    Run the checks that don't need the model and build the prompt.
+    
+    Returns:
+        tuple: ((response, error_message), None) if the reply is already known,
+               otherwise (None, NpcReplyRequest)
+    """
     # Get NPC ID from game context (set by game_engine)
     npc_id = game.get("_current_npc_id")
     
@@ -282,31 +404,28 @@ def generate_npc_reply(npc, room, game, username, player_input, recent_log=None,
     # Check rate limiting
     rate_allowed, rate_message = _check_rate_limit(username, user_id=user_id, db_conn=db_conn)
     if not rate_allowed:
-        return _fallback_reply(npc_name, personality, username, is_reaction, npc_memory, reputation), rate_message
+        return (_fallback_reply(npc_name, personality, username, is_reaction, npc_memory, reputation), rate_message), None
     
     # Check token budget
     budget_allowed, remaining, budget_message = _check_token_budget(user_id, db_conn)
     if not budget_allowed:
-        return _fallback_reply(npc_name, personality, username, is_reaction, npc_memory, reputation), budget_message
+        return (_fallback_reply(npc_name, personality, username, is_reaction, npc_memory, reputation), budget_message), None
+    
+    # Check the response cache (local tier, then the shared tier)
+    cache_key = make_reply_cache_key(npc_id, player_input, reputation, npc_memory)
+    cached_response = _check_cache(cache_key, username)
+    if cached_response:
+        return (cached_response, None), None
     
-    # Check cache (only for simple queries without much context)
-    if len(npc_memory) < 3:  # Only cache if conversation is relatively new
-        memory_hash = str(len(npc_memory))  # Simple hash for cache key
-        cache_key = _get_cache_key(npc_id, player_input.lower(), memory_hash)
-        cached_response = _check_cache(cache_key)
-        if cached_response:
-            return cached_response, None
+    fallback = _fallback_reply(npc_name, personality, username, is_reaction, npc_memory, reputation)
     
     # Check if OpenAI is available and API key is set
     api_key = os.environ.get("OPENAI_API_KEY")
     if not OPENAI_AVAILABLE or not api_key:
         # Fallback to placeholder implementation
-        return _fallback_reply(npc_name, personality, username, is_reaction, npc_memory, reputation), "AI service is not configured."
+        return (fallback, "AI service is not configured."), None
     
     try:
-        # Build context for the AI
-        client = OpenAI(api_key=api_key)
-        
         # Build conversation history from memory
         conversation_history = []
         if npc_memory:
@@ -330,31 +449,8 @@ def generate_npc_reply(npc, room, game, username, player_input, recent_log=None,
                         "content": mem.get("response", "")
                     })
         
-        # Build system prompt
-        # Updated reputation descriptions to match new thresholds
-        reputation_desc = ""
-        if reputation >= 100:
-            reputation_desc = "You have an exceptional relationship with this player - they are a true friend and ally. You trust them completely."
-        elif reputation >= 50:
-            reputation_desc = "You have a very strong positive relationship with this player - you trust and like them a great deal."
-        elif reputation >= 25:
-            reputation_desc = "You have a positive relationship with this player - you trust and like them."
-        elif reputation >= 15:
-            reputation_desc = "You have a moderately positive impression of this player - you think well of them."
-        elif reputation >= 10:
-            reputation_desc = "You have a slightly positive impression of this player - they seem decent."
-        elif reputation > 0:
-            reputation_desc = "You have a neutral-to-positive impression of this player."
-        elif reputation == 0:
-            reputation_desc = "You don't know this player well yet."
-        elif reputation >= -10:
-            reputation_desc = "You have a slightly negative impression of this player - you're a bit wary."
-        elif reputation >= -25:
-            reputation_desc = "You have a negative impression of this player - you don't trust them much."
-        elif reputation >= -50:
-            reputation_desc = "You have a strongly negative relationship with this player - you're very wary and dislike them."
-        else:
-            reputation_desc = "You have an extremely negative relationship with this player - you consider them an enemy or threat."
+        # Describe the relationship for the reputation band
+        reputation_desc = _REPUTATION_DESCRIPTIONS[_reputation_band(reputation)]
         
         # Build system prompt using template
         room_name = room.get('name', 'a room')
@@ -368,20 +464,43 @@ def generate_npc_reply(npc, room, game, username, player_input, recent_log=None,
         # Build user message using template
         user_message = _get_npc_dialogue_user_message(is_reaction, username, player_input)
         
-        # Make API call
         messages = [{"role": "system", "content": system_prompt}]
         messages.extend(conversation_history)
         messages.append({"role": "user", "content": user_message})
-        
-        # Record request time for rate limiting
-        if username:
-            _user_request_times[username].append(datetime.now())
-        
-        response = client.chat.completions.create(
-            model=os.environ.get("OPENAI_MODEL", "gpt-4o-mini"),  # Default to cheaper model
-            messages=messages,
+    except Exception as e:
+        return _error_reply(e, fallback), None
+    
+    # Record the request for rate limiting
+    if username:
+        get_rate_limiter().hit(username)
+    
+    model = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")  # Default to cheaper model
+    return None, NpcReplyRequest(npc_name, username, user_id, model, messages, cache_key, fallback)
+
+
+def _complete_npc_reply(request, db_conn=None, timeout=None):
+    """
+    Run a prepared completion, account for its tokens and cache the reply.
+    
+    Args:
+        request: NpcReplyRequest from _prepare_npc_reply
+        db_conn: Optional database connection for token budget tracking
+        timeout: Optional per-request timeout in seconds
+    
+    Returns:
+        tuple: (response_string, error_message_or_none)
+    """
+    username = request.username
+    user_id = request.user_id
+    npc_name = request.npc_name
+    try:
+        options = {"timeout": timeout} if timeout is not None else {}
+        response = get_openai_client().chat.completions.create(
+            model=request.model,
+            messages=request.messages,
             max_tokens=150,
             temperature=0.8,
+            **options,
         )
         
         # Track token usage
@@ -407,22 +526,9 @@ def generate_npc_reply(npc, room, game, username, player_input, recent_log=None,
                 _user_token_usage[username]["total_tokens"] += tokens_used
                 _user_token_usage[username]["requests"] += 1
             
-            # Update database token budget
-            if user_id and db_conn:
-                try:
-                    db_conn.execute(
-                        """
-                        INSERT INTO ai_usage (user_id, tokens_used, requests_count)
-                        VALUES (?, ?, 1)
-                        ON CONFLICT(user_id) DO UPDATE SET
-                            tokens_used = tokens_used + ?,
-                            requests_count = requests_count + 1
-                        """,
-                        (user_id, tokens_used, tokens_used)
-                    )
-                    db_conn.commit()
-                except Exception as db_error:
-                    print(f"Database error updating token usage: {db_error}")
+            # Update the token budget (written to ai_usage in the next batch)
+            if user_id:
+                get_usage_ledger().record(user_id, tokens_used)
             
             # Check if budget exceeded after this request
             if user_id and db_conn:
@@ -437,31 +543,33 @@ def generate_npc_reply(npc, room, game, username, player_input, recent_log=None,
             ai_response = f"{npc_name} {ai_response}"
         
         # Add to cache
-        if len(npc_memory) < 3:
-            memory_hash = str(len(npc_memory))
-            cache_key = _get_cache_key(npc_id, player_input.lower(), memory_hash)
-            _add_to_cache(cache_key, ai_response)
+        _add_to_cache(request.cache_key, ai_response, username)
         
         return ai_response, error_message
         
     except Exception as e:
-        # Check for specific error types
-        error_str = str(e).lower()
-        
-        # Handle quota/rate limit errors
-        if "quota" in error_str or "rate limit" in error_str or "insufficient_quota" in error_str:
-            print(f"OpenAI quota/rate limit exceeded: {e}")
-            error_msg = "AI service quota exceeded. Please try again later."
-            return _fallback_reply(npc_name, personality, username, is_reaction, npc_memory, reputation), error_msg
-        elif "invalid" in error_str and "api key" in error_str:
-            print(f"OpenAI API key error: {e}")
-            error_msg = "AI service configuration error."
-            return _fallback_reply(npc_name, personality, username, is_reaction, npc_memory, reputation), error_msg
-        else:
-            # Other errors - fallback to placeholder
-            print(f"AI API error: {e}")  # Debug logging
-            error_msg = "AI service temporarily unavailable. Using fallback response."
-            return _fallback_reply(npc_name, personality, username, is_reaction, npc_memory, reputation), error_msg
+        return _error_reply(e, request.fallback)
+
+
+def _error_reply(e, fallback):
+    """Map an AI API error to (fallback reply, error message)."""
+    # Check for specific error types
+    error_str = str(e).lower()
+    
+    # Handle quota/rate limit errors
+    if "quota" in error_str or "rate limit" in error_str or "insufficient_quota" in error_str:
+        print(f"OpenAI quota/rate limit exceeded: {e}")
+        error_msg = "AI service quota exceeded. Please try again later."
+        return fallback, error_msg
+    elif "invalid" in error_str and "api key" in error_str:
+        print(f"OpenAI API key error: {e}")
+        error_msg = "AI service configuration error."
+        return fallback, error_msg
+    else:
+        # Other errors - fallback to placeholder
+        print(f"AI API error: {e}")  # Debug logging
+        error_msg = "AI service temporarily unavailable. Using fallback response."
+        return fallback, error_msg
 
 
 def _fallback_reply(npc_name, personality, username, is_reaction, npc_memory, reputation):
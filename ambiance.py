@@ -416,7 +416,8 @@ def process_room_ambiance(game: Dict, broadcast_fn=None) -> List[str]:
     Returns:
         list: List of ambiance messages to add to the log
     """
-    from game_engine import WORLD, get_time_of_day
+    from game_engine import WORLD
+    from game.systems.world_clock import get_world_clock
     from game.state import WEATHER_STATE
     
     loc_id = game.get("location", "town_square")
@@ -424,7 +425,7 @@ def process_room_ambiance(game: Dict, broadcast_fn=None) -> List[str]:
         return []
     
     room_def = WORLD[loc_id]
-    time_of_day = get_time_of_day()
+    time_of_day = get_world_clock().snapshot().time_of_day
     weather_type = WEATHER_STATE.get("type", "clear")
     weather_intensity = WEATHER_STATE.get("intensity", "none")
     
@@ -488,7 +489,8 @@ def process_weather_ambiance(game: Dict, broadcast_fn=None) -> List[str]:
     Returns:
         list: List of weather ambiance messages to add to the log (empty for indoor rooms)
     """
-    from game_engine import WORLD, get_time_of_day
+    from game_engine import WORLD
+    from game.systems.world_clock import get_world_clock
     from game.state import WEATHER_STATE
     
     loc_id = game.get("location", "town_square")
@@ -506,7 +508,7 @@ def process_weather_ambiance(game: Dict, broadcast_fn=None) -> List[str]:
         logger.debug(f"Blocking weather ambiance for indoor room: {loc_id}")
         return []
     
-    time_of_day = get_time_of_day()
+    time_of_day = get_world_clock().snapshot().time_of_day
     weather_type = WEATHER_STATE.get("type", "clear")
     weather_intensity = WEATHER_STATE.get("intensity", "none")
     
@@ -9,12 +9,12 @@ except ImportError:
     pass  # eventlet not available, will use sync mode
 
 import json
+import atexit
 import sqlite3
-import random
 import logging
 from functools import wraps
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, session, jsonify, redirect, url_for, flash
+from flask import Flask, render_template, request, session, jsonify, redirect, url_for, flash, g, has_request_context
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_socketio import SocketIO, emit, join_room, leave_room, disconnect
 
@@ -56,16 +56,23 @@ from game_engine import (
     NPCS,
     AVAILABLE_RACES,
     AVAILABLE_BACKSTORIES,
-    get_npcs_in_room,
     get_current_game_tick,
-    update_player_weather_status,
-    process_npc_movements,
+    register_world_tick_systems,
 )
-import ambiance
 from core.state_manager import get_state_manager
-from core.socketio_handlers import register_socketio_handlers
-from game.systems.atmospheric_manager import get_atmospheric_manager
-from core.redis_manager import test_redis_connection
+from core.socketio_handlers import register_socketio_handlers, push_messages
+from core.redis_manager import test_redis_connection, begin_redis_batch, end_redis_batch
+from core.event_bus import begin_event_batch, end_event_batch, event_batch
+from core.persistence import get_persistence
+from core.room_index import get_room_index
+from core.message_buffer import get_message_buffers
+from core.settings import SettingsService, get_settings_service
+from core.db_pool import get_db_pool
+from core.dialogue_service import get_dialogue_service
+from core.response_cache import RedisTier, SQLiteTier, configure_response_cache, get_response_cache
+from core.ai_limits import configure_rate_limiter, get_rate_limiter, get_usage_ledger
+from utils.prompt_loader import get_prompt_registry
+from game.world.manager import WorldManager
 
 app = Flask(__name__)
 
@@ -77,6 +84,28 @@ app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 app.config["SESSION_COOKIE_SECURE"] = False  # Set to True in production with HTTPS
 app.config["PERMANENT_SESSION_LIFETIME"] = 86400  # 24 hours
 
+
+@app.before_request
+def _begin_request_redis_batch():
+    """Coalesce the Redis cache writes (and published events) of one request."""
+    begin_redis_batch()
+    begin_event_batch()
+
+
+@app.teardown_request
+def _flush_request_redis_batch(exc=None):
+    """Send the request's queued Redis writes and events."""
+    end_redis_batch()
+    end_event_batch()
+
+
+@app.teardown_request
+def _release_request_db(exc=None):
+    """Return the request's database connection to the pool."""
+    conn = g.pop("_db_conn", None)
+    if conn is not None:
+        conn.release()
+
 # Initialize Flask-SocketIO with Redis adapter for multi-instance scaling
 REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 
@@ -201,116 +230,113 @@ def init_db() -> None:
                 "INSERT OR IGNORE INTO game_settings (key, value, description) VALUES (?, ?, ?)",
                 (key, default_value, description)
             )
+        SettingsService.create_tables(conn)
+        SQLiteTier.create_tables(conn)
         
         conn.commit()
 
 init_db()
 
-def get_db() -> sqlite3.Connection:
-    """Get database connection with WAL mode enabled for better concurrency."""
-    conn = sqlite3.connect(DATABASE, timeout=10.0)  # 10 second timeout
-    conn.row_factory = sqlite3.Row
-    # Enable WAL mode for better concurrency (allows reads during writes)
-    conn.execute("PRAGMA journal_mode=WAL")
-    return conn
+DB_POOL = get_db_pool(
+    DATABASE,
+    size=int(os.environ.get("DB_POOL_SIZE", "16")),
+    checkout_timeout=float(os.environ.get("DB_POOL_TIMEOUT", "10.0")),
+)
+
+def get_db():
+    """
+    Get a pooled database connection (WAL mode, pragmas applied once per connection).
+
+    Inside a request every call returns the same connection, checked out on
+    first use and returned to the pool when the request ends; close() is
+    still safe to call. Outside a request close() returns it to the pool.
+    """
+    if has_request_context():
+        conn = g.get("_db_conn")
+        if conn is None or conn.closed:
+            conn = g._db_conn = DB_POOL.acquire()
+        return conn.retain()
+    return DB_POOL.acquire()
 
 # --- Game Settings Management ---
+# Settings are cached in memory; reads never touch the database.
+SETTINGS = get_settings_service(get_db)
+SETTINGS.load()
 
 def get_game_setting(key, default=None):
-    """Get a game setting value from the database."""
-    conn = get_db()
-    try:
-        row = conn.execute("SELECT value FROM game_settings WHERE key = ?", (key,)).fetchone()
-        return row["value"] if row else default
-    finally:
-        conn.close()
+    """Get a game setting value (from the in-memory settings cache)."""
+    return SETTINGS.get(key, default)
 
 def set_game_setting(key, value, description=None):
-    """Set a game setting value in the database."""
-    conn = get_db()
-    try:
-        conn.execute(
-            """
-            INSERT INTO game_settings (key, value, description, updated_at)
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(key) DO UPDATE SET 
-                value = excluded.value,
-                updated_at = CURRENT_TIMESTAMP
-            """,
-            (key, str(value), description)
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    """Set a game setting value in the database and the settings cache."""
+    SETTINGS.set(key, value, description)
 
 def get_all_game_settings():
     """Get all game settings as a dictionary."""
-    conn = get_db()
-    try:
-        rows = conn.execute("SELECT key, value, description FROM game_settings ORDER BY key").fetchall()
-        return {row["key"]: {"value": row["value"], "description": row["description"]} for row in rows}
-    finally:
-        conn.close()
+    return SETTINGS.all()
 
 # --- State Management ---
 
 ACTIVE_GAMES = {}
 ACTIVE_SESSIONS = {}
 
+PERSISTENCE = get_persistence(
+    STATE_FILE,
+    snapshot_fn=get_global_state_snapshot,
+    players_fn=lambda: ACTIVE_GAMES,
+    flush_interval=float(os.environ.get("STATE_FLUSH_INTERVAL", "2.0")),
+    compact_every=int(os.environ.get("STATE_COMPACT_EVERY", "1000")),
+)
+
+# Room -> online players index (kept in step with ACTIVE_GAMES)
+ROOM_INDEX = get_room_index()
+
+# Per-player message ring buffers (outside the persisted game dicts); messages
+# posted for WebSocket players are pushed to them as they arrive
+MESSAGES = get_message_buffers()
+MESSAGES.add_listener(lambda username: push_messages(socketio, username))
+
 def load_state_from_disk():
-    """Load ACTIVE_GAMES and global state from disk."""
+    """Load ACTIVE_GAMES and global state from the snapshot plus delta log."""
     global ACTIVE_GAMES
-    if not os.path.exists(STATE_FILE):
-        return
     try:
-        with open(STATE_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = PERSISTENCE.load()
+        if not data:
+            return
         if "players" in data and isinstance(data["players"], dict):
             ACTIVE_GAMES = data["players"]
+            for uname, g in ACTIVE_GAMES.items():
+                MESSAGES.adopt_legacy_log(uname, g)
+            ROOM_INDEX.rebuild(ACTIVE_GAMES)
         if "global_state" in data:
             load_global_state_snapshot(data["global_state"])
     except Exception as e:
         print(f"Error loading state from disk: {e}")
 
 def save_state_to_disk():
-    """Save ACTIVE_GAMES and global state to disk."""
-    try:
-        cleaned_games = {}
-        for username, game in ACTIVE_GAMES.items():
-            cleaned_game = {k: v for k, v in game.items() if not k.startswith("_")}
-            cleaned_games[username] = cleaned_game
-        
-        data = {
-            "players": cleaned_games,
-            "global_state": get_global_state_snapshot(),
-        }
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error saving state to disk: {e}")
+    """
+    Ask the write-behind flusher to persist pending changes.
+    
+    No I/O happens here: save_game() marks the player dirty and the engine marks
+    touched rooms/NPCs, so the background flush only writes those deltas.
+    """
+    PERSISTENCE.request_flush()
 
 load_state_from_disk()
 
 def broadcast_to_room(sender_username, room_id, text):
-    """Broadcast a message to all other players in the same room."""
-    # Update logs for polling clients
-    for uname, g in ACTIVE_GAMES.items():
+    """
+    Broadcast a message to all other players in the same room.
+    
+    The message goes into each recipient's message buffer: WebSocket players get
+    it pushed right away, polling players with their next /poll or /command.
+    """
+    for uname in ROOM_INDEX.players_in(room_id):
         if uname == sender_username:
             continue
-        if g.get("location") == room_id:
-            g.setdefault("log", [])
-            g["log"].append(text)
-            g["log"] = g["log"][-50:]
-    
-    # Emit via SocketIO for real-time clients
-    try:
-        socketio.emit('room_message', {
-            'room_id': room_id,
-            'message': text,
-            'message_type': 'system'
-        }, room=f"room:{room_id}", skip_sid=None) # We don't have SID here easily, so might duplicate if sender is on socket
-    except Exception:
-        pass
+        g = ACTIVE_GAMES.get(uname)
+        if g is not None and g.get("location") == room_id:
+            MESSAGES.post(uname, text)
 
 def cleanup_stale_sessions():
     """Remove stale sessions and clean up ACTIVE_GAMES."""
@@ -326,6 +352,10 @@ def cleanup_stale_sessions():
             logout_msg = f"[{username} has been logged out automatically for being idle too long.]"
             broadcast_to_room(username, game.get("location"), logout_msg)
             ACTIVE_GAMES.pop(username, None)
+            ROOM_INDEX.remove(username)
+            PERSISTENCE.mark_player_dirty(username)
+            WorldManager.get_instance().evict_player(username)
+            MESSAGES.drop(username)
         ACTIVE_SESSIONS.pop(username, None)
 
 def list_active_players():
@@ -335,13 +365,13 @@ def list_active_players():
     seen_usernames = set()
     cutoff_time = datetime.now() - timedelta(minutes=10)
     
-    for uname, g in ACTIVE_GAMES.items():
+    for uname, location in ROOM_INDEX.locations().items():
         if uname in seen_usernames:
             continue
         seen_usernames.add(uname)
         session_info = ACTIVE_SESSIONS.get(uname)
         if session_info and session_info.get("last_activity", datetime.min) >= cutoff_time:
-            data.append({"username": uname, "location": g.get("location", "town_square")})
+            data.append({"username": uname, "location": location})
     return data
 
 def require_auth(f):
@@ -408,7 +438,9 @@ def get_game():
         state_manager = get_state_manager_instance()
         cached_game = state_manager.get_player_state(username, use_cache=True)
         if cached_game and username in ACTIVE_SESSIONS:
+            MESSAGES.adopt_legacy_log(username, cached_game)
             ACTIVE_GAMES[username] = cached_game
+            ROOM_INDEX.update(username, cached_game.get("location"))
             return cached_game
     except Exception as e:
         logger.warning(f"Error getting game state from StateManager: {e}")
@@ -442,6 +474,7 @@ def get_game():
                 game["user_description"] = user_row["description"]
             
             game["username"] = username
+            MESSAGES.adopt_legacy_log(username, game)
             from economy import initialize_player_gold
             initialize_player_gold(game)
             game.setdefault("notify", {"login": False})
@@ -453,6 +486,7 @@ def get_game():
             except Exception: pass
             
             ACTIVE_GAMES[username] = game
+            ROOM_INDEX.update(username, game.get("location"))
             save_state_to_disk()
             return game
         except Exception:
@@ -486,27 +520,16 @@ def save_game(game):
     if not username: return
     
     ACTIVE_GAMES[username] = game
+    ROOM_INDEX.update(username, game.get("location"))
+    PERSISTENCE.mark_player_dirty(username)
     
     try:
         state_manager = get_state_manager_instance()
         # Only sync to DB if we have user_id (i.e., we're in a request context)
         # In background tasks, just update in-memory cache
         sync_to_db = bool(user_id)
+        # Writes state, location and room player sets in one pipelined round trip
         state_manager.save_player_state(username, game, sync_to_db=sync_to_db, use_cache=True)
-        
-        # Update Redis location
-        if "location" in game:
-            from core.redis_manager import CacheKeys, set_cached_state
-            room_id = game["location"]
-            set_cached_state(CacheKeys.player_location(username), room_id, ttl=900)
-            
-            cache = state_manager._cache
-            if cache:
-                old_location_key = f"player:{username}:location"
-                old_room_id = cache.get(old_location_key)
-                if old_room_id and old_room_id != room_id:
-                    cache.srem(CacheKeys.room_players(old_room_id), username)
-                cache.sadd(CacheKeys.room_players(room_id), username)
     except Exception as e:
         logger.warning(f"Error saving via StateManager: {e}")
         # DB Fallback - use single connection for all updates to avoid locking
@@ -707,8 +730,7 @@ def index():
         hour_of_day = int(current_minutes // MINUTES_PER_HOUR) % 24
         if (hour_of_day >= 1 and hour_of_day < 10) and not is_admin_user(username, game):
             game["location"] = "town_square"
-            game.setdefault("log", []).append("[CYAN]Mara notices you in the locked tavern and shakes her head. 'Sorry, but the tavern's closed right now! Out you go!' She ushers you out the door to the town square.[/CYAN]")
-            game["log"] = game["log"][-50:]
+            MESSAGES.post(username, "[CYAN]Mara notices you in the locked tavern and shakes her head. 'Sorry, but the tavern's closed right now! Out you go!' She ushers you out the door to the town square.[/CYAN]")
             save_game(game)
             broadcast_to_room(username, "town_square", f"{username} appears in the town square, looking slightly bewildered after being ejected from the locked tavern.")
     
@@ -736,9 +758,9 @@ def index():
                 storyteller = NPCS["old_storyteller"]
                 possessive = getattr(storyteller, 'possessive', 'their')
                 storyteller_name = storyteller.name if hasattr(storyteller, 'name') else 'The Old Storyteller'
-                game["log"].append(f"The Old Storyteller looks up from {possessive} tales, eyes twinkling with ancient wisdom. '{username}... a {race_name} with a {backstory_name.lower()}...' {storyteller_name} smiles warmly. 'Welcome to Hollowvale. Your story is just beginning. The wheel has turned, and you have returned.'")
+                MESSAGES.post(username, f"The Old Storyteller looks up from {possessive} tales, eyes twinkling with ancient wisdom. '{username}... a {race_name} with a {backstory_name.lower()}...' {storyteller_name} smiles warmly. 'Welcome to Hollowvale. Your story is just beginning. The wheel has turned, and you have returned.'")
             
-            game["log"].append(describe_location(game))
+            MESSAGES.post(username, describe_location(game))
             save_game(game)
             session.pop("onboarding_step", None)
             session.pop("onboarding_state", None)
@@ -746,18 +768,19 @@ def index():
             session["onboarding_step"] = "start"
             return redirect(url_for("index"))
     
-    if len(game.get("log", [])) == 2 and "Type 'look' to see where you are" in game["log"][-1]:
-        game["log"].append(describe_location(game))
-        save_game(game)
+    messages = MESSAGES.get(username)
+    if len(messages) == 2 and "Type 'look' to see where you are" in messages.texts(1)[0]:
+        messages.append(describe_location(game))
     
-    if "last_log_index" not in session:
-        session["last_log_index"] = len(game.get("log", [])) - 1
-        session.modified = True
+    # The page shows the whole buffer; the client continues from its last seq
+    log = messages.texts()
+    last_seq = messages.last_seq
+    messages.mark_delivered(last_seq)
     
     from color_system import get_color_settings
     color_settings = get_color_settings(game) if game else {}
     
-    return render_template("index.html", log=highlight_exits_in_log(game["log"]), session=session, onboarding=False, color_settings=color_settings)
+    return render_template("index.html", log=highlight_exits_in_log(log), last_seq=last_seq, session=session, onboarding=False, color_settings=color_settings)
 
 @app.route("/logout")
 def logout():
@@ -768,6 +791,10 @@ def logout():
         broadcast_to_room(username, ACTIVE_GAMES[username].get("location"), f"[{username} has logged out.]")
         ACTIVE_GAMES.pop(username, None)
         ACTIVE_SESSIONS.pop(username, None)
+        ROOM_INDEX.remove(username)
+        PERSISTENCE.mark_player_dirty(username)
+        WorldManager.get_instance().evict_player(username)
+        MESSAGES.drop(username)
     
     session.pop("welcome_added", None)
     session.clear()
@@ -843,9 +870,9 @@ def command():
                 storyteller = NPCS["old_storyteller"]
                 possessive = getattr(storyteller, 'possessive', 'their')
                 storyteller_name = storyteller.name if hasattr(storyteller, 'name') else 'The Old Storyteller'
-                game["log"].append(f"The Old Storyteller looks up from {possessive} tales, eyes twinkling with ancient wisdom. '{username}... a {race_name} with a {backstory_name.lower()}...' {storyteller_name} smiles warmly. 'Welcome to Hollowvale. Your story is just beginning. The wheel has turned, and you have returned.'")
+                MESSAGES.post(username, f"The Old Storyteller looks up from {possessive} tales, eyes twinkling with ancient wisdom. '{username}... a {race_name} with a {backstory_name.lower()}...' {storyteller_name} smiles warmly. 'Welcome to Hollowvale. Your story is just beginning. The wheel has turned, and you have returned.'")
             
-            game["log"].append(describe_location(game))
+            MESSAGES.post(username, describe_location(game))
             save_game(game)
             log = [response]
             conn.close()
@@ -881,34 +908,6 @@ def command():
             cmd, game, username=username, user_id=user_id, db_conn=conn, broadcast_fn=broadcast_fn, who_fn=list_active_players
         )
         
-        # Check for sunrise/sunset transitions
-        atmos = get_atmospheric_manager()
-        notifications = atmos.check_sunrise_sunset_transitions()
-        
-        # Broadcast notifications
-        for msg_type, msg_text in notifications:
-            # Filter broadcast function to only notify players with notify time on (for sunrise/sunset)
-            for uname, g in ACTIVE_GAMES.items():
-                # For now, broadcast to all outdoor rooms or just all players?
-                # The old logic filtered by room_id but we don't have a specific room_id here
-                # We'll broadcast to all players who are in outdoor rooms (implied by message content usually)
-                # or just check their notify settings
-                notify_cfg = g.get("notify", {})
-                if notify_cfg.get("time", False):
-                    g.setdefault("log", [])
-                    g["log"].append(msg_text)
-                    g["log"] = g["log"][-50:]
-                    # Also emit socket event if possible
-                    try:
-                        socketio.emit('room_message', {
-                            'room_id': g.get("location"),
-                            'message': msg_text,
-                            'message_type': 'system'
-                        }, room=f"user:{uname}")
-                    except Exception: pass
-        
-                    except Exception: pass
-        
         if "user_description" in game:
             conn.execute("UPDATE users SET description = ? WHERE id = ?", (game["user_description"], user_id))
             conn.commit()
@@ -918,11 +917,8 @@ def command():
         print(f"Error handling command '{cmd}': {e}")
         print(traceback.format_exc())
         error_msg = f"An error occurred while processing your command. Please try again."
-        game.setdefault("log", []).append(error_msg)
-        game["log"] = game["log"][-50:]
+        MESSAGES.post(username, error_msg, notify=False)
         response = error_msg
-        save_game(game)
-        save_state_to_disk()
     finally:
         conn.close()
     
@@ -932,45 +928,50 @@ def command():
         broadcast_to_room(username, game.get("location"), f"[{username} has logged out.]")
         ACTIVE_GAMES.pop(username, None)
         ACTIVE_SESSIONS.pop(username, None)
+        ROOM_INDEX.remove(username)
+        PERSISTENCE.mark_player_dirty(username)
+        WorldManager.get_instance().evict_player(username)
+        MESSAGES.drop(username)
         
         # Note: Session is NOT cleared here - client will redirect to /logout which handles session clearing
         return jsonify({"logout": True, "message": "You have logged out.", "log": []})
     
-    session.setdefault("last_log_index", -1)
-    last_log_index = session.get("last_log_index", -1)
-    current_log = game.get("log", [])
-    current_log_length = len(current_log)
-    
-    if last_log_index >= current_log_length: last_log_index = -1
-    
-    if last_log_index + 1 <= current_log_length:
-        new_log_entries = current_log[last_log_index + 1:]
-    else:
-        new_log_entries = []
-    
-    if len(new_log_entries) == 0 and current_log_length > 0:
-        if last_log_index >= current_log_length - 1:
-            session["last_log_index"] = -1
-            session.modified = True
-            if current_log_length >= 2: new_log_entries = current_log[-2:]
-            elif current_log_length == 1: new_log_entries = current_log[-1:]
-    
-    if len(new_log_entries) > 0:
-        session["last_log_index"] = current_log_length - 1
-        session.modified = True
+    # Everything after the client's last seq (or the delivered cursor): this
+    # command's echo and response plus broadcasts that arrived since the last fetch
+    messages = MESSAGES.get(username)
+    new_log_entries = [text for _, text in messages.take(_client_seq(data))]
     
     processed_log = highlight_exits_in_log(new_log_entries) if new_log_entries else []
     
     from color_system import get_color_settings
     color_settings = get_color_settings(game)
     
-    return jsonify({"response": response, "log": processed_log, "color_settings": color_settings})
+    return jsonify({"response": response, "log": processed_log, "seq": messages.last_seq, "color_settings": color_settings})
+
+def _client_seq(data):
+    """The "after" cursor a client sent (last message seq it saw), or None."""
+    try:
+        return int(data["after"]) if data and data.get("after") is not None else None
+    except (TypeError, ValueError):
+        return None
 
-LAST_POLL_STATE = {}
+# Seconds a /poll request waits for a message before returning empty (long-poll)
+POLL_TIMEOUT = float(os.environ.get("POLL_TIMEOUT", "25"))
 
 @app.route("/poll", methods=["POST"])
 @require_auth
 def poll_updates():
+    """
+    Long-poll for messages (clients without a WebSocket).
+    
+    Parks the request on the player's message buffer until something is posted
+    for them (room broadcasts, tells, NPC actions and ambiance from the
+    background event scheduler) or POLL_TIMEOUT expires. Nothing is generated
+    here, so an idle player costs one sleeping request rather than a round of
+    world updates every few seconds.
+    
+    JSON body (optional): {"after": last seq seen, "wait": false for an immediate answer}
+    """
     username = session.get("username")
     user_id = session.get("user_id")
     if not username or not user_id: return jsonify({"messages": []})
@@ -983,90 +984,22 @@ def poll_updates():
     if username not in ACTIVE_GAMES:
         return jsonify({"messages": []})
     
-    game = get_game()
-    if not game: return jsonify({"messages": []})
-    
-    # Only add to ACTIVE_SESSIONS if user actually has an active game
-    # This prevents logged-out users from being re-added on polling
-    if username in ACTIVE_GAMES:
-        ACTIVE_SESSIONS[username] = {
-            "last_activity": datetime.now(),
-            "session_id": session.get("session_id", id(session)),
-        }
-    
-    
-    def broadcast_fn(room_id, text):
-        broadcast_to_room(username, room_id, text)
-    
-    # Update weather/player status (but don't accumulate messages)
-    atmos = get_atmospheric_manager()
-    weather_changed, transition_message = atmos.update()
-    # Note: Transition messages are handled in background task, not here
-    
-    # process_world_clock_events() # Removed as it no longer exists
-    update_player_weather_status(game)
-    # NPC weather updates now handled in handle_command() via new model methods (Phase 2)
-    # cleanup_buried_items() # Removed
-    # process_time_based_exit_states() # Removed
-    process_npc_movements(broadcast_fn=broadcast_fn)
-    
-    current_time = datetime.now()
-    if username not in LAST_POLL_STATE:
-        LAST_POLL_STATE[username] = {
-            "last_ambiance_time": current_time,
-            "last_npc_action_time": current_time,
-        }
-    
-    poll_state = LAST_POLL_STATE[username]
-    new_messages = []
-    current_room = game.get("location", "town_square")
-    
-    npc_interval_min = float(get_game_setting("npc_action_interval_min", "30"))
-    npc_interval_max = float(get_game_setting("npc_action_interval_max", "60"))
-    
-    last_npc_time = poll_state.get("last_npc_action_time", current_time)
-    elapsed_npc_seconds = (current_time - last_npc_time).total_seconds()
-    
-    if elapsed_npc_seconds >= npc_interval_min:
-        from npc_actions import get_all_npc_actions_for_room
-        npc_ids = get_npcs_in_room(current_room)
-        if npc_ids:
-            npc_actions = get_all_npc_actions_for_room(current_room, game=game, active_players_fn=list_active_players)
-            if npc_actions:
-                npc_id, action = random.choice(list(npc_actions.items()))
-                action_text = f"[NPC]{action}[/NPC]"
-                new_messages.append(action_text)
-                broadcast_fn(current_room, action_text)
-                next_interval = random.uniform(npc_interval_min, npc_interval_max)
-                poll_state["last_npc_action_time"] = current_time - timedelta(seconds=elapsed_npc_seconds - next_interval)
-    
-    ambiance_interval_min = float(get_game_setting("ambiance_interval_min", "120"))
-    ambiance_interval_max = float(get_game_setting("ambiance_interval_max", "240"))
-    
-    last_ambiance_time = poll_state.get("last_ambiance_time", current_time)
-    elapsed_ambiance_seconds = (current_time - last_ambiance_time).total_seconds()
-    
-    if elapsed_ambiance_seconds >= ambiance_interval_min:
-        ambiance_msg = ambiance.process_room_ambiance(game, broadcast_fn=broadcast_fn)
-        if ambiance_msg and len(ambiance_msg) > 0:
-            new_messages.append(ambiance_msg[0])
-            next_interval = random.uniform(ambiance_interval_min, ambiance_interval_max)
-            poll_state["last_ambiance_time"] = current_time - timedelta(seconds=elapsed_ambiance_seconds - next_interval)
-    
-    # Weather messages for outdoor rooms (using old working system)
-    # Weather messages are now handled by the background events system
-    # (removed duplicate weather message logic from poll_updates)
-    
-    if new_messages:
-        game.setdefault("log", [])
-        for msg in new_messages:
-            game["log"].append(msg)
-        game["log"] = game["log"][-50:]
-        save_game(game)
-        save_state_to_disk()
+    ACTIVE_SESSIONS[username] = {
+        "last_activity": datetime.now(),
+        "session_id": session.get("session_id", id(session)),
+    }
     
-    processed_messages = highlight_exits_in_log(new_messages) if new_messages else []
-    return jsonify({"messages": processed_messages})
+    data = request.get_json(silent=True) or {}
+    timeout = POLL_TIMEOUT if data.get("wait", True) else 0.0
+    messages = MESSAGES.get(username)
+    entries = messages.take(_client_seq(data), timeout=timeout)
+    processed_messages = highlight_exits_in_log([text for _, text in entries]) if entries else []
+    return jsonify({
+        "messages": processed_messages,
+        # Lets the client drop messages it already got from /command while this request was parked
+        "first_seq": entries[0][0] if entries else None,
+        "seq": messages.last_seq,
+    })
 
 def require_admin(f):
     @wraps(f)
@@ -1095,13 +1028,14 @@ def require_admin(f):
 @require_admin
 def admin_dashboard():
     try:
-        from ai_client import _token_usage, _user_token_usage, _response_cache
+        from ai_client import _token_usage, _user_token_usage
     except ImportError:
         _token_usage = {"total_tokens": 0, "prompt_tokens": 0, "completion_tokens": 0, "requests": 0, "last_reset": "Never"}
         _user_token_usage = {}
-        _response_cache = {}
     
     conn = get_db()
+    # Write this worker's pending usage first (other workers flush every few seconds)
+    get_usage_ledger().flush(conn)
     total_users = conn.execute("SELECT COUNT(*) as count FROM users").fetchone()["count"]
     total_ai_users = conn.execute("SELECT COUNT(*) as count FROM ai_usage").fetchone()["count"]
     user_usage = conn.execute(
@@ -1117,20 +1051,14 @@ def admin_dashboard():
         """
     ).fetchall()
     
-    rate_limit_stats = conn.execute(
-        """
-        SELECT user_id, COUNT(*) as request_count
-        FROM ai_rate_limits
-        WHERE request_time > datetime('now', '-1 hour')
-        GROUP BY user_id
-        """
-    ).fetchall()
-    rate_limit_map = {row["user_id"]: row["request_count"] for row in rate_limit_stats}
+    # Requests in the last hour come from the rate limiter (memory or Redis)
+    limiter = get_rate_limiter()
+    counts = limiter.counts(row["username"] for row in user_usage)
+    rate_limit_map = {row["id"]: counts[row["username"]] for row in user_usage}
     conn.close()
     
     global_usage = _token_usage.copy()
-    cache_size = len(_response_cache)
-    cache_hits = sum(1 for entry in _response_cache.values() if datetime.now() - entry["timestamp"] < timedelta(hours=24))
+    cache_stats = get_response_cache().get_stats()
     default_budget = int(os.environ.get("AI_DEFAULT_TOKEN_BUDGET", "10000"))
     
     return render_template(
@@ -1140,9 +1068,8 @@ def admin_dashboard():
         user_usage=user_usage,
         rate_limit_map=rate_limit_map,
         global_usage=global_usage,
-        cache_size=cache_size,
-        cache_hits=cache_hits,
-        max_requests_per_hour=os.environ.get("AI_MAX_REQUESTS_PER_HOUR", "60"),
+        cache_stats=cache_stats,
+        max_requests_per_hour=limiter.limit,
         default_budget=default_budget,
     )
 
@@ -1170,6 +1097,7 @@ def set_budget():
     )
     conn.commit()
     conn.close()
+    get_usage_ledger().invalidate()
     return jsonify({"success": True, "message": f"Budget set to {budget} tokens"})
 
 # Register SocketIO handlers
@@ -1187,52 +1115,26 @@ try:
         from game_engine import WORLD
         return list(WORLD.keys())
     
-    def update_weather_statuses():
-        """Wrapper to update weather for all players and NPCs, and broadcast transition messages."""
-        from game.systems.atmospheric_manager import get_atmospheric_manager
+    def broadcast_weather_transition(transition_message):
+        """Broadcast a weather transition message to all outdoor rooms."""
         from game_engine import WORLD
         
-        atmos = get_atmospheric_manager()
-        weather_changed, transition_message = atmos.update()
-        
-        # If weather changed and we have a transition message, broadcast to all outdoor rooms
-        if weather_changed and transition_message:
-            # Get all outdoor rooms
-            outdoor_rooms = [room_id for room_id, room_def in WORLD.items() 
-                           if room_def.get("outdoor", False)]
-            
-            # Broadcast transition message to all outdoor rooms
-            for room_id in outdoor_rooms:
-                try:
-                    # Check if room has active players
-                    from core.redis_manager import get_cache_connection, CacheKeys
-                    cache = get_cache_connection()
-                    room_players_key = CacheKeys.room_players(room_id)
-                    players = cache.smembers(room_players_key)
-                    players = list(players) if players else []
-                    
-                    if players:
-                        # Format message with CYAN tags for visibility
-                        formatted_message = f"[CYAN]{transition_message}[/CYAN]"
-                        socketio.emit('room_message', {
-                            'room_id': room_id,
-                            'message': formatted_message,
-                            'message_type': 'weather_transition'
-                        }, room=f"room:{room_id}")
-                except Exception as e:
-                    # If Redis unavailable or other error, still try to broadcast via SocketIO
-                    # (SocketIO will handle rooms even if Redis is down)
-                    try:
-                        formatted_message = f"[CYAN]{transition_message}[/CYAN]"
-                        socketio.emit('room_message', {
-                            'room_id': room_id,
-                            'message': formatted_message,
-                            'message_type': 'weather_transition'
-                        }, room=f"room:{room_id}")
-                    except Exception:
-                        pass  # Silently fail if SocketIO also unavailable
-        
-        # Update weather status for all players and NPCs
+        formatted_message = f"[CYAN]{transition_message}[/CYAN]"
+        outdoor_rooms = [room_id for room_id, room_def in WORLD.items()
+                         if room_def.get("outdoor", False)]
+        for room_id in outdoor_rooms:
+            broadcast_to_room(None, room_id, formatted_message)
+    
+    def notify_time_subscribers(msg_type, msg_text):
+        """Deliver sunrise/sunset messages to players with notify time on."""
+        for uname, g in list(ACTIVE_GAMES.items()):
+            if not g.get("notify", {}).get("time", False):
+                continue
+            # Pushed over SocketIO for connected players, otherwise delivered by /poll
+            MESSAGES.post(uname, msg_text)
+    
+    def update_weather_statuses():
+        """Wrapper to update weather status for all players and NPCs."""
         update_all_weather_statuses(
             get_active_games_fn=lambda: ACTIVE_GAMES,
             get_active_sessions_fn=lambda: ACTIVE_SESSIONS,
@@ -1240,24 +1142,81 @@ try:
             get_npc_state_fn=lambda: NPC_STATE,
         )
     
+    # World upkeep runs on a fixed cadence, independent of command rate
+    world_tick = register_world_tick_systems(
+        broadcast_fn=lambda room_id, text: broadcast_to_room(None, room_id, text),
+        who_fn=list_active_players,
+        notify_fn=notify_time_subscribers,
+        on_weather_change=broadcast_weather_transition,
+    )
+    # Player weather statuses every 5 ticks (previously every background cycle)
+    world_tick.register("weather_statuses", update_weather_statuses, every=5)
+    # Pick up settings changed by other workers (one single-row version query)
+    world_tick.register("settings_refresh", SETTINGS.refresh_if_changed, every=5)
+    world_tick.interval = float(os.environ.get("WORLD_TICK_INTERVAL", world_tick.interval))
+    # Events published during a tick go out as one message per channel
+    world_tick.tick_context = event_batch
+    world_tick.start(socketio)
+    
     # Import ambiance processing functions
     from ambiance import process_room_ambiance, process_weather_ambiance
     
-    # Start background events (weather updates run every 5 seconds along with other events)
+    # Start background events (weather updates now run on the world tick)
     start_background_event_generator(
         socketio,
-        get_game_setting_fn=None,  # Can be added later if needed
+        get_game_setting_fn=get_game_setting,  # In-memory settings cache, no I/O
         get_all_rooms_fn=get_all_rooms,
         process_ambiance_fn=process_room_ambiance,  # General ambiance (every 2-4 minutes)
         process_weather_ambiance_fn=process_weather_ambiance,  # Weather messages (every 30-60 seconds)
         process_decay_fn=None,  # Decay can be added later
-        update_weather_fn=update_weather_statuses,
+        update_weather_fn=None,
         get_active_games_fn=lambda: ACTIVE_GAMES,
+        get_occupied_rooms_fn=ROOM_INDEX.occupied_rooms,
+        # Into each player's message buffer (SocketIO push or long-poll /poll)
+        deliver_fn=lambda room_id, text: broadcast_to_room(None, room_id, text),
     )
     logger.info("Background weather updates started")
 except Exception as e:
     logger.warning(f"Could not start background event generator: {e}", exc_info=True)
 
+# AI replies are cached in-process and shared between workers (Redis) or restarts (SQLite)
+_ai_cache_ttl = int(os.environ.get("AI_CACHE_TTL", "86400"))
+configure_response_cache(
+    max_entries=int(os.environ.get("AI_CACHE_MAX_ENTRIES", "1000")),
+    ttl=_ai_cache_ttl,
+    shared=RedisTier(_ai_cache_ttl) if use_redis else SQLiteTier(
+        DB_POOL.acquire, _ai_cache_ttl, max_entries=int(os.environ.get("AI_CACHE_SHARED_MAX_ENTRIES", "20000"))
+    ),
+)
+
+# Compile and validate the AI prompt templates now (problems are logged here, not per request)
+PROMPTS = get_prompt_registry()
+PROMPTS.load()
+if os.environ.get("PROMPT_HOT_RELOAD", "").lower() in ("1", "true", "yes"):
+    PROMPTS.start_watcher(float(os.environ.get("PROMPT_RELOAD_INTERVAL", "2.0")), socketio)
+
+# AI rate limits are counted in memory (shared through Redis when available);
+# token usage is batched into ai_usage by the ledger's background flush
+configure_rate_limiter(int(os.environ.get("AI_MAX_REQUESTS_PER_HOUR", "60")), use_redis=use_redis)
+USAGE_LEDGER = get_usage_ledger(flush_interval=float(os.environ.get("AI_USAGE_FLUSH_INTERVAL", "2.0")))
+USAGE_LEDGER.start(socketio, connect=DB_POOL.acquire)
+
+# AI NPC dialogue runs in the background; replies reach the room via room_message
+get_dialogue_service(
+    max_concurrency=int(os.environ.get("AI_MAX_CONCURRENCY", "4")),
+    timeout=float(os.environ.get("AI_REPLY_TIMEOUT", "8.0")),
+).start(
+    socketio,
+    connect=DB_POOL.acquire,
+    deliver=lambda room_id, text: broadcast_to_room(None, room_id, text),
+)
+
+# Start write-behind persistence (flushes dirty players/rooms/NPCs in the background)
+PERSISTENCE.start(socketio)
+atexit.register(PERSISTENCE.stop)
+atexit.register(DB_POOL.close_all)
+atexit.register(USAGE_LEDGER.stop)  # runs before close_all (atexit is LIFO)
+
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))
     socketio.run(app, host='0.0.0.0', port=port)
\ No newline at end of file
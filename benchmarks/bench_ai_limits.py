@@ -0,0 +1,128 @@
+"""
+Benchmark: per-request AI bookkeeping, database-backed vs. in-memory.
+
+Simulates the bookkeeping around each AI call for a set of active players
+against a SQLite file in WAL mode (the game's database settings):
+
+- legacy: rebuild the user's timestamp list, INSERT into ai_rate_limits and
+  DELETE expired rows, SELECT the budget from ai_usage, then UPSERT the usage
+  and commit after the completion
+- current: sliding-window limiter check/hit in memory, cached budget check
+  and an in-memory usage delta, with one batched flush per FLUSH_EVERY calls
+
+Usage:
+    python benchmarks/bench_ai_limits.py
+"""
+import os
+import sys
+import time
+import sqlite3
+import logging
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+from core.ai_limits import SlidingWindowLimiter, UsageLedger
+
+PLAYERS = 50
+CALLS = 2000
+PRIOR_REQUESTS = 40  # requests already in each player's window
+FLUSH_EVERY = 100  # calls per flush (~2 s at 50 calls/s)
+TOKENS = 132
+
+
+def make_db(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        """
+        CREATE TABLE ai_usage (
+            user_id INTEGER PRIMARY KEY,
+            token_budget INTEGER DEFAULT 10000,
+            tokens_used INTEGER DEFAULT 0,
+            requests_count INTEGER DEFAULT 0,
+            last_reset TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    conn.execute("CREATE TABLE ai_rate_limits (user_id INTEGER NOT NULL, request_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    conn.execute("CREATE INDEX idx_rate_limit_user_time ON ai_rate_limits(user_id, request_time)")
+    conn.executemany("INSERT INTO ai_usage (user_id, token_budget) VALUES (?, ?)",
+                     [(i, 10 ** 9) for i in range(PLAYERS)])
+    conn.commit()
+    return conn
+
+
+def legacy_call(conn, request_times, user_id):
+    username = f"player{user_id}"
+    now = datetime.now()
+    request_times[username] = [t for t in request_times[username] if now - t < timedelta(hours=1)]
+    conn.execute("INSERT INTO ai_rate_limits (user_id, request_time) VALUES (?, ?)", (user_id, now))
+    conn.execute("DELETE FROM ai_rate_limits WHERE request_time < datetime('now', '-1 hour')")
+    allowed = len(request_times[username]) < 10 ** 6
+    row = conn.execute("SELECT token_budget, tokens_used FROM ai_usage WHERE user_id = ?", (user_id,)).fetchone()
+    allowed = allowed and row["token_budget"] - row["tokens_used"] > 0
+    request_times[username].append(now)
+    conn.execute(
+        """
+        INSERT INTO ai_usage (user_id, tokens_used, requests_count) VALUES (?, ?, 1)
+        ON CONFLICT(user_id) DO UPDATE SET tokens_used = tokens_used + ?, requests_count = requests_count + 1
+        """,
+        (user_id, TOKENS, TOKENS)
+    )
+    conn.commit()
+    return allowed
+
+
+def current_call(conn, limiter, ledger, user_id, calls):
+    username = f"player{user_id}"
+    allowed = limiter.allow(username) and ledger.check(user_id, conn)[0]
+    limiter.hit(username)
+    ledger.record(user_id, TOKENS)
+    if calls % FLUSH_EVERY == 0:
+        ledger.flush(conn)
+    return allowed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = make_db(os.path.join(tmp, "legacy.db"))
+        request_times = defaultdict(list)
+        for i in range(PLAYERS):
+            request_times[f"player{i}"] = [datetime.now()] * PRIOR_REQUESTS
+        start = time.perf_counter()
+        for n in range(CALLS):
+            legacy_call(conn, request_times, n % PLAYERS)
+        legacy = (time.perf_counter() - start) / CALLS
+        legacy_used = conn.execute("SELECT SUM(tokens_used) FROM ai_usage").fetchone()[0]
+        conn.close()
+
+        conn = make_db(os.path.join(tmp, "current.db"))
+        limiter = SlidingWindowLimiter(10 ** 6)
+        ledger = UsageLedger()
+        for i in range(PLAYERS):
+            for _ in range(PRIOR_REQUESTS):
+                limiter.hit(f"player{i}")
+        start = time.perf_counter()
+        for n in range(1, CALLS + 1):
+            current_call(conn, limiter, ledger, (n - 1) % PLAYERS, n)
+        ledger.flush(conn)
+        current = (time.perf_counter() - start) / CALLS
+        current_used = conn.execute("SELECT SUM(tokens_used) FROM ai_usage").fetchone()[0]
+        conn.close()
+
+    print(f"Bookkeeping per AI call ({PLAYERS} players, {CALLS} calls, flush every {FLUSH_EVERY}):")
+    print(f"  legacy (DB per call):       {legacy * 1e6:8.1f} us")
+    print(f"  limiter + usage ledger:     {current * 1e6:8.1f} us ({legacy / current:.0f}x)")
+    print(f"  tokens recorded: legacy {legacy_used}, ledger {current_used}")
+    print(f"  ledger: {ledger.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
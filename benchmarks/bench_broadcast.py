@@ -0,0 +1,69 @@
+"""
+Benchmark: room broadcast by scanning ACTIVE_GAMES vs. the room membership index.
+
+Keeps 10 players in the target room while total online players grow from 100
+to 10,000, and reports the cost of one broadcast_to_room-style delivery.
+
+Usage:
+    python benchmarks/bench_broadcast.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.room_index import RoomIndex
+
+ROOM_SIZE = 10
+ROUNDS = 2000
+
+
+def make_games(total):
+    games = {}
+    for i in range(total):
+        location = "town_square" if i < ROOM_SIZE else f"room_{i % 500}"
+        games[f"player{i}"] = {"location": location, "log": []}
+    return games
+
+
+def scan_broadcast(games, sender, room_id, text):
+    for uname, g in games.items():
+        if uname == sender:
+            continue
+        if g.get("location") == room_id:
+            g["log"].append(text)
+            g["log"] = g["log"][-50:]
+
+
+def index_broadcast(games, index, sender, room_id, text):
+    for uname in index.players_in(room_id):
+        if uname == sender:
+            continue
+        g = games.get(uname)
+        if g is not None and g.get("location") == room_id:
+            g["log"].append(text)
+            g["log"] = g["log"][-50:]
+
+
+def time_it(fn):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - started) / ROUNDS * 1e6
+
+
+def main():
+    print(f"Room size fixed at {ROOM_SIZE}; microseconds per broadcast")
+    print(f"{'online':>8} {'scan us':>10} {'index us':>10}")
+    for total in (100, 1000, 10000):
+        games = make_games(total)
+        index = RoomIndex()
+        index.rebuild(games)
+        scan_us = time_it(lambda: scan_broadcast(games, "player0", "town_square", "hello"))
+        index_us = time_it(lambda: index_broadcast(games, index, "player0", "town_square", "hello"))
+        print(f"{total:>8} {scan_us:>10.2f} {index_us:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark: legacy if/elif command routing vs. the command registry.
+
+Replays a mixed command corpus (movement, look, say, emotes, trade, admin and
+late verbs like 'weather') through both routing paths and reports how long it
+takes to find the code that handles each command. The legacy path is the
+routing logic of the old _legacy_handle_command_body: a registry lookup, a
+second lowercase/split of the raw text, then one comparison per branch until a
+verb matches. The registry path is a single dict lookup plus the handler's
+declared argument grammar.
+
+It then runs the corpus through handle_command and prints the registry's
+per-verb call counts and latencies.
+
+Usage:
+    python benchmarks/bench_command_dispatch.py
+"""
+import io
+import os
+import sys
+import time
+import logging
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+from game_engine import EMOTES, handle_command, is_admin_user, new_game_state
+from command_registry import (
+    COMMAND_ALIASES,
+    COMMAND_HANDLERS,
+    get_command,
+    get_command_stats,
+    reset_command_stats,
+)
+
+ROUNDS = 2000
+
+CORPUS = [
+    "look", "n", "s", "e", "w", "go north", "say Hello there", "smile", "wave",
+    "inventory", "take rock", "drop rock", "gold", "buy bread", "list", "talk innkeeper",
+    "give coin to innkeeper", "search", "who", "time", "tell bob hi", "notify",
+    "board", "accept quest", "tokens", "read sign", "touch fountain", "weather",
+    "attack goblin", "help", "quit", "no", "frobnicate",
+]
+
+# Verbs the old registry knew about before the legacy chain was retired
+LEGACY_REGISTRY = {"help", "?", "quests", "questlog", "colour", "color", "colors", "colours",
+                   "inventory", "inv", "i", "take", "get", "drop", "bury", "description", "desc"}
+
+
+def legacy_route(text, game, username):
+    """The branch selection of the old dispatch_command + _legacy_handle_command_body."""
+    verb = text.lower().split()[0]
+    base = COMMAND_ALIASES.get(verb, verb)
+    if base in LEGACY_REGISTRY and COMMAND_HANDLERS.get(base):
+        return base
+    if verb in ["setweather"]:
+        return "setweather"
+    text = text.strip()
+    tokens = text.lower().split()
+    verb = tokens[0]
+    if verb in EMOTES:
+        return "emote"
+    elif verb in ["look", "l", "examine"]:
+        return "look"
+    elif tokens[0] in ["go", "move", "walk"] and len(tokens) >= 2:
+        return "go"
+    elif tokens[0] in ["n", "north", "s", "south", "e", "east", "w", "west"]:
+        return "direction"
+    elif tokens[0] in ["gold", "money", "currency"]:
+        return "gold"
+    elif tokens[0] == "earn" and len(tokens) >= 2:
+        return "earn"
+    elif tokens[0] == "pay" and len(tokens) >= 3:
+        return "pay"
+    elif tokens[0] in ["search", "scavenge", "loot"]:
+        return "search"
+    elif tokens[0] == "recover" and len(tokens) >= 2:
+        return "recover"
+    elif tokens[0] == "give" and len(tokens) >= 2:
+        return "give"
+    elif tokens[0] == "buy" and len(tokens) >= 2:
+        return "buy"
+    elif tokens[0] == "list":
+        return "list"
+    elif tokens[0] == "say" and len(tokens) >= 2:
+        return "say"
+    elif tokens[0] in ["talk", "speak", "chat"]:
+        return "talk"
+    elif tokens[0] in ["attack", "hit", "strike"] and len(tokens) >= 2:
+        return "attack"
+    elif tokens[0] == "stat":
+        return "stat"
+    elif tokens[0] == "goto" and len(tokens) >= 2:
+        return "goto"
+    elif tokens[0] == "set" and len(tokens) >= 4:
+        return "set"
+    elif tokens[0] == "describe" and len(tokens) >= 2:
+        return "describe"
+    elif tokens[0] in ["board", "noticeboard", "read board"]:
+        return "board"
+    elif tokens[0] == "accept" and len(tokens) >= 2 and tokens[1] == "quest":
+        return "accept"
+    elif tokens[0] == "decline" and len(tokens) >= 2 and tokens[1] == "quest":
+        return "decline"
+    elif tokens[0] in ["tokens", "budget", "token_budget"]:
+        return "tokens"
+    elif tokens[0] == "who":
+        return "who"
+    elif tokens[0] == "settings" and is_admin_user(username, game):
+        return "settings"
+    elif tokens[0] == "time":
+        return "time"
+    elif tokens[0] == "tell" and len(tokens) >= 3:
+        return "tell"
+    elif tokens[0] == "notify":
+        return "notify"
+    elif tokens[0] == "touch" and len(tokens) >= 2:
+        return "touch"
+    elif tokens[0] == "read" and len(tokens) >= 2:
+        return "read"
+    elif text.lower() in ["restart", "reset"]:
+        return "restart"
+    elif text.lower() in ["quit", "logout", "exit"]:
+        return "quit"
+    elif text.lower() in ["yes", "y"] and game.get("pending_quit"):
+        return "yes"
+    elif text.lower() in ["no", "n"] and game.get("pending_quit"):
+        return "no"
+    elif tokens[0] == "weather":
+        return "weather"
+    return "unknown"
+
+
+def registry_route(tokens):
+    """The branch selection of the registry-only dispatch_command."""
+    spec = get_command(tokens[0])
+    if spec is None or not spec.accepts(tokens):
+        return "unknown"
+    return spec.verb
+
+
+def bench_routing():
+    game = new_game_state("player0")
+    parsed = [(text, text.lower().split()) for text in CORPUS]
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for text, tokens in parsed:
+            legacy_route(text, game, "player0")
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for text, tokens in parsed:
+            registry_route(tokens)
+    registry = time.perf_counter() - start
+
+    count = ROUNDS * len(CORPUS)
+    print(f"Routing {count} commands ({len(CORPUS)}-command corpus x {ROUNDS}):")
+    print(f"  legacy if/elif chain: {legacy / count * 1e6:7.3f} us/command")
+    print(f"  command registry:     {registry / count * 1e6:7.3f} us/command  ({legacy / registry:.1f}x)")
+
+    print("  late verbs:")
+    for text in ("weather", "read sign", "frobnicate"):
+        tokens = text.split()
+        start = time.perf_counter()
+        for _ in range(ROUNDS * 10):
+            legacy_route(text, game, "player0")
+        legacy = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(ROUNDS * 10):
+            registry_route(tokens)
+        registry = time.perf_counter() - start
+        print(f"    {text:<12} legacy {legacy / (ROUNDS * 10) * 1e6:6.3f} us"
+              f"  registry {registry / (ROUNDS * 10) * 1e6:6.3f} us")
+
+
+def bench_handlers():
+    game = new_game_state("player0")
+    players = [{"username": "player0", "location": "town_square"}]
+    reset_command_stats()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(20):
+            for text in CORPUS:
+                _, game = handle_command(text, game, username="player0",
+                                         who_fn=lambda: players, broadcast_fn=lambda room_id, text: None)
+                game.pop("pending_quit", None)
+                players[0]["location"] = game.get("location")
+
+    print("\nPer-verb counters after replaying the corpus through handle_command:")
+    print(f"  {'verb':<12} {'calls':>6} {'avg ms':>8} {'max ms':>8}")
+    for verb, stats in get_command_stats().items():
+        print(f"  {verb:<12} {stats['calls']:>6} {stats['avg_ms']:>8.3f} {stats['max_ms']:>8.3f}")
+
+
+def main():
+    bench_routing()
+    bench_handlers()
+
+
+if __name__ == "__main__":
+    main()
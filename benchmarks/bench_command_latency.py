@@ -0,0 +1,73 @@
+"""
+Benchmark: command latency with world upkeep per command vs. on the world tick.
+
+Simulates 10, 100 and 1,000 active players issuing "look" and reports the
+p50/p99 latency of handle_command. The legacy path runs every world system
+inside each command (as handle_command used to); the tick path leaves them to
+the world tick scheduler, which runs once per interval regardless of players.
+
+Usage:
+    python benchmarks/bench_command_latency.py
+"""
+import os
+import sys
+import time
+import logging
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+import game_engine
+from game_engine import handle_command, new_game_state, register_world_tick_systems
+
+COMMANDS = 300
+PLAYERS = []
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+
+def bench(player_count, legacy):
+    PLAYERS[:] = [{"username": f"player{i}", "location": "town_square"} for i in range(player_count)]
+    who_fn = lambda: PLAYERS
+    broadcast_fn = lambda room_id, text: None
+
+    scheduler = game_engine.get_world_tick_scheduler()
+    # Pretend the background loop owns world upkeep
+    scheduler._running = True
+
+    game = new_game_state("bench")
+    samples = []
+    for _ in range(COMMANDS):
+        started = time.perf_counter()
+        if legacy:
+            scheduler.tick()
+        handle_command("look", game, username="bench", broadcast_fn=broadcast_fn, who_fn=who_fn)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    scheduler._running = False
+    return samples
+
+
+def main():
+    register_world_tick_systems(
+        broadcast_fn=lambda room_id, text: None,
+        who_fn=lambda: PLAYERS,
+    )
+    print(f"{'players':>8} {'mode':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    for player_count in (10, 100, 1000):
+        for legacy in (True, False):
+            samples = bench(player_count, legacy)
+            print(f"{player_count:>8} {'legacy' if legacy else 'tick':>8} "
+                  f"{statistics.median(samples):>10.3f} {percentile(samples, 99):>10.3f}")
+    stats = game_engine.get_world_tick_scheduler().get_stats()
+    print("\nPer-system world tick timings:")
+    for name, system in stats["systems"].items():
+        print(f"  {name:<16} avg {system['avg_ms']:.3f} ms  max {system['max_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: open/close-per-call SQLite connections vs. the connection pool.
+
+Replays the database work of one game command (load the player's game state,
+save it back, read the AI token budget) through the legacy get_db() pattern -
+sqlite3.connect + PRAGMA journal_mode=WAL on every call - and through
+ConnectionPool, single-threaded and with 8 concurrent workers.
+
+Usage:
+    python benchmarks/bench_db_pool.py
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.db_pool import ConnectionPool
+
+PLAYERS = 200
+COMMANDS = 2000
+WORKERS = 8
+
+
+def setup_db(path):
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE)")
+        conn.execute("CREATE TABLE games (user_id INTEGER UNIQUE, game_state TEXT, updated_at TIMESTAMP)")
+        conn.execute("CREATE TABLE ai_tokens (user_id INTEGER UNIQUE, tokens_remaining INTEGER)")
+        state = json.dumps({"location": "town_square", "inventory": ["copper_coin"] * 10,
+                            "log": ["something happens"] * 50})
+        for i in range(PLAYERS):
+            conn.execute("INSERT INTO users (id, username) VALUES (?, ?)", (i, f"player{i}"))
+            conn.execute("INSERT INTO games VALUES (?, ?, CURRENT_TIMESTAMP)", (i, state))
+            conn.execute("INSERT INTO ai_tokens VALUES (?, 10000)", (i,))
+
+
+def legacy_connect(path):
+    conn = sqlite3.connect(path, timeout=10.0)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def run_command(get_conn, username):
+    conn = get_conn()
+    try:
+        user = conn.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()
+        row = conn.execute("SELECT game_state FROM games WHERE user_id = ?", (user["id"],)).fetchone()
+        state = json.loads(row["game_state"])
+    finally:
+        conn.close()
+    state["log"].append("you look around")
+    conn = get_conn()
+    try:
+        user = conn.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()
+        conn.execute(
+            "INSERT INTO games (user_id, game_state, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP) "
+            "ON CONFLICT(user_id) DO UPDATE SET game_state = excluded.game_state, updated_at = CURRENT_TIMESTAMP",
+            (user["id"], json.dumps(state)))
+        conn.commit()
+        conn.execute("SELECT tokens_remaining FROM ai_tokens WHERE user_id = ?", (user["id"],)).fetchone()
+    finally:
+        conn.close()
+
+
+def bench(get_conn, workers):
+    per_worker = COMMANDS // workers
+
+    def worker(offset):
+        for i in range(per_worker):
+            run_command(get_conn, f"player{(offset + i) % PLAYERS}")
+
+    threads = [threading.Thread(target=worker, args=(w * 37,)) for w in range(workers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return per_worker * workers / (time.perf_counter() - start)
+
+
+def main():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, "users.db")
+        setup_db(path)
+        pool = ConnectionPool(path, size=WORKERS)
+        print(f"{'workers':>8} {'open/close cmd/s':>18} {'pool cmd/s':>12} {'speedup':>8}")
+        for workers in (1, WORKERS):
+            legacy = bench(lambda: legacy_connect(path), workers)
+            pooled = bench(pool.acquire, workers)
+            print(f"{workers:>8} {legacy:>18.0f} {pooled:>12.0f} {pooled / legacy:>7.1f}x")
+        print(f"pool: {pool.get_stats()}")
+        pool.close_all()
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: event publishing, JSON dict per event vs. the compact binary envelope.
+
+- envelope size and encode cost per event: the old {"type", "data", ISO
+  "timestamp"} JSON dict vs. the binary envelope, alone and ten to a batch
+- publish throughput for the state_update event save_player_state sends on
+  every save (nobody subscribed) and for room events with one subscriber:
+  one JSON PUBLISH per event vs. EventBus.publish (state updates skip idle channels)
+  vs. EventBus.publish inside an event batch (ten events per tick)
+
+The publish section uses fakeredis when installed, otherwise the Redis at
+REDIS_URL, and is skipped when neither is available.
+
+Usage:
+    pip install -r requirements-dev.txt   # fakeredis, or run a local redis-server
+    python benchmarks/bench_event_envelope.py
+"""
+import os
+import sys
+import json
+import time
+import logging
+import warnings
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+warnings.simplefilter("ignore", DeprecationWarning)
+
+from core.event_codec import encode_events
+
+ROUNDS = 20000
+TICK_EVENTS = 10
+
+STATE_UPDATE = ("system_message", {"message_type": "state_update"})
+PLAYER_MOVE = ("player_move", {"username": "player42", "from_room": "town_square", "to_room": "tavern"})
+
+
+def legacy_encode(event_type, data):
+    return json.dumps({"type": event_type, "data": data, "timestamp": datetime.utcnow().isoformat()})
+
+
+def per_call(fn, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def bench_encoding():
+    print("Envelope size and encode cost per event:")
+    for event_type, data in (STATE_UPDATE, PLAYER_MOVE):
+        legacy = legacy_encode(event_type, data)
+        single = encode_events([(event_type, data, time.time())])
+        batch = encode_events([(event_type, data, time.time())] * TICK_EVENTS)
+        legacy_us = per_call(lambda: legacy_encode(event_type, data)) * 1e6
+        binary_us = per_call(lambda: encode_events([(event_type, data, time.time())])) * 1e6
+        print(f"  {event_type:15s} JSON {len(legacy):4d} B {legacy_us:5.2f} us | "
+              f"binary {len(single):4d} B {binary_us:5.2f} us | "
+              f"batch of {TICK_EVENTS}: {len(batch) / TICK_EVENTS:5.1f} B/event")
+
+
+def make_client():
+    # Bytes mode, like the app's subscriber (binary payloads are not UTF-8)
+    try:
+        import fakeredis
+        return fakeredis.FakeRedis(), "fakeredis"
+    except ImportError:
+        import redis
+        client = redis.Redis.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+        client.ping()
+        return client, "redis"
+
+
+def bench_publish():
+    try:
+        client, backend = make_client()
+    except Exception as e:
+        print(f"Publish throughput: skipped (no fakeredis or Redis: {e})")
+        return
+
+    import core.redis_manager as redis_manager
+    from core.event_bus import EventBus, event_batch
+
+    redis_manager._redis_available = False  # Keep EventBus() from opening its own connections
+    listener = client.pubsub(ignore_subscribe_messages=True)
+    listener.subscribe("room:tavern")
+    listener.get_message(timeout=0.1)
+
+    print(f"Publish throughput ({backend}):")
+    for label, (event_type, data), channel in (("state_update, no subscribers", STATE_UPDATE, "user:player42"),
+                                                ("room event, 1 subscriber", PLAYER_MOVE, "room:tavern")):
+        def legacy():
+            client.publish(channel, legacy_encode(event_type, data))
+
+        bus = EventBus()
+        bus._redis = client
+
+        def envelope():
+            bus.publish(event_type, data, channel=channel)
+
+        batched_bus = EventBus()
+        batched_bus._redis = client
+
+        def batched():
+            with event_batch():
+                for _ in range(TICK_EVENTS):
+                    batched_bus.publish(event_type, data, channel=channel)
+
+        rounds = ROUNDS // 4
+        legacy_rate = 1.0 / per_call(legacy, rounds)
+        envelope_rate = 1.0 / per_call(envelope, rounds)
+        batched_rate = TICK_EVENTS / per_call(batched, rounds // TICK_EVENTS)
+        print(f"  {label}:")
+        print(f"    JSON, one PUBLISH per event: {legacy_rate:10,.0f} events/s")
+        print(f"    EventBus.publish:            {envelope_rate:10,.0f} events/s "
+              f"({bus.stats['publishes']} publishes, {bus.stats['skipped']} skipped)")
+        print(f"    EventBus in tick batches:    {batched_rate:10,.0f} events/s "
+              f"({batched_bus.stats['publishes']} publishes, "
+              f"{batched_bus.stats['bytes'] / max(1, batched_bus.stats['events']):.1f} B/event)")
+        while listener.get_message(timeout=0):
+            pass
+    listener.close()
+
+
+def main():
+    bench_encoding()
+    bench_publish()
+
+
+if __name__ == "__main__":
+    main()
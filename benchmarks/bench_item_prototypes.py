@@ -0,0 +1,131 @@
+"""
+Benchmark: copying ITEM_DEFS on every lookup vs. shared item prototypes.
+
+Hydrates a player carrying 50 items and a room holding 1,000 items (item
+objects plus total weight), the way Player._load_inventory and room loading
+do. The legacy path copies and back-fills the ITEM_DEFS entry for every item
+and re-parses it in load_from_def; the prototype path shares one pre-normalised
+ItemPrototype per item id.
+
+Usage:
+    python benchmarks/bench_item_prototypes.py
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+from game.models.item import Item, Weapon, Armor, Container, Consumable
+from game.systems.inventory import ITEM_DEFS, calculate_inventory_weight
+from game.world.manager import WorldManager
+
+ROUNDS = 50
+ITEM_IDS = list(ITEM_DEFS) + ["unknown_trinket"]
+
+
+def legacy_get_item_def(item_id):
+    if item_id in ITEM_DEFS:
+        item_def = ITEM_DEFS[item_id].copy()
+        if "droppable" not in item_def:
+            item_def["droppable"] = True
+        if "weight" not in item_def:
+            item_def["weight"] = 0.1
+        return item_def
+    return {"name": item_id.replace("_", " "), "type": "misc", "description": "",
+            "weight": 0.1, "flags": [], "droppable": True}
+
+
+def legacy_load_from_def(item, item_def):
+    item.name = item_def.get("name", item.name)
+    item.description = item_def.get("description", "")
+    item.item_type = item_def.get("type", "misc")
+    item.weight = item_def.get("weight", 0.1)
+    item.value = item_def.get("value", 0)
+    item.droppable = item_def.get("droppable", True)
+    item.detailed_description = item_def.get("detailed_description", "")
+    item.history = item_def.get("history", "")
+    item.is_held = item_def.get("is_held", False)
+    flags = item_def.get("flags", [])
+    item.stackable = "stackable" in flags
+    if "quest" in flags:
+        item.flags.append("quest")
+    if not item.adjectives and " " in item.name:
+        item.adjectives = item.name.split()[:-1]
+    if isinstance(item, Weapon):
+        item.damage = item_def.get("damage", 1)
+        item.weapon_type = item_def.get("weapon_type", "blunt")
+    elif isinstance(item, Armor):
+        item.ac = item_def.get("ac", 1)
+        item.slot = item_def.get("slot", "body")
+    elif isinstance(item, Consumable):
+        item.effects = item_def.get("effects", {})
+        item.charges = item_def.get("charges", 1)
+
+
+def legacy_get_item(item_id):
+    item_def = legacy_get_item_def(item_id)
+    item_type = item_def.get("type", "misc")
+    if item_type == "weapon":
+        item = Weapon(item_id, item_def.get("name", item_id))
+    elif item_type == "armor":
+        item = Armor(item_id, item_def.get("name", item_id))
+    elif item_type == "container":
+        item = Container(item_id, item_def.get("name", item_id))
+    elif item_type in ["food", "potion", "consumable"]:
+        item = Consumable(item_id, item_def.get("name", item_id))
+    else:
+        item = Item(item_id, item_def.get("name", item_id))
+    legacy_load_from_def(item, item_def)
+    return item
+
+
+def legacy_weight(item_ids):
+    total_weight = 0.0
+    for item_id in item_ids:
+        total_weight += legacy_get_item_def(item_id).get("weight", 0.1)
+    return total_weight
+
+
+def hydrate(item_ids, get_item, weight_fn):
+    items = [get_item(item_id) for item_id in item_ids]
+    return items, weight_fn(item_ids)
+
+
+def bench(label, count):
+    item_ids = [ITEM_IDS[i % len(ITEM_IDS)] for i in range(count)]
+    wm = WorldManager.get_instance()
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        hydrate(item_ids, legacy_get_item, legacy_weight)
+    legacy = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        hydrate(item_ids, wm.get_item, calculate_inventory_weight)
+    shared = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        legacy_weight(item_ids)
+    legacy_w = (time.perf_counter() - start) / ROUNDS
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        calculate_inventory_weight(item_ids)
+    shared_w = (time.perf_counter() - start) / ROUNDS
+
+    print(f"{label:<22} hydrate {legacy * 1000:7.3f} ms -> {shared * 1000:7.3f} ms ({legacy / shared:.1f}x)"
+          f"   weight only {legacy_w * 1e6:8.1f} us -> {shared_w * 1e6:7.1f} us ({legacy_w / shared_w:.1f}x)")
+
+
+def main():
+    bench("player with 50 items", 50)
+    bench("room with 1,000 items", 1000)
+
+
+if __name__ == "__main__":
+    main()
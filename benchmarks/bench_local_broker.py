@@ -0,0 +1,138 @@
+"""
+Benchmark: in-process event broker vs. a Redis round trip.
+
+- broker fan-out: publishes/s into 1,000 room channels with one callback
+  subscriber each plus a "room:*" wildcard subscriber, and into bounded
+  queues drained by a consumer thread
+- EventBus on a single node with one in-process subscriber per room: the
+  local backend vs. the Redis backend (publish, then the subscriber reads
+  it back over pub/sub)
+
+The Redis comparison uses fakeredis when installed, otherwise the Redis at
+REDIS_URL, and is skipped when neither is available.
+
+Usage:
+    python benchmarks/bench_local_broker.py
+"""
+import os
+import sys
+import time
+import logging
+import threading
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+warnings.simplefilter("ignore", DeprecationWarning)
+
+from core.local_broker import DROP_OLDEST, BLOCK, LocalBroker
+
+ROOMS = 1000
+EVENTS = 100000
+EVENT = {"type": "npc_action", "data": {"text": "Mara polishes a glass."}, "timestamp": 0.0}
+
+
+def bench_broker():
+    broker = LocalBroker()
+    counter = [0]
+
+    def count(_event):
+        counter[0] += 1
+
+    for i in range(ROOMS):
+        broker.subscribe(f"room:room_{i}", count)
+    broker.subscribe("room:*", count)
+
+    start = time.perf_counter()
+    for i in range(EVENTS):
+        broker.publish(f"room:room_{i % ROOMS}", EVENT)
+    elapsed = time.perf_counter() - start
+    print(f"Broker, {ROOMS} rooms + wildcard, callbacks: {EVENTS / elapsed:10,.0f} publishes/s "
+          f"({counter[0]} deliveries)")
+
+    for policy in (DROP_OLDEST, BLOCK):
+        broker = LocalBroker()
+        queue = broker.subscribe("room:*", maxsize=1000, policy=policy)
+        done = threading.Event()
+        received = [0]
+
+        def consume():
+            while True:
+                if queue.get(timeout=0.01) is None:
+                    if done.is_set():
+                        return
+                    continue
+                received[0] += 1 + len(queue.drain())
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        start = time.perf_counter()
+        for i in range(EVENTS):
+            broker.publish(f"room:room_{i % ROOMS}", EVENT)
+        elapsed = time.perf_counter() - start
+        done.set()
+        consumer.join()
+        print(f"Broker, bounded queue ({policy:11s}):       {EVENTS / elapsed:10,.0f} publishes/s "
+              f"({received[0]} consumed, {queue.dropped} dropped)")
+
+
+def make_client():
+    try:
+        import fakeredis
+        return fakeredis.FakeRedis(), "fakeredis"
+    except ImportError:
+        import redis
+        client = redis.Redis.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+        client.ping()
+        return client, "redis"
+
+
+def bench_event_bus():
+    try:
+        client, backend = make_client()
+        import core.redis_manager as redis_manager
+        from core.event_bus import EventBus
+        from core.event_codec import decode_events
+    except Exception as e:
+        print(f"EventBus comparison: skipped (no fakeredis or Redis: {e})")
+        return
+
+    redis_manager._redis_available = False  # Keep EventBus() from opening its own connections
+    rounds = EVENTS // 20
+
+    local_bus = EventBus(backend="local", local=LocalBroker())
+    received = [0]
+    local_bus.subscribe("room:tavern", lambda _event: received.__setitem__(0, received[0] + 1))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        local_bus.publish_room("tavern", "npc_action", EVENT["data"])
+    local_rate = rounds / (time.perf_counter() - start)
+
+    redis_bus = EventBus(backend="local", local=LocalBroker())
+    redis_bus._redis = client
+    listener = client.pubsub(ignore_subscribe_messages=True)
+    listener.subscribe("room:tavern")
+    listener.get_message(timeout=0.1)
+    delivered = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        redis_bus.publish_room("tavern", "npc_action", EVENT["data"])
+        message = listener.get_message(timeout=1.0)
+        if message:
+            delivered += len(decode_events(message["data"]))
+    redis_rate = rounds / (time.perf_counter() - start)
+    listener.close()
+
+    print(f"EventBus, one subscriber in this process ({backend} for the Redis backend):")
+    print(f"  local backend: {local_rate:10,.0f} events/s ({received[0]}/{rounds} delivered)")
+    print(f"  redis backend: {redis_rate:10,.0f} events/s ({delivered}/{rounds} delivered)")
+
+
+def main():
+    bench_broker()
+    bench_event_bus()
+
+
+if __name__ == "__main__":
+    main()
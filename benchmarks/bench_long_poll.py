@@ -0,0 +1,130 @@
+"""
+Load test: 500 idle polling clients, interval /poll vs. long-poll.
+
+- interval: every client calls /poll every 3 seconds and each call runs the old
+  handler body (player weather status, four settings reads, NPC action and
+  ambiance timers per player) even though nothing happens
+- long-poll: every client parks in MessageBuffer.take(timeout=...) until a
+  message is posted for it; NPC and ambiance events come from the server-side
+  scheduler, so an idle client does no work at all
+
+Measures server CPU time over an idle window, then posts one room broadcast to
+every client and measures how long the parked clients take to receive it.
+HTTP and session handling are not simulated, so the interval numbers are a
+lower bound (each of those polls is also a full Flask request).
+
+Usage:
+    python benchmarks/bench_long_poll.py
+"""
+import os
+import sys
+import time
+import heapq
+import random
+import logging
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+from game_engine import update_player_weather_status
+from core.message_buffer import MessageBuffers
+
+CLIENTS = 500
+IDLE_SECONDS = 6.0
+POLL_INTERVAL = 3.0
+POLL_TIMEOUT = 25.0
+
+SETTINGS = {"npc_action_interval_min": "30", "npc_action_interval_max": "60",
+            "ambiance_interval_min": "120", "ambiance_interval_max": "240"}
+
+
+def legacy_poll(username, game, sessions, poll_states):
+    """The old /poll body for an idle player (no NPC action or ambiance due)."""
+    sessions[username] = {"last_activity": datetime.now(), "session_id": username}
+    update_player_weather_status(game)
+    current_time = datetime.now()
+    poll_state = poll_states.setdefault(username, {"last_ambiance_time": current_time,
+                                                   "last_npc_action_time": current_time})
+    npc_interval_min = float(SETTINGS.get("npc_action_interval_min", 30.0))
+    float(SETTINGS.get("npc_action_interval_max", 60.0))
+    if (current_time - poll_state["last_npc_action_time"]).total_seconds() >= npc_interval_min:
+        poll_state["last_npc_action_time"] = current_time + timedelta(seconds=random.uniform(30, 60))
+    ambiance_interval_min = float(SETTINGS.get("ambiance_interval_min", 120.0))
+    float(SETTINGS.get("ambiance_interval_max", 240.0))
+    if (current_time - poll_state["last_ambiance_time"]).total_seconds() >= ambiance_interval_min:
+        poll_state["last_ambiance_time"] = current_time
+    return []
+
+
+def run_interval():
+    games = {f"player{i}": {"username": f"player{i}", "location": "town_square"} for i in range(CLIENTS)}
+    sessions, poll_states = {}, {}
+    # Clients start at staggered offsets, as real browsers would
+    next_due = [(random.uniform(0, POLL_INTERVAL), username) for username in games]
+    heapq.heapify(next_due)
+    polls = 0
+    cpu_start, wall_start = time.process_time(), time.time()
+    while True:
+        now = time.time() - wall_start
+        if now >= IDLE_SECONDS:
+            break
+        due, username = next_due[0]
+        if due > now:
+            time.sleep(min(due - now, IDLE_SECONDS - now))
+            continue
+        legacy_poll(username, games[username], sessions, poll_states)
+        heapq.heapreplace(next_due, (due + POLL_INTERVAL, username))
+        polls += 1
+    return polls, time.process_time() - cpu_start
+
+
+def run_long_poll():
+    buffers = MessageBuffers()
+    received = {}
+    parked = threading.Barrier(CLIENTS + 1)
+
+    def client(username):
+        buffer = buffers.get(username)
+        parked.wait()
+        entries = buffer.take(timeout=POLL_TIMEOUT)
+        received[username] = (time.perf_counter(), len(entries))
+
+    threads = [threading.Thread(target=client, args=(f"player{i}",), daemon=True) for i in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    parked.wait()
+    time.sleep(0.2)  # Let every client reach its wait
+
+    cpu_start = time.process_time()
+    time.sleep(IDLE_SECONDS)
+    idle_cpu = time.process_time() - cpu_start
+
+    posted = time.perf_counter()
+    for i in range(CLIENTS):
+        buffers.post(f"player{i}", "[NPC]Mara wipes down the bar.[/NPC]")
+    for thread in threads:
+        thread.join()
+    latencies = sorted(at - posted for at, count in received.values() if count)
+    return idle_cpu, latencies
+
+
+def main():
+    random.seed(7)
+    print(f"{CLIENTS} idle clients, {IDLE_SECONDS:.0f}s window")
+
+    polls, cpu = run_interval()
+    print(f"  /poll every {POLL_INTERVAL:.0f}s: {polls} polls, {cpu * 1000:8.1f} ms CPU "
+          f"({polls / IDLE_SECONDS * 60:.0f} requests/min)")
+
+    idle_cpu, latencies = run_long_poll()
+    print(f"  long-poll:       0 polls, {idle_cpu * 1000:8.1f} ms CPU "
+          f"(at most {CLIENTS / POLL_TIMEOUT * 60:.0f} requests/min from timeouts)")
+    print(f"  broadcast to all parked clients: {len(latencies)}/{CLIENTS} delivered, "
+          f"median {latencies[len(latencies) // 2] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
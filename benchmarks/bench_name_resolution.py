@@ -0,0 +1,134 @@
+"""
+Benchmark: linear name scans vs. the name resolution index.
+
+Resolves typical targets ("coin", "bread", "sword", a missing item, an NPC
+shortname, an NPC name, a room fixture) in a typical room and in a crowded
+room: hundreds of items on the floor and a few hundred NPCs standing around. The legacy path is the
+old per-entry scan of match_item_name_in_collection / match_npc_in_room /
+resolve_room_detail; the indexed path is the current implementation.
+
+Usage:
+    python benchmarks/bench_name_resolution.py
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+from game.systems.inventory import ITEM_DEFS, get_item_prototype, match_item_name_in_collection
+from game.world.data import WORLD
+from game.world.manager import WorldManager
+from game_engine import resolve_room_detail
+from npc import NPCS, match_npc_in_room
+
+ROUNDS = 200
+ROOM_ITEMS = 500
+ROOM_NPCS = 300
+TYPICAL_ITEMS = 8
+TYPICAL_NPCS = 3
+
+
+def legacy_match_item(input_text, items):
+    if not items:
+        return None
+    input_normalized = " ".join(input_text.lower().strip().split())
+    matches = []
+    input_words = input_normalized.split()
+    for item_id in items:
+        prototype = get_item_prototype(item_id)
+        if input_normalized in (prototype.id_lower, prototype.id_spaced, prototype.name_lower):
+            return item_id
+        if (input_normalized in prototype.id_lower or input_normalized in prototype.id_spaced
+                or input_normalized in prototype.name_lower):
+            matches.append((item_id, len(input_normalized), len(item_id)))
+        for word in input_words:
+            if word in prototype.id_words:
+                matches.append((item_id, len(word), len(item_id)))
+    if not matches:
+        return None
+    matches.sort(key=lambda x: (-x[1], x[2]))
+    return matches[0][0]
+
+
+def legacy_match_npc(room_npc_ids, target_text):
+    target_lower = target_text.lower().strip()
+    for npc_id in room_npc_ids:
+        if npc_id not in NPCS:
+            continue
+        wm = WorldManager.get_instance()
+        npc = wm.get_npc(npc_id) or NPCS[npc_id]
+        name_lower = npc.name.lower()
+        shortname_lower = npc.shortname.lower()
+        if target_lower in (npc_id.lower(), name_lower, shortname_lower):
+            return npc_id, npc
+        if (npc_id.lower().startswith(target_lower) or name_lower.startswith(target_lower)
+                or shortname_lower.startswith(target_lower)):
+            return npc_id, npc
+        target_words = set(target_lower.split())
+        if (target_words & set(name_lower.split()) or target_words & set((npc.title or "").lower().split())
+                or target_words & {shortname_lower}):
+            return npc_id, npc
+    return None, None
+
+
+def legacy_resolve_detail(game, target_text):
+    loc_id = game.get("location", "town_square")
+    details = WORLD[loc_id].get("details", {})
+    target_lower = target_text.lower()
+    for detail_id, detail in details.items():
+        if detail_id.lower() == target_lower or detail.get("name", "").lower() == target_lower:
+            return detail_id, detail, loc_id
+        for alias in detail.get("aliases", []):
+            if alias.lower() == target_lower:
+                return detail_id, detail, loc_id
+    return None, None, None
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = fn(*args)
+    return (time.perf_counter() - start) / ROUNDS, result
+
+
+def report(label, legacy, indexed):
+    (legacy_time, legacy_result), (indexed_time, indexed_result) = legacy, indexed
+    same = "same" if legacy_result == indexed_result else "DIFFERENT"
+    print(f"  {label:<28} {legacy_time * 1e6:9.1f} us -> {indexed_time * 1e6:7.1f} us"
+          f" ({legacy_time / indexed_time:5.1f}x, {same})")
+
+
+def bench_room(item_count, npc_count):
+    item_ids = list(ITEM_DEFS)
+    room_items = [item_ids[i % len(item_ids)] for i in range(item_count)]
+    print(f"Items: room with {item_count} items ({len(set(room_items))} distinct ids)")
+    for target in ("copper coin", "coin", "bread", "sword", "golden chalice"):
+        report(target, timed(legacy_match_item, target, room_items),
+               timed(match_item_name_in_collection, target, room_items))
+
+    npc_ids = list(NPCS)
+    room_npcs = [npc_ids[i % len(npc_ids)] for i in range(npc_count)]
+    last = NPCS[room_npcs[-1]]
+    print(f"NPCs: room with {npc_count} NPC entries ({len(set(room_npcs))} distinct)")
+    for target in (last.shortname, last.name, "mara", "nobody"):
+        report(target, timed(legacy_match_npc, room_npcs, target), timed(match_npc_in_room, room_npcs, target))
+
+
+def main():
+    print("== Typical room ==")
+    bench_room(TYPICAL_ITEMS, TYPICAL_NPCS)
+    print("\n== Crowded room ==")
+    bench_room(ROOM_ITEMS, ROOM_NPCS)
+
+    game = {"location": "town_square"}
+    print("\nRoom details: town_square")
+    for target in ("bell", "bulletin board", "statue"):
+        report(target, timed(legacy_resolve_detail, game, target), timed(resolve_room_detail, game, target))
+
+
+if __name__ == "__main__":
+    main()
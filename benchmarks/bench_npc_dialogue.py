@@ -0,0 +1,143 @@
+"""
+Benchmark: blocking vs. non-blocking AI NPC dialogue.
+
+Starts a local mock completion server (OpenAI-compatible, fixed latency) and
+measures how long a 'talk' to an AI NPC holds the command:
+
+- blocking: generate_npc_reply waits for the model round trip
+- non-blocking: request_npc_reply queues the completion on the dialogue
+  service and returns; the reply is delivered when the model answers
+
+It then fires a burst of talks from several players (some with identical
+prompts) and reports how many completions actually ran, how long the last
+reply took to arrive and the service counters.
+
+Requires the openai package (no real API calls are made).
+
+Usage:
+    python benchmarks/bench_npc_dialogue.py
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+import ai_client
+from core.dialogue_service import get_dialogue_service
+from core.response_cache import get_response_cache
+from core.ai_limits import get_rate_limiter
+
+MODEL_LATENCY = 0.3
+TALKS = 10
+BURST_PLAYERS = 24
+DISTINCT_PROMPTS = 8
+
+
+class MockCompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.completions += 1
+        time.sleep(MODEL_LATENCY)
+        payload = json.dumps({
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "nods. 'Welcome, traveller.'"}}],
+            "usage": {"prompt_tokens": 120, "completion_tokens": 12, "total_tokens": 132},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+NPC = {"name": "Mara", "title": "Innkeeper", "personality": "kind", "home": "tavern"}
+ROOM = {"name": "The Rusty Tankard", "description": "A warm tavern."}
+
+
+def talk_game():
+    return {"_current_npc_id": "innkeeper", "npc_memory": {}, "reputation": {}}
+
+
+def reset_limits():
+    get_response_cache().clear()
+    get_rate_limiter().clear()
+
+
+def bench_single(service):
+    reset_limits()
+    start = time.perf_counter()
+    for i in range(TALKS):
+        reset_limits()
+        ai_client.generate_npc_reply(NPC, ROOM, talk_game(), f"player{i}", "talk to Mara")
+    blocking = (time.perf_counter() - start) / TALKS
+
+    reset_limits()
+    service.start()
+    held = []
+    for i in range(TALKS):
+        reset_limits()
+        start = time.perf_counter()
+        ai_client.request_npc_reply(NPC, ROOM, talk_game(), f"player{i}", "talk to Mara", lambda *reply: None)
+        held.append(time.perf_counter() - start)
+    service.wait_idle(30)
+    service.stop()
+
+    print(f"Command held per 'talk' (model latency {MODEL_LATENCY * 1000:.0f} ms):")
+    print(f"  blocking generate_npc_reply: {blocking * 1000:8.2f} ms")
+    print(f"  non-blocking request:        {sum(held) / len(held) * 1000:8.2f} ms")
+
+
+def bench_burst(service, server):
+    reset_limits()
+    service.start()
+    server.completions = 0
+    arrived = []
+    start = time.perf_counter()
+    for i in range(BURST_PLAYERS):
+        # Players sharing a name send identical prompts
+        ai_client.request_npc_reply(NPC, ROOM, talk_game(), f"player{i % DISTINCT_PROMPTS}", "talk to Mara",
+                                    lambda *reply: arrived.append(time.perf_counter() - start))
+    queued = time.perf_counter() - start
+    service.wait_idle(30)
+    service.stop()
+
+    print(f"\nBurst of {BURST_PLAYERS} talks ({DISTINCT_PROMPTS} distinct prompts, "
+          f"{service.max_concurrency} concurrent completions):")
+    print(f"  all commands returned after {queued * 1000:.2f} ms")
+    print(f"  completions run: {server.completions}, replies delivered: {len(arrived)}, "
+          f"last reply after {max(arrived) * 1000:.0f} ms")
+    print(f"  service: {service.get_stats()}")
+
+
+def main():
+    if not ai_client.OPENAI_AVAILABLE:
+        print("The openai package is required for this benchmark.")
+        return
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockCompletionHandler)
+    server.completions = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_API_KEY"] = "bench-key"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    service = get_dialogue_service(max_concurrency=4, timeout=10.0)
+    try:
+        bench_single(service)
+        bench_burst(service, server)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: NPC_STATE scans vs. the NPC location index.
+
+Places 5,000 NPCs across 2,000 rooms and times (a) a single "NPCs in room"
+lookup and (b) one background-generator sweep asking every room for its
+living NPCs, using the old list comprehension and the index.
+
+Usage:
+    python benchmarks/bench_npc_index.py
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.world.npc_index import NPCIndex
+
+NPCS = 5000
+ROOMS = 2000
+
+
+def scan(npc_state, room_id):
+    return [npc_id for npc_id, state in npc_state.items()
+            if state.get("room") == room_id and state.get("alive", True)]
+
+
+def main():
+    random.seed(1)
+    rooms = [f"room_{i}" for i in range(ROOMS)]
+    npc_state = {f"npc_{i}": {"room": random.choice(rooms), "alive": random.random() > 0.05}
+                 for i in range(NPCS)}
+    index = NPCIndex()
+    started = time.perf_counter()
+    index.rebuild(npc_state)
+    rebuild_ms = (time.perf_counter() - started) * 1000.0
+
+    lookups = 2000
+    started = time.perf_counter()
+    for i in range(lookups):
+        scan(npc_state, rooms[i % ROOMS])
+    scan_us = (time.perf_counter() - started) / lookups * 1e6
+    started = time.perf_counter()
+    for i in range(lookups):
+        index.npcs_in(rooms[i % ROOMS], alive_only=True)
+    index_us = (time.perf_counter() - started) / lookups * 1e6
+
+    started = time.perf_counter()
+    for room_id in rooms:
+        scan(npc_state, room_id)
+    sweep_scan_ms = (time.perf_counter() - started) * 1000.0
+    started = time.perf_counter()
+    for room_id in rooms:
+        index.npcs_in(room_id, alive_only=True)
+    sweep_index_ms = (time.perf_counter() - started) * 1000.0
+
+    print(f"{NPCS} NPCs across {ROOMS} rooms (index rebuild {rebuild_ms:.2f} ms)")
+    print(f"{'':>22} {'scan':>10} {'index':>10}")
+    print(f"{'single lookup (us)':>22} {scan_us:>10.2f} {index_us:>10.2f}")
+    print(f"{'all-rooms sweep (ms)':>22} {sweep_scan_ms:>10.2f} {sweep_index_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: legacy full mud_state.json rewrite vs. write-behind persistence.
+
+Measures save latency on the request path at 10, 100 and 1,000 active players.
+The legacy path serialises every player plus global state with indent=2; the
+write-behind path marks one player dirty on the request and flushes that one
+delta in the background.
+
+Usage:
+    python benchmarks/bench_persistence.py
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.persistence import WorldPersistence
+
+ROUNDS = 50
+
+
+def make_game(username):
+    return {
+        "username": username,
+        "location": "town_square",
+        "inventory": ["copper_coin"] * 10 + ["loaf_of_bread", "iron_hammer"],
+        "log": [f"{username} sees something interesting happen, line {i}." for i in range(50)],
+        "quests": {},
+        "completed_quests": {},
+        "reputation": {"innkeeper": 5, "blacksmith": 2},
+        "npc_memory": {"innkeeper": [{"type": "talk", "text": "hello"}] * 5},
+        "character": {"race": "human", "gender": "female", "backstory": "farmer"},
+    }
+
+
+def make_world():
+    return {
+        "room_state": {f"room_{i}": {"items": ["rock", "stick"]} for i in range(200)},
+        "npc_state": {f"npc_{i}": {"room": f"room_{i % 200}", "hp": 10, "alive": True} for i in range(100)},
+        "buried_items": {},
+        "game_time": {"start_timestamp": "2025-01-01T00:00:00"},
+        "weather_state": {"type": "clear", "intensity": "none"},
+    }
+
+
+def legacy_save(path, players, world):
+    cleaned = {u: {k: v for k, v in g.items() if not k.startswith("_")} for u, g in players.items()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"players": cleaned, "global_state": world}, f, indent=2, ensure_ascii=False)
+
+
+def bench(player_count, tmpdir):
+    players = {f"player{i}": make_game(f"player{i}") for i in range(player_count)}
+    world = make_world()
+
+    legacy_path = os.path.join(tmpdir, f"legacy_{player_count}.json")
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        legacy_save(legacy_path, players, world)
+    legacy_ms = (time.perf_counter() - started) * 1000.0 / ROUNDS
+
+    engine = WorldPersistence(
+        os.path.join(tmpdir, f"wb_{player_count}.json"),
+        snapshot_fn=lambda: world,
+        players_fn=lambda: players,
+        compact_every=10 ** 9,
+    )
+    engine.flush()  # Prime scalar fingerprints
+
+    mark_total = 0.0
+    flush_total = 0.0
+    for i in range(ROUNDS):
+        username = f"player{i % player_count}"
+        players[username]["log"].append("new line")
+        started = time.perf_counter()
+        engine.mark_player_dirty(username)
+        engine.mark_room_dirty("room_1")
+        mark_total += time.perf_counter() - started
+
+        started = time.perf_counter()
+        engine.flush()
+        flush_total += time.perf_counter() - started
+
+    started = time.perf_counter()
+    engine.compact()
+    compact_ms = (time.perf_counter() - started) * 1000.0
+
+    return legacy_ms, mark_total * 1e6 / ROUNDS, flush_total * 1000.0 / ROUNDS, compact_ms
+
+
+def main():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        print(f"{'players':>8} | {'legacy save (ms)':>16} | {'mark (us)':>9} | {'bg flush (ms)':>13} | {'compaction (ms)':>15}")
+        print("-" * 74)
+        for count in (10, 100, 1000):
+            legacy_ms, mark_us, flush_ms, compact_ms = bench(count, tmpdir)
+            print(f"{count:>8} | {legacy_ms:>16.2f} | {mark_us:>9.2f} | {flush_ms:>13.3f} | {compact_ms:>15.2f}")
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: rebuilding Player from the legacy dict vs. the session Player cache.
+
+Replays a 100-command session with three Player lookups per command (handle_command,
+a quest event, a command handler), for a player carrying 20 items and two
+active quests. Reports wall time and peak traced allocation (tracemalloc) for both.
+
+Usage:
+    python benchmarks/bench_player_cache.py
+"""
+import os
+import sys
+import time
+import logging
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+from game_engine import new_game_state
+from game.models.player import Player
+from game.world.manager import WorldManager
+from game.systems.quest_manager import QuestManager
+
+COMMANDS = 100
+LOOKUPS_PER_COMMAND = 3
+
+
+def make_game(username):
+    game = new_game_state(username)
+    game["inventory"] = ["copper_coin", "bread", "torch", "rope", "water_skin"] * 4
+    game["max_carry_weight"] = 500.0
+    qm = QuestManager.get_instance()
+    if not qm.templates:
+        qm.initialize_quests()
+    for quest_id in list(qm.templates)[:2]:
+        game["quests"][quest_id] = {"id": quest_id, "status": "active", "current_stage_index": 0}
+    return game
+
+
+def rebuild(username, game):
+    player = Player(username)
+    player.load_from_state(game)
+    return player
+
+
+def cached(username, game):
+    return WorldManager.get_instance().get_player(username, game)
+
+
+def run(lookup, username):
+    game = make_game(username)
+    tracemalloc.start()
+    started = time.perf_counter()
+    for i in range(COMMANDS):
+        for _ in range(LOOKUPS_PER_COMMAND):
+            player = lookup(username, game)
+        # Weather status is written back every command (as handle_command does)
+        game["weather_status"] = player.weather_status.to_dict()
+        if i % 25 == 0:
+            # Occasional inventory change forces one resync
+            game["inventory"] = game["inventory"][1:] + game["inventory"][:1]
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak
+
+
+def main():
+    print(f"{COMMANDS}-command session, {LOOKUPS_PER_COMMAND} Player lookups per command")
+    print(f"{'mode':>8} {'total ms':>10} {'per cmd ms':>11} {'peak KiB':>10}")
+    for name, lookup in (("rebuild", rebuild), ("cached", cached)):
+        elapsed_ms, peak = run(lookup, f"bench_{name}")
+        print(f"{name:>8} {elapsed_ms:>10.2f} {elapsed_ms / COMMANDS:>11.3f} {peak / 1024:>10.1f}")
+    stats = WorldManager.get_instance().player_cache_stats
+    print(f"\nCache hits: {stats['hits']}  misses: {stats['misses']}")
+
+
+if __name__ == "__main__":
+    main()
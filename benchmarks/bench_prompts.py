@@ -0,0 +1,79 @@
+"""
+Benchmark: reading prompt templates per call vs. the compiled prompt registry.
+
+Builds the prompts of one AI NPC dialogue (system prompt and user message)
+and one purchase-intent check:
+
+- legacy: open and read the template from prompts/ and str.format it on
+  every call (the old load_prompt)
+- registry: compiled templates; the NPC system prompt uses a per-NPC
+  pre-rendered template so only the per-player fields are formatted
+
+Usage:
+    python benchmarks/bench_prompts.py
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+from ai_client import _get_npc_dialogue_system_prompt, _get_npc_dialogue_user_message
+from game_engine import _get_purchase_intent_system_prompt, _get_purchase_intent_user_message
+from utils.prompt_loader import PROMPTS_DIR, get_prompt_registry
+
+ROUNDS = 5000
+
+NPC = dict(npc_name="Mara", npc_title="the Innkeeper", personality="warm, gossipy and quick to laugh",
+           npc_home="The Rusty Tankard")
+ITEMS_TEXT = "\n".join(f"- item {i} (key: item_{i}, price: {i} copper)" for i in range(12))
+
+
+def legacy_load_prompt(filename, fallback_text="", **kwargs):
+    with open(os.path.join(PROMPTS_DIR, filename), "r", encoding="utf-8") as f:
+        template = f.read().strip()
+    return template.format(**kwargs) if template and kwargs else template or fallback_text
+
+
+def legacy_round(i):
+    username = f"player{i % 50}"
+    legacy_load_prompt("npc_dialogue_system.txt", room_name="The Rusty Tankard", room_description="A warm tavern.",
+                       reputation_desc="You don't know this player well yet.", reputation=0, username=username, **NPC)
+    legacy_load_prompt("npc_dialogue_user_talk.txt", username=username, player_input="hello there")
+    legacy_load_prompt("purchase_intent_system.txt", items_text=ITEMS_TEXT)
+    legacy_load_prompt("purchase_intent_user.txt", text="one ale please")
+
+
+def registry_round(i):
+    username = f"player{i % 50}"
+    _get_npc_dialogue_system_prompt(room_name="The Rusty Tankard", room_description="A warm tavern.",
+                                    reputation_desc="You don't know this player well yet.", reputation=0,
+                                    username=username, **NPC)
+    _get_npc_dialogue_user_message(False, username, "hello there")
+    _get_purchase_intent_system_prompt(ITEMS_TEXT)
+    _get_purchase_intent_user_message("one ale please")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        fn(i)
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def main():
+    start = time.perf_counter()
+    problems = get_prompt_registry().load()
+    print(f"Registry load: {(time.perf_counter() - start) * 1000:.2f} ms, problems: {problems or 'none'}")
+    legacy = timed(legacy_round)
+    registry = timed(registry_round)
+    print(f"Prompts for one dialogue + one purchase check ({ROUNDS} rounds):")
+    print(f"  read + format per call: {legacy * 1e6:8.1f} us")
+    print(f"  compiled registry:      {registry * 1e6:8.1f} us ({legacy / registry:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
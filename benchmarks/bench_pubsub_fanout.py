@@ -0,0 +1,163 @@
+"""
+Load test: Redis pub/sub for 1,000 WebSocket connections, per-connection
+subscribers vs. the shared per-process subscriber.
+
+1,000 simulated connections in 50 rooms (20 per room), each subscribed to its
+user channel and its room channel. 200 room events are published:
+
+- per-connection: every connection has its own pubsub() (the old
+  _listen_for_events); each event crosses the wire once per subscriber and is
+  decoded and re-encoded per connection
+- shared: WebSocketManager with one PubSubMultiplexer; each event is received
+  and decoded once, encoded once and fanned out in memory
+
+Reports subscriber connections and the CPU time to deliver every event.
+Uses fakeredis when installed, otherwise the Redis at REDIS_URL (which also
+reports the server's connected_clients), and is skipped when neither is
+available.
+
+Usage:
+    pip install -r requirements-dev.txt   # fakeredis, or run a local redis-server
+    python benchmarks/bench_pubsub_fanout.py
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+warnings.simplefilter("ignore", DeprecationWarning)
+
+from core.pubsub_multiplexer import PubSubMultiplexer
+
+try:
+    import redis
+    import core.redis_manager as redis_manager
+    from core.websocket_manager import WebSocketManager
+    REDIS_AVAILABLE = True
+except ImportError:  # redis package not installed
+    REDIS_AVAILABLE = False
+
+CONNECTIONS = 1000
+ROOMS = 50
+EVENTS = 200
+EXPECTED = EVENTS * (CONNECTIONS // ROOMS)
+
+
+def make_client():
+    """fakeredis when installed, otherwise the Redis at REDIS_URL."""
+    # Room for a connection per subscriber (the app's pub/sub pool stops at 50)
+    max_connections = CONNECTIONS + 10
+    try:
+        import fakeredis
+        return fakeredis.FakeRedis(decode_responses=True, max_connections=max_connections), "fakeredis"
+    except ImportError:
+        client = redis.Redis.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+                                      decode_responses=True, max_connections=max_connections)
+        client.ping()
+        return client, "redis"
+
+
+def connected_clients(client, backend):
+    return client.info("clients")["connected_clients"] if backend == "redis" else None
+
+
+def publish_events(client):
+    for i in range(EVENTS):
+        event = {"type": "npc_action", "data": {"text": f"Mara polishes glass {i}."}, "timestamp": time.time()}
+        client.publish(f"room:room_{i % ROOMS}", json.dumps(event))
+
+
+def run_per_connection(client, backend):
+    base = connected_clients(client, backend)
+    pubsubs = []
+    for i in range(CONNECTIONS):
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(f"user:player{i}", f"room:room_{i % ROOMS}")
+        pubsubs.append(pubsub)
+    for pubsub in pubsubs:
+        pubsub.get_message(timeout=0)  # Settle subscription replies
+    clients = connected_clients(client, backend)
+
+    delivered = 0
+    cpu_start = time.process_time()
+    publish_events(client)
+    deadline = time.time() + 60
+    while delivered < EXPECTED and time.time() < deadline:
+        for pubsub in pubsubs:
+            message = pubsub.get_message(timeout=0)
+            if message and message["type"] == "message":
+                event = json.loads(message["data"])
+                json.dumps({"type": "event", "event": event})
+                delivered += 1
+    cpu = time.process_time() - cpu_start
+    for pubsub in pubsubs:
+        pubsub.close()
+    return len(pubsubs), None if base is None else clients - base, delivered, cpu
+
+
+class SimulatedSocket:
+    def __init__(self, counter):
+        self.counter = counter
+
+    async def send(self, text):
+        self.counter[0] += 1
+
+
+async def run_shared(client, backend):
+    base = connected_clients(client, backend)
+    subscribers = []
+
+    def connect():
+        subscribers.append(client)
+        return client
+
+    subscriber = PubSubMultiplexer(connect_fn=connect, poll_timeout=0.05)
+    manager = WebSocketManager(subscriber=subscriber)
+    counter = [0]
+    for i in range(CONNECTIONS):
+        conn = await manager.connect(SimulatedSocket(counter), f"player{i}")
+        await manager.set_room(conn, f"room_{i % ROOMS}")
+    while not subscriber.connected:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)  # Let the subscriptions settle
+    clients = connected_clients(client, backend)
+
+    cpu_start = time.process_time()
+    publish_events(client)
+    deadline = time.time() + 60
+    while counter[0] < EXPECTED and time.time() < deadline:
+        await asyncio.sleep(0.001)
+    cpu = time.process_time() - cpu_start
+    subscriber.stop()
+    return len(subscribers), None if base is None else clients - base, counter[0], cpu
+
+
+def main():
+    if not REDIS_AVAILABLE:
+        print("Pub/sub fan-out: skipped (redis package not installed)")
+        return
+    # The event bus is not used here; keep it from connecting to Redis
+    redis_manager._redis_available = False
+    try:
+        client, backend = make_client()
+    except Exception as e:
+        print(f"Pub/sub fan-out: skipped (no fakeredis or Redis: {e})")
+        return
+    print(f"{CONNECTIONS} connections in {ROOMS} rooms, {EVENTS} room events ({EXPECTED} deliveries), {backend}")
+
+    for name, result in (("per-connection", run_per_connection(client, backend)),
+                         ("shared", asyncio.run(run_shared(client, backend)))):
+        subscribers, clients, delivered, cpu = result
+        server = f", server connected_clients +{clients}" if clients is not None else ""
+        print(f"  {name:15s} {subscribers:5d} subscriber connections{server}, "
+              f"{delivered}/{EXPECTED} delivered, {cpu * 1000:8.1f} ms CPU")
+
+
+if __name__ == "__main__":
+    main()
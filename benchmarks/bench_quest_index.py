@@ -0,0 +1,136 @@
+"""
+Benchmark: quest lookups with 2,000 quest templates, full scans vs. the
+quest indexes.
+
+- board: get_noticeboard_quests_for_room (templates spread over 50
+  noticeboards) vs. scanning every template's offer sources
+- NPC offer: maybe_offer_npc_quest for a line that matches nothing (100
+  quest-giving NPCs) vs. checking every template's availability and offers
+- quest events: QuestManager.handle_event for a player with 20 active
+  quests vs. updating every active quest
+
+Usage:
+    python benchmarks/bench_quest_index.py
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+import quests
+from game_engine import new_game_state
+from game.models.player import Player
+from game.models.quest import QuestTemplate as QuestModelTemplate
+from game.systems.quest_manager import QuestManager
+
+TEMPLATES = 2000
+BOARDS = 50
+NPCS = 100
+ACTIVE_QUESTS = 20
+ROUNDS = 200
+
+
+def template_fields(i):
+    return dict(
+        id=f"bench_quest_{i}", name=f"Bench Quest {i}", description="A quest for benchmarking.",
+        giver_id=f"npc:giver_{i % NPCS}", difficulty="Easy", category="Errand", timed=False,
+        time_limit_minutes=None, actors=[f"giver_{i % NPCS}"],
+        stages=[
+            {"id": "visit", "objectives": [{"id": "visit_obj", "type": "go_to_room", "room_id": f"room_{i}"}]},
+            {"id": "fetch", "objectives": [{"id": "fetch_obj", "type": "obtain_item", "item_id": f"item_{i}"}]},
+        ],
+        rewards={},
+        offer_sources=[
+            {"type": "noticeboard", "room_id": f"board_{i % BOARDS}"},
+            {"type": "npc_dialogue", "npc_id": f"giver_{i % NPCS}",
+             "trigger": {"kind": "say_contains", "keywords": [f"errand {i}"]}, "offer_text": "Sure."},
+        ],
+    )
+
+
+def legacy_noticeboard(game, room_id, username):
+    available = []
+    for quest_id, template in quests.QUEST_TEMPLATES.items():
+        if game.get("quests", {}).get(quest_id, {}).get("status") == "active":
+            continue
+        if not any(source.get("type") == "noticeboard" and source.get("room_id", "") == room_id
+                   for source in template.offer_sources):
+            continue
+        if quests.is_quest_available_to_player(game, username, quest_id)[0]:
+            available.append(template)
+    return available
+
+
+def legacy_npc_offer(game, username, npc_id, player_text):
+    for quest_id, template in quests.QUEST_TEMPLATES.items():
+        if game.get("quests", {}).get(quest_id, {}).get("status") == "active":
+            continue
+        if not quests.is_quest_available_to_player(game, username, quest_id)[0]:
+            continue
+        for source in template.offer_sources:
+            if source.get("type") == "npc_dialogue" and source.get("npc_id", "") == npc_id:
+                keywords = source.get("trigger", {}).get("keywords", [])
+                if any(keyword.lower() in player_text.lower() for keyword in keywords):
+                    return source.get("offer_text", "")
+    return None
+
+
+def legacy_handle_event(player, event, game):
+    for quest in player.quests.values():
+        if quest.status == "active":
+            quest.update(event, game)
+
+
+def per_call(fn, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def report(label, legacy_s, indexed_s):
+    print(f"  {label:32s} scan {legacy_s * 1e6:9.1f} us | indexed {indexed_s * 1e6:7.1f} us "
+          f"({legacy_s / indexed_s:6.1f}x)")
+
+
+def main():
+    for i in range(TEMPLATES):
+        quests.register_quest_template(quests.QuestTemplate(**template_fields(i)))
+    qm = QuestManager.get_instance()
+    for i in range(TEMPLATES):
+        qm.register_template(QuestModelTemplate(**template_fields(i)))
+
+    game = new_game_state("bench_player")
+    print(f"{len(quests.QUEST_TEMPLATES)} quest templates:")
+
+    assert len(legacy_noticeboard(game, "board_7", "bench_player")) == \
+        len(quests.get_noticeboard_quests_for_room(game, "board_7", 0, "bench_player"))
+    report("board (one noticeboard)",
+           per_call(lambda: legacy_noticeboard(game, "board_7", "bench_player"), ROUNDS // 10),
+           per_call(lambda: quests.get_noticeboard_quests_for_room(game, "board_7", 0, "bench_player")))
+
+    text = "nice weather today"
+    report("NPC offer (no match)",
+           per_call(lambda: legacy_npc_offer(game, "bench_player", "giver_7", text), ROUNDS // 10),
+           per_call(lambda: quests.maybe_offer_npc_quest(game, "bench_player", "giver_7", text, 0)))
+
+    player = Player("bench_player")
+    player.load_from_state(game)
+    for i in range(ACTIVE_QUESTS):
+        qm.start_quest(player, f"bench_quest_{i}")
+    miss = {"type": "enter_room", "room_id": "town_square"}
+    report(f"quest event ({ACTIVE_QUESTS} active quests)",
+           per_call(lambda: legacy_handle_event(player, miss, game), ROUNDS * 10),
+           per_call(lambda: qm.handle_event(player, miss, game), ROUNDS * 10))
+
+    qm.handle_event(player, {"type": "enter_room", "room_id": "room_3"}, game)
+    advanced = [quest.id for quest in player.quests.values() if quest.current_stage_index]
+    print(f"  matching event advanced {advanced}")
+
+
+if __name__ == "__main__":
+    main()
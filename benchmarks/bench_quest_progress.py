@@ -0,0 +1,125 @@
+"""
+Benchmark: quest events and expiry checks, Player round trip vs. the quest
+progress engine.
+
+A player with 20 active quests (two stages each) sends quest events:
+
+- round trip: the old handle_quest_event (refresh the live Player's quests
+  from the game dict, QuestManager.handle_event, then to_state() to copy
+  quests and completed_quests back)
+- engine: quests.handle_quest_event on the progress engine (compiled
+  matchers, counters keyed by event type and target, in-place writes)
+
+Events are a move no quest waits for, and a take that advances one quest
+(on a fresh game dict each time, so the engine also builds the player's
+counters). tick_quests is timed as the old scan of every active quest vs. the
+deadline heap.
+
+Usage:
+    python benchmarks/bench_quest_progress.py
+"""
+import os
+import sys
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+import quests
+from game_engine import new_game_state
+from game.models.quest import QuestTemplate
+from game.systems.quest_manager import QuestManager
+from game.world.manager import WorldManager
+
+ACTIVE_QUESTS = 20
+ROUNDS = 5000
+USERNAME = "bench_player"
+
+
+def make_template(i):
+    return QuestTemplate(
+        id=f"bench_quest_{i}", name=f"Bench Quest {i}", description="A quest for benchmarking.",
+        giver_id="npc:innkeeper", difficulty="Easy", category="Errand", timed=True,
+        time_limit_minutes=60, actors=["innkeeper"],
+        stages=[
+            {"id": "fetch", "description": "Fetch it.",
+             "objectives": [{"id": "fetch_obj", "type": "obtain_item", "item_id": f"item_{i}"}]},
+            {"id": "deliver", "description": "Bring it back.",
+             "objectives": [{"id": "deliver_obj", "type": "deliver_item", "item_id": f"item_{i}",
+                             "npc_id": "innkeeper"}]},
+        ],
+        rewards={}, offer_sources=[],
+    )
+
+
+def make_game():
+    game = new_game_state(USERNAME)
+    game["username"] = USERNAME
+    game["quests"] = {
+        f"bench_quest_{i}": {
+            "id": f"bench_quest_{i}", "template_id": f"bench_quest_{i}", "status": "active",
+            "giver_id": "npc:innkeeper", "current_stage_index": 0, "objectives_state": {},
+            "notes": [], "difficulty": "Easy", "expires_at_tick": 10 ** 9 + i,
+        }
+        for i in range(ACTIVE_QUESTS)
+    }
+    return game
+
+
+def round_trip_event(game, event):
+    player = WorldManager.get_instance().get_player(USERNAME, game, sections=("quests",))
+    QuestManager.get_instance().handle_event(player, event, game)
+    player.sync_to_state(game, "quests", "completed_quests")
+
+
+def scan_tick(game, current_tick):
+    for instance in quests.get_active_quests(game):
+        expires_at_tick = instance.get("expires_at_tick")
+        if expires_at_tick and current_tick >= expires_at_tick:
+            quests.fail_quest(game, "adventurer", instance["id"], "You ran out of time.")
+
+
+def per_call(fn, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def report(label, old_s, new_s):
+    print(f"  {label:28s} round trip {old_s * 1e6:8.1f} us | engine {new_s * 1e6:6.1f} us "
+          f"({old_s / new_s:6.1f}x)")
+
+
+def main():
+    qm = QuestManager.get_instance()
+    for i in range(ACTIVE_QUESTS):
+        qm.register_template(make_template(i))
+
+    move = {"type": "enter_room", "room_id": "market", "username": USERNAME}
+    print(f"{ACTIVE_QUESTS} active quests:")
+
+    old_game, new_game = make_game(), make_game()
+    report("move (no quest waits)",
+           per_call(lambda: round_trip_event(old_game, move)),
+           per_call(lambda: quests.handle_quest_event(new_game, move)))
+
+    def takes(handle):
+        games = [make_game() for _ in range(ROUNDS // 10)]
+        take = {"type": "take_item", "item_id": "item_7", "username": USERNAME}
+        start = time.perf_counter()
+        for game in games:
+            handle(game, take)
+        return (time.perf_counter() - start) / len(games)
+
+    report("take (advances one quest)", takes(round_trip_event), takes(quests.handle_quest_event))
+
+    report("tick_quests (none expired)",
+           per_call(lambda: scan_tick(old_game, 1000)),
+           per_call(lambda: quests.tick_quests(new_game, 1000)))
+
+
+if __name__ == "__main__":
+    main()
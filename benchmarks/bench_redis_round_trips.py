@@ -0,0 +1,148 @@
+"""
+Benchmark: Redis round trips per command, sequential calls vs. pipelined batches.
+
+Counts real client round trips (each non-pipelined command is one, each
+pipeline execute is one) for:
+- save_game after a movement command: the old sequence (state SETEX, location
+  SETEX, SADD/EXPIRE, a second location SETEX, GET of the old location, SREM/SADD)
+  vs. GameStateManager.save_player_state with its pipelined batch
+- a whole request with several cache writes, without and with the request batch
+- a background event timer flush for 50 rooms: per-room SETEX vs. one batch
+
+Uses fakeredis when installed, otherwise the Redis at REDIS_URL, and is
+skipped when neither is available. Event bus publishing is disabled so only
+cache traffic is counted.
+
+Usage:
+    pip install -r requirements-dev.txt   # fakeredis, or run a local redis-server
+    python benchmarks/bench_redis_round_trips.py
+"""
+import os
+import sys
+import json
+import logging
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+warnings.simplefilter("ignore", DeprecationWarning)
+
+try:
+    import redis
+    from redis.client import Pipeline
+
+    import core.redis_manager as redis_manager
+    from core.redis_manager import CacheKeys, redis_batch, set_cached_state, set_many_cached_states
+    from core.state_manager import GameStateManager
+    REDIS_AVAILABLE = True
+except ImportError:  # redis package not installed
+    REDIS_AVAILABLE = False
+
+ROUND_TRIPS = {"count": 0}
+
+
+def install_counting_client():
+    """Point core.redis_manager at fakeredis/local Redis and count round trips."""
+    try:
+        import fakeredis
+        client = fakeredis.FakeRedis(decode_responses=True)
+        backend = "fakeredis"
+    except ImportError:
+        client = redis.Redis.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+                                      decode_responses=True)
+        client.ping()
+        backend = "redis"
+
+    execute_command = redis.Redis.execute_command
+    pipeline_execute = Pipeline.execute
+
+    def counted_execute_command(self, *args, **kwargs):
+        if not isinstance(self, Pipeline):
+            ROUND_TRIPS["count"] += 1
+        return execute_command(self, *args, **kwargs)
+
+    def counted_pipeline_execute(self, *args, **kwargs):
+        ROUND_TRIPS["count"] += 1
+        return pipeline_execute(self, *args, **kwargs)
+
+    redis.Redis.execute_command = counted_execute_command
+    Pipeline.execute = counted_pipeline_execute
+
+    redis_manager._cache_client = client
+    redis_manager._redis_available = True
+    return client, backend
+
+
+def legacy_save_game(cache, username, game):
+    """save_game's Redis traffic before batching (state manager + app follow-up)."""
+    cache.setex(CacheKeys.player_state(username), 900, json.dumps(game))
+    cache.setex(CacheKeys.player_location(username), 900, json.dumps(game["location"]))
+    cache.sadd(CacheKeys.room_players(game["location"]), username)
+    cache.expire(CacheKeys.room_players(game["location"]), 3600)
+    cache.setex(CacheKeys.player_location(username), 900, json.dumps(game["location"]))
+    old_room_id = cache.get(f"player:{username}:location")
+    if old_room_id and old_room_id != game["location"]:
+        cache.srem(CacheKeys.room_players(old_room_id), username)
+    cache.sadd(CacheKeys.room_players(game["location"]), username)
+
+
+def measure(fn):
+    ROUND_TRIPS["count"] = 0
+    fn()
+    return ROUND_TRIPS["count"]
+
+
+def main():
+    if not REDIS_AVAILABLE:
+        print("Redis round trips: skipped (redis package not installed)")
+        return
+    try:
+        cache, backend = install_counting_client()
+    except Exception as e:
+        print(f"Redis round trips: skipped (no fakeredis or Redis: {e})")
+        return
+    manager = GameStateManager()
+    manager._cache = cache
+    manager._event_bus = None
+
+    game = {"username": "bench", "location": "town_square", "inventory": ["torch"] * 10}
+    manager.save_player_state("bench", game, sync_to_db=False)
+    moved = dict(game, location="market_lane")
+
+    rows = []
+    rows.append(("save_game (move)",
+                 measure(lambda: legacy_save_game(cache, "bench", moved)),
+                 measure(lambda: manager.save_player_state("bench", moved, sync_to_db=False))))
+
+    def legacy_request():
+        legacy_save_game(cache, "bench", moved)
+        cache.setex(CacheKeys.player_session("bench"), 900, json.dumps({"active": True}))
+        legacy_save_game(cache, "bench", moved)
+
+    def batched_request():
+        # What the before_request/teardown_request hooks do around a route
+        with redis_batch():
+            manager.save_player_state("bench", moved, sync_to_db=False)
+            set_cached_state(CacheKeys.player_session("bench"), {"active": True})
+            manager.save_player_state("bench", moved, sync_to_db=False)
+
+    rows.append(("request: 2 saves + session", measure(legacy_request), measure(batched_request)))
+
+    timers = {f"room_{i}": {"npc_action": 1.0, "ambiance": 2.0} for i in range(50)}
+    rows.append(("event timer flush (50 rooms)",
+                 measure(lambda: [cache.setex(CacheKeys.room_events(room_id), 3600, json.dumps(t))
+                                  for room_id, t in timers.items()]),
+                 measure(lambda: set_many_cached_states(
+                     {CacheKeys.room_events(room_id): t for room_id, t in timers.items()}, ttl=3600))))
+
+    print(f"Backend: {backend}")
+    print(f"{'operation':>30} {'before':>8} {'after':>8}  (round trips)")
+    for name, before, after in rows:
+        print(f"{name:>30} {before:>8} {after:>8}")
+    assert cache.sismember(CacheKeys.room_players("market_lane"), "bench")
+    assert not cache.sismember(CacheKeys.room_players("town_square"), "bench")
+
+
+if __name__ == "__main__":
+    main()
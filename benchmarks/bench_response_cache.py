@@ -0,0 +1,132 @@
+"""
+Benchmark: the old AI response cache vs. the tiered response cache.
+
+- eviction: the old cache sorted every entry by timestamp and dropped half of
+  them whenever it filled up; the local tier is an LRU that evicts one entry
+  in O(1). Measures the cost of a write into a full cache.
+- hit rate: replays a stream of player lines (several phrasings of common
+  greetings and questions, many players, a few reputation levels). The old
+  key used the raw lowercased input and was skipped once the NPC remembered
+  three interactions; the new key normalises the input and uses the
+  reputation band and a digest of the remembered conversation (so replies
+  stay correct for players with different histories).
+
+Usage:
+    python benchmarks/bench_response_cache.py
+"""
+import gc
+import os
+import sys
+import time
+import random
+import hashlib
+import logging
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+from ai_client import make_reply_cache_key
+from core.response_cache import LocalTier
+
+CACHE_SIZE = 1000
+EVICTION_CACHE_SIZE = 20000
+WRITES = 100000
+LINES = 5000
+PLAYERS = 200
+TALK_SHARE = 0.3  # share of remembered interactions that are conversation
+
+PHRASINGS = {
+    "hello": ["hello", "Hello!", "hello.", "um, hello", "HELLO", "hello there", "Hello there!"],
+    "rumours": ["any rumours?", "Any rumours", "any rumours??", "um any rumours?"],
+    "room": ["do you have a room", "Do you have a room?", "do you have a room, please?"],
+    "ale": ["one ale please", "One ale, please!", "one ale"],
+}
+
+
+class LegacyCache:
+    """The old dict cache: sort by timestamp and drop half when full."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = {}
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["response"]
+
+    def set(self, key, response):
+        if len(self.entries) >= self.max_size:
+            oldest = sorted(self.entries.items(), key=lambda x: x[1]["timestamp"])
+            for old_key, _ in oldest[:self.max_size // 2]:
+                del self.entries[old_key]
+        self.entries[key] = {"response": response, "timestamp": datetime.now()}
+
+
+def legacy_key(npc_id, player_input, npc_memory):
+    return hashlib.md5(f"{npc_id}:{player_input.lower()}:{len(npc_memory)}".encode()).hexdigest()
+
+
+def bench_eviction():
+    print(f"Writes into a full cache ({EVICTION_CACHE_SIZE} entries, {WRITES} writes):")
+    gc.disable()
+    for label, cache in (("sort-and-drop-half", LegacyCache(EVICTION_CACHE_SIZE)),
+                         ("LRU local tier", LocalTier(EVICTION_CACHE_SIZE))):
+        worst = 0.0
+        start = time.perf_counter()
+        for i in range(WRITES):
+            t = time.perf_counter()
+            cache.set(f"key{i}", "reply")
+            worst = max(worst, time.perf_counter() - t)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<20} {elapsed / WRITES * 1e6:8.2f} us/write, slowest write {worst * 1e6:8.1f} us")
+    gc.enable()
+
+
+def bench_hit_rate():
+    rng = random.Random(7)
+    legacy, tiered = LegacyCache(CACHE_SIZE), LocalTier(CACHE_SIZE)
+    memories = {}
+    for _ in range(LINES):
+        player = rng.randrange(PLAYERS)
+        reputation = rng.choice((0, 0, 5, 12, 30))
+        intent = rng.choice(list(PHRASINGS))
+        line = rng.choice(PHRASINGS[intent])
+        memory = memories.get(player, [])
+
+        old = legacy_key("innkeeper", line, memory) if len(memory) < 3 else None
+        if old is None:
+            legacy.misses += 1
+        elif legacy.get(old) is None:
+            legacy.set(old, "reply")
+
+        new = make_reply_cache_key("innkeeper", line, reputation, memory)
+        if tiered.get(new) is None:
+            tiered.set(new, "reply")
+
+        # Purchases and gifts are remembered too, but only conversation reaches the prompt
+        if rng.random() < TALK_SHARE:
+            entry = {"type": "talked", "player_input": intent, "response": f"reply to {intent}"}
+        else:
+            entry = {"type": "bought", "item": "ale"}
+        memories[player] = (memory + [entry])[-5:]
+
+    stats = tiered.get_stats()
+    print(f"\nHit rate over {LINES} player lines ({PLAYERS} players, {len(PHRASINGS)} intents):")
+    print(f"  old keys (raw input, skipped after 3 memories): {legacy.hits / LINES:6.1%}")
+    print(f"  normalised keys (band + memory digest):          {stats['hits'] / LINES:6.1%}")
+
+
+def main():
+    bench_eviction()
+    bench_hit_rate()
+
+
+if __name__ == "__main__":
+    main()
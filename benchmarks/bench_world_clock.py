@@ -0,0 +1,110 @@
+"""
+Benchmark: per-call time parsing vs. the shared world clock snapshot.
+
+Reads what one player command touches (the time command plus a look at an
+outdoor room: minute, hour, season, month, day, time of day, sunrise/sunset
+and moon phase):
+
+- legacy: every getter parses GAME_TIME["start_timestamp"] with
+  datetime.fromisoformat and calls datetime.now() (get_season() alone did it
+  once, get_time_of_day() twice)
+- snapshot: one WorldClock.snapshot() per read, rebuilt once per in-game minute
+
+Usage:
+    python benchmarks/bench_world_clock.py
+"""
+import os
+import sys
+import time
+import logging
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.disable(logging.CRITICAL)
+
+from game.systems.time_system import SUNRISE_TIMES, SUNSET_TIMES, time_of_day_at
+from game.systems.season_system import SeasonSystem
+from game.systems.lunar_system import LunarSystem
+from game.systems.world_clock import WorldClock
+
+ROUNDS = 20000
+
+GAME_TIME = {"start_timestamp": datetime(2024, 1, 1).isoformat()}
+WORLD_CLOCK = {"lunar_cycle_start_day": 0}
+SEASONS = SeasonSystem()
+LUNAR = LunarSystem()
+
+
+def legacy_minutes():
+    start_time = datetime.fromisoformat(GAME_TIME["start_timestamp"])
+    return int((datetime.now() - start_time).total_seconds() / 60.0 * 12.0)
+
+
+def legacy_day_of_year():
+    return legacy_minutes() // 1440 % 120
+
+
+def legacy_season():
+    return SEASONS.get_season(legacy_day_of_year())
+
+
+def legacy_sunrise_sunset():
+    season = legacy_season()
+    return SUNRISE_TIMES.get(season, 360), SUNSET_TIMES.get(season, 1200)
+
+
+def legacy_time_of_day():
+    sunrise, sunset = legacy_sunrise_sunset()
+    return time_of_day_at(legacy_minutes() % 1440, sunrise, sunset)
+
+
+def legacy_round():
+    # The time command
+    minutes = legacy_minutes() % 1440
+    legacy_time_of_day()
+    legacy_season()
+    SEASONS.get_month(legacy_day_of_year())
+    SEASONS.get_day_of_month(legacy_day_of_year())
+    legacy_day_of_year()
+    # Looking at an outdoor room: weather line and description
+    legacy_minutes()
+    legacy_season()
+    legacy_day_of_year()
+    legacy_sunrise_sunset()
+    LUNAR.get_moon_phase(legacy_day_of_year())
+    legacy_time_of_day()
+    return minutes
+
+
+def snapshot_round(clock):
+    # The time command
+    snapshot = clock.snapshot()
+    _ = (snapshot.minute_of_day, snapshot.time_of_day, snapshot.season, snapshot.month,
+         snapshot.day_of_month, snapshot.day_of_year)
+    # Looking at an outdoor room: weather line and description
+    snapshot = clock.snapshot()
+    _ = (snapshot.minute_of_day, snapshot.season, snapshot.time_of_day, snapshot.moon_phase)
+    return clock.snapshot().time_of_day
+
+
+def main():
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        legacy_round()
+    legacy = (time.perf_counter() - start) / ROUNDS
+
+    clock = WorldClock(lambda: GAME_TIME, lambda: WORLD_CLOCK)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        snapshot_round(clock)
+    current = (time.perf_counter() - start) / ROUNDS
+
+    print(f"Clock reads for one time command + one outdoor look ({ROUNDS} rounds):")
+    print(f"  parse per getter:  {legacy * 1e6:8.2f} us")
+    print(f"  shared snapshot:   {current * 1e6:8.2f} us ({legacy / current:.1f}x)")
+    print(f"  snapshots built:   {clock.computed}")
+
+
+if __name__ == "__main__":
+    main()
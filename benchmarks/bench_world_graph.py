@@ -0,0 +1,104 @@
+"""
+Benchmark: per-room BFS vs. the precomputed world graph.
+
+Builds a synthetic 100x100 grid (10,000 rooms) and times get_rooms_within_distance
+for radius 5 the old way (one BFS with list.pop(0) per room in WORLD) and via the
+world graph (one deque BFS, then cached). Also times NPC next-step lookups.
+
+Usage:
+    python benchmarks/bench_world_graph.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.world.graph import WorldGraph
+
+SIZE = 100
+RADIUS = 5
+
+
+def make_grid(size):
+    world = {}
+    for x in range(size):
+        for y in range(size):
+            exits = {}
+            if x > 0:
+                exits["west"] = f"r{x - 1}_{y}"
+            if x < size - 1:
+                exits["east"] = f"r{x + 1}_{y}"
+            if y > 0:
+                exits["north"] = f"r{x}_{y - 1}"
+            if y < size - 1:
+                exits["south"] = f"r{x}_{y + 1}"
+            world[f"r{x}_{y}"] = {"exits": exits, "outdoor": True}
+    return world
+
+
+def legacy_distance(world, start_room_id, target_room_id, max_distance=10):
+    """calculate_room_distance as it was before the world graph."""
+    if start_room_id == target_room_id:
+        return 0
+    if start_room_id not in world or target_room_id not in world:
+        return None
+    queue = [(start_room_id, 0)]
+    visited = {start_room_id}
+    while queue:
+        current_room, distance = queue.pop(0)
+        if distance >= max_distance:
+            continue
+        for direction, next_room_id in world[current_room].get("exits", {}).items():
+            if next_room_id == target_room_id:
+                return distance + 1
+            if next_room_id not in visited and next_room_id in world:
+                visited.add(next_room_id)
+                queue.append((next_room_id, distance + 1))
+    return None
+
+
+def legacy_rooms_within(world, center_room_id, max_distance):
+    """get_rooms_within_distance as it was before the world graph."""
+    rooms_within = []
+    for room_id in world.keys():
+        distance = legacy_distance(world, center_room_id, room_id, max_distance + 1)
+        if distance is not None and distance <= max_distance:
+            rooms_within.append((room_id, distance))
+    return rooms_within
+
+
+def timed(fn, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - started) * 1000.0 / repeat, result
+
+
+def main():
+    world = make_grid(SIZE)
+    center = f"r{SIZE // 2}_{SIZE // 2}"
+    graph = WorldGraph()
+    build_ms, _ = timed(lambda: graph.build(world))
+
+    legacy_ms, legacy = timed(lambda: legacy_rooms_within(world, center, RADIUS))
+    cold_ms, fresh = timed(lambda: graph.rooms_within(center, RADIUS))
+    warm_ms, _ = timed(lambda: graph.rooms_within(center, RADIUS), repeat=1000)
+    assert dict(legacy) == fresh
+
+    corner, far = "r0_0", f"r{SIZE - 1}_{SIZE - 1}"
+    step_cold_ms, step = timed(lambda: graph.next_step(corner, far, max_distance=2 * SIZE))
+    step_warm_ms, _ = timed(lambda: graph.next_step(corner, far, max_distance=2 * SIZE), repeat=1000)
+    graph.set_exit_state(corner, step[1], {"locked": True})
+    step_relock_ms, _ = timed(lambda: graph.next_step(corner, far, max_distance=2 * SIZE))
+
+    print(f"{SIZE * SIZE}-room grid, radius {RADIUS} ({len(fresh)} rooms in range), build {build_ms:.1f} ms")
+    print(f"{'rooms within (legacy)':>28} {legacy_ms:>10.2f} ms")
+    print(f"{'rooms within (graph, cold)':>28} {cold_ms:>10.3f} ms")
+    print(f"{'rooms within (graph, cached)':>28} {warm_ms * 1000:>10.2f} us")
+    print(f"{'next step corner->corner':>28} {step_cold_ms:>10.2f} ms cold, {step_warm_ms * 1000:.2f} us cached, "
+          f"{step_relock_ms:.2f} ms after an exit locks")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,9 @@ command_registry.py
 
 Command registry and dispatcher system.
 
-Provides a registry for command handlers to replace the giant if/elif chain
-in handle_command. Allows commands to be extracted into separate functions/modules
-while maintaining backward compatibility.
+Every command verb is registered here with its handler and argument grammar,
+so dispatch is a single dict lookup instead of an if/elif chain. The registry
+also keeps per-verb call counts and latencies (get_command_stats()).
 """
 
 from typing import Callable, Dict, List, Tuple, Optional
@@ -31,10 +31,41 @@ COMMAND_HANDLERS: Dict[str, CommandHandler] = {}
 COMMAND_ALIASES: Dict[str, str] = {}
 
 
+class CommandSpec:
+    """A registered command: its handler plus the argument grammar it accepts."""
+
+    __slots__ = ("verb", "handler", "min_args", "max_args", "raw")
+
+    def __init__(self, verb: str, handler: CommandHandler, min_args: int = 0,
+                 max_args: Optional[int] = None, raw: bool = False):
+        self.verb = verb
+        self.handler = handler
+        self.min_args = min_args
+        self.max_args = max_args
+        self.raw = raw
+
+    def accepts(self, tokens: list) -> bool:
+        """Whether the tokens (verb included) match this command's grammar."""
+        arg_count = len(tokens) - 1
+        if arg_count < self.min_args:
+            return False
+        return self.max_args is None or arg_count <= self.max_args
+
+
+# Every verb and alias -> its CommandSpec (one dict lookup per command)
+COMMAND_SPECS: Dict[str, CommandSpec] = {}
+
+# Per-verb counters: {verb: {"calls", "total_ms", "max_ms"}}
+COMMAND_STATS: Dict[str, Dict[str, float]] = {}
+
+
 def register_command(
     verb: str,
     handler: CommandHandler,
     aliases: Optional[List[str]] = None,
+    min_args: int = 0,
+    max_args: Optional[int] = None,
+    raw: bool = False,
 ):
     """
     Register a command verb and any aliases to a handler.
@@ -43,10 +74,19 @@ def register_command(
         verb: The primary command verb (e.g., "help", "quests")
         handler: The handler function that processes this command
         aliases: Optional list of alias verbs (e.g., ["commands"] for "help")
+        min_args: Minimum number of tokens after the verb
+        max_args: Maximum number of tokens after the verb (None for no limit)
+        raw: Pass the original (not lowercased) command text as raw_command=
+    
+    Commands whose arguments don't match the grammar are treated as unknown.
     """
+    spec = CommandSpec(verb, handler, min_args=min_args, max_args=max_args, raw=raw)
     COMMAND_HANDLERS[verb] = handler
+    COMMAND_ALIASES.pop(verb, None)
+    COMMAND_SPECS[verb] = spec
     for alias in aliases or []:
         COMMAND_ALIASES[alias] = verb
+        COMMAND_SPECS[alias] = spec
 
 
 def get_handler(verb: str) -> Optional[CommandHandler]:
@@ -59,6 +99,55 @@ def get_handler(verb: str) -> Optional[CommandHandler]:
     Returns:
         CommandHandler function or None if not found
     """
-    base = COMMAND_ALIASES.get(verb, verb)
-    return COMMAND_HANDLERS.get(base)
+    spec = COMMAND_SPECS.get(verb)
+    return spec.handler if spec else None
+
+
+def get_command(verb: str) -> Optional[CommandSpec]:
+    """
+    Return the CommandSpec registered for a verb or alias.
+    
+    Args:
+        verb: The command verb to look up
+    
+    Returns:
+        CommandSpec or None if not found
+    """
+    return COMMAND_SPECS.get(verb)
+
+
+def record_command_call(verb: str, seconds: float) -> None:
+    """
+    Count one call of a command and its latency.
+    
+    Args:
+        verb: Primary command verb
+        seconds: Time spent in the handler
+    """
+    stats = COMMAND_STATS.get(verb)
+    if stats is None:
+        stats = COMMAND_STATS[verb] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+    elapsed_ms = seconds * 1000.0
+    stats["calls"] += 1
+    stats["total_ms"] += elapsed_ms
+    if elapsed_ms > stats["max_ms"]:
+        stats["max_ms"] = elapsed_ms
+
+
+def get_command_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Return per-verb call counts and latencies, busiest verbs first.
+    
+    Returns:
+        dict: {verb: {"calls", "total_ms", "avg_ms", "max_ms"}}
+    """
+    ordered = sorted(COMMAND_STATS.items(), key=lambda item: item[1]["calls"], reverse=True)
+    return {
+        verb: dict(stats, avg_ms=stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0)
+        for verb, stats in ordered
+    }
+
 
+def reset_command_stats() -> None:
+    """Clear the per-verb counters."""
+    COMMAND_STATS.clear()
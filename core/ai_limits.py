@@ -0,0 +1,451 @@
+"""
+AI request rate limiting and token-budget accounting.
+
+Every AI call used to pay for its bookkeeping with database work on the
+shared SQLite file: the rate limiter rebuilt the user's timestamp list and
+INSERTed into ai_rate_limits (plus a table-wide DELETE of old rows), the
+budget check SELECTed ai_usage, and each completion UPSERTed its usage and
+committed.
+
+- SlidingWindowLimiter: per-user request counts in memory, bucketed into
+  window / buckets slices; a check drops expired slices and reads a running
+  total (amortised O(1))
+- RedisWindowLimiter: the same bucketed window in Redis (INCR per slice,
+  one MGET per check, one pipelined round trip for many users' counts), so
+  every worker sees the same counts
+- UsageLedger: budget checks read a cached (budget, used) counter; usage is
+  added to in-memory deltas that a background task flushes to ai_usage in
+  one batch, so the table lags by at most flush_interval seconds
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 60 * 60  # seconds
+DEFAULT_BUCKETS = 60
+DEFAULT_FLUSH_INTERVAL = 2.0
+# Cached budgets are re-read from ai_usage this often (picks up other workers' usage)
+DEFAULT_REFRESH_INTERVAL = 10.0
+
+
+class SlidingWindowLimiter:
+    """In-process sliding-window request counter, keyed by username."""
+
+    backend = "memory"
+
+    def __init__(self, limit: int, window: float = DEFAULT_WINDOW, buckets: int = DEFAULT_BUCKETS):
+        """
+        Initialize the limiter.
+
+        Args:
+            limit: Requests allowed per window
+            window: Window length in seconds
+            buckets: Slices per window (counts expire one slice at a time)
+        """
+        self.limit = limit
+        self.window = window
+        self.slice = window / max(1, int(buckets))
+        self._lock = threading.Lock()
+        # {key: [deque of [slice_index, count], total]}
+        self._windows: Dict[str, list] = {}
+
+    def _current(self, key: str, now: float) -> Optional[list]:
+        """Window state for key with expired slices dropped (caller holds the lock)."""
+        state = self._windows.get(key)
+        if state is None:
+            return None
+        slices: Deque[list] = state[0]
+        oldest = int(now // self.slice) - int(self.window // self.slice) + 1
+        while slices and slices[0][0] < oldest:
+            state[1] -= slices.popleft()[1]
+        if not slices:
+            del self._windows[key]
+            return None
+        return state
+
+    def count(self, key: str) -> int:
+        """Requests recorded for key in the current window."""
+        with self._lock:
+            state = self._current(key, time.time())
+            return state[1] if state else 0
+
+    def allow(self, key: str) -> bool:
+        """True if key is below the limit (does not record a request)."""
+        return self.count(key) < self.limit
+
+    def hit(self, key: str) -> None:
+        """Record one request for key."""
+        now = time.time()
+        index = int(now // self.slice)
+        with self._lock:
+            state = self._current(key, now)
+            if state is None:
+                state = self._windows[key] = [deque(), 0]
+            slices = state[0]
+            if slices and slices[-1][0] == index:
+                slices[-1][1] += 1
+            else:
+                slices.append([index, 1])
+            state[1] += 1
+
+    def counts(self, keys: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Current counts for several keys at once.
+
+        Args:
+            keys: Keys to read (every key is reported, 0 if it has no requests);
+                  defaults to every key with requests in the window
+
+        Returns:
+            dict: key -> requests in the current window
+        """
+        now = time.time()
+        with self._lock:
+            if keys is None:
+                keys = list(self._windows)
+                result = {}
+            else:
+                result = {key: 0 for key in keys}
+            for key in keys:
+                state = self._current(key, now)
+                if state:
+                    result[key] = state[1]
+            return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+
+class RedisWindowLimiter:
+    """Sliding-window request counter shared by every worker through Redis."""
+
+    backend = "redis"
+
+    def __init__(self, limit: int, window: float = DEFAULT_WINDOW, buckets: int = DEFAULT_BUCKETS):
+        self.limit = limit
+        self.window = window
+        self.buckets = max(1, int(buckets))
+        self.slice = window / self.buckets
+        # Requests made while Redis is unreachable are still limited per worker
+        self._fallback = SlidingWindowLimiter(limit, window, buckets)
+
+    def _keys(self, key: str, now: float) -> List[str]:
+        from core.redis_manager import CacheKeys
+        index = int(now // self.slice)
+        return [CacheKeys.ai_requests(key, i) for i in range(index - self.buckets + 1, index + 1)]
+
+    def count(self, key: str) -> int:
+        try:
+            from core.redis_manager import get_cache_connection
+            cache = get_cache_connection()
+            if cache is not None:
+                return sum(int(value) for value in cache.mget(self._keys(key, time.time())) if value)
+        except Exception as e:
+            logger.error(f"Error reading AI rate limit from Redis: {e}")
+        return self._fallback.count(key)
+
+    def counts(self, keys: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Current counts for several keys in one pipelined round trip (one MGET per key).
+
+        Args:
+            keys: Keys to read; without them only this worker's fallback counts are known
+
+        Returns:
+            dict: key -> requests in the current window
+        """
+        if keys is None:
+            return self._fallback.counts()
+        keys = list(keys)
+        try:
+            from core.redis_manager import get_cache_connection
+            cache = get_cache_connection()
+            if cache is not None:
+                now = time.time()
+                pipe = cache.pipeline(transaction=False)
+                for key in keys:
+                    pipe.mget(self._keys(key, now))
+                return {key: sum(int(value) for value in values if value)
+                        for key, values in zip(keys, pipe.execute())}
+        except Exception as e:
+            logger.error(f"Error reading AI rate limits from Redis: {e}")
+        return self._fallback.counts(keys)
+
+    def allow(self, key: str) -> bool:
+        return self.count(key) < self.limit
+
+    def hit(self, key: str) -> None:
+        try:
+            from core.redis_manager import get_cache_connection
+            cache = get_cache_connection()
+            if cache is not None:
+                slice_key = self._keys(key, time.time())[-1]
+                pipe = cache.pipeline(transaction=False)
+                pipe.incr(slice_key)
+                pipe.expire(slice_key, int(self.window + self.slice) + 1)
+                pipe.execute()
+                return
+        except Exception as e:
+            logger.error(f"Error recording AI request in Redis: {e}")
+        self._fallback.hit(key)
+
+    def clear(self) -> None:
+        self._fallback.clear()
+
+
+class UsageLedger:
+    """
+    Cached AI token budgets with batched usage writes.
+
+    check() answers from a cached (budget, used) pair per user, loaded from
+    ai_usage on first use and refreshed every refresh_interval seconds.
+    record() adds to an in-memory delta; flush() writes every pending delta
+    to ai_usage in one executemany/commit.
+    """
+
+    def __init__(self, connect_fn: Optional[Callable[[], Any]] = None,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        """
+        Initialize the ledger.
+
+        Args:
+            connect_fn: Callable returning a database connection for background
+                        flushes (closed after use); see also start()
+            flush_interval: Seconds between background flushes (upper bound on lag)
+            refresh_interval: Seconds a cached budget is trusted before re-reading it
+        """
+        self.connect = connect_fn
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        # {user_id: [token_budget, tokens_used (as flushed), loaded_at]}
+        self._budgets: Dict[int, list] = {}
+        # {user_id: [tokens, requests]} not yet written to ai_usage
+        self._pending: Dict[int, List[int]] = {}
+        self._running = False
+        self._wake = threading.Event()
+        self.stats = {"checks": 0, "loads": 0, "flushes": 0, "rows_flushed": 0, "errors": 0}
+
+    @staticmethod
+    def default_budget() -> int:
+        return int(os.environ.get("AI_DEFAULT_TOKEN_BUDGET", "10000"))
+
+    def _load(self, user_id: int, db_conn) -> list:
+        """Read a user's budget row (caller does not hold the lock)."""
+        row = db_conn.execute(
+            "SELECT token_budget, tokens_used FROM ai_usage WHERE user_id = ?",
+            (user_id,)
+        ).fetchone()
+        with self._lock:
+            self.stats["loads"] += 1
+            if row:
+                entry = [row["token_budget"], row["tokens_used"], time.monotonic()]
+            else:
+                # No row yet: the user gets the default budget, created on the next flush
+                entry = [self.default_budget(), 0, time.monotonic()]
+                self._pending.setdefault(user_id, [0, 0])
+            self._budgets[user_id] = entry
+            return entry
+
+    def get_usage(self, user_id: int, db_conn) -> Tuple[int, int]:
+        """
+        Current budget and usage for a user, including unflushed usage.
+
+        Args:
+            user_id: User ID
+            db_conn: Database connection (used when the cached entry is missing or stale)
+
+        Returns:
+            tuple: (token_budget, tokens_used)
+        """
+        with self._lock:
+            self.stats["checks"] += 1
+            entry = self._budgets.get(user_id)
+            fresh = entry is not None and time.monotonic() - entry[2] < self.refresh_interval
+        if not fresh:
+            entry = self._load(user_id, db_conn)
+        with self._lock:
+            pending = self._pending.get(user_id)
+            return entry[0], entry[1] + (pending[0] if pending else 0)
+
+    def check(self, user_id: int, db_conn) -> Tuple[bool, int]:
+        """
+        Check whether a user has budget left.
+
+        Returns:
+            tuple: (allowed, remaining)
+        """
+        budget, used = self.get_usage(user_id, db_conn)
+        remaining = budget - used
+        return remaining > 0, remaining
+
+    def record(self, user_id: int, tokens: int, requests: int = 1) -> None:
+        """Add usage for a user (written to ai_usage on the next flush)."""
+        with self._lock:
+            pending = self._pending.setdefault(user_id, [0, 0])
+            pending[0] += tokens
+            pending[1] += requests
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Drop cached budgets (one user, or everyone) so the next check re-reads them."""
+        with self._lock:
+            if user_id is None:
+                self._budgets.clear()
+            else:
+                self._budgets.pop(user_id, None)
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return bool(self._pending)
+
+    def flush(self, db_conn=None) -> int:
+        """
+        Write pending usage to ai_usage in one batch.
+
+        Args:
+            db_conn: Connection to use (defaults to one from connect_fn)
+
+        Returns:
+            int: Number of user rows written
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+        default_budget = self.default_budget()
+        rows = [(user_id, default_budget, tokens, requests) for user_id, (tokens, requests) in pending.items()]
+        started = time.monotonic()
+        conn = db_conn if db_conn is not None else (self.connect() if self.connect else None)
+        try:
+            if conn is None:
+                raise RuntimeError("no database connection for the AI usage flush")
+            conn.executemany(
+                """
+                INSERT INTO ai_usage (user_id, token_budget, tokens_used, requests_count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    tokens_used = tokens_used + excluded.tokens_used,
+                    requests_count = requests_count + excluded.requests_count
+                """,
+                rows
+            )
+            conn.commit()
+        except Exception as e:
+            # Put the deltas back; they go out with the next flush
+            with self._lock:
+                self.stats["errors"] += 1
+                for user_id, (tokens, requests) in pending.items():
+                    merged = self._pending.setdefault(user_id, [0, 0])
+                    merged[0] += tokens
+                    merged[1] += requests
+            logger.error(f"Error flushing AI usage: {e}")
+            return 0
+        finally:
+            if db_conn is None and conn is not None:
+                conn.close()
+
+        with self._lock:
+            for user_id, (tokens, _) in pending.items():
+                entry = self._budgets.get(user_id)
+                if entry is None:
+                    continue
+                if entry[2] < started:
+                    entry[1] += tokens
+                else:
+                    # Loaded while the batch was being written; re-read on the next check
+                    entry[2] = float("-inf")
+            self.stats["flushes"] += 1
+            self.stats["rows_flushed"] += len(rows)
+        return len(rows)
+
+    def start(self, socketio=None, connect: Optional[Callable[[], Any]] = None) -> None:
+        """
+        Start the background flush loop.
+
+        Args:
+            socketio: Flask-SocketIO instance (runs as its background task);
+                      falls back to a daemon thread when not provided
+            connect: Returns a database connection for a flush (closed afterwards)
+        """
+        if connect is not None:
+            self.connect = connect
+        if self._running:
+            return
+        self._running = True
+
+        def flush_task():
+            logger.info("AI usage flusher started")
+            while self._running:
+                # Event.wait is green under eventlet's monkey patching
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self.flush()
+
+        if socketio:
+            socketio.start_background_task(flush_task)
+        else:
+            threading.Thread(target=flush_task, name="ai-usage", daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop the background loop and flush anything outstanding."""
+        self._running = False
+        self._wake.set()
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, cached_users=len(self._budgets), pending_users=len(self._pending))
+
+
+# Global limiter and ledger
+_limiter = None
+_ledger: Optional[UsageLedger] = None
+
+
+def get_rate_limiter():
+    """Get the global AI rate limiter (in-memory until configure_rate_limiter is called)."""
+    global _limiter
+    if _limiter is None:
+        _limiter = SlidingWindowLimiter(int(os.environ.get("AI_MAX_REQUESTS_PER_HOUR", "60")))
+    return _limiter
+
+
+def configure_rate_limiter(limit: int, use_redis: bool = False, window: float = DEFAULT_WINDOW):
+    """
+    Replace the global AI rate limiter.
+
+    Args:
+        limit: Requests allowed per window
+        use_redis: Share counts between workers through Redis
+        window: Window length in seconds
+
+    Returns:
+        The new limiter
+    """
+    global _limiter
+    _limiter = (RedisWindowLimiter if use_redis else SlidingWindowLimiter)(limit, window)
+    return _limiter
+
+
+def get_usage_ledger(**kwargs) -> UsageLedger:
+    """
+    Get the global AI usage ledger.
+
+    Args:
+        **kwargs: UsageLedger options (used on first call only)
+
+    Returns:
+        UsageLedger: The shared ledger
+    """
+    global _ledger
+    if _ledger is None:
+        _ledger = UsageLedger(**kwargs)
+    return _ledger
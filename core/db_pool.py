@@ -0,0 +1,276 @@
+"""
+SQLite connection pool.
+
+get_db() used to open a new sqlite3 connection (and run PRAGMA journal_mode=WAL)
+on every call. The pool keeps a bounded set of open connections instead:
+
+- pragmas (WAL, synchronous=NORMAL, cache_size, mmap_size) are applied once,
+  when a connection is created
+- each connection keeps its compiled statement cache, so the hot queries
+  (user lookup, game state load/save, token accounting) are prepared once per
+  connection rather than once per call
+- checkout is bounded: when every connection is in use, callers wait up to
+  checkout_timeout seconds and then get PoolTimeout
+
+The pool only uses threading primitives, which eventlet.monkey_patch() turns
+into green ones, so waiting for a connection yields to other greenlets instead
+of blocking the hub.
+
+Connections are handed out wrapped in PooledConnection, whose close() returns
+the connection to the pool, so existing "conn = get_db() ... conn.close()"
+code keeps working unchanged.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 16
+DEFAULT_CHECKOUT_TIMEOUT = 10.0
+# Compiled statements kept per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+DEFAULT_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", "-16000"),   # 16 MB page cache
+    ("mmap_size", "268435456"),  # 256 MB
+)
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """No connection became free within the checkout timeout."""
+
+
+class PooledConnection:
+    """
+    A checked-out pool connection.
+
+    Behaves like the sqlite3.Connection it wraps; close() hands the connection
+    back to the pool instead of closing it. A connection can be shared by
+    several callers (see retain()); it goes back to the pool when the last of
+    them closes it.
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn: Optional[sqlite3.Connection] = conn
+        self._refs = 1
+
+    @property
+    def closed(self) -> bool:
+        """Whether the connection has been returned to the pool."""
+        return self._conn is None
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        """The underlying sqlite3 connection."""
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a connection returned to the pool.")
+        return self._conn
+
+    def retain(self) -> "PooledConnection":
+        """Add a holder; each holder must call close() once."""
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot retain a connection returned to the pool.")
+        self._refs += 1
+        return self
+
+    def close(self) -> None:
+        """Drop one holder; the last one returns the connection to the pool."""
+        if self._conn is None:
+            return
+        self._refs -= 1
+        if self._refs <= 0:
+            self.release()
+
+    def release(self) -> None:
+        """Return the connection to the pool regardless of remaining holders."""
+        conn, self._conn = self._conn, None
+        self._refs = 0
+        if conn is not None:
+            self._pool._checkin(conn)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
+
+    def __enter__(self) -> "PooledConnection":
+        self.raw.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self.raw.__exit__(exc_type, exc, tb)
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections to one database file."""
+
+    def __init__(self, database: str, size: int = DEFAULT_POOL_SIZE,
+                 checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT,
+                 busy_timeout: float = 10.0, pragmas=DEFAULT_PRAGMAS):
+        """
+        Initialize the pool (connections are opened lazily).
+
+        Args:
+            database: Path to the SQLite database
+            size: Maximum number of open connections
+            checkout_timeout: Seconds to wait for a free connection before PoolTimeout
+            busy_timeout: sqlite3 lock timeout for each connection
+            pragmas: (name, value) pairs applied once per new connection
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.database = database
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.busy_timeout = busy_timeout
+        self.pragmas = tuple(pragmas)
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: List[sqlite3.Connection] = []
+        self._open = 0
+        self._in_use = 0
+        self.stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "wait_seconds": 0.0,
+            "connections_opened": 0,
+            "connections_discarded": 0,
+            "max_in_use": 0,
+        }
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.database,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas:
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Check out a connection.
+
+        Args:
+            timeout: Seconds to wait for a free connection (defaults to checkout_timeout)
+
+        Returns:
+            PooledConnection; close() it to return it to the pool
+
+        Raises:
+            PoolTimeout: If no connection became free in time
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = None
+        with self._cond:
+            while not self._idle and self._open >= self.size:
+                if deadline is None:
+                    deadline = time.monotonic() + timeout
+                    self.stats["waits"] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats["timeouts"] += 1
+                    raise PoolTimeout(f"No database connection free after {timeout:.1f}s "
+                                      f"({self._in_use}/{self.size} in use)")
+                self._cond.wait(remaining)
+            if deadline is not None:
+                self.stats["wait_seconds"] += timeout - max(0.0, deadline - time.monotonic())
+            conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                self._open += 1
+            self._in_use += 1
+            self.stats["checkouts"] += 1
+            self.stats["max_in_use"] = max(self.stats["max_in_use"], self._in_use)
+
+        if conn is None:
+            try:
+                conn = self._open_connection()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+            self.stats["connections_opened"] += 1
+        return PooledConnection(self, conn)
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        """Take a connection back (uncommitted work is rolled back, as close() did)."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            keep = True
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding pooled database connection: {e}")
+            keep = False
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.append(conn)
+            else:
+                self._open -= 1
+                self.stats["connections_discarded"] += 1
+            self._cond.notify()
+        if not keep:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager yielding a pooled connection."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.release()
+
+    def close_all(self) -> None:
+        """Close idle connections (connections in use are closed when returned)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn in idle:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool counters plus current occupancy."""
+        with self._cond:
+            return dict(self.stats, size=self.size, open=self._open,
+                        in_use=self._in_use, idle=len(self._idle))
+
+
+# Global pool instance
+_db_pool: Optional[ConnectionPool] = None
+
+
+def get_db_pool(database: Optional[str] = None, **kwargs) -> ConnectionPool:
+    """
+    Get global connection pool.
+
+    Args:
+        database: Database path (required on first call)
+        **kwargs: ConnectionPool options used on first call
+
+    Returns:
+        ConnectionPool instance
+    """
+    global _db_pool
+    if _db_pool is None:
+        if database is None:
+            raise ValueError("get_db_pool() needs a database path on first use")
+        _db_pool = ConnectionPool(database, **kwargs)
+    return _db_pool
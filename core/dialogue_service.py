@@ -0,0 +1,216 @@
+"""
+Non-blocking NPC dialogue service.
+
+AI dialogue used to run inside the command handler: a 'talk' or 'say' near an
+AI NPC held the request (and its eventlet greenlet) for the whole model round
+trip. The service runs those completions in the background instead:
+
+- the command queues the work and returns straight away; the reply reaches
+  the room later through the deliver hook (the room_message SocketIO channel)
+- at most max_concurrency completions run at once; the rest wait their turn
+- every job has a deadline; a job that can't finish in time resolves to its
+  fallback (the placeholder reply) instead
+- jobs with the same key (identical prompts) that are already in flight are
+  coalesced: the completion runs once and every caller gets its result
+
+Like the connection pool, the service only uses threading primitives, so
+under eventlet.monkey_patch() the workers are green and waiting is cheap.
+When the service isn't started (scripts, tests) callers keep the old
+synchronous path.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 8.0
+
+
+class _DialogueJob:
+    """One in-flight completion and the callers waiting on it."""
+
+    __slots__ = ("key", "work", "fallback", "deadline", "callbacks")
+
+    def __init__(self, key: Hashable, work: Callable[[float], Any], fallback: Callable[[], Any],
+                 deadline: float, callback: Callable[[Any], None]):
+        self.key = key
+        self.work = work
+        self.fallback = fallback
+        self.deadline = deadline
+        self.callbacks: List[Callable[[Any], None]] = [callback]
+
+
+class DialogueService:
+    """Runs AI completions in the background with a concurrency cap, deadlines and coalescing."""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Initialize the service.
+
+        Args:
+            max_concurrency: Completions allowed to run at the same time
+            timeout: Seconds from submit() until a job falls back
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self.connect: Optional[Callable[[], Any]] = None
+        self._deliver: Optional[Callable[[str, str], None]] = None
+        self._spawn: Optional[Callable[..., Any]] = None
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._in_flight: Dict[Hashable, _DialogueJob] = {}
+        self._stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "completed": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "max_in_flight": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._spawn is not None
+
+    def start(self, socketio=None, connect: Optional[Callable[[], Any]] = None,
+              deliver: Optional[Callable[[str, str], None]] = None) -> None:
+        """
+        Start accepting background work.
+
+        Args:
+            socketio: Flask-SocketIO instance (jobs run as its background tasks);
+                      falls back to daemon threads when not provided
+            connect: Returns a database connection for a job (closed when the job ends)
+            deliver: deliver(room_id, text) sends a finished reply to a room
+        """
+        self.connect = connect
+        self._deliver = deliver
+        if socketio is not None:
+            self._spawn = socketio.start_background_task
+        else:
+            self._spawn = lambda fn: threading.Thread(target=fn, name="dialogue", daemon=True).start()
+        logger.info(f"Dialogue service started (max {self.max_concurrency} concurrent, {self.timeout}s timeout)")
+
+    def stop(self) -> None:
+        """Stop accepting background work (callers go back to the synchronous path)."""
+        self._spawn = None
+
+    def deliver(self, room_id: str, text: str) -> None:
+        """Send a finished reply to everyone in a room (no-op without a deliver hook)."""
+        if self._deliver is None:
+            logger.info(f"[DIALOGUE] Room {room_id}: {text}")
+            return
+        try:
+            self._deliver(room_id, text)
+        except Exception as e:
+            logger.error(f"Error delivering dialogue to room {room_id}: {e}", exc_info=True)
+
+    def submit(self, key: Hashable, work: Callable[[float], Any], fallback: Callable[[], Any],
+               callback: Callable[[Any], None]) -> bool:
+        """
+        Queue a completion.
+
+        Args:
+            key: Identifies the prompt; jobs with an in-flight key are coalesced
+            work: work(timeout) runs the completion and returns its result
+            fallback: Returns the result to use when work fails or runs out of time
+            callback: Called with the result once it is known
+
+        Returns:
+            bool: True if the job joined an identical in-flight job
+        """
+        with self._lock:
+            self._stats["submitted"] += 1
+            job = self._in_flight.get(key)
+            if job is not None:
+                job.callbacks.append(callback)
+                self._stats["coalesced"] += 1
+                return True
+            job = self._in_flight[key] = _DialogueJob(key, work, fallback, time.monotonic() + self.timeout, callback)
+            self._stats["max_in_flight"] = max(self._stats["max_in_flight"], len(self._in_flight))
+        spawn = self._spawn or (lambda fn: fn())
+        spawn(lambda: self._run(job))
+        return False
+
+    def _run(self, job: _DialogueJob) -> None:
+        result = None
+        resolved = False
+        failed = False
+        if self._slots.acquire(timeout=max(0.0, job.deadline - time.monotonic())):
+            try:
+                remaining = job.deadline - time.monotonic()
+                if remaining > 0:
+                    result = job.work(remaining)
+                    resolved = True
+            except Exception as e:
+                failed = True
+                self._count("errors")
+                logger.error(f"Dialogue job failed: {e}", exc_info=True)
+            finally:
+                self._slots.release()
+        if resolved and time.monotonic() > job.deadline:
+            resolved = False
+        if not resolved:
+            if not failed:
+                # No slot in time, or the deadline passed before or during the work
+                self._count("timeouts")
+            result = job.fallback()
+
+        with self._lock:
+            self._in_flight.pop(job.key, None)
+            callbacks = job.callbacks
+            self._stats["completed"] += 1
+            self._idle.notify_all()
+        for callback in callbacks:
+            try:
+                callback(result)
+            except Exception as e:
+                logger.error(f"Error in dialogue callback: {e}", exc_info=True)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no jobs are in flight.
+
+        Returns:
+            bool: True if the service went idle within the timeout
+        """
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._in_flight, timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return job counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._in_flight)
+        stats["running"] = self.running
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
+
+
+# Global dialogue service
+_service: Optional[DialogueService] = None
+
+
+def get_dialogue_service(**kwargs) -> DialogueService:
+    """
+    Get the global dialogue service.
+
+    Args:
+        **kwargs: DialogueService options (used on first call only)
+
+    Returns:
+        DialogueService: The shared service
+    """
+    global _service
+    if _service is None:
+        _service = DialogueService(**kwargs)
+    return _service
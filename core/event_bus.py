@@ -5,28 +5,77 @@ Provides pub/sub system for:
 - Room broadcasts (NPC actions, ambiance, player messages)
 - Player-specific events (quest updates, private messages)
 - Global events (world time changes, weather updates)
+
+Events are published in the compact binary envelope from core.event_codec
+(EVENT_ENCODING=json for readable payloads). Inside an event batch (one per
+request and per world tick) events are queued and each channel gets a single
+publish carrying all of its events. Droppable events (state_update
+notifications, which the next one supersedes) are skipped for a short while
+on channels that had no subscribers on the last publish; every other event
+is always published, so a subscriber on another worker never misses one.
+
+Subscribers in this process (subscribe(), WebSocketManager on the local
+backend) are served by core.local_broker without a Redis hop. With
+EVENT_BUS_BACKEND=local, or when Redis is unavailable, the bus runs on the
+in-process broker alone (a single node without Redis).
 """
 
-import json
+import os
+import time
 import logging
+import threading
+from contextlib import contextmanager
 from typing import Dict, Any, Optional, Callable, List
-from datetime import datetime
 from core.redis_manager import get_pubsub_connection, get_cache_connection
+from core.event_codec import Event, encode_events, json_debug_enabled
+from core.local_broker import DEFAULT_QUEUE_SIZE, DROP_OLDEST, LocalBroker, Subscription, get_local_broker
 
 logger = logging.getLogger(__name__)
 
+# Seconds droppable events skip a channel that had no subscribers
+IDLE_CHANNEL_TTL = float(os.environ.get("EVENT_IDLE_CHANNEL_TTL", "2.0"))
+
+# Events that may be skipped on idle channels: "system_message" events with these
+# message types only tell the client to refetch state, and the next one supersedes them
+DROPPABLE_MESSAGE_TYPES = frozenset({"state_update"})
+
+# "redis", "local" (in-process only), or "auto" (Redis when available, otherwise local)
+EVENT_BUS_BACKEND = os.environ.get("EVENT_BUS_BACKEND", "auto").lower()
+
 
 class EventBus:
     """
     Event bus for publishing and subscribing to game events.
     
-    Uses Redis pub/sub for cross-instance event distribution.
+    Uses Redis pub/sub for cross-instance event distribution and the
+    in-process broker for subscribers in this process.
     """
     
-    def __init__(self):
-        self._redis = get_pubsub_connection()
-        self._cache = get_cache_connection()
-        self._subscriptions: Dict[str, List[Callable]] = {}
+    def __init__(self, idle_channel_ttl: float = IDLE_CHANNEL_TTL,
+                 backend: str = EVENT_BUS_BACKEND,
+                 local: Optional[LocalBroker] = None):
+        """
+        Initialize the event bus.
+        
+        Args:
+            idle_channel_ttl: Seconds droppable events skip a channel after a publish reached no subscribers
+            backend: "redis", "local" or "auto" (Redis when available)
+            local: In-process broker (defaults to the process-wide one)
+        """
+        self._redis = None if backend == "local" else get_pubsub_connection()
+        self._cache = None if backend == "local" else get_cache_connection()
+        if self._redis is None and backend == "redis":
+            logger.warning("Redis unavailable, event bus running on the in-process broker")
+        self.local = local or get_local_broker()
+        self.debug_json = json_debug_enabled()
+        self.idle_channel_ttl = idle_channel_ttl
+        self._idle_until: Dict[str, float] = {}  # channel -> skip publishes until (epoch seconds)
+        self.stats = {"events": 0, "publishes": 0, "skipped": 0, "bytes": 0, "batches": 0}
+    
+    @property
+    def backend(self) -> str:
+        """"redis", or "local" when events stay in this process."""
+        return "redis" if self._redis is not None else "local"
         
     def publish(self, event_type: str, data: Dict[str, Any], 
                 room_id: Optional[str] = None, 
@@ -43,46 +92,95 @@ class EventBus:
             channel: Custom channel name (overrides room_id/username)
             
         Returns:
-            True if published successfully
+            True if published successfully (or queued in the open event batch,
+            or a droppable event skipped because the channel has no subscribers)
         """
+        # Determine the channel to publish to
+        if channel:
+            chan = channel
+        elif room_id:
+            chan = f"room:{room_id}"
+        elif username:
+            chan = f"user:{username}"
+        else:
+            # Global event
+            chan = "global"
+        
+        now = time.time()
+        if self.local.has_subscribers(chan):
+            # Subscribers in this process get it right away, without the Redis round trip
+            self.local.publish(chan, {"type": event_type, "data": data, "timestamp": now})
         if self._redis is None:
-            # Redis unavailable, skip publishing
-            # TODO: Implement local fallback if needed, but for now just silence errors
-            # logger.debug(f"Redis unavailable, skipping event publish: {event_type}")
-            return False
-            
-        event = {
-            "type": event_type,
-            "data": data,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+            return True
         
-        try:
-            event_json = json.dumps(event)
+        if self._idle_until.get(chan, 0.0) > now and is_droppable(event_type, data):
+            # Nobody was listening a moment ago (e.g. state updates for players without a socket)
+            self.stats["skipped"] += 1
+            return True
+        
+        event = (event_type, data, now)
+        batch = get_active_event_batch()
+        if batch is not None:
+            batch.setdefault(self, {}).setdefault(chan, []).append(event)
+            return True
+        return self._publish_now({chan: [event]})
+    
+    def _publish_now(self, events_by_channel: Dict[str, List[Event]]) -> bool:
+        """
+        Publish queued events: one message per channel, one round trip in all.
+        
+        Args:
+            events_by_channel: channel -> events, in order
             
-            # Determine channels to publish to
-            channels = []
-            if channel:
-                channels.append(channel)
-            elif room_id:
-                channels.append(f"room:{room_id}")
-            elif username:
-                channels.append(f"user:{username}")
+        Returns:
+            True if published successfully
+        """
+        if not events_by_channel:
+            return True
+        try:
+            payloads = {chan: encode_events(events, debug_json=self.debug_json)
+                        for chan, events in events_by_channel.items()}
+            if len(payloads) == 1:
+                (chan, payload), = payloads.items()
+                receivers = [self._redis.publish(chan, payload)]
             else:
-                # Global event
-                channels.append("global")
-            
-            # Publish to all relevant channels
-            for chan in channels:
-                self._redis.publish(chan, event_json)
-                logger.debug(f"Published event {event_type} to {chan}")
+                pipe = self._redis.pipeline(transaction=False)
+                for chan, payload in payloads.items():
+                    pipe.publish(chan, payload)
+                receivers = pipe.execute()
             
+            idle_until = time.time() + self.idle_channel_ttl
+            for (chan, payload), count in zip(payloads.items(), receivers):
+                if count:
+                    self._idle_until.pop(chan, None)
+                else:
+                    self._idle_until[chan] = idle_until
+                self.stats["events"] += len(events_by_channel[chan])
+                self.stats["publishes"] += 1
+                self.stats["bytes"] += len(payload)
+                logger.debug(f"Published {len(events_by_channel[chan])} event(s) to {chan} ({count} subscribers)")
             return True
             
         except Exception as e:
-            logger.error(f"Error publishing event {event_type}: {e}")
+            logger.error(f"Error publishing events to {list(events_by_channel)}: {e}")
             return False
     
+    def channel_subscribed(self, channel: str) -> None:
+        """
+        Note that this process just subscribed to a channel, so droppable events go to it again right away.
+        
+        Subscribers in other processes get every other event at once, and
+        droppable ones once the idle TTL expires.
+        """
+        self._idle_until.pop(channel, None)
+    
+    def flush_batch(self, batch: Dict[str, List[Event]]) -> bool:
+        """Publish a closed event batch."""
+        if not batch:
+            return True
+        self.stats["batches"] += 1
+        return self._publish_now(batch)
+    
     def publish_room(self, room_id: str, event_type: str, data: Dict[str, Any]) -> bool:
         """Publish event to all players in a room."""
         return self.publish(event_type, data, room_id=room_id)
@@ -95,20 +193,26 @@ class EventBus:
         """Publish global event."""
         return self.publish(event_type, data)
     
-    def subscribe(self, channel: str, callback: Callable[[Dict[str, Any]], None]) -> None:
+    def subscribe(self, channel: str, callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  maxsize: int = DEFAULT_QUEUE_SIZE, policy: str = DROP_OLDEST) -> Subscription:
         """
-        Subscribe to a channel (local callback only - for in-process subscriptions).
+        Subscribe to events in this process.
         
-        Note: For cross-instance subscriptions, use Redis pub/sub directly.
-        This is mainly for local event handling.
+        Receives everything this process publishes to matching channels (and
+        emit_local() events). Events from other instances arrive over Redis
+        (see core.pubsub_multiplexer).
         
         Args:
-            channel: Channel name (e.g., "room:town_square", "user:player1")
-            callback: Function to call with event data
+            channel: Channel name or pattern (e.g., "room:town_square", "user:*")
+            callback: Function to call with event data; without one, events are
+                      queued on the returned subscription
+            maxsize: Queue capacity (queued subscriptions)
+            policy: What a full queue does: drop_oldest, drop_newest or block
+            
+        Returns:
+            Subscription (call close() to unsubscribe)
         """
-        if channel not in self._subscriptions:
-            self._subscriptions[channel] = []
-        self._subscriptions[channel].append(callback)
+        return self.local.subscribe(channel, callback, maxsize=maxsize, policy=policy)
     
     def emit_local(self, channel: str, event: Dict[str, Any]) -> None:
         """
@@ -118,12 +222,12 @@ class EventBus:
             channel: Channel name
             event: Event data
         """
-        if channel in self._subscriptions:
-            for callback in self._subscriptions[channel]:
-                try:
-                    callback(event)
-                except Exception as e:
-                    logger.error(f"Error in event callback for {channel}: {e}")
+        self.local.publish(channel, event)
+
+
+def is_droppable(event_type: str, data: Dict[str, Any]) -> bool:
+    """Return True if an event may be skipped on a channel that had no subscribers."""
+    return event_type == "system_message" and data.get("message_type") in DROPPABLE_MESSAGE_TYPES
 
 
 # Global event bus instance
@@ -138,6 +242,56 @@ def get_event_bus() -> EventBus:
     return _event_bus
 
 
+_event_batch_local = threading.local()
+
+
+def get_active_event_batch() -> Optional[Dict[EventBus, Dict[str, List[Event]]]]:
+    """Get the event batch (bus -> channel -> queued events) open on this thread/greenlet, if any."""
+    return getattr(_event_batch_local, "batch", None)
+
+
+def begin_event_batch() -> Dict[EventBus, Dict[str, List[Event]]]:
+    """
+    Open an event batch for this thread/greenlet (e.g. at the start of a request or tick).
+    
+    Events published until end_event_batch() go out as one message per channel.
+    If a batch is already open it is returned instead.
+    """
+    batch = get_active_event_batch()
+    if batch is None:
+        batch = _event_batch_local.batch = {}
+    return batch
+
+
+def end_event_batch() -> bool:
+    """Close the batch opened by begin_event_batch() and publish its events."""
+    batch = get_active_event_batch()
+    if batch is None:
+        return True
+    _event_batch_local.batch = None
+    ok = True
+    for bus, events_by_channel in batch.items():
+        ok = bus.flush_batch(events_by_channel) and ok
+    return ok
+
+
+@contextmanager
+def event_batch():
+    """
+    Context manager that batches every event published inside it.
+    
+    Nested uses join the outer batch.
+    """
+    if get_active_event_batch() is not None:
+        yield
+        return
+    begin_event_batch()
+    try:
+        yield
+    finally:
+        end_event_batch()
+
+
 # Event type constants
 class EventTypes:
     """Event type constants."""
@@ -0,0 +1,121 @@
+"""
+Compact, versioned envelope for events published over Redis.
+
+A published payload carries one or more events (everything published to a
+channel in one tick or request is sent as one message):
+
+    header:  magic (0xEB), version (1), event count      struct ">BBH"
+    event:   type code, timestamp (epoch float), length   struct ">HdI"
+             payload: the event data as compact JSON
+
+Event types have fixed integer codes (EVENT_CODES, append-only); a type
+without a code is sent as code 0 with the name inside its payload. Set
+EVENT_ENCODING=json to publish readable JSON instead (debugging with
+redis-cli MONITOR); decode_events() accepts both, as well as the older
+single-event JSON dicts.
+"""
+
+import os
+import json
+import struct
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+ENVELOPE_MAGIC = 0xEB
+ENVELOPE_VERSION = 1
+
+_HEADER = struct.Struct(">BBH")
+_EVENT = struct.Struct(">HdI")
+
+# Event type -> wire code. Append only: codes must stay stable across deploys.
+EVENT_CODES: Dict[str, int] = {
+    "player_move": 1,
+    "player_message": 2,
+    "player_emote": 3,
+    "player_command": 4,
+    "player_command_response": 5,
+    "npc_action": 6,
+    "npc_message": 7,
+    "npc_move": 8,
+    "ambiance": 9,
+    "weather_change": 10,
+    "quest_update": 11,
+    "quest_offer": 12,
+    "quest_complete": 13,
+    "world_time_update": 14,
+    "system_message": 15,
+}
+EVENT_NAMES: Dict[int, str] = {code: name for name, code in EVENT_CODES.items()}
+
+# (event_type, data, timestamp)
+Event = Tuple[str, Dict[str, Any], float]
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def encode_events(events: Iterable[Event], debug_json: bool = False) -> Union[bytes, str]:
+    """
+    Encode events into one publishable payload.
+
+    Args:
+        events: (event_type, data, timestamp) tuples, in order
+        debug_json: Produce a JSON list of {"type", "data", "timestamp"} instead
+
+    Returns:
+        bytes (binary envelope) or str (JSON debug mode)
+    """
+    events = list(events)
+    if debug_json:
+        return json.dumps([{"type": event_type, "data": data, "timestamp": timestamp}
+                           for event_type, data, timestamp in events])
+    parts = [_HEADER.pack(ENVELOPE_MAGIC, ENVELOPE_VERSION, len(events))]
+    for event_type, data, timestamp in events:
+        code = EVENT_CODES.get(event_type, 0)
+        payload = _dumps(data) if code else _dumps([event_type, data])
+        parts.append(_EVENT.pack(code, timestamp, len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def decode_events(payload: Union[bytes, str]) -> List[Dict[str, Any]]:
+    """
+    Decode a published payload (binary envelope or JSON).
+
+    Args:
+        payload: Message data as received from Redis
+
+    Returns:
+        list: Event dicts {"type", "data", "timestamp"}, in publish order
+
+    Raises:
+        ValueError: Unknown envelope version or a truncated payload
+    """
+    if isinstance(payload, bytes) and payload[:1] == bytes((ENVELOPE_MAGIC,)):
+        magic, version, count = _HEADER.unpack_from(payload, 0)
+        if version != ENVELOPE_VERSION:
+            raise ValueError(f"Unsupported event envelope version {version}")
+        offset = _HEADER.size
+        events = []
+        for _ in range(count):
+            code, timestamp, length = _EVENT.unpack_from(payload, offset)
+            offset += _EVENT.size
+            body = payload[offset:offset + length]
+            if len(body) != length:
+                raise ValueError("Truncated event envelope")
+            offset += length
+            data = json.loads(body)
+            if code:
+                event_type = EVENT_NAMES.get(code, f"unknown_{code}")
+            else:
+                event_type, data = data
+            events.append({"type": event_type, "data": data, "timestamp": timestamp})
+        return events
+
+    decoded = json.loads(payload)
+    return decoded if isinstance(decoded, list) else [decoded]
+
+
+def json_debug_enabled() -> bool:
+    """True when EVENT_ENCODING=json (readable payloads for debugging)."""
+    return os.environ.get("EVENT_ENCODING", "binary").lower() == "json"
@@ -0,0 +1,230 @@
+"""
+Room event scheduler for the background event generator.
+
+Keeps the next-due time of every background room event (NPC idle actions,
+ambiance, weather ambiance, NPC weather reactions) in a heap, so a generator
+cycle only touches events that are actually due instead of every room in WORLD.
+
+Rooms are scheduled only while they have listeners. Timers live in memory and
+are handed to a save callback in batches by flush(); a room that gains
+listeners again picks its timers back up through the load callback.
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Event kinds
+NPC_ACTION = "npc_action"
+AMBIANCE = "ambiance"
+WEATHER_AMBIANCE = "weather_ambiance"
+NPC_WEATHER_REACTION = "npc_weather_reaction"
+
+INDOOR_EVENTS = (NPC_ACTION, AMBIANCE)
+OUTDOOR_EVENTS = (NPC_ACTION, AMBIANCE, WEATHER_AMBIANCE, NPC_WEATHER_REACTION)
+
+# Default (min, max) seconds between events of each kind
+DEFAULT_INTERVALS = {
+    NPC_ACTION: (30.0, 60.0),
+    AMBIANCE: (120.0, 240.0),
+    WEATHER_AMBIANCE: (120.0, 240.0),
+    NPC_WEATHER_REACTION: (30.0, 60.0),
+}
+
+
+class RoomEventScheduler:
+    """Heap of (due_time, room_id, kind) for rooms that currently have listeners."""
+
+    def __init__(self, load_fn: Optional[Callable[[List[str]], Dict[str, Dict[str, float]]]] = None,
+                 save_fn: Optional[Callable[[Dict[str, Dict[str, float]]], None]] = None,
+                 flush_interval: float = 30.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            load_fn: Optional callback([room_id, ...]) -> {room_id: {kind: due_time}} for saved timers
+            save_fn: Optional callback({room_id: {kind: due_time}}) to persist a batch of timers
+            flush_interval: Minimum seconds between timer batches passed to save_fn
+        """
+        self.load_fn = load_fn
+        self.save_fn = save_fn
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._seq = itertools.count()
+        # room_id -> {kind: due_time}; the heap entry matching this is the live one
+        self._timers: Dict[str, Dict[str, float]] = {}
+        # Timers of rooms that lost their listeners (restored if listeners return)
+        self._parked: Dict[str, Dict[str, float]] = {}
+        self._dirty = set()
+        self._last_flush = 0.0
+        self.stats = {"fired": 0, "activated": 0, "deactivated": 0, "flushes": 0}
+
+    @property
+    def active_rooms(self) -> List[str]:
+        """Room ids currently scheduled."""
+        return list(self._timers.keys())
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def _initial_due(self, kind: str, intervals: Dict[str, Tuple[float, float]], now: float) -> float:
+        low, high = intervals.get(kind, DEFAULT_INTERVALS[kind])
+        if kind == WEATHER_AMBIANCE:
+            # First weather message as soon as someone is outside
+            return now
+        if kind == NPC_WEATHER_REACTION:
+            # First reaction shortly after arrival
+            return now + max(0.0, random.uniform(low, high) - 45.0)
+        return now + random.uniform(low, high)
+
+    def _push(self, room_id: str, kind: str, due: float) -> None:
+        self._timers[room_id][kind] = due
+        heapq.heappush(self._heap, (due, next(self._seq), room_id, kind))
+        self._dirty.add(room_id)
+
+    def set_listened_rooms(self, room_ids: Iterable[str], is_outdoor_fn: Callable[[str], bool],
+                           intervals: Optional[Dict[str, Tuple[float, float]]] = None,
+                           now: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Schedule rooms that gained listeners and drop rooms that lost them.
+
+        Args:
+            room_ids: Rooms that currently have listeners
+            is_outdoor_fn: callback(room_id) -> bool; outdoor rooms also get weather events
+            intervals: {kind: (min_seconds, max_seconds)} (defaults to DEFAULT_INTERVALS)
+            now: Current time (defaults to time.time())
+
+        Returns:
+            tuple: (rooms added, rooms removed)
+        """
+        intervals = intervals or DEFAULT_INTERVALS
+        now = time.time() if now is None else now
+        wanted = set(room_ids)
+        with self._lock:
+            added = [room_id for room_id in wanted if room_id not in self._timers]
+            removed = [room_id for room_id in self._timers if room_id not in wanted]
+
+            for room_id in removed:
+                self._parked[room_id] = self._timers.pop(room_id)
+                self._dirty.add(room_id)
+
+            # Saved timers for rooms not parked in memory, fetched in one batch
+            loaded = {}
+            to_load = [room_id for room_id in added if room_id not in self._parked]
+            if to_load and self.load_fn:
+                try:
+                    loaded = self.load_fn(to_load) or {}
+                except Exception as e:
+                    logger.debug(f"Could not load event timers for {len(to_load)} rooms: {e}")
+
+            for room_id in added:
+                saved = self._parked.pop(room_id, None)
+                if saved is None:
+                    saved = loaded.get(room_id)
+                saved = saved if isinstance(saved, dict) else {}
+                kinds = OUTDOOR_EVENTS if is_outdoor_fn(room_id) else INDOOR_EVENTS
+                self._timers[room_id] = {}
+                for kind in kinds:
+                    due = saved.get(kind)
+                    if not isinstance(due, (int, float)):
+                        due = self._initial_due(kind, intervals, now)
+                    self._push(room_id, kind, float(due))
+
+            self.stats["activated"] += len(added)
+            self.stats["deactivated"] += len(removed)
+            if removed and len(self._heap) > 2 * sum(len(t) for t in self._timers.values()) + 64:
+                self._compact()
+        return len(added), len(removed)
+
+    def _compact(self) -> None:
+        """Drop heap entries of unscheduled rooms (lazily invalidated entries)."""
+        self._heap = [entry for entry in self._heap
+                      if self._timers.get(entry[2], {}).get(entry[3]) == entry[0]]
+        heapq.heapify(self._heap)
+
+    def pop_due(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """
+        Remove and return every event that is due.
+
+        Each returned event is unscheduled until reschedule() is called for it.
+
+        Returns:
+            list: (room_id, kind) tuples in due order
+        """
+        now = time.time() if now is None else now
+        due_events = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due, _, room_id, kind = heapq.heappop(self._heap)
+                timers = self._timers.get(room_id)
+                if timers is None or timers.get(kind) != due:
+                    continue  # Stale entry (room dropped or event rescheduled)
+                del timers[kind]
+                due_events.append((room_id, kind))
+            self.stats["fired"] += len(due_events)
+        return due_events
+
+    def reschedule(self, room_id: str, kind: str,
+                   intervals: Optional[Dict[str, Tuple[float, float]]] = None,
+                   now: Optional[float] = None) -> None:
+        """Schedule the next occurrence of an event (no-op if the room lost its listeners)."""
+        intervals = intervals or DEFAULT_INTERVALS
+        now = time.time() if now is None else now
+        low, high = intervals.get(kind, DEFAULT_INTERVALS[kind])
+        with self._lock:
+            if room_id in self._timers:
+                self._push(room_id, kind, now + random.uniform(low, high))
+
+    def next_due(self, room_id: str, kind: str) -> Optional[float]:
+        """Get when an event is next due, or None if it isn't scheduled."""
+        return self._timers.get(room_id, {}).get(kind)
+
+    def flush(self, force: bool = False, now: Optional[float] = None) -> int:
+        """
+        Hand changed timers to save_fn as one batch.
+
+        Args:
+            force: Flush even if flush_interval hasn't elapsed
+            now: Current time (defaults to time.time())
+
+        Returns:
+            int: Number of rooms in the batch
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if not self._dirty or (not force and now - self._last_flush < self.flush_interval):
+                return 0
+            batch = {}
+            for room_id in self._dirty:
+                timers = self._timers.get(room_id)
+                if timers is None:
+                    timers = self._parked.get(room_id, {})
+                batch[room_id] = dict(timers)
+            self._dirty = set()
+            self._last_flush = now
+            self.stats["flushes"] += 1
+        if self.save_fn:
+            try:
+                self.save_fn(batch)
+            except Exception as e:
+                logger.warning(f"Could not persist room event timers: {e}")
+        return len(batch)
+
+    def clear(self) -> None:
+        """Forget every scheduled room and timer."""
+        with self._lock:
+            self._heap = []
+            self._timers = {}
+            self._parked = {}
+            self._dirty = set()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get scheduler counters."""
+        return dict(self.stats, active_rooms=len(self._timers), heap_size=len(self._heap))
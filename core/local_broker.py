@@ -0,0 +1,305 @@
+"""
+In-process event broker.
+
+Backs EventBus when Redis is unavailable (or EVENT_BUS_BACKEND=local), and
+delivers events to subscribers in the same process without a Redis hop.
+
+- channels are matched exactly ("room:tavern") or by wildcard pattern
+  ("room:*", "user:*", "*"); the subscriber list for a channel is cached
+  until subscriptions change, so a publish does no pattern matching
+- a subscription either has a callback (called on publish) or a bounded
+  queue its consumer drains at its own pace
+- a full queue applies the subscription's policy: drop the oldest event,
+  drop the new one, or block the publisher (backpressure) for up to
+  block_timeout before dropping
+"""
+
+import re
+import fnmatch
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Full-queue policies
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+
+DEFAULT_QUEUE_SIZE = 1000
+
+
+def _is_pattern(channel: str) -> bool:
+    return any(char in channel for char in "*?[")
+
+
+class Subscription:
+    """One subscriber: a callback, or a bounded queue of events."""
+
+    def __init__(self, broker: "LocalBroker", pattern: str,
+                 callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 maxsize: int = DEFAULT_QUEUE_SIZE, policy: str = DROP_OLDEST,
+                 block_timeout: float = 1.0):
+        """
+        Initialize a subscription (use LocalBroker.subscribe).
+
+        Args:
+            broker: Owning broker
+            pattern: Channel name or wildcard pattern
+            callback: Called with each event (no queue when given)
+            maxsize: Queue capacity
+            policy: DROP_OLDEST, DROP_NEWEST or BLOCK when the queue is full
+            block_timeout: Longest a BLOCK publisher waits for room (seconds)
+        """
+        if policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.broker = broker
+        self.pattern = pattern
+        self.callback = callback
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._queue: deque = deque()
+        self._changed = threading.Condition()
+        self.delivered = 0
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """
+        Deliver an event to this subscriber.
+
+        Returns:
+            True if delivered (called back or queued), False if dropped
+        """
+        if self.callback is not None:
+            try:
+                self.callback(event)
+            except Exception as e:
+                logger.error(f"Error in event callback for {self.pattern}: {e}")
+                return False
+            self.delivered += 1
+            return True
+
+        with self._changed:
+            if len(self._queue) >= self.maxsize:
+                if self.policy == DROP_OLDEST:
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif self.policy == DROP_NEWEST or not self._changed.wait_for(
+                        lambda: len(self._queue) < self.maxsize, self.block_timeout):
+                    self.dropped += 1
+                    return False
+            self._queue.append(event)
+            self.delivered += 1
+            self._changed.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Take the next queued event.
+
+        Args:
+            timeout: Seconds to wait for one (None waits forever, 0 does not wait)
+
+        Returns:
+            The event, or None if none arrived in time
+        """
+        with self._changed:
+            if not self._changed.wait_for(lambda: self._queue, timeout):
+                return None
+            event = self._queue.popleft()
+            self._changed.notify_all()  # Room for a blocked publisher
+            return event
+
+    def drain(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Take every queued event (or at most `limit`) without waiting."""
+        with self._changed:
+            count = len(self._queue) if limit is None else min(limit, len(self._queue))
+            events = [self._queue.popleft() for _ in range(count)]
+            if events:
+                self._changed.notify_all()
+            return events
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def close(self) -> None:
+        """Unsubscribe."""
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Channel -> subscribers fan-out within one process."""
+
+    def __init__(self):
+        """Initialize an empty broker."""
+        self._exact: Dict[str, List[Subscription]] = {}
+        self._patterns: List[Tuple[Any, Subscription]] = []  # (compiled pattern, subscription)
+        self._matches: Dict[str, Tuple[Subscription, ...]] = {}  # channel -> subscribers (cache)
+        self._lock = threading.Lock()
+        self.stats = {"published": 0, "delivered": 0, "dropped": 0, "unrouted": 0}
+
+    def subscribe(self, pattern: str, callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  maxsize: int = DEFAULT_QUEUE_SIZE, policy: str = DROP_OLDEST,
+                  block_timeout: float = 1.0) -> Subscription:
+        """
+        Subscribe to a channel or wildcard pattern.
+
+        Args:
+            pattern: Channel ("room:tavern") or pattern ("room:*", "*")
+            callback: Called with each event; without one, events are queued
+            maxsize: Queue capacity (queued subscriptions)
+            policy: DROP_OLDEST, DROP_NEWEST or BLOCK when the queue is full
+            block_timeout: Longest a BLOCK publisher waits for room (seconds)
+
+        Returns:
+            Subscription (call close() to unsubscribe)
+        """
+        subscription = Subscription(self, pattern, callback, maxsize, policy, block_timeout)
+        with self._lock:
+            if _is_pattern(pattern):
+                self._patterns.append((re.compile(fnmatch.translate(pattern)), subscription))
+            else:
+                self._exact.setdefault(pattern, []).append(subscription)
+            self._matches = {}
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription (no-op if already removed)."""
+        with self._lock:
+            subscribers = self._exact.get(subscription.pattern)
+            if subscribers and subscription in subscribers:
+                subscribers.remove(subscription)
+                if not subscribers:
+                    del self._exact[subscription.pattern]
+            self._patterns = [(regex, sub) for regex, sub in self._patterns if sub is not subscription]
+            self._matches = {}
+
+    def subscribers(self, channel: str) -> Tuple[Subscription, ...]:
+        """Subscriptions that receive events published to a channel."""
+        matches = self._matches.get(channel)
+        if matches is None:
+            with self._lock:
+                found = list(self._exact.get(channel, ()))
+                found.extend(sub for regex, sub in self._patterns if regex.match(channel))
+                matches = self._matches[channel] = tuple(found)
+        return matches
+
+    def has_subscribers(self, channel: str) -> bool:
+        """True if anything in this process listens on a channel."""
+        return bool(self.subscribers(channel))
+
+    def publish(self, channel: str, event: Dict[str, Any]) -> int:
+        """
+        Deliver an event to every matching subscriber.
+
+        Args:
+            channel: Channel name (no wildcards)
+            event: Event dict ({"type", "data", "timestamp"})
+
+        Returns:
+            int: Number of subscribers that received it
+        """
+        self.stats["published"] += 1
+        subscribers = self.subscribers(channel)
+        if not subscribers:
+            self.stats["unrouted"] += 1
+            return 0
+        delivered = 0
+        for subscription in subscribers:
+            if subscription.offer(event):
+                delivered += 1
+            else:
+                self.stats["dropped"] += 1
+        self.stats["delivered"] += delivered
+        return delivered
+
+
+class LocalSubscriber:
+    """
+    Ref-counted channel subscriptions on a LocalBroker for WebSocketManager.
+
+    Same interface as PubSubMultiplexer, for the local event bus backend.
+    """
+
+    def __init__(self, broker: LocalBroker, handler: Optional[Callable[[str, Any], None]] = None):
+        """
+        Initialize the subscriber.
+
+        Args:
+            broker: Broker to subscribe on
+            handler: Called as handler(channel, event) for each event
+        """
+        self.broker = broker
+        self.handler = handler
+        self._subscriptions: Dict[str, Tuple[Subscription, int]] = {}
+        self._lock = threading.Lock()
+        self._running = False
+
+    @property
+    def channels(self) -> List[str]:
+        return list(self._subscriptions)
+
+    @property
+    def connected(self) -> bool:
+        return True
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def refcount(self, channel: str) -> int:
+        entry = self._subscriptions.get(channel)
+        return entry[1] if entry else 0
+
+    def _deliver(self, channel: str, event: Dict[str, Any]) -> None:
+        if self.handler is not None:
+            self.handler(channel, event)
+
+    def acquire(self, channel: str) -> bool:
+        """Take a reference to a channel, subscribing on the first one."""
+        with self._lock:
+            entry = self._subscriptions.get(channel)
+            if entry is not None:
+                self._subscriptions[channel] = (entry[0], entry[1] + 1)
+                return False
+            subscription = self.broker.subscribe(channel, callback=lambda event: self._deliver(channel, event))
+            self._subscriptions[channel] = (subscription, 1)
+            return True
+
+    def release(self, channel: str) -> bool:
+        """Drop a reference to a channel, unsubscribing after the last one."""
+        with self._lock:
+            entry = self._subscriptions.get(channel)
+            if entry is None:
+                return False
+            if entry[1] > 1:
+                self._subscriptions[channel] = (entry[0], entry[1] - 1)
+                return False
+            del self._subscriptions[channel]
+        entry[0].close()
+        return True
+
+    def start(self, socketio=None) -> None:
+        """Nothing to run: events are delivered on publish."""
+        self._running = True
+
+    def stop(self) -> None:
+        self._running = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.broker.stats, channels=len(self._subscriptions), connected=True)
+
+
+# Global broker instance
+_local_broker: Optional[LocalBroker] = None
+
+
+def get_local_broker() -> LocalBroker:
+    """Get global in-process event broker."""
+    global _local_broker
+    if _local_broker is None:
+        _local_broker = LocalBroker()
+    return _local_broker
@@ -0,0 +1,264 @@
+"""
+Per-player message buffers.
+
+Each online player's output (command echoes and responses, room broadcasts,
+tells, NPC actions, ambiance and time notifications) goes into a fixed-capacity
+ring buffer where every message gets a monotonically increasing sequence
+number. Transports fetch "everything after seq N":
+
+- the buffer keeps a delivered cursor, so /command, /poll and SocketIO
+  deliver each message exactly once between them (a SocketIO push
+  marks the message delivered for connected players)
+- clients may also send the last seq they saw ("after"); retrying a request
+  with the same cursor returns the same messages instead of losing them
+- truncation never desynchronises a cursor: messages that fell out of the
+  ring are simply skipped
+
+Buffers live here rather than in the game dict, so saving a player no longer
+re-serialises their scrollback to SQLite and Redis.
+
+take() can also park the caller until a message arrives (long-poll /poll), so
+an idle HTTP client holds one sleeping request instead of polling every few
+seconds.
+"""
+
+import os
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_BUFFER_SIZE = int(os.environ.get("MESSAGE_BUFFER_SIZE", "50"))
+
+
+class MessageBuffer:
+    """Fixed-capacity ring of (seq, text) messages for one player."""
+
+    def __init__(self, capacity: int = MESSAGE_BUFFER_SIZE, start_seq: int = 0):
+        """
+        Initialize an empty buffer.
+
+        Args:
+            capacity: Messages kept (older ones are dropped)
+            start_seq: Sequence number the first message follows
+        """
+        self._entries: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._arrived = threading.Condition(self._lock)  # Wakes parked take() calls
+        self.last_seq = start_seq
+        self.delivered_seq = start_seq
+
+    def append(self, text: str, wake: bool = True) -> int:
+        """Add a message; returns its sequence number."""
+        return self.extend((text,), wake=wake)
+
+    def extend(self, texts: Iterable[str], wake: bool = True) -> int:
+        """
+        Add several messages.
+
+        Args:
+            texts: Messages, in order
+            wake: Wake callers parked in take() (False for messages the caller
+                  delivers itself, e.g. a command's echo and response)
+
+        Returns:
+            int: The last sequence number
+        """
+        with self._lock:
+            for text in texts:
+                self.last_seq += 1
+                self._entries.append((self.last_seq, text))
+            if wake:
+                self._arrived.notify_all()
+            return self.last_seq
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest retained message (last_seq + 1 if empty)."""
+        entries = self._entries
+        return entries[0][0] if entries else self.last_seq + 1
+
+    def since(self, seq: int) -> List[Tuple[int, str]]:
+        """
+        Messages after a sequence number.
+
+        Args:
+            seq: Last sequence number the caller has seen
+
+        Returns:
+            list: (seq, text) tuples, oldest first (only those still retained)
+        """
+        with self._lock:
+            if seq >= self.last_seq or not self._entries:
+                return []
+            # Sequence numbers are contiguous, so the start offset is arithmetic
+            skip = max(0, seq - self._entries[0][0] + 1)
+            return [self._entries[i] for i in range(skip, len(self._entries))]
+
+    def wait(self, after: int, timeout: float) -> bool:
+        """
+        Block until a message after `after` is posted (with wake) or timeout expires.
+
+        Under eventlet the lock and condition are green, so a parked request
+        costs a sleeping greenlet rather than a thread.
+
+        Returns:
+            bool: True if there are messages after `after`
+        """
+        with self._arrived:
+            return self._arrived.wait_for(lambda: self.last_seq > after, timeout)
+
+    def take(self, after: Optional[int] = None, timeout: float = 0.0) -> List[Tuple[int, str]]:
+        """
+        Deliver messages and advance the delivered cursor.
+
+        Args:
+            after: Client cursor (last seq it saw); defaults to the delivered cursor.
+                   A cursor ahead of the buffer (e.g. from before a server restart)
+                   is ignored.
+            timeout: Seconds to wait for a message if there is none yet (long-poll)
+
+        Returns:
+            list: (seq, text) tuples not yet delivered
+        """
+        if after is None or after > self.last_seq:
+            after = self.delivered_seq
+        if timeout > 0:
+            self.wait(after, timeout)
+        entries = self.since(after)
+        if entries:
+            self.mark_delivered(entries[-1][0])
+        return entries
+
+    def mark_delivered(self, seq: int) -> None:
+        """Record that everything up to seq reached the player."""
+        with self._lock:
+            if seq > self.delivered_seq:
+                self.delivered_seq = min(seq, self.last_seq)
+
+    def texts(self, limit: Optional[int] = None) -> List[str]:
+        """The retained messages (or the last `limit`), oldest first."""
+        with self._lock:
+            entries = list(self._entries)
+        if limit is not None:
+            entries = entries[-limit:] if limit > 0 else []
+        return [text for _, text in entries]
+
+    def reset(self, texts: Iterable[str] = ()) -> None:
+        """Replace the contents (sequence numbers keep increasing)."""
+        with self._lock:
+            self._entries.clear()
+            self.delivered_seq = self.last_seq
+        self.extend(texts)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MessageBuffers:
+    """username -> MessageBuffer registry."""
+
+    def __init__(self, capacity: int = MESSAGE_BUFFER_SIZE):
+        """
+        Initialize an empty registry.
+
+        Args:
+            capacity: Ring size for each player's buffer
+        """
+        self.capacity = capacity
+        self._buffers: Dict[str, MessageBuffer] = {}
+        # Highest seq of any dropped buffer; new buffers start after it, so a
+        # returning client's cursor never hides messages in a fresh buffer
+        self._seq_floor = 0
+        self._listeners: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> MessageBuffer:
+        """Get (creating if needed) a player's buffer."""
+        buffer = self._buffers.get(username)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.get(username)
+                if buffer is None:
+                    buffer = self._buffers[username] = MessageBuffer(self.capacity, self._seq_floor)
+        return buffer
+
+    def drop(self, username: str) -> None:
+        """Forget a player's buffer (logout / idle eviction); the next post starts a new one."""
+        with self._lock:
+            buffer = self._buffers.pop(username, None)
+            if buffer is not None:
+                self._seq_floor = max(self._seq_floor, buffer.last_seq)
+
+    def peek(self, username: str) -> Optional[MessageBuffer]:
+        """A player's buffer, or None if they have none."""
+        return self._buffers.get(username)
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Call listener(username) after messages are posted for a player.
+
+        Used to push messages to SocketIO clients as they arrive.
+        """
+        self._listeners.append(listener)
+
+    def post(self, username: Optional[str], *texts: str, notify: bool = True) -> int:
+        """
+        Add messages to a player's buffer.
+
+        Args:
+            username: Recipient (ignored if empty)
+            *texts: Messages, in order
+            notify: Tell listeners and wake parked long-polls (False when the
+                    caller delivers the messages itself, e.g. a command's
+                    echo and response)
+
+        Returns:
+            int: Sequence number of the last message (0 if nothing was posted)
+        """
+        if not username or not texts:
+            return 0
+        seq = self.get(username).extend(texts, wake=notify)
+        if notify:
+            for listener in self._listeners:
+                try:
+                    listener(username)
+                except Exception as e:
+                    logger.error(f"Message listener failed for {username}: {e}", exc_info=True)
+        return seq
+
+    def recent(self, username: Optional[str], limit: int) -> List[str]:
+        """A player's last `limit` messages (e.g. context for AI replies)."""
+        buffer = self._buffers.get(username) if username else None
+        return buffer.texts(limit) if buffer is not None else []
+
+    def adopt_legacy_log(self, username: Optional[str], game: Dict[str, Any]) -> None:
+        """
+        Move a game dict's persisted "log" list (saved before buffers existed) into the buffer.
+
+        The adopted lines count as delivered; they are history shown on page load.
+        """
+        log = game.pop("log", None)
+        if not username or not isinstance(log, list):
+            return
+        buffer = self.get(username)
+        if not len(buffer):
+            buffer.extend(str(line) for line in log[-self.capacity:])
+            buffer.mark_delivered(buffer.last_seq)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+
+# Global message buffers
+_message_buffers: Optional[MessageBuffers] = None
+
+
+def get_message_buffers() -> MessageBuffers:
+    """Get the global per-player message buffers."""
+    global _message_buffers
+    if _message_buffers is None:
+        _message_buffers = MessageBuffers()
+    return _message_buffers
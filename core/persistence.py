@@ -0,0 +1,404 @@
+"""
+Incremental, write-behind world persistence.
+
+Replaces full rewrites of mud_state.json with:
+- Dirty tracking for players, rooms, NPC records, buried-item lists and the
+  small whole-section world state (world clock, game time, weather, ...)
+- An append-only delta log flushed on a background schedule (bounded lag)
+- Periodic compaction into an atomically replaced full snapshot
+
+The snapshot file keeps the legacy layout ({"players": ..., "global_state": ...})
+so load_global_state_snapshot() restores it unchanged, plus a "log_generation"
+counter. Log records carry the generation they were written in, and load()
+skips records older than the snapshot, so a crash between writing a snapshot
+and truncating the log can't replay stale records over it.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Optional, Dict, Any, Callable, Set
+
+logger = logging.getLogger(__name__)
+
+# Global state sections keyed by an id (room_id / npc_id) - tracked per entry
+KEYED_SECTIONS = ("room_state", "npc_state", "buried_items")
+
+# Small global state sections - written whole when marked dirty
+SCALAR_SECTIONS = (
+    "world_clock",
+    "game_time",
+    "weather_state",
+    "quest_global_state",
+    "npc_actions_state",
+    "npc_route_positions",
+    "exit_states",
+)
+
+
+class WorldPersistence:
+    """
+    Write-behind persistence engine for player and world state.
+
+    Request handlers only mark things dirty (O(1), no I/O). A background task
+    calls flush() every flush_interval seconds, which appends one JSON record
+    per dirty entry to the delta log. snapshot_fn must be cheap and free of
+    side effects: it is only called when world state is dirty, to read the
+    dirty entries out of the live dicts. Every compact_every records (or
+    compact_interval seconds) the log is folded into a full snapshot written
+    via a temp file + os.replace, then truncated. Each compaction starts a
+    new log generation.
+    """
+
+    def __init__(self, state_file: str,
+                 snapshot_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+                 players_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+                 flush_interval: float = 2.0,
+                 compact_every: int = 1000,
+                 compact_interval: float = 300.0,
+                 fsync: bool = False):
+        """
+        Initialize persistence engine.
+
+        Args:
+            state_file: Path of the full snapshot (e.g. mud_state.json)
+            snapshot_fn: Function returning the live global state dict (get_global_state_snapshot)
+            players_fn: Function returning the live {username: game} dict (ACTIVE_GAMES)
+            flush_interval: Seconds between background flushes (upper bound on lag)
+            compact_every: Compact after this many log records
+            compact_interval: Compact at least this often (seconds) while dirty
+            fsync: fsync the log after each flush (durability vs. latency)
+        """
+        self.state_file = state_file
+        self.log_file = state_file + ".log"
+        self._snapshot_fn = snapshot_fn
+        self._players_fn = players_fn
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._dirty_players: Set[str] = set()
+        self._dirty_keys: Dict[str, Set[str]] = {section: set() for section in KEYED_SECTIONS}
+        self._dirty_sections: Set[str] = set()
+        self._log_records = 0
+        self._generation = 0  # Log generation; bumped by every compaction
+        self._last_compaction = time.time()
+        self._running = False
+        self._wake = threading.Event()
+
+        # Timing counters (exposed for benchmarks / admin)
+        self.stats = {
+            "flushes": 0,
+            "records_written": 0,
+            "compactions": 0,
+            "last_flush_ms": 0.0,
+            "last_compaction_ms": 0.0,
+        }
+
+    # --- Dirty tracking (request path, no I/O) ---
+
+    def mark_player_dirty(self, username: str) -> None:
+        """Mark a player's game state as changed (or removed, if no longer active)."""
+        if username:
+            with self._lock:
+                self._dirty_players.add(username)
+
+    def mark_room_dirty(self, room_id: str) -> None:
+        """Mark a room's shared state (floor items) as changed."""
+        self._mark_key("room_state", room_id)
+
+    def mark_npc_dirty(self, npc_id: str) -> None:
+        """Mark an NPC_STATE record as changed."""
+        self._mark_key("npc_state", npc_id)
+
+    def mark_buried_dirty(self, room_id: str) -> None:
+        """Mark a room's buried-item list as changed."""
+        self._mark_key("buried_items", room_id)
+
+    def mark_section_dirty(self, section: str) -> None:
+        """Mark a whole scalar section (see SCALAR_SECTIONS) as changed."""
+        with self._lock:
+            self._dirty_sections.add(section)
+
+    def _mark_key(self, section: str, key: str) -> None:
+        if key:
+            with self._lock:
+                self._dirty_keys[section].add(key)
+
+    def request_flush(self) -> None:
+        """Ask the background loop to flush now instead of waiting for the interval."""
+        self._wake.set()
+
+    def has_pending(self) -> bool:
+        """Return True if anything is waiting to be flushed."""
+        with self._lock:
+            return (bool(self._dirty_players) or bool(self._dirty_sections)
+                    or any(self._dirty_keys.values()))
+
+    # --- Flushing ---
+
+    def flush(self) -> int:
+        """
+        Append deltas for everything dirty to the log.
+
+        Returns:
+            Number of records written
+        """
+        started = time.perf_counter()
+        with self._lock:
+            dirty_players = self._dirty_players
+            dirty_keys = self._dirty_keys
+            dirty_sections = self._dirty_sections
+            self._dirty_players = set()
+            self._dirty_keys = {section: set() for section in KEYED_SECTIONS}
+            self._dirty_sections = set()
+
+        lines = []
+        try:
+            players = self._players_fn() if self._players_fn else {}
+            for username in dirty_players:
+                game = players.get(username)
+                if game is None:
+                    lines.append(_encode_record("players", username, None, self._generation, deleted=True))
+                else:
+                    lines.append(_encode_record("players", username, _clean_game(game), self._generation))
+
+            world_dirty = dirty_sections or any(dirty_keys.values())
+            snapshot = self._snapshot_fn() if self._snapshot_fn and world_dirty else {}
+            for section, keys in dirty_keys.items():
+                section_data = snapshot.get(section) or {}
+                for key in keys:
+                    if key in section_data:
+                        lines.append(_encode_record(section, key, section_data[key], self._generation))
+                    else:
+                        lines.append(_encode_record(section, key, None, self._generation, deleted=True))
+
+            for section in dirty_sections:
+                if section in snapshot:
+                    lines.append(_encode_record(section, None, snapshot[section], self._generation))
+        except Exception as e:
+            # State changed under us (threaded worker) - requeue and retry next flush
+            logger.warning(f"Persistence flush deferred: {e}")
+            with self._lock:
+                self._dirty_players |= dirty_players
+                self._dirty_sections |= dirty_sections
+                for section, keys in dirty_keys.items():
+                    self._dirty_keys[section] |= keys
+            return 0
+
+        if lines:
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._log_records += len(lines)
+
+        self.stats["flushes"] += 1
+        self.stats["records_written"] += len(lines)
+        self.stats["last_flush_ms"] = (time.perf_counter() - started) * 1000.0
+
+        if self._should_compact():
+            self.compact()
+        return len(lines)
+
+    def _should_compact(self) -> bool:
+        if self._log_records == 0:
+            return False
+        if self._log_records >= self.compact_every:
+            return True
+        return time.time() - self._last_compaction >= self.compact_interval
+
+    def compact(self) -> None:
+        """Write a full snapshot atomically and truncate the delta log."""
+        started = time.perf_counter()
+        players = self._players_fn() if self._players_fn else {}
+        # Records of earlier generations are folded into this snapshot; load()
+        # skips them if we die before the log is truncated
+        self._generation += 1
+        data = {
+            "players": {username: _clean_game(game) for username, game in players.items()},
+            "global_state": self._snapshot_fn() if self._snapshot_fn else {},
+            "log_generation": self._generation,
+        }
+        _atomic_write(self.state_file, json.dumps(data, ensure_ascii=False))
+        _atomic_write(self.log_file, "")
+        self._log_records = 0
+        self._last_compaction = time.time()
+        self.stats["compactions"] += 1
+        self.stats["last_compaction_ms"] = (time.perf_counter() - started) * 1000.0
+
+    # --- Loading ---
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the last snapshot and replay the delta log on top of it.
+        
+        Log records from generations older than the snapshot are already in it
+        and are skipped.
+
+        Returns:
+            {"players": {...}, "global_state": {...}} or None if nothing is stored
+        """
+        data = None
+        if os.path.exists(self.state_file):
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        snapshot_generation = data.pop("log_generation", 0) if data else 0
+        self._generation = snapshot_generation
+
+        if not os.path.exists(self.log_file):
+            return data
+
+        if data is None:
+            data = {}
+        players = data.setdefault("players", {})
+        global_state = data.setdefault("global_state", {})
+        replayed = 0
+        with open(self.log_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write at the tail of the log - everything before it is intact
+                    logger.warning("Skipping malformed persistence log record")
+                    continue
+                generation = record.get("g", 0)
+                if generation < snapshot_generation:
+                    continue  # Left over from a compaction interrupted before truncating
+                self._generation = max(self._generation, generation)
+                section = record.get("s")
+                key = record.get("k")
+                deleted = record.get("d", False)
+                value = record.get("v")
+                if section == "players":
+                    target = players
+                elif section in KEYED_SECTIONS:
+                    target = global_state.setdefault(section, {})
+                else:
+                    global_state[section] = value
+                    replayed += 1
+                    continue
+                if deleted:
+                    target.pop(key, None)
+                else:
+                    target[key] = value
+                replayed += 1
+        self._log_records = replayed
+        return data
+
+    # --- Background scheduling ---
+
+    def start(self, socketio=None) -> None:
+        """
+        Start the background flush loop.
+
+        Args:
+            socketio: Flask-SocketIO instance (runs as its background task);
+                      falls back to a daemon thread when not provided
+        """
+        if self._running:
+            return
+        self._running = True
+
+        def flush_task():
+            logger.info("World persistence flusher started")
+            while self._running:
+                # Event.wait is green under eventlet's monkey patching
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Error flushing world state: {e}", exc_info=True)
+
+        if socketio:
+            socketio.start_background_task(flush_task)
+        else:
+            threading.Thread(target=flush_task, name="world-persistence", daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop the background loop and flush anything outstanding."""
+        self._running = False
+        self._wake.set()
+        self.flush()
+
+
+def _clean_game(game: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop transient (underscore-prefixed) keys from a game dict."""
+    return {k: v for k, v in game.items() if not k.startswith("_")}
+
+
+def _encode_record(section: str, key: Optional[str], value: Any, generation: int,
+                   deleted: bool = False) -> str:
+    record = {"s": section, "k": key, "g": generation, "t": time.time()}
+    if deleted:
+        record["d"] = True
+    else:
+        record["v"] = value
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _atomic_write(path: str, text: str) -> None:
+    """Write text to path via a temp file and os.replace."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# Global persistence instance
+_persistence: Optional[WorldPersistence] = None
+
+
+def get_persistence(state_file: Optional[str] = None, **kwargs) -> Optional[WorldPersistence]:
+    """
+    Get global persistence instance (created on first call with a state_file).
+
+    Args:
+        state_file: Snapshot path (required on first call)
+        **kwargs: Passed to WorldPersistence
+
+    Returns:
+        WorldPersistence instance, or None if not configured yet
+    """
+    global _persistence
+    if _persistence is None and state_file:
+        _persistence = WorldPersistence(state_file, **kwargs)
+    return _persistence
+
+
+def mark_player_dirty(username: str) -> None:
+    """Mark a player dirty on the global engine (no-op if persistence is not configured)."""
+    if _persistence:
+        _persistence.mark_player_dirty(username)
+
+
+def mark_room_dirty(room_id: str) -> None:
+    """Mark a room dirty on the global engine (no-op if persistence is not configured)."""
+    if _persistence:
+        _persistence.mark_room_dirty(room_id)
+
+
+def mark_npc_dirty(npc_id: str) -> None:
+    """Mark an NPC dirty on the global engine (no-op if persistence is not configured)."""
+    if _persistence:
+        _persistence.mark_npc_dirty(npc_id)
+
+
+def mark_buried_dirty(room_id: str) -> None:
+    """Mark a room's buried items dirty on the global engine (no-op if not configured)."""
+    if _persistence:
+        _persistence.mark_buried_dirty(room_id)
+
+
+def mark_section_dirty(section: str) -> None:
+    """Mark a scalar world state section dirty on the global engine (no-op if not configured)."""
+    if _persistence:
+        _persistence.mark_section_dirty(section)
@@ -0,0 +1,242 @@
+"""
+Shared Redis pub/sub subscriber for one worker process.
+
+Instead of a Redis pub/sub connection per WebSocket connection, each process
+holds a single subscriber connection:
+
+- channels are reference counted: the process subscribes when the first local
+  connection needs a channel and unsubscribes when the last one leaves it
+- each message is received (and decoded) once and its events are handed to a
+  handler that fans them out to the local connections in memory
+- a lost connection is re-established with exponential backoff (plus jitter)
+  and every channel still in use is subscribed again
+"""
+
+import time
+import random
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from core.event_codec import decode_events
+
+logger = logging.getLogger(__name__)
+
+# Reconnect backoff bounds (seconds)
+DEFAULT_BACKOFF_INITIAL = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+
+
+def _default_connect():
+    from core.redis_manager import get_pubsub_connection
+    return get_pubsub_connection()
+
+
+class PubSubMultiplexer:
+    """One Redis subscriber shared by every local connection, with ref-counted channels."""
+
+    def __init__(self, handler: Optional[Callable[[str, Any], None]] = None,
+                 connect_fn: Optional[Callable[[], Any]] = None,
+                 decode: Callable[[Any], List[Any]] = decode_events,
+                 backoff_initial: float = DEFAULT_BACKOFF_INITIAL,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX,
+                 poll_timeout: float = 1.0):
+        """
+        Initialize the multiplexer.
+
+        Args:
+            handler: Called as handler(channel, event) for each received event
+            connect_fn: Returns a Redis client (None if Redis is unavailable);
+                        defaults to core.redis_manager.get_pubsub_connection
+            decode: Turns a message payload into its list of events (once per message)
+            backoff_initial: First reconnect delay in seconds
+            backoff_max: Longest reconnect delay in seconds
+            poll_timeout: Seconds the listener blocks waiting for a message
+        """
+        self.handler = handler
+        self._connect_fn = connect_fn or _default_connect
+        self._decode = decode
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.poll_timeout = poll_timeout
+        self._refs: Dict[str, int] = {}
+        self._pubsub = None
+        self._lock = threading.RLock()
+        self._running = False
+        self.stats = {"connects": 0, "reconnects": 0, "messages": 0, "decode_errors": 0,
+                      "subscribes": 0, "unsubscribes": 0}
+
+    @property
+    def channels(self) -> List[str]:
+        """Channels currently subscribed (or to be subscribed on connect)."""
+        return list(self._refs)
+
+    @property
+    def connected(self) -> bool:
+        """True while the subscriber connection is up."""
+        return self._pubsub is not None
+
+    @property
+    def running(self) -> bool:
+        """True while the background listener is active."""
+        return self._running
+
+    def refcount(self, channel: str) -> int:
+        """Number of local users of a channel."""
+        return self._refs.get(channel, 0)
+
+    def acquire(self, channel: str) -> bool:
+        """
+        Take a reference to a channel, subscribing on the first one.
+
+        Returns:
+            True if this call subscribed the process to the channel
+        """
+        with self._lock:
+            count = self._refs.get(channel, 0) + 1
+            self._refs[channel] = count
+            if count > 1:
+                return False
+            self.stats["subscribes"] += 1
+            if self._pubsub is not None:
+                try:
+                    self._pubsub.subscribe(channel)
+                except Exception as e:
+                    logger.warning(f"Subscribe to {channel} failed, reconnecting: {e}")
+                    self._drop_connection()
+            return True
+
+    def release(self, channel: str) -> bool:
+        """
+        Drop a reference to a channel, unsubscribing after the last one.
+
+        Returns:
+            True if this call unsubscribed the process from the channel
+        """
+        with self._lock:
+            count = self._refs.get(channel, 0)
+            if count <= 0:
+                return False
+            if count > 1:
+                self._refs[channel] = count - 1
+                return False
+            del self._refs[channel]
+            self.stats["unsubscribes"] += 1
+            if self._pubsub is not None:
+                try:
+                    self._pubsub.unsubscribe(channel)
+                except Exception as e:
+                    logger.warning(f"Unsubscribe from {channel} failed, reconnecting: {e}")
+                    self._drop_connection()
+            return True
+
+    def _connect(self) -> None:
+        """Open the subscriber connection and subscribe every channel in use."""
+        client = self._connect_fn()
+        if client is None:
+            raise ConnectionError("Redis pub/sub unavailable")
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        with self._lock:
+            channels = list(self._refs)
+            if channels:
+                pubsub.subscribe(*channels)
+            self._pubsub = pubsub
+        self.stats["connects"] += 1
+        logger.info(f"Redis subscriber connected ({len(channels)} channels)")
+
+    def _drop_connection(self) -> None:
+        with self._lock:
+            pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        """Decode a pub/sub message once and hand each of its events to the handler."""
+        if message.get("type") != "message":
+            return
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8")
+        self.stats["messages"] += 1
+        try:
+            events = self._decode(message["data"])
+        except Exception as e:
+            self.stats["decode_errors"] += 1
+            logger.error(f"Undecodable event on {channel}: {e}")
+            return
+        if self.handler is None:
+            return
+        for event in events:
+            try:
+                self.handler(channel, event)
+            except Exception as e:
+                logger.error(f"Error fanning out event on {channel}: {e}", exc_info=True)
+
+    def poll(self, timeout: Optional[float] = None) -> bool:
+        """
+        Receive and dispatch at most one message (connecting first if needed).
+
+        Args:
+            timeout: Seconds to block waiting (defaults to poll_timeout)
+
+        Returns:
+            True if a message was dispatched
+
+        Raises:
+            Exception: Connection errors (the listener loop reconnects with backoff)
+        """
+        pubsub = self._pubsub
+        if pubsub is None:
+            self._connect()
+            pubsub = self._pubsub
+        message = pubsub.get_message(timeout=self.poll_timeout if timeout is None else timeout)
+        if not message:
+            return False
+        self._dispatch(message)
+        return True
+
+    def start(self, socketio=None) -> None:
+        """
+        Start the listener loop.
+
+        Args:
+            socketio: Flask-SocketIO instance (runs as its background task);
+                      falls back to a daemon thread when not provided
+        """
+        if self._running:
+            return
+        self._running = True
+        sleep = socketio.sleep if socketio else time.sleep
+
+        def listen_task():
+            delay = self.backoff_initial
+            while self._running:
+                try:
+                    self.poll()
+                    delay = self.backoff_initial
+                except Exception as e:
+                    self._drop_connection()
+                    if not self._running:
+                        break
+                    self.stats["reconnects"] += 1
+                    wait = delay * (1.0 + random.random() * 0.5)
+                    logger.warning(f"Redis subscriber error: {e}; reconnecting in {wait:.1f}s")
+                    sleep(wait)
+                    delay = min(delay * 2, self.backoff_max)
+
+        if socketio:
+            socketio.start_background_task(listen_task)
+        else:
+            threading.Thread(target=listen_task, name="redis-subscriber", daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop the listener loop and close the connection."""
+        self._running = False
+        self._drop_connection()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection and traffic counters."""
+        return dict(self.stats, channels=len(self._refs), connected=self.connected)
@@ -5,11 +5,14 @@ Provides:
 - Redis cache connection (hot data)
 - Redis pub/sub connection (events)
 - Connection pooling and error handling
+- Pipelined, coalesced batches of cache commands (redis_batch)
 """
 
 import os
 import json
 import redis
+import threading
+from contextlib import contextmanager
 from typing import Optional, Any, Dict, List
 import logging
 
@@ -17,7 +20,9 @@ logger = logging.getLogger(__name__)
 
 # Redis connection pools (created on first use)
 _cache_pool: Optional[redis.ConnectionPool] = None
+_cache_client: Optional[redis.Redis] = None
 _pubsub_pool: Optional[redis.ConnectionPool] = None
+_pubsub_binary_pool: Optional[redis.ConnectionPool] = None
 _redis_available: Optional[bool] = None  # Circuit breaker: None=Unknown, True=Available, False=Unavailable
 
 
@@ -54,12 +59,16 @@ def get_cache_connection() -> Optional[redis.Redis]:
     Returns:
         Redis client instance, or None if Redis is unavailable
     """
-    global _cache_pool, _redis_available
+    global _cache_pool, _cache_client, _redis_available
     
     # Circuit breaker check
     if _redis_available is False:
         return None
     
+    # Reuse one client per pool (clients are thread-safe; connections come from the pool)
+    if _cache_client is not None and _redis_available:
+        return _cache_client
+    
     try:
         if _cache_pool is None:
             url = get_redis_url("cache")
@@ -86,7 +95,8 @@ def get_cache_connection() -> Optional[redis.Redis]:
                 _redis_available = False
                 logger.warning(f"Redis connection failed ({e}), disabling Redis cache")
                 return None
-                
+        
+        _cache_client = client
         return client
     except Exception as e:
         logger.debug(f"Redis cache connection unavailable: {e}")
@@ -94,34 +104,43 @@ def get_cache_connection() -> Optional[redis.Redis]:
         return None
 
 
-def get_pubsub_connection() -> Optional[redis.Redis]:
+def get_pubsub_connection(binary: bool = False) -> Optional[redis.Redis]:
     """
     Get Redis connection for pub/sub (events).
     
+    Args:
+        binary: Return message data as bytes (for subscribers reading the
+                binary event envelope) instead of decoded strings
+    
     Returns:
         Redis client instance, or None if unavailable
     """
-    global _pubsub_pool, _redis_available
+    global _pubsub_pool, _pubsub_binary_pool, _redis_available
     
     # Circuit breaker check
     if _redis_available is False:
         return None
     
     try:
-        if _pubsub_pool is None:
+        pool = _pubsub_binary_pool if binary else _pubsub_pool
+        if pool is None:
             url = get_redis_url("pubsub")
-            _pubsub_pool = redis.ConnectionPool.from_url(
+            pool = redis.ConnectionPool.from_url(
                 url,
                 max_connections=50,
-                decode_responses=True,
+                decode_responses=not binary,
                 socket_connect_timeout=5,
                 socket_timeout=5,
                 retry_on_timeout=True,
                 health_check_interval=30,
             )
-            logger.info(f"Created Redis pub/sub pool: {url}")
+            if binary:
+                _pubsub_binary_pool = pool
+            else:
+                _pubsub_pool = pool
+            logger.info(f"Created Redis pub/sub pool{' (binary)' if binary else ''}: {url}")
         
-        return redis.Redis(connection_pool=_pubsub_pool)
+        return redis.Redis(connection_pool=pool)
     except Exception as e:
         logger.debug(f"Redis pub/sub connection unavailable: {e}")
         return None
@@ -171,6 +190,11 @@ class CacheKeys:
     def room_events(room_id: str) -> str:
         return f"room:{room_id}:events"
     
+    @staticmethod
+    def ai_requests(username: str, bucket: int) -> str:
+        """Key for a user's AI request count in one rate-limit time slice."""
+        return f"ai:requests:{username}:{bucket}"
+    
     @staticmethod
     def global_world_time() -> str:
         return "global:world_time"
@@ -184,6 +208,180 @@ class CacheKeys:
         return "global:active_players"
 
 
+# Round-trip accounting for the cache helpers below
+_stats = {"round_trips": 0, "commands": 0, "batches": 0}
+
+
+def get_redis_stats() -> Dict[str, int]:
+    """Get counters of cache round trips / commands issued by this module."""
+    return dict(_stats)
+
+
+def reset_redis_stats() -> None:
+    """Reset the round-trip counters (benchmarks/tests)."""
+    for key in _stats:
+        _stats[key] = 0
+
+
+class RedisBatch:
+    """
+    Queue cache writes and send them to Redis in one pipelined round trip.
+    
+    Writes are coalesced: a key written twice keeps only the last value, and a
+    set member added then removed (or vice versa) keeps only the last operation.
+    Reads through get_cached_state() see values queued in the active batch.
+    """
+    
+    def __init__(self, transaction: bool = False):
+        """
+        Initialize an empty batch.
+        
+        Args:
+            transaction: Wrap the pipeline in MULTI/EXEC
+        """
+        self.transaction = transaction
+        # key -> ("set", ttl, payload) or ("delete",)
+        self._writes: Dict[str, tuple] = {}
+        # (set_key, member) -> "sadd" / "srem"
+        self._members: Dict[tuple, str] = {}
+        self._expires: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._writes) + len(self._members) + len(self._expires)
+    
+    def set_state(self, key: str, value: Any, ttl: int = 900) -> None:
+        """Queue a JSON SETEX."""
+        self._writes[key] = ("set", ttl, json.dumps(value))
+    
+    def delete(self, key: str) -> None:
+        """Queue a DEL."""
+        self._writes[key] = ("delete",)
+    
+    def sadd(self, key: str, *members: str) -> None:
+        """Queue SADD of members to a set."""
+        for member in members:
+            self._members[(key, member)] = "sadd"
+    
+    def srem(self, key: str, *members: str) -> None:
+        """Queue SREM of members from a set."""
+        for member in members:
+            self._members[(key, member)] = "srem"
+    
+    def expire(self, key: str, ttl: int) -> None:
+        """Queue an EXPIRE."""
+        self._expires[key] = ttl
+    
+    def pending(self, key: str) -> tuple:
+        """
+        Look up a queued write for a key.
+        
+        Returns:
+            tuple: (found, value) - value is None for a queued delete
+        """
+        write = self._writes.get(key)
+        if write is None:
+            return False, None
+        if write[0] == "delete":
+            return True, None
+        return True, json.loads(write[2])
+    
+    def execute(self) -> bool:
+        """
+        Send every queued command in one pipeline.
+        
+        Returns:
+            True if successful (or nothing to send), False otherwise
+        """
+        if not len(self):
+            return True
+        writes, members, expires = self._writes, self._members, self._expires
+        self._writes, self._members, self._expires = {}, {}, {}
+        try:
+            cache = get_cache_connection()
+            if cache is None:
+                return False
+            pipe = cache.pipeline(transaction=self.transaction)
+            commands = 0
+            for key, write in writes.items():
+                if write[0] == "delete":
+                    pipe.delete(key)
+                else:
+                    pipe.setex(key, write[1], write[2])
+                commands += 1
+            grouped: Dict[tuple, List[str]] = {}
+            for (key, member), op in members.items():
+                grouped.setdefault((op, key), []).append(member)
+            for (op, key), group in grouped.items():
+                getattr(pipe, op)(key, *group)
+                commands += 1
+            for key, ttl in expires.items():
+                pipe.expire(key, ttl)
+                commands += 1
+            pipe.execute()
+            _stats["round_trips"] += 1
+            _stats["commands"] += commands
+            _stats["batches"] += 1
+            return True
+        except Exception as e:
+            logger.error(f"Error executing Redis batch: {e}")
+            return False
+
+
+_batch_local = threading.local()
+
+
+def get_active_batch() -> Optional[RedisBatch]:
+    """Get the batch open on this thread/greenlet, if any."""
+    return getattr(_batch_local, "batch", None)
+
+
+def begin_redis_batch(transaction: bool = False) -> RedisBatch:
+    """
+    Open a batch for this thread/greenlet (e.g. at the start of a request).
+    
+    Cache writes made until end_redis_batch() are coalesced into one round trip.
+    If a batch is already open it is returned instead.
+    """
+    batch = get_active_batch()
+    if batch is None:
+        batch = RedisBatch(transaction=transaction)
+        _batch_local.batch = batch
+    return batch
+
+
+def end_redis_batch() -> bool:
+    """Close and execute the batch opened by begin_redis_batch()."""
+    batch = get_active_batch()
+    if batch is None:
+        return True
+    _batch_local.batch = None
+    return batch.execute()
+
+
+@contextmanager
+def redis_batch(transaction: bool = False):
+    """
+    Context manager that pipelines every cache write inside it.
+    
+    Nested uses join the outer batch, so a request-level batch coalesces the
+    writes of everything it calls.
+    
+    Usage:
+        with redis_batch() as batch:
+            batch.set_state(key, value, ttl=900)
+            batch.sadd(room_key, username)
+    """
+    batch = get_active_batch()
+    if batch is not None:
+        yield batch
+        return
+    batch = begin_redis_batch(transaction=transaction)
+    try:
+        yield batch
+    finally:
+        end_redis_batch()
+
+
 # Cache helpers
 def get_cached_state(key: str, default: Any = None) -> Optional[Any]:
     """
@@ -196,12 +394,19 @@ def get_cached_state(key: str, default: Any = None) -> Optional[Any]:
     Returns:
         Cached value or default
     """
+    batch = get_active_batch()
+    if batch is not None:
+        found, value = batch.pending(key)
+        if found:
+            return default if value is None else value
     try:
         cache = get_cache_connection()
         if cache is None:
             return default
             
         value = cache.get(key)
+        _stats["round_trips"] += 1
+        _stats["commands"] += 1
         if value:
             return json.loads(value)
         return default
@@ -210,10 +415,51 @@ def get_cached_state(key: str, default: Any = None) -> Optional[Any]:
         return default
 
 
+def get_many_cached_states(keys: List[str], default: Any = None) -> Dict[str, Any]:
+    """
+    Get several cached states with one MGET.
+    
+    Args:
+        keys: Cache keys
+        default: Value for keys that are missing
+        
+    Returns:
+        dict: {key: value or default}
+    """
+    results = {key: default for key in keys}
+    if not keys:
+        return results
+    batch = get_active_batch()
+    remaining = []
+    for key in keys:
+        found, value = batch.pending(key) if batch is not None else (False, None)
+        if found:
+            results[key] = default if value is None else value
+        else:
+            remaining.append(key)
+    if not remaining:
+        return results
+    try:
+        cache = get_cache_connection()
+        if cache is None:
+            return results
+        values = cache.mget(remaining)
+        _stats["round_trips"] += 1
+        _stats["commands"] += 1
+        for key, value in zip(remaining, values):
+            if value:
+                results[key] = json.loads(value)
+    except Exception as e:
+        logger.error(f"Error getting cached states {remaining[:3]}...: {e}")
+    return results
+
+
 def set_cached_state(key: str, value: Any, ttl: int = 900) -> bool:
     """
     Set cached state in Redis.
     
+    Inside a redis_batch() the write is queued and sent with the batch.
+    
     Args:
         key: Cache key
         value: Value to cache (must be JSON serializable)
@@ -222,28 +468,59 @@ def set_cached_state(key: str, value: Any, ttl: int = 900) -> bool:
     Returns:
         True if successful, False otherwise
     """
+    batch = get_active_batch()
+    if batch is not None:
+        batch.set_state(key, value, ttl)
+        return True
     try:
         cache = get_cache_connection()
         if cache is None:
             return False
             
         cache.setex(key, ttl, json.dumps(value))
+        _stats["round_trips"] += 1
+        _stats["commands"] += 1
         return True
     except Exception as e:
         logger.error(f"Error setting cached state {key}: {e}")
         return False
 
 
+def set_many_cached_states(values: Dict[str, Any], ttl: int = 900) -> bool:
+    """
+    Set several cached states in one pipelined round trip.
+    
+    Args:
+        values: {key: value} (values must be JSON serializable)
+        ttl: Time to live in seconds for every key
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    outer = get_active_batch()
+    batch = outer if outer is not None else RedisBatch()
+    for key, value in values.items():
+        batch.set_state(key, value, ttl)
+    if outer is not None:
+        return True  # Sent with the enclosing batch
+    return batch.execute()
+
+
 def delete_cached_state(key: str) -> bool:
     """Delete cached state."""
+    batch = get_active_batch()
+    if batch is not None:
+        batch.delete(key)
+        return True
     try:
         cache = get_cache_connection()
         if cache is None:
             return False
             
         cache.delete(key)
+        _stats["round_trips"] += 1
+        _stats["commands"] += 1
         return True
     except Exception as e:
         logger.error(f"Error deleting cached state {key}: {e}")
         return False
-
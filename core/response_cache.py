@@ -0,0 +1,279 @@
+"""
+Tiered cache for AI dialogue responses.
+
+- LocalTier: in-process LRU (OrderedDict, O(1) get/put/evict) with a TTL
+- RedisTier: shared by every worker (SETEX keys under a prefix)
+- SQLiteTier: shared tier for single-node deployments (no Redis), an
+  ai_response_cache table pruned to a maximum size
+
+TieredResponseCache reads the local tier first, then the shared tier
+(promoting hits into the local tier), and writes through to both. Every
+tier keeps hit/miss/eviction counters for the admin dashboard.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_SHARED_MAX_ENTRIES = 20000
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+
+
+class LocalTier:
+    """In-process LRU tier with a per-entry TTL."""
+
+    name = "local"
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, size=len(self._entries), max_entries=self.max_entries)
+
+
+class RedisTier:
+    """Shared tier in Redis (expiry and eviction are left to Redis)."""
+
+    name = "redis"
+
+    def __init__(self, ttl: float = DEFAULT_TTL, prefix: str = "ai:reply:"):
+        self.ttl = int(ttl)
+        self.prefix = prefix
+        self.stats = {"hits": 0, "misses": 0, "errors": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            from core.redis_manager import get_cache_connection
+            cache = get_cache_connection()
+            value = cache.get(self.prefix + key) if cache is not None else None
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error reading AI response cache from Redis: {e}")
+            value = None
+        self.stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        try:
+            from core.redis_manager import get_cache_connection
+            cache = get_cache_connection()
+            if cache is not None:
+                cache.setex(self.prefix + key, self.ttl, value)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error writing AI response cache to Redis: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+class SQLiteTier:
+    """Shared tier in SQLite, for single-node deployments."""
+
+    name = "sqlite"
+
+    # Prune the table back to max_entries every this many writes
+    PRUNE_EVERY = 100
+
+    def __init__(self, connect_fn: Callable, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_SHARED_MAX_ENTRIES):
+        """
+        Initialize the tier.
+
+        Args:
+            connect_fn: Callable returning a sqlite3 connection (closed after use)
+            ttl: Seconds an entry stays valid
+            max_entries: Rows kept after pruning (least recently written go first)
+        """
+        self._connect = connect_fn
+        self.ttl = ttl
+        self.max_entries = max(1, int(max_entries))
+        self._writes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "errors": 0}
+
+    @staticmethod
+    def create_tables(conn) -> None:
+        """Create the shared response cache table."""
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ai_response_cache (
+                cache_key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_response_cache_updated ON ai_response_cache(updated_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT response FROM ai_response_cache WHERE cache_key = ? AND expires_at > ?",
+                    (key, time.time()),
+                ).fetchone()
+            finally:
+                conn.close()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error reading AI response cache from SQLite: {e}")
+            row = None
+        self.stats["hits" if row is not None else "misses"] += 1
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        self._writes += 1
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    """
+                    INSERT INTO ai_response_cache (cache_key, response, expires_at, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(cache_key) DO UPDATE SET
+                        response = excluded.response,
+                        expires_at = excluded.expires_at,
+                        updated_at = excluded.updated_at
+                    """,
+                    (key, value, now + self.ttl, now),
+                )
+                if self._writes % self.PRUNE_EVERY == 0:
+                    self._prune(conn, now)
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error writing AI response cache to SQLite: {e}")
+
+    def _prune(self, conn, now: float) -> None:
+        expired = conn.execute("DELETE FROM ai_response_cache WHERE expires_at <= ?", (now,)).rowcount
+        overflow = conn.execute(
+            """
+            DELETE FROM ai_response_cache WHERE cache_key IN (
+                SELECT cache_key FROM ai_response_cache ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        ).rowcount
+        self.stats["evictions"] += max(0, expired) + max(0, overflow)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, max_entries=self.max_entries)
+
+
+class TieredResponseCache:
+    """Local LRU tier in front of an optional shared tier."""
+
+    def __init__(self, local: Optional[LocalTier] = None, shared=None):
+        self.local = local or LocalTier()
+        self.shared = shared
+
+    def get(self, key: str) -> Optional[str]:
+        """Look a key up in the local tier, then the shared tier."""
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value in every tier."""
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value)
+
+    def clear(self) -> None:
+        """Empty the local tier (shared entries expire on their own)."""
+        self.local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters per tier plus the overall hit rate."""
+        local = self.local.get_stats()
+        shared = self.shared.get_stats() if self.shared is not None else None
+        lookups = local["hits"] + local["misses"]
+        hits = local["hits"] + (shared["hits"] if shared else 0)
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "ttl": self.local.ttl,
+            "local": local,
+            "shared_backend": self.shared.name if self.shared is not None else None,
+            "shared": shared,
+        }
+
+
+# Global response cache (local tier only until configure_response_cache is called)
+_cache: Optional[TieredResponseCache] = None
+
+
+def get_response_cache() -> TieredResponseCache:
+    """Get the global AI response cache."""
+    global _cache
+    if _cache is None:
+        _cache = TieredResponseCache()
+    return _cache
+
+
+def configure_response_cache(max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL,
+                             shared=None) -> TieredResponseCache:
+    """
+    Replace the global AI response cache.
+
+    Args:
+        max_entries: Size of the in-process LRU tier
+        ttl: Seconds an entry stays valid in the local tier
+        shared: Optional shared tier (RedisTier or SQLiteTier)
+
+    Returns:
+        TieredResponseCache: The new global cache
+    """
+    global _cache
+    _cache = TieredResponseCache(LocalTier(max_entries, ttl), shared)
+    return _cache
@@ -0,0 +1,161 @@
+"""
+In-process room membership index.
+
+Maps room_id -> online usernames (and username -> room_id) so room broadcasts,
+per-room player lookups and the background event generator cost O(room)
+instead of scanning every entry in ACTIVE_GAMES.
+
+Login/logout, movement, idle cleanup and stale-session cleanup keep it
+current; check_consistency() compares it against ACTIVE_GAMES for tests.
+"""
+
+import logging
+import threading
+from typing import Optional, Dict, Any, Set, List
+
+logger = logging.getLogger(__name__)
+
+
+class RoomIndex:
+    """Bidirectional room <-> online player index."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._lock = threading.Lock()
+        self._rooms: Dict[str, Set[str]] = {}
+        self._locations: Dict[str, str] = {}
+
+    def update(self, username: str, room_id: Optional[str]) -> None:
+        """
+        Add a player to the index or move them to a new room.
+
+        Args:
+            username: Player username
+            room_id: Room the player is now in
+        """
+        if not username or not room_id:
+            return
+        with self._lock:
+            old_room = self._locations.get(username)
+            if old_room == room_id:
+                return
+            if old_room is not None:
+                self._discard(username, old_room)
+            self._locations[username] = room_id
+            self._rooms.setdefault(room_id, set()).add(username)
+
+    def relocate(self, username: str, room_id: Optional[str]) -> bool:
+        """
+        Move a player that is already indexed (no-op for offline players).
+
+        Args:
+            username: Player username
+            room_id: Room the player moved to
+
+        Returns:
+            True if the player was indexed and updated
+        """
+        if username not in self._locations:
+            return False
+        self.update(username, room_id)
+        return True
+
+    def remove(self, username: str) -> None:
+        """Remove a player from the index (logout / idle cleanup)."""
+        with self._lock:
+            old_room = self._locations.pop(username, None)
+            if old_room is not None:
+                self._discard(username, old_room)
+
+    def _discard(self, username: str, room_id: str) -> None:
+        members = self._rooms.get(room_id)
+        if members is not None:
+            members.discard(username)
+            if not members:
+                del self._rooms[room_id]
+
+    def players_in(self, room_id: str) -> List[str]:
+        """Return usernames currently in a room."""
+        with self._lock:
+            return list(self._rooms.get(room_id, ()))
+
+    def room_of(self, username: str) -> Optional[str]:
+        """Return the room a player is in, or None if not online."""
+        return self._locations.get(username)
+
+    def locations(self) -> Dict[str, str]:
+        """Return a snapshot of {username: room_id} for every online player."""
+        with self._lock:
+            return dict(self._locations)
+
+    def occupied_rooms(self) -> List[str]:
+        """Return room ids that have at least one online player."""
+        with self._lock:
+            return list(self._rooms.keys())
+
+    def __contains__(self, username: str) -> bool:
+        return username in self._locations
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def rebuild(self, active_games: Dict[str, Dict[str, Any]]) -> None:
+        """Rebuild the index from scratch from {username: game}."""
+        with self._lock:
+            self._rooms = {}
+            self._locations = {}
+        for username, game in list(active_games.items()):
+            self.update(username, game.get("location"))
+
+    def clear(self) -> None:
+        """Remove every player from the index."""
+        with self._lock:
+            self._rooms = {}
+            self._locations = {}
+
+    def check_consistency(self, active_games: Dict[str, Dict[str, Any]]) -> List[str]:
+        """
+        Compare the index against {username: game}.
+
+        Args:
+            active_games: The authoritative ACTIVE_GAMES dict
+
+        Returns:
+            List of human-readable problems (empty if consistent)
+        """
+        problems = []
+        with self._lock:
+            locations = dict(self._locations)
+            rooms = {room_id: set(members) for room_id, members in self._rooms.items()}
+
+        for username, game in active_games.items():
+            location = game.get("location")
+            if not location:
+                continue
+            indexed = locations.get(username)
+            if indexed is None:
+                problems.append(f"{username} is active but not indexed")
+            elif indexed != location:
+                problems.append(f"{username} indexed in {indexed} but is in {location}")
+
+        for username in locations:
+            if username not in active_games:
+                problems.append(f"{username} is indexed but not active")
+
+        for room_id, members in rooms.items():
+            for username in members:
+                if locations.get(username) != room_id:
+                    problems.append(f"{username} listed in {room_id} but located in {locations.get(username)}")
+        return problems
+
+
+# Global index instance
+_room_index: Optional[RoomIndex] = None
+
+
+def get_room_index() -> RoomIndex:
+    """Get global room membership index."""
+    global _room_index
+    if _room_index is None:
+        _room_index = RoomIndex()
+    return _room_index
@@ -0,0 +1,188 @@
+"""
+In-process cache of the game_settings table.
+
+Settings are loaded into memory once at startup, so hot paths (/poll, the
+background event generator) read them without touching SQLite. Writes go
+through set() which updates the table, bumps a version counter in the same
+transaction and refreshes the local copy. Other workers notice the change
+with refresh_if_changed(), a single-row version query run off the hot path
+(on the world tick).
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SettingsService:
+    """Typed, cached access to game_settings."""
+
+    def __init__(self, connect_fn: Callable):
+        """
+        Initialize the service.
+
+        Args:
+            connect_fn: Callable returning a sqlite3 connection (with sqlite3.Row rows)
+        """
+        self._connect = connect_fn
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[str, Any]] = {}
+        self._version: Optional[int] = None
+        self.stats = {"reloads": 0, "version_checks": 0, "writes": 0}
+
+    @staticmethod
+    def create_tables(conn) -> None:
+        """Create the settings version table (game_settings is created by init_db)."""
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS game_settings_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute("INSERT OR IGNORE INTO game_settings_version (id, version) VALUES (1, 0)")
+
+    @property
+    def version(self) -> Optional[int]:
+        """Version of the settings currently held in memory."""
+        return self._version
+
+    @property
+    def loaded(self) -> bool:
+        """Whether settings have been loaded from the database."""
+        return self._version is not None
+
+    def load(self) -> None:
+        """Load every setting and the current version from the database."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT key, value, description FROM game_settings ORDER BY key").fetchall()
+            version_row = conn.execute("SELECT version FROM game_settings_version WHERE id = 1").fetchone()
+        finally:
+            conn.close()
+        values = {row["key"]: {"value": row["value"], "description": row["description"]} for row in rows}
+        with self._lock:
+            self._values = values
+            self._version = version_row["version"] if version_row else 0
+            self.stats["reloads"] += 1
+
+    def _ensure_loaded(self) -> None:
+        if self._version is None:
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"Error loading game settings: {e}")
+
+    def refresh_if_changed(self) -> bool:
+        """
+        Reload settings if another worker changed them (one single-row query).
+
+        Returns:
+            True if the settings were reloaded
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT version FROM game_settings_version WHERE id = 1").fetchone()
+        finally:
+            conn.close()
+        self.stats["version_checks"] += 1
+        version = row["version"] if row else 0
+        if version == self._version:
+            return False
+        logger.info(f"Game settings changed (version {self._version} -> {version}), reloading")
+        self.load()
+        return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a setting's raw (string) value without any I/O."""
+        self._ensure_loaded()
+        entry = self._values.get(key)
+        return entry["value"] if entry else default
+
+    def get_float(self, key: str, default: float) -> float:
+        """Get a setting as a float (default if missing or not numeric)."""
+        try:
+            return float(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_int(self, key: str, default: int) -> int:
+        """Get a setting as an int (default if missing or not numeric)."""
+        try:
+            return int(float(self.get(key, default)))
+        except (TypeError, ValueError):
+            return default
+
+    def get_bool(self, key: str, default: bool) -> bool:
+        """Get a setting as a bool ("true"/"1"/"yes"/"on" are true)."""
+        value = self.get(key)
+        if value is None:
+            return default
+        return str(value).strip().lower() in ("true", "1", "yes", "on")
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        """Get {key: {"value", "description"}} for every setting, ordered by key."""
+        self._ensure_loaded()
+        return {key: dict(entry) for key, entry in sorted(self._values.items())}
+
+    def set(self, key: str, value: Any, description: Optional[str] = None) -> None:
+        """
+        Write a setting and bump the settings version in one transaction.
+
+        Args:
+            key: Setting key
+            value: New value (stored as a string)
+            description: Optional description (kept as-is for existing settings)
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                INSERT INTO game_settings (key, value, description, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (key, str(value), description)
+            )
+            conn.execute("UPDATE game_settings_version SET version = version + 1 WHERE id = 1")
+            version_row = conn.execute("SELECT version FROM game_settings_version WHERE id = 1").fetchone()
+            conn.commit()
+        finally:
+            conn.close()
+        self.stats["writes"] += 1
+        new_version = version_row["version"] if version_row else None
+        if self._version is None or new_version != self._version + 1:
+            # Another worker wrote in between (or we never loaded): take the full table
+            self.load()
+            return
+        with self._lock:
+            entry = self._values.setdefault(key, {"value": None, "description": description})
+            entry["value"] = str(value)
+            self._version = new_version
+
+
+# Global settings service instance
+_settings_service: Optional[SettingsService] = None
+
+
+def get_settings_service(connect_fn: Optional[Callable] = None) -> SettingsService:
+    """
+    Get global settings service instance.
+
+    Args:
+        connect_fn: Database connection factory (required on first call)
+
+    Returns:
+        SettingsService instance
+    """
+    global _settings_service
+    if _settings_service is None:
+        if connect_fn is None:
+            raise ValueError("get_settings_service() needs connect_fn on first use")
+        _settings_service = SettingsService(connect_fn)
+    return _settings_service
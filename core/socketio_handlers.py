@@ -13,6 +13,10 @@ from flask import session, request
 from flask_socketio import emit, join_room, leave_room
 from core.event_bus import get_event_bus, EventTypes
 from core.state_manager import get_state_manager
+from core.persistence import mark_player_dirty
+from core.room_index import get_room_index
+from core.message_buffer import get_message_buffers
+from game.world.manager import WorldManager
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +29,34 @@ CONNECTION_STATE = {}
 DISCONNECTED_PLAYERS = {}
 
 
+def push_messages(socketio, username):
+    """
+    Send a connected player's undelivered messages over SocketIO.
+    
+    Registered as a message buffer listener, so room broadcasts, tells and
+    notifications reach WebSocket clients as they are posted. Each message
+    carries its sequence number; it counts as delivered once emitted, so
+    /poll and /command will not send it again.
+    
+    Args:
+        socketio: Flask-SocketIO instance
+        username: Player to deliver to
+    
+    Returns:
+        int: Number of messages sent
+    """
+    if not CONNECTION_STATE.get(username, {}).get("is_connected", False):
+        return 0
+    entries = get_message_buffers().get(username).take()
+    for seq, text in entries:
+        socketio.emit('room_message', {
+            'message': text,
+            'message_type': 'system',
+            'seq': seq
+        }, room=f"user:{username}")
+    return len(entries)
+
+
 def register_socketio_handlers(socketio, get_game_fn, handle_command_fn, save_game_fn, active_games, active_sessions):
     """
     Register all SocketIO event handlers.
@@ -138,6 +170,9 @@ def register_socketio_handlers(socketio, get_game_fn, handle_command_fn, save_ga
             'is_reconnect': is_reconnect
         })
         
+        # Deliver anything posted while the player was not connected
+        push_messages(socketio, username)
+        
         return True
     
     @socketio.on('disconnect')
@@ -222,30 +257,10 @@ def register_socketio_handlers(socketio, get_game_fn, handle_command_fn, save_ga
                 return
             
             # Create broadcast function for room messages
-            # CRITICAL: Exclude sender from broadcasts so they don't see their own movement/action messages
-            # Flask's request object is available in SocketIO handlers and contains request.sid
-            try:
-                current_sid = request.sid  # Get current socket session ID from Flask request
-            except AttributeError:
-                # Fallback if request.sid is not available (shouldn't happen in SocketIO context)
-                current_sid = None
-                logger.warning("Could not get request.sid, broadcasts will include sender")
-            
             def broadcast_fn(room_id, text):
-                """Broadcast message to room via SocketIO, excluding the sender."""
-                if current_sid:
-                    socketio.emit('room_message', {
-                        'room_id': room_id,
-                        'message': text,
-                        'message_type': 'system'
-                    }, room=f"room:{room_id}", skip_sid=current_sid)
-                else:
-                    # Fallback: broadcast to all (if we couldn't get sid)
-                    socketio.emit('room_message', {
-                        'room_id': room_id,
-                        'message': text,
-                        'message_type': 'system'
-                    }, room=f"room:{room_id}")
+                """Broadcast to the other players in a room (polling and WebSocket clients alike)."""
+                from app import broadcast_to_room
+                broadcast_to_room(username, room_id, text)
             
             # Get database connection for AI token tracking
             from app import get_db
@@ -331,18 +346,8 @@ def register_socketio_handlers(socketio, get_game_fn, handle_command_fn, save_ga
                         # Check if this player has notify login enabled
                         notify_settings = g.get("notify", {})
                         if notify_settings.get("login", False):
-                            logout_msg = f"{username} has logged out."
-                            g.setdefault("log", [])
-                            g["log"].append(logout_msg)
-                            g["log"] = g["log"][-50:]
-                            save_game_fn(g)
-                            
-                            # Also send via SocketIO if they're connected
-                            socketio.emit('room_message', {
-                                'room_id': g.get('location'),
-                                'message': logout_msg,
-                                'message_type': 'system'
-                            }, room=f"user:{uname}")
+                            # Pushed over SocketIO if they're connected
+                            get_message_buffers().post(uname, f"{username} has logged out.")
                     
                     # Remove from disconnected players (statue) if present (deliberate logout, not disconnect)
                     if username in DISCONNECTED_PLAYERS:
@@ -360,6 +365,10 @@ def register_socketio_handlers(socketio, get_game_fn, handle_command_fn, save_ga
                     # Remove from active games and sessions FIRST
                     ACTIVE_GAMES.pop(username, None)
                     ACTIVE_SESSIONS.pop(username, None)
+                    get_room_index().remove(username)
+                    mark_player_dirty(username)
+                    WorldManager.get_instance().evict_player(username)
+                    get_message_buffers().drop(username)
                     
                     # Clean up Redis room tracking in background to avoid blocking
                     def cleanup_on_logout():
@@ -416,6 +425,10 @@ def register_socketio_handlers(socketio, get_game_fn, handle_command_fn, save_ga
                 # Save game state
                 save_game_fn(game)
                 
+                # The response below delivers the command's echo and response from the buffer
+                messages = get_message_buffers().get(username)
+                messages.mark_delivered(messages.last_seq)
+                
                 # Emit command response
                 emit('command_response', {
                     'command': command,
@@ -535,6 +548,8 @@ def register_socketio_handlers(socketio, get_game_fn, handle_command_fn, save_ga
                             
                             # Update connection state (next command will be rejected)
                             CONNECTION_STATE[username]["is_connected"] = False
+                            WorldManager.get_instance().evict_player(username)
+                            get_message_buffers().drop(username)
                             
                             # Force disconnect the socket
                             sid = state.get("sid")
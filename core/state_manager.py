@@ -17,6 +17,7 @@ from core.redis_manager import (
     get_cached_state,
     set_cached_state,
     delete_cached_state,
+    redis_batch,
 )
 from core.event_bus import get_event_bus, EventTypes
 
@@ -48,6 +49,8 @@ class GameStateManager:
             self._cache = None
         self._db_get = db_get_fn
         self._db_save = db_save_fn
+        # Last location this process wrote to Redis per player (for room set moves)
+        self._published_locations: Dict[str, str] = {}
         try:
             self._event_bus = get_event_bus()
         except Exception as e:
@@ -76,11 +79,11 @@ class GameStateManager:
             try:
                 state = self._db_get(username)
                 if state:
-                    # Cache it for next time
-                    set_cached_state(CacheKeys.player_state(username), state, ttl=900)
-                    # Also cache location
-                    if "location" in state:
-                        set_cached_state(CacheKeys.player_location(username), state["location"], ttl=900)
+                    # Cache it (and its location) for next time in one round trip
+                    with redis_batch():
+                        set_cached_state(CacheKeys.player_state(username), state, ttl=900)
+                        if "location" in state:
+                            set_cached_state(CacheKeys.player_location(username), state["location"], ttl=900)
                     return state
             except Exception as e:
                 logger.error(f"Error loading player state from DB for {username}: {e}")
@@ -103,15 +106,21 @@ class GameStateManager:
         """
         success = True
         
-        # Update cache
+        # Update cache (state, location and room sets in one pipelined round trip)
         if use_cache and self._cache:
             try:
-                set_cached_state(CacheKeys.player_state(username), state, ttl=900)
-                # Also cache location separately for quick room queries
-                if "location" in state:
-                    set_cached_state(CacheKeys.player_location(username), state["location"], ttl=900)
-                    # Update room player set
-                    self._update_room_players(state["location"], username)
+                with redis_batch() as batch:
+                    batch.set_state(CacheKeys.player_state(username), state, ttl=900)
+                    # Also cache location separately for quick room queries
+                    if "location" in state:
+                        room_id = state["location"]
+                        batch.set_state(CacheKeys.player_location(username), room_id, ttl=900)
+                        # Move the player between room player sets
+                        old_room_id = self._published_locations.get(username)
+                        if old_room_id and old_room_id != room_id:
+                            batch.srem(CacheKeys.room_players(old_room_id), username)
+                        self._update_room_players(room_id, username)
+                        self._published_locations[username] = room_id
             except Exception as e:
                 logger.error(f"Error caching player state for {username}: {e}")
                 success = False
@@ -210,10 +219,11 @@ class GameStateManager:
         """
         try:
             key = CacheKeys.room_players(room_id)
-            # Add player to room set
-            self._cache.sadd(key, username)
-            # Set expiry on the set (expires if no players for 1 hour)
-            self._cache.expire(key, 3600)
+            with redis_batch() as batch:
+                # Add player to room set
+                batch.sadd(key, username)
+                # Set expiry on the set (expires if no players for 1 hour)
+                batch.expire(key, 3600)
         except Exception as e:
             logger.debug(f"Error updating room players: {e}")
     
@@ -227,7 +237,10 @@ class GameStateManager:
         """
         try:
             key = CacheKeys.room_players(room_id)
-            self._cache.srem(key, username)
+            with redis_batch() as batch:
+                batch.srem(key, username)
+            if self._published_locations.get(username) == room_id:
+                self._published_locations.pop(username, None)
         except Exception as e:
             logger.debug(f"Error removing player from room: {e}")
     
@@ -244,16 +257,17 @@ class GameStateManager:
             True if successful
         """
         try:
-            # Update player state location
-            state = self.get_player_state(username)
-            if state:
-                state["location"] = new_room_id
-                self.save_player_state(username, state, sync_to_db=False)  # Batch DB writes
-            
-            # Update room player sets
-            if old_room_id:
-                self.remove_player_from_room(old_room_id, username)
-            self._update_room_players(new_room_id, username)
+            with redis_batch():
+                # Update player state location
+                state = self.get_player_state(username)
+                if state:
+                    state["location"] = new_room_id
+                    self.save_player_state(username, state, sync_to_db=False)  # Batch DB writes
+                
+                # Update room player sets
+                if old_room_id:
+                    self.remove_player_from_room(old_room_id, username)
+                self._update_room_players(new_room_id, username)
             
             # Emit move event
             self._event_bus.publish_room(
@@ -278,10 +292,12 @@ class GameStateManager:
         Args:
             username: Player username
         """
+        self._published_locations.pop(username, None)
         try:
-            delete_cached_state(CacheKeys.player_state(username))
-            delete_cached_state(CacheKeys.player_location(username))
-            delete_cached_state(CacheKeys.player_session(username))
+            with redis_batch():
+                delete_cached_state(CacheKeys.player_state(username))
+                delete_cached_state(CacheKeys.player_location(username))
+                delete_cached_state(CacheKeys.player_session(username))
         except Exception as e:
             logger.debug(f"Error invalidating cache for {username}: {e}")
 
@@ -7,6 +7,12 @@ Provides clean, maintainable WebSocket handling with:
 - Event broadcasting
 - Reconnection handling
 - Clear separation of concerns
+
+Events from Redis arrive over one shared subscriber per process
+(core.pubsub_multiplexer): a channel is subscribed while at least one local
+connection needs it, and each event is fanned out in memory to the local
+connections on that channel. When the event bus runs without Redis, the
+same fan-out subscribes on the in-process broker (core.local_broker) instead.
 """
 
 import json
@@ -17,6 +23,8 @@ from datetime import datetime
 from collections import defaultdict
 from core.redis_manager import get_pubsub_connection
 from core.event_bus import get_event_bus, EventTypes
+from core.pubsub_multiplexer import PubSubMultiplexer
+from core.local_broker import LocalSubscriber
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +58,20 @@ class WebSocketConnection:
         Args:
             message: Message dict (will be JSON encoded)
             
+        Returns:
+            True if sent successfully, False otherwise
+        """
+        if not self.connected:
+            return False
+        return await self.send_text(json.dumps(message))
+    
+    async def send_text(self, message_json: str) -> bool:
+        """
+        Send an already JSON-encoded message (encoded once for a whole fan-out).
+        
+        Args:
+            message_json: JSON text
+            
         Returns:
             True if sent successfully, False otherwise
         """
@@ -57,7 +79,6 @@ class WebSocketConnection:
             return False
         
         try:
-            message_json = json.dumps(message)
             await self.websocket.send(message_json)
             self.last_activity = datetime.utcnow()
             return True
@@ -120,13 +141,26 @@ class WebSocketManager:
     - Manage connection lifecycle
     """
     
-    def __init__(self):
-        """Initialize manager."""
+    def __init__(self, subscriber: Optional[Any] = None):
+        """
+        Initialize manager.
+        
+        Args:
+            subscriber: Shared subscriber (defaults to one for this process, on
+                        Redis or on the in-process broker, following the event bus)
+        """
         self._connections: Dict[str, WebSocketConnection] = {}  # username -> connection
         self._room_connections: Dict[str, Set[str]] = defaultdict(set)  # room_id -> set of usernames
+        self._channel_members: Dict[str, Set[str]] = defaultdict(set)  # channel -> usernames subscribed locally
         self._event_bus = get_event_bus()
-        self._redis = get_pubsub_connection()
-        self._pubsub = None
+        if subscriber is None:
+            if self._event_bus.backend == "local":
+                subscriber = LocalSubscriber(self._event_bus.local)
+            else:
+                subscriber = PubSubMultiplexer(connect_fn=lambda: get_pubsub_connection(binary=True))
+        self._subscriber = subscriber
+        self._subscriber.handler = self._on_event
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
     async def connect(self, websocket, username: str) -> WebSocketConnection:
         """
@@ -148,14 +182,17 @@ class WebSocketManager:
         conn = WebSocketConnection(websocket, username)
         self._connections[username] = conn
         
+        # Events are fanned out on this loop; the shared subscriber starts with the first connection
+        self._loop = asyncio.get_running_loop()
+        if not self._subscriber.running:
+            self._subscriber.start()
+        
         # Subscribe to user-specific events
         conn.subscribe_user()
+        self._join_channel(conn, f"user:{username}")
         
         logger.info(f"WebSocket connected: {username}")
         
-        # Start listening for events
-        asyncio.create_task(self._listen_for_events(conn))
-        
         return conn
     
     async def disconnect(self, connection: WebSocketConnection) -> None:
@@ -174,10 +211,12 @@ class WebSocketManager:
             if not self._room_connections[room_id]:
                 del self._room_connections[room_id]
         
-        # Remove connection
-        if username in self._connections:
+        # Remove connection (unless it was already replaced by a newer one)
+        if self._connections.get(username) is connection:
             del self._connections[username]
         
+        for channel in list(connection.subscribed_channels):
+            self._leave_channel(connection, channel)
         connection.connected = False
         connection.unsubscribe_all()
         
@@ -196,10 +235,14 @@ class WebSocketManager:
         # Leave old room
         if old_room:
             self._room_connections[old_room].discard(connection.username)
+            if old_room != room_id:
+                connection.subscribed_channels.discard(f"room:{old_room}")
+                self._leave_channel(connection, f"room:{old_room}")
         
         # Join new room
         connection.subscribe_room(room_id)
         self._room_connections[room_id].add(connection.username)
+        self._join_channel(connection, f"room:{room_id}")
         
         logger.info(f"{connection.username} moved to room: {room_id}")
     
@@ -250,44 +293,60 @@ class WebSocketManager:
         
         return count
     
-    async def _listen_for_events(self, connection: WebSocketConnection) -> None:
+    def _join_channel(self, connection: WebSocketConnection, channel: str) -> None:
+        """Add a connection to a channel's local fan-out (subscribing the process if first)."""
+        members = self._channel_members[channel]
+        if connection.username in members:
+            return
+        members.add(connection.username)
+        if self._subscriber.acquire(channel):
+            # Publish to it again right away even if it recently had no subscribers
+            self._event_bus.channel_subscribed(channel)
+    
+    def _leave_channel(self, connection: WebSocketConnection, channel: str) -> None:
+        """Remove a connection from a channel's local fan-out (unsubscribing if last)."""
+        members = self._channel_members.get(channel)
+        if not members or connection.username not in members:
+            return
+        members.discard(connection.username)
+        if not members:
+            del self._channel_members[channel]
+        self._subscriber.release(channel)
+    
+    def _on_event(self, channel: str, event: Dict[str, Any]) -> None:
         """
-        Listen for events for a connection (runs in background).
+        Handle an event from the shared subscriber (runs on the listener
+        thread, or on the publishing thread for the in-process broker).
         
-        Args:
-            connection: Connection to listen for
+        Encodes the client message once and schedules the fan-out on the event loop.
         """
-        try:
-            # Subscribe to Redis pub/sub channels
-            pubsub = self._redis.pubsub()
-            
-            for channel in connection.subscribed_channels:
-                pubsub.subscribe(channel)
-            
-            # Listen for messages
-            async for message in pubsub.listen():
-                if not connection.connected:
-                    break
-                
-                if message["type"] == "message":
-                    try:
-                        event = json.loads(message["data"])
-                        # Send to connection
-                        await connection.send({
-                            "type": "event",
-                            "event": event
-                        })
-                    except Exception as e:
-                        logger.error(f"Error processing event for {connection.username}: {e}")
-            
-            # Clean up
-            pubsub.unsubscribe()
-            pubsub.close()
+        loop = self._loop
+        if loop is None or loop.is_closed() or channel not in self._channel_members:
+            return
+        message_json = json.dumps({"type": "event", "event": event})
+        asyncio.run_coroutine_threadsafe(self._fan_out(channel, message_json), loop)
+    
+    async def _fan_out(self, channel: str, message_json: str) -> int:
+        """
+        Send an encoded event to every local connection on a channel.
+        
+        Args:
+            channel: Channel the event arrived on
+            message_json: Encoded client message
             
-        except Exception as e:
-            logger.error(f"Error in event listener for {connection.username}: {e}")
-        finally:
-            await self.disconnect(connection)
+        Returns:
+            Number of connections that received it
+        """
+        count = 0
+        for username in list(self._channel_members.get(channel, ())):
+            conn = self._connections.get(username)
+            if conn is not None and await conn.send_text(message_json):
+                count += 1
+        return count
+    
+    def get_subscriber_stats(self) -> Dict[str, Any]:
+        """Shared subscriber counters (connections, channels, messages)."""
+        return self._subscriber.get_stats()
     
     def get_connection(self, username: str) -> Optional[WebSocketConnection]:
         """Get connection for username."""
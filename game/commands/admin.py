@@ -2,6 +2,7 @@
 Admin Commands - Commands for administrators and testing.
 """
 from typing import Tuple, Dict, Any, Optional, List
+from core.persistence import mark_section_dirty
 
 def handle_setweather_command(
     verb: str,
@@ -49,11 +50,13 @@ Examples:
     if weather_type == "unlock":
         from game.state import WEATHER_STATE
         WEATHER_STATE['locked'] = False
+        mark_section_dirty("weather_state")
         return "Weather unlocked. Automatic transitions are now enabled.", game
     
     if weather_type == "lock":
         from game.state import WEATHER_STATE
         WEATHER_STATE['locked'] = True
+        mark_section_dirty("weather_state")
         return "Weather locked. Automatic transitions are now disabled.", game
     
     intensity = tokens[2].lower() if len(tokens) > 2 else "moderate"
@@ -80,6 +83,7 @@ Examples:
     # Preserve temperature if it exists, otherwise use default
     if 'temperature' not in WEATHER_STATE:
         WEATHER_STATE['temperature'] = 'mild'
+    mark_section_dirty("weather_state")
     
     # Update the Atmospheric Manager's WeatherSystem to match
     from game.systems.atmospheric_manager import get_atmospheric_manager
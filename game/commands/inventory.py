@@ -9,7 +9,6 @@ Handles commands related to inventory management:
 """
 
 from typing import Tuple, Dict, Any, List, Optional
-from game.models.player import Player
 from game.world.manager import WorldManager
 from game.utils import colors
 from game.state import (
@@ -42,8 +41,7 @@ def handle_inventory_command(
     Usage: inventory [sort <name|weight|type>]
     """
     # Bridge to OO System
-    player = Player(username or "adventurer")
-    player.load_from_state(game)
+    player = WorldManager.get_instance().get_player(username, game)
     
     response_parts = []
     
@@ -139,8 +137,7 @@ def handle_take_command(
     
     wm = WorldManager.get_instance()
     room = wm.get_room(loc_id)
-    player = Player(username or "adventurer")
-    player.load_from_state(game)
+    player = WorldManager.get_instance().get_player(username, game)
     
     response = ""
     
@@ -225,8 +222,7 @@ def handle_drop_command(
     
     wm = WorldManager.get_instance()
     room = wm.get_room(loc_id)
-    player = Player(username or "adventurer")
-    player.load_from_state(game)
+    player = WorldManager.get_instance().get_player(username, game)
     
     response = ""
     
@@ -6,7 +6,7 @@ Handles commands related to player settings and status:
 """
 
 from typing import Tuple, Dict, Any, List, Optional
-from game.models.player import Player
+from game.world.manager import WorldManager
 
 def handle_description_command(
     verb: str,
@@ -24,8 +24,7 @@ def handle_description_command(
     """
     if len(tokens) < 2:
         # Show current description with helpful guidance
-        player = Player(username or "adventurer")
-        player.load_from_state(game)
+        player = WorldManager.get_instance().get_player(username, game)
         
         help_text = """
 HOW TO WRITE YOUR DESCRIPTION:
@@ -65,8 +64,7 @@ BAD EXAMPLES:
         new_description = new_description[3:]
     
     # Update game state
-    player = Player(username or "adventurer")
-    player.load_from_state(game)
+    player = WorldManager.get_instance().get_player(username, game)
     
     player.user_description = new_description
     game["user_description"] = new_description
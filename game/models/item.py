@@ -5,6 +5,22 @@ Inspired by Discworld MUDlib's /std/object and /obj structure.
 from typing import Dict, Any, List, Optional
 from game.models.base import GameObject
 from game.systems.inventory_system import InventorySystem
+from game.systems.inventory import ItemPrototype
+
+
+class ItemState:
+    """
+    Decay state of an item that rots (currently only corpses), created on demand.
+    
+    Items that never decay don't allocate one.
+    """
+    
+    __slots__ = ("decay_ticks", "decay_stage")
+    
+    def __init__(self, decay_ticks: Optional[int] = None, decay_stage: int = 0):
+        self.decay_ticks = decay_ticks
+        self.decay_stage = decay_stage
+
 
 class Item(GameObject):
     """Represents an item in the game world."""
@@ -26,6 +42,17 @@ class Item(GameObject):
         
         # Visibility/State
         self.is_held: bool = False
+        
+        # Shared definition and decay state (see ItemState)
+        self.prototype: Optional[ItemPrototype] = None
+        self._state: Optional[ItemState] = None
+
+    @property
+    def state(self) -> ItemState:
+        """Decay state, created on first use."""
+        if self._state is None:
+            self._state = ItemState()
+        return self._state
 
     @property
     def total_weight(self) -> float:
@@ -35,14 +62,51 @@ class Item(GameObject):
             return base + self.inventory.current_weight
         return base
         
+    @classmethod
+    def from_prototype(cls, prototype: ItemPrototype) -> 'Item':
+        """
+        Create an item of this class from its shared prototype.
+        
+        The first item of each (class, prototype) pair is built normally and its
+        attributes remembered; later ones copy those attributes in one step.
+        Every item, the first included, gets its own mutable containers so
+        none of them share the remembered template's.
+        """
+        attrs = prototype.hydrated.get(cls)
+        if attrs is None:
+            item = cls(prototype.item_id, prototype.name)
+            item.load_from_prototype(prototype)
+            prototype.hydrated[cls] = dict(item.__dict__)
+            item._copy_mutable_state()
+            return item
+        item = cls.__new__(cls)
+        item.__dict__.update(attrs)
+        item._copy_mutable_state()
+        return item
+    
+    def _copy_mutable_state(self):
+        """Give an item copied by from_prototype() its own mutable containers."""
+        self.flags = list(self.flags)
+        self.properties = dict(self.properties)
+        self.contents = []
+        self.adjectives = list(self.adjectives)
+        if self._state is not None:
+            self._state = ItemState(self._state.decay_ticks, self._state.decay_stage)
+    
     def load_from_def(self, item_def: Dict[str, Any]):
-        """Hydrate item from ITEM_DEFS definition."""
-        self.name = item_def.get("name", self.name)
+        """Hydrate item from an ITEM_DEFS-style definition dict."""
+        self.load_from_prototype(ItemPrototype(self.oid, item_def))
+    
+    def load_from_prototype(self, prototype: ItemPrototype):
+        """Hydrate item from its shared prototype (no parsing; fields are precomputed)."""
+        item_def = prototype.definition
+        self.prototype = prototype
+        self.name = prototype.name
         self.description = item_def.get("description", "")
-        self.item_type = item_def.get("type", "misc")
-        self.weight = item_def.get("weight", 0.1)
-        self.value = item_def.get("value", 0)
-        self.droppable = item_def.get("droppable", True)
+        self.item_type = prototype.item_type
+        self.weight = prototype.weight
+        self.value = prototype.value
+        self.droppable = prototype.droppable
         
         # Load immersion fields
         self.detailed_description = item_def.get("detailed_description", "")
@@ -50,15 +114,13 @@ class Item(GameObject):
         self.is_held = item_def.get("is_held", False)
         
         # Handle flags
-        flags = item_def.get("flags", [])
-        self.stackable = "stackable" in flags
-        if "quest" in flags:
+        self.stackable = prototype.stackable
+        if prototype.is_quest:
             self.flags.append("quest")
             
-        # Parse adjectives from name if not provided
-        if not self.adjectives and " " in self.name:
-            parts = self.name.split()
-            self.adjectives = parts[:-1] # All but the last word are adjectives
+        # Adjectives from name if not provided
+        if not self.adjectives:
+            self.adjectives = list(prototype.adjectives)
     
     def can_be_taken(self, by_entity: 'GameObject') -> tuple[bool, str]:
         """
@@ -103,6 +165,11 @@ class Container(Item):
         self.locked: bool = False
         self.key_id: Optional[str] = None
         
+    def _copy_mutable_state(self):
+        super()._copy_mutable_state()
+        template = self.inventory
+        self.inventory = InventorySystem(self, max_weight=template.max_weight, max_items=template.max_items)
+        
     def add_item(self, item: Item) -> bool:
         """Add item to container. Returns False if full."""
         return self.inventory.add(item)
@@ -117,10 +184,10 @@ class Weapon(Item):
         self.damage: int = 1
         self.weapon_type: str = "blunt" # slash, pierce, blunt
         
-    def load_from_def(self, item_def: Dict[str, Any]):
-        super().load_from_def(item_def)
-        self.damage = item_def.get("damage", 1)
-        self.weapon_type = item_def.get("weapon_type", "blunt")
+    def load_from_prototype(self, prototype: ItemPrototype):
+        super().load_from_prototype(prototype)
+        self.damage = prototype.definition.get("damage", 1)
+        self.weapon_type = prototype.definition.get("weapon_type", "blunt")
 
 class Armor(Item):
     def __init__(self, oid: str, name: str, description: str = ""):
@@ -128,10 +195,10 @@ class Armor(Item):
         self.ac: int = 1
         self.slot: str = "body" # head, body, legs, feet, hands
         
-    def load_from_def(self, item_def: Dict[str, Any]):
-        super().load_from_def(item_def)
-        self.ac = item_def.get("ac", 1)
-        self.slot = item_def.get("slot", "body")
+    def load_from_prototype(self, prototype: ItemPrototype):
+        super().load_from_prototype(prototype)
+        self.ac = prototype.definition.get("ac", 1)
+        self.slot = prototype.definition.get("slot", "body")
 
 class Consumable(Item):
     def __init__(self, oid: str, name: str, description: str = ""):
@@ -139,10 +206,14 @@ class Consumable(Item):
         self.effects: Dict[str, Any] = {}
         self.charges: int = 1
         
-    def load_from_def(self, item_def: Dict[str, Any]):
-        super().load_from_def(item_def)
-        self.effects = item_def.get("effects", {})
-        self.charges = item_def.get("charges", 1)
+    def load_from_prototype(self, prototype: ItemPrototype):
+        super().load_from_prototype(prototype)
+        self.effects = prototype.definition.get("effects", {})
+        self.charges = prototype.definition.get("charges", 1)
+
+    def _copy_mutable_state(self):
+        super()._copy_mutable_state()
+        self.effects = dict(self.effects)
 
     def tick(self):
         """Called periodically to update item state."""
@@ -151,8 +222,23 @@ class Consumable(Item):
 class Corpse(Container):
     def __init__(self, oid: str, name: str, description: str = ""):
         super().__init__(oid, name, description)
-        self.decay_ticks: int = 60 # Default decay time (e.g. 5 minutes if tick is 5s)
-        self.decay_stage: int = 0
+        self.state.decay_ticks = 60 # Default decay time (e.g. 5 minutes if tick is 5s)
+
+    @property
+    def decay_ticks(self) -> int:
+        return self.state.decay_ticks
+
+    @decay_ticks.setter
+    def decay_ticks(self, value: int):
+        self.state.decay_ticks = value
+
+    @property
+    def decay_stage(self) -> int:
+        return self.state.decay_stage
+
+    @decay_stage.setter
+    def decay_stage(self, value: int):
+        self.state.decay_stage = value
         
     def tick(self):
         self.decay_ticks -= 1
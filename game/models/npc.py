@@ -4,6 +4,7 @@ NPC Model
 from typing import Dict, List, Optional, Any, TYPE_CHECKING, Tuple
 from game.models.entity import Entity
 from game.systems.weather import WeatherStatusTracker
+from game.systems.world_clock import get_world_clock
 
 if TYPE_CHECKING:
     from game.models.player import Player
@@ -73,11 +74,9 @@ class NPC(Entity):
         
         is_outdoor = getattr(self.location, 'outdoor', False)
         weather_state = atmos_manager.weather.get_state()
-        day_of_year = atmos_manager.time.get_day_of_year()
-        season = atmos_manager.seasons.get_season(day_of_year)
-        current_tick = atmos_manager.time.get_current_tick()
+        clock = get_world_clock().snapshot()
         
-        self.weather_status.update(current_tick, is_outdoor, weather_state, season)
+        self.weather_status.update(clock.tick, is_outdoor, weather_state, clock.season)
     
     def get_weather_description(self, pronoun: str = None) -> str:
         """Get weather status description for this NPC."""
@@ -229,6 +228,14 @@ class NPC(Entity):
         # Remove NPC from room
         if self.oid in self.location.npcs:
             self.location.npcs.remove(self.oid)
+        
+        # Record the death in NPC_STATE and the location index
+        from game_engine import NPC_STATE, mark_npc_dirty
+        from game.world.npc_index import get_npc_index
+        if self.oid in NPC_STATE:
+            NPC_STATE[self.oid]["alive"] = False
+            mark_npc_dirty(self.oid)
+        get_npc_index().set_alive(self.oid, False)
     def receive_item(self, giver: 'Entity', item_obj: 'Item', game_state: Dict[str, Any]) -> str:
         """
         Handle receiving an item from an entity.
@@ -1,12 +1,18 @@
+import copy
 from typing import Dict, List, Optional, Any, Tuple, TYPE_CHECKING
 from game.models.entity import Entity
 from game.systems.inventory_system import InventorySystem
 from game.systems.weather import WeatherStatusTracker
+from game.systems.world_clock import get_world_clock
 
 if TYPE_CHECKING:
     from game.models.room import Room
     from game.models.npc import NPC
 
+# Sections refresh_from_state() can resync independently
+REFRESH_SECTIONS = ("location", "inventory", "reputation", "quests", "scalars", "weather")
+
+
 class Player(Entity):
     def __init__(self, username: str):
         """Initialize player with a username and default attributes."""
@@ -34,6 +40,9 @@ class Player(Entity):
         
         self.npc_memory: Dict[str, List[Dict]] = {}
         
+        # Legacy quest dict the live Quest objects were built from (None until first load)
+        self._quests_source: Optional[Dict[str, Any]] = None
+        
         # RPG Stats
         self.level: int = 1
         self.xp: int = 0
@@ -76,14 +85,84 @@ class Player(Entity):
         from game.world.manager import WorldManager
         self.location: Optional[Room] = WorldManager.get_instance().get_room(location_oid)
         
-        char_data = state.get("character", {})
-        self.race = char_data.get("race", "human")
-        self.gender = char_data.get("gender", "unknown")
-        self.backstory = char_data.get("backstory", "")
-        self.user_description = state.get("user_description", "")
+        self._load_inventory(state)
         
-        if "stats" in char_data:
-            self.stats.update(char_data["stats"])
+        # Load Reputation
+        rep_data = state.get("reputation", {})
+        self.reputation.initialize(rep_data)
+        
+        self._load_quests(state)
+        self._load_scalars(state)
+        
+        # Load weather status
+        if "weather_status" in state:
+            self.weather_status.from_dict(state["weather_status"])
+
+    def refresh_from_state(self, state: Dict[str, Any], sections: Optional[Tuple[str, ...]] = None) -> None:
+        """
+        Incrementally refresh a live (cached) player from the legacy dictionary.
+        
+        Only sections that differ from the live object are rehydrated, so a
+        cached Player costs a few comparisons per command instead of a rebuild.
+        
+        Args:
+            state: Legacy game state dict
+            sections: Subset of REFRESH_SECTIONS to refresh (default: all). Code running
+                      inside a command (e.g. quest events) refreshes only what it reads,
+                      so in-flight changes on the live object are not clobbered.
+        """
+        if self._quests_source is None:
+            self.load_from_state(state)
+            return
+        sections = sections or REFRESH_SECTIONS
+        
+        if "location" in sections:
+            location_oid = state.get("location", "town_square")
+            if not self.location or self.location.oid != location_oid:
+                from game.world.manager import WorldManager
+                self.location = WorldManager.get_instance().get_room(location_oid)
+        
+        if "inventory" in sections:
+            inventory_ids = state.get("inventory", [])
+            live_ids = [item.oid if hasattr(item, 'oid') else str(item) for item in self.inventory.contents]
+            if live_ids != inventory_ids or self.max_carry_weight != state.get("max_carry_weight", 20.0):
+                self._load_inventory(state)
+        
+        if "reputation" in sections:
+            rep_data = state.get("reputation", {})
+            if (rep_data or self.reputation.defaults) != self.reputation.standings:
+                self.reputation.initialize(rep_data)
+        
+        if "quests" in sections:
+            if state.get("quests", {}) != self._quests_source:
+                self._load_quests(state)
+            self.completed_quests = state.get("completed_quests", {})
+        
+        if "scalars" in sections:
+            self._load_scalars(state)
+        
+        if "weather" in sections:
+            if "weather_status" in state and state["weather_status"] != self.weather_status.to_dict():
+                self.weather_status.from_dict(state["weather_status"])
+
+    def sync_to_state(self, state: Dict[str, Any], *sections: str) -> None:
+        """
+        Write sections of the live player back to the legacy dictionary.
+        
+        Args:
+            state: Legacy game state dict
+            *sections: to_state() keys to copy (e.g. "quests", "completed_quests")
+        """
+        updated_state = self.to_state()
+        for section in sections:
+            if section in updated_state:
+                state[section] = updated_state[section]
+        if "quests" in sections:
+            self._quests_source = copy.deepcopy(state.get("quests", {}))
+
+    def _load_inventory(self, state: Dict[str, Any]) -> None:
+        """Rebuild inventory item objects from the legacy item id list."""
+        from game.world.manager import WorldManager
         
         inventory_ids = state.get("inventory", [])
         # Clear existing inventory
@@ -97,13 +176,9 @@ class Player(Entity):
         
         self.max_carry_weight = state.get("max_carry_weight", 20.0)
         self.inventory.max_weight = self.max_carry_weight
-        
-        # Load Reputation
-        rep_data = state.get("reputation", {})
-        self.reputation.initialize(rep_data)
-        
-        self.npc_memory = state.get("npc_memory", {})
-        
+
+    def _load_quests(self, state: Dict[str, Any]) -> None:
+        """Rehydrate active Quest objects from their templates."""
         from game.systems.quest_manager import QuestManager
         from game.models.quest import Quest
         
@@ -113,10 +188,21 @@ class Player(Entity):
             template = qm.get_template(q_id)
             if template:
                 self.quests[q_id] = Quest.from_dict(q_data, template)
-            else:
-                pass
-                
         self.completed_quests = state.get("completed_quests", {})
+        self._quests_source = copy.deepcopy(state.get("quests", {}))
+
+    def _load_scalars(self, state: Dict[str, Any]) -> None:
+        """Load character data, settings and RPG stats (cheap field copies)."""
+        char_data = state.get("character", {})
+        self.race = char_data.get("race", "human")
+        self.gender = char_data.get("gender", "unknown")
+        self.backstory = char_data.get("backstory", "")
+        self.user_description = state.get("user_description", "")
+        
+        if "stats" in char_data:
+            self.stats.update(char_data["stats"])
+        
+        self.npc_memory = state.get("npc_memory", {})
         if "color_settings" in state:
             self.color_settings.update(state["color_settings"])
         
@@ -132,10 +218,6 @@ class Player(Entity):
         self.dexterity = state.get("dexterity", 10)
         self.intelligence = state.get("intelligence", 10)
         self.defense = state.get("defense", 0)
-        
-        # Load weather status
-        if "weather_status" in state:
-            self.weather_status.from_dict(state["weather_status"])
 
     def to_state(self) -> Dict[str, Any]:
         """Serialize player state for persistence."""
@@ -417,11 +499,9 @@ class Player(Entity):
         
         is_outdoor = getattr(self.location, 'outdoor', False)
         weather_state = atmos_manager.weather.get_state()
-        day_of_year = atmos_manager.time.get_day_of_year()
-        season = atmos_manager.seasons.get_season(day_of_year)
-        current_tick = atmos_manager.time.get_current_tick()
+        clock = get_world_clock().snapshot()
         
-        self.weather_status.update(current_tick, is_outdoor, weather_state, season)
+        self.weather_status.update(clock.tick, is_outdoor, weather_state, clock.season)
     
     def get_weather_description(self, pronoun: str = "they") -> str:
         """
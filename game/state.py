@@ -27,6 +27,9 @@ QUEST_SPECIFIC_ITEMS = {}
 
 
 
+# --- NPC Actions State (per-room NPC action / weather reaction timers) ---
+NPC_ACTIONS_STATE = {}
+
 # --- NPC Route Positions ---
 NPC_ROUTE_POSITIONS = {}
 
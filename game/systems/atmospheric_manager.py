@@ -9,6 +9,8 @@ from game.systems.time_system import TimeSystem
 from game.systems.season_system import SeasonSystem
 from game.systems.lunar_system import LunarSystem
 from game.systems.weather import WeatherSystem
+from game.systems.world_clock import get_world_clock
+from core.persistence import mark_section_dirty
 
 
 class AtmosphericManager:
@@ -47,16 +49,15 @@ class AtmosphericManager:
             self.weather.from_dict(weather_data)
             return False, None  # No change when locked
         
-        current_tick = self.time.get_current_tick()
-        day_of_year = self.time.get_day_of_year()
-        season = self.seasons.get_season(day_of_year)
+        clock = get_world_clock().snapshot()
         
         # Update weather (may change based on season)
-        weather_changed, transition_message = self.weather.update(current_tick, season)
+        weather_changed, transition_message = self.weather.update(clock.tick, clock.season)
         
         # Sync to global WEATHER_STATE if weather changed
         if weather_changed:
             WEATHER_STATE.update(self.weather.to_dict())
+            mark_section_dirty("weather_state")
         
         return weather_changed, transition_message
     
@@ -89,37 +90,11 @@ class AtmosphericManager:
         # DEBUG: Log after update
         logger.info(f"[WEATHER_DESC_DEBUG] After update: WEATHER_STATE={WEATHER_STATE.get('type')}, using weather_type={weather_type} (preserved from before update)")
         
-        # Use legacy time functions directly to ensure perfect sync with time command
-        from game_engine import get_current_hour_in_minutes, get_time_of_day, get_season, get_day_of_year
-        
-        # Force sync TimeSystem timestamp before using legacy functions
-        from game.state import GAME_TIME
-        if GAME_TIME.get("start_timestamp") and self.time.start_timestamp != GAME_TIME["start_timestamp"]:
-            self.time.start_timestamp = GAME_TIME["start_timestamp"]
-            self.time.from_dict({"start_timestamp": GAME_TIME["start_timestamp"]})
-        
-        # Use legacy functions for minutes/season/day, but calculate time_of_day directly to ensure correctness
-        minutes = get_current_hour_in_minutes()
-        season = get_season()
-        day_of_year = get_day_of_year()
-        
-        # Calculate time_of_day directly from minutes (don't trust legacy function)
-        from game_engine import get_sunrise_sunset_times
-        sunrise_min, sunset_min = get_sunrise_sunset_times()
-        dawn_start = max(0, sunrise_min - 30)
-        dawn_end = sunrise_min + 30
-        dusk_start = max(0, sunset_min - 30)
-        dusk_end = min(24 * 60, sunset_min + 30)
-        
-        # Calculate time_of_day directly from minutes
-        if dawn_start <= minutes < dawn_end:
-            time_of_day = "dawn"
-        elif dawn_end <= minutes < dusk_start:
-            time_of_day = "day"
-        elif dusk_start <= minutes < dusk_end:
-            time_of_day = "dusk"
-        else:
-            time_of_day = "night"
+        # Same clock snapshot as the time command, ambiance and the weather checks
+        clock = get_world_clock().snapshot()
+        minutes = clock.minute_of_day
+        season = clock.season
+        time_of_day = clock.time_of_day
         
         # Debug: Log time calculation
         hour = minutes // 60
@@ -146,8 +121,8 @@ class AtmosphericManager:
         weather_type = weather_state.get("type", "clear")
         weather_intensity = weather_state.get("intensity", "none")
         
-        moon_phase = self.lunar.get_moon_phase(day_of_year)
-        moon_desc = self.lunar.get_moon_phase_description(day_of_year)
+        moon_phase = clock.moon_phase
+        moon_desc = clock.moon_description
         
         # Daytime
         if time_of_day == "day":
@@ -250,10 +225,10 @@ class AtmosphericManager:
         """
         notifications = []
         
-        current_minutes = self.time.get_current_hour_in_minutes()
-        day_of_year = self.time.get_day_of_year()
-        season = self.seasons.get_season(day_of_year)
-        sunrise_min, sunset_min = self.time.get_sunrise_sunset_times(season)
+        clock = get_world_clock().snapshot()
+        current_minutes = clock.minute_of_day
+        season = clock.season
+        sunrise_min, sunset_min = clock.sunrise, clock.sunset
         
         weather_state = self.weather.get_state()
         wtype = weather_state["type"]
@@ -306,9 +281,7 @@ class AtmosphericManager:
         Returns:
             str: Weather-modified description
         """
-        day_of_year = self.time.get_day_of_year()
-        season = self.seasons.get_season(day_of_year)
-        time_of_day = self.time.get_time_of_day(season)
+        time_of_day = get_world_clock().snapshot().time_of_day
         
         return self.weather.apply_to_description(description, time_of_day)
     
@@ -340,7 +313,7 @@ _atmospheric_manager: Optional[AtmosphericManager] = None
 def get_atmospheric_manager() -> AtmosphericManager:
     """Get or create the global atmospheric manager instance."""
     global _atmospheric_manager
-    from game.state import WEATHER_STATE, GAME_TIME
+    from game.state import WEATHER_STATE
     
     if _atmospheric_manager is None:
         _atmospheric_manager = AtmosphericManager()
@@ -349,17 +322,6 @@ def get_atmospheric_manager() -> AtmosphericManager:
         if WEATHER_STATE:
             _atmospheric_manager.weather.from_dict(WEATHER_STATE)
     
-    # ALWAYS sync TimeSystem start_timestamp with GAME_TIME (ensure they're always in sync)
-    # Priority: Use GAME_TIME if it exists and is valid, otherwise use TimeSystem's timestamp
-    if GAME_TIME and "start_timestamp" in GAME_TIME and GAME_TIME["start_timestamp"]:
-        # Sync TimeSystem to GAME_TIME (legacy system is the source of truth)
-        if _atmospheric_manager.time.start_timestamp != GAME_TIME["start_timestamp"]:
-            _atmospheric_manager.time.from_dict({"start_timestamp": GAME_TIME["start_timestamp"]})
-    else:
-        # Sync GAME_TIME to TimeSystem's timestamp (newer system provides timestamp)
-        if _atmospheric_manager.time.start_timestamp:
-            GAME_TIME["start_timestamp"] = _atmospheric_manager.time.start_timestamp
-    
     return _atmospheric_manager
 
 def sync_weather_state():
@@ -368,3 +330,4 @@ def sync_weather_state():
     atmos = get_atmospheric_manager()
     weather_data = atmos.weather.to_dict()
     WEATHER_STATE.update(weather_data)
+    mark_section_dirty("weather_state")
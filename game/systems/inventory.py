@@ -4,9 +4,12 @@ Inventory System - Manages item definitions, weights, and inventory logic.
 This module centralizes all item-related functionality, replacing the legacy
 implementations in game_engine.py.
 """
-from typing import Dict, List, Tuple, Optional, Any
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Optional, Any, Mapping
 from collections import Counter
 
+from game.world.name_index import NameIndex, normalize
+
 # Global item definitions registry
 # In a future iteration, this could be loaded from JSON files
 ITEM_DEFS = {
@@ -166,7 +169,124 @@ MAX_ROOM_ITEMS = 50  # Maximum number of items a room can hold
 MAX_ROOM_WEIGHT = 100.0  # Maximum total weight (kg) a room can hold
 
 
-def get_item_def(item_id: str) -> Dict[str, Any]:
+class ItemPrototype:
+    """
+    Immutable, pre-normalised view of one item definition (flyweight).
+    
+    Built once per item id and shared by every copy of the item, so lookups
+    don't copy ITEM_DEFS or re-derive names, weights and flags.
+    """
+    
+    __slots__ = (
+        "item_id", "source", "definition", "name", "name_lower", "id_lower",
+        "id_spaced", "id_words", "item_type", "weight", "value", "droppable",
+        "flags", "stackable", "is_quest", "adjectives", "article_name", "plural_name",
+        "hydrated",
+    )
+    
+    def __init__(self, item_id: str, source: Optional[Dict[str, Any]] = None):
+        """
+        Build a prototype.
+        
+        Args:
+            item_id: The item identifier
+            source: The ITEM_DEFS entry (None for unknown items)
+        """
+        if source is not None:
+            definition = dict(source)
+            # Ensure droppable defaults to True if not specified
+            definition.setdefault("droppable", True)
+            # Ensure weight is set (default 0.1 kg for unknown items)
+            definition.setdefault("weight", 0.1)
+        else:
+            # Fallback for unknown items
+            definition = {
+                "name": item_id.replace("_", " "),
+                "type": "misc",
+                "description": "",
+                "weight": 0.1,  # Default weight in kg
+                "flags": [],
+                "droppable": True,  # Default to droppable
+            }
+        definition["flags"] = tuple(definition.get("flags") or ())
+        
+        self.item_id = item_id
+        self.source = source
+        self.definition: Mapping[str, Any] = MappingProxyType(definition)
+        self.id_lower = item_id.lower()
+        self.id_spaced = item_id.replace("_", " ").lower()
+        self.id_words = tuple(self.id_spaced.split())
+        self.name = definition.get("name", item_id.replace("_", " "))
+        self.name_lower = self.name.lower()
+        self.item_type = definition.get("type", "misc")
+        self.weight = definition["weight"]
+        self.value = definition.get("value", 0)
+        self.droppable = definition["droppable"]
+        self.flags = frozenset(definition["flags"])
+        self.stackable = "stackable" in self.flags
+        self.is_quest = "quest" in self.flags
+        # All but the last word of a multi-word name are adjectives
+        self.adjectives = tuple(self.name.split()[:-1])
+        self.article_name = f"an {self.name}" if self.name_lower.startswith(('a', 'e', 'i', 'o', 'u')) else f"a {self.name}"
+        self.plural_name = pluralize_item_name(self.name, 2)
+        # Model class -> attributes of a freshly hydrated item (filled by game.models.item)
+        self.hydrated: Dict[type, Dict[str, Any]] = {}
+
+
+# item_id -> prototype, built from ITEM_DEFS on first use
+_PROTOTYPES: Dict[str, ItemPrototype] = {}
+
+# Names of every item id seen so far (ids, spaced ids, display names, id words),
+# shared by all inventories and rooms; refreshed when a prototype is rebuilt
+ITEM_NAMES = NameIndex()
+# Collections shorter than this are scanned directly (cheaper than the index)
+NAME_INDEX_MIN_ITEMS = 16
+_ITEM_NAME_SOURCES: Dict[str, ItemPrototype] = {}
+
+
+def get_item_prototype(item_id: str) -> ItemPrototype:
+    """
+    Get the shared prototype for an item id.
+    
+    Prototypes are rebuilt automatically when an ITEM_DEFS entry is replaced;
+    use update_item_def() to change an existing entry in place.
+    
+    Args:
+        item_id: The item identifier (unknown ids get a default prototype)
+    
+    Returns:
+        ItemPrototype: Shared, read-only prototype
+    """
+    prototype = _PROTOTYPES.get(item_id)
+    source = ITEM_DEFS.get(item_id)
+    if prototype is None or prototype.source is not source:
+        prototype = _PROTOTYPES[item_id] = ItemPrototype(item_id, source)
+    return prototype
+
+
+def update_item_def(item_id: str, **changes) -> None:
+    """
+    Change fields of an ITEM_DEFS entry and rebuild its prototype.
+    
+    Args:
+        item_id: The item identifier (must be in ITEM_DEFS)
+        **changes: Fields to set (e.g., droppable=False, flags=[...])
+    """
+    ITEM_DEFS[item_id] = dict(ITEM_DEFS[item_id], **changes)
+    _PROTOTYPES.pop(item_id, None)
+
+
+def mark_quest_item(item_id: str) -> None:
+    """Flag a defined item as a non-droppable quest item (no-op for unknown items)."""
+    if item_id not in ITEM_DEFS:
+        return
+    flags = list(ITEM_DEFS[item_id].get("flags", []))
+    if "quest" not in flags:
+        flags.append("quest")
+    update_item_def(item_id, flags=flags, droppable=False)
+
+
+def get_item_def(item_id: str) -> Mapping[str, Any]:
     """
     Get item definition, with graceful fallback for unknown items.
     
@@ -174,27 +294,10 @@ def get_item_def(item_id: str) -> Dict[str, Any]:
         item_id: The item identifier (e.g., "copper_coin")
     
     Returns:
-        dict: Item definition with at least name, type, description, flags, droppable, weight
+        Mapping: Read-only item definition with at least name, type, description,
+                 flags, droppable, weight (shared - copy it before changing it)
     """
-    if item_id in ITEM_DEFS:
-        item_def = ITEM_DEFS[item_id].copy()
-        # Ensure droppable defaults to True if not specified
-        if "droppable" not in item_def:
-            item_def["droppable"] = True
-        # Ensure weight is set (default 0.1 kg for unknown items)
-        if "weight" not in item_def:
-            item_def["weight"] = 0.1
-        return item_def
-    
-    # Fallback for unknown items
-    return {
-        "name": item_id.replace("_", " "),
-        "type": "misc",
-        "description": "",
-        "weight": 0.1,  # Default weight in kg
-        "flags": [],
-        "droppable": True,  # Default to droppable
-    }
+    return get_item_prototype(item_id).definition
 
 
 def calculate_inventory_weight(inventory: List[str]) -> float:
@@ -207,12 +310,7 @@ def calculate_inventory_weight(inventory: List[str]) -> float:
     Returns:
         float: Total weight in kg
     """
-    total_weight = 0.0
-    for item_id in inventory:
-        item_def = get_item_def(item_id)
-        weight = item_def.get("weight", 0.1)
-        total_weight += weight
-    return total_weight
+    return sum(get_item_prototype(item_id).weight for item_id in inventory)
 
 
 def calculate_room_items_weight(room_items: List[str]) -> float:
@@ -225,12 +323,7 @@ def calculate_room_items_weight(room_items: List[str]) -> float:
     Returns:
         float: Total weight in kg
     """
-    total_weight = 0.0
-    for item_id in room_items:
-        item_def = get_item_def(item_id)
-        weight = item_def.get("weight", 0.1)
-        total_weight += weight
-    return total_weight
+    return sum(get_item_prototype(item_id).weight for item_id in room_items)
 
 
 def is_quest_item(item_id: str) -> bool:
@@ -243,9 +336,7 @@ def is_quest_item(item_id: str) -> bool:
     Returns:
         bool: True if item is a quest item
     """
-    item_def = get_item_def(item_id)
-    flags = item_def.get("flags", [])
-    return "quest" in flags
+    return get_item_prototype(item_id).is_quest
 
 
 def is_item_buryable(item_id: str) -> Tuple[bool, str]:
@@ -410,8 +501,7 @@ def render_item_name(item_id: str) -> str:
     Returns:
         str: Human-friendly name (e.g., "copper coin" instead of "copper_coin")
     """
-    item_def = get_item_def(item_id)
-    return item_def.get("name", item_id.replace("_", " "))
+    return get_item_prototype(item_id).name
 
 
 def group_inventory_items(inventory: List[str]) -> List[str]:
@@ -432,20 +522,12 @@ def group_inventory_items(inventory: List[str]) -> List[str]:
     
     grouped = []
     for item_id, count in sorted(item_counts.items()):
-        item_name = render_item_name(item_id)
-        
-        # Handle pluralization
+        prototype = get_item_prototype(item_id)
+        # Singular form with article, or the precomputed plural
         if count == 1:
-            # Use singular form with article
-            if item_name.lower().startswith(('a', 'e', 'i', 'o', 'u')):
-                grouped.append(f"an {item_name}")
-            else:
-                grouped.append(f"a {item_name}")
+            grouped.append(prototype.article_name)
         else:
-            # Use plural form
-            # Try to pluralize intelligently
-            plural_name = pluralize_item_name(item_name, count)
-            grouped.append(f"{count} {plural_name}")
+            grouped.append(f"{count} {prototype.plural_name}")
     
     return grouped
 
@@ -464,35 +546,62 @@ def match_item_name_in_collection(input_text: str, items: List[str]) -> Optional
     if not items:
         return None
     
-    input_lower = input_text.lower().strip()
-    input_normalized = " ".join(input_lower.split())
-    
-    # Track matches with scores (longer matches preferred)
+    input_normalized = normalize(input_text)
+    if len(items) < NAME_INDEX_MIN_ITEMS:
+        return _scan_item_names(input_normalized, items)
+    
+    # Distinct item ids in collection order (stacks of coins etc. repeat ids)
+    positions = {item_id: position for position, item_id in enumerate(dict.fromkeys(items))}
+    for item_id in positions:
+        prototype = get_item_prototype(item_id)
+        if _ITEM_NAME_SOURCES.get(item_id) is not prototype:
+            _index_item_names(prototype)
+    
+    # Exact matches get highest priority
+    exact = ITEM_NAMES.first(ITEM_NAMES.exact(input_normalized), positions)
+    if exact is not None:
+        return exact
+    
+    # Input contained in the item name/id beats any word-level match (a matched
+    # word can't be longer than the whole input); prefer the shortest item id
+    contained = [item_id for item_id in positions
+                 if any(input_normalized in form for form in ITEM_NAMES.forms(item_id)[0])]
+    if contained:
+        return min(contained, key=lambda item_id: (len(item_id), positions[item_id]))
+    
+    # Word-level matches, longest matched word first
+    input_words = input_normalized.split()
+    best = None
+    for item_id in ITEM_NAMES.with_words(input_words):
+        if item_id not in positions:
+            continue
+        item_words = ITEM_NAMES.forms(item_id)[1]
+        rank = (-max(len(word) for word in input_words if word in item_words), len(item_id), positions[item_id])
+        if best is None or rank < best[0]:
+            best = (rank, item_id)
+    return best[1] if best else None
+
+
+def _scan_item_names(input_normalized: str, items: List[str]) -> Optional[str]:
+    """Linear version of match_item_name_in_collection, for short collections."""
     matches = []
-    
+    input_words = input_normalized.split()
     for item_id in items:
-        item_lower = item_id.lower()
-        item_spaced = item_id.replace("_", " ").lower()
-        item_def = get_item_def(item_id)
-        item_name_lower = item_def.get("name", item_spaced).lower()
+        prototype = get_item_prototype(item_id)
+        item_lower = prototype.id_lower
+        item_spaced = prototype.id_spaced
+        item_name_lower = prototype.name_lower
         
-        # Exact matches get highest priority
         if input_normalized == item_lower or input_normalized == item_spaced or input_normalized == item_name_lower:
-            return item_id  # Immediate return for exact match
+            return item_id
         
-        # Check if input is contained in item name/id
         if input_normalized in item_lower or input_normalized in item_spaced or input_normalized in item_name_lower:
-            match_length = len(input_normalized)
-            matches.append((item_id, match_length, len(item_id)))
-        
-        # Check word-level matches
-        item_words = item_spaced.split()
-        input_words = input_normalized.split()
+            matches.append((item_id, len(input_normalized), len(item_id)))
         
+        item_words = prototype.id_words
         for word in input_words:
             if word in item_words:
-                match_length = len(word)
-                matches.append((item_id, match_length, len(item_id)))
+                matches.append((item_id, len(word), len(item_id)))
     
     if not matches:
         return None
@@ -500,3 +609,15 @@ def match_item_name_in_collection(input_text: str, items: List[str]) -> Optional
     # Sort by match length (longer is better), then by item length (shorter is better for specificity)
     matches.sort(key=lambda x: (-x[1], x[2]))
     return matches[0][0]
+
+
+def _index_item_names(prototype: ItemPrototype) -> None:
+    """Add (or refresh) an item's name forms in the shared item name index."""
+    ITEM_NAMES.add(prototype.item_id, names=(prototype.id_lower, prototype.id_spaced, prototype.name_lower),
+                   words=prototype.id_words, prefixes=())
+    _ITEM_NAME_SOURCES[prototype.item_id] = prototype
+
+
+# Build the prototypes of every defined item up front
+for _item_id in ITEM_DEFS:
+    get_item_prototype(_item_id)
@@ -1,16 +1,35 @@
 """
 Quest Manager
 Handles quest registration, assignment, and event processing.
+
+Objectives are indexed by the event that can satisfy them (event type plus
+its room/NPC/item target), so an event only updates the quests it can
+advance.
 """
-from typing import Dict, List, Optional, Any
+from collections import defaultdict
+from typing import Dict, List, Optional, Any, Tuple
 from game.models.quest import Quest, QuestTemplate
 from game.models.player import Player
 
+# Objective type -> (event type that satisfies it, event/objective field naming the target)
+OBJECTIVE_EVENTS: Dict[str, Tuple[str, str]] = {
+    "go_to_room": ("enter_room", "room_id"),
+    "talk_to_npc": ("talk_to_npc", "npc_id"),
+    "say_to_npc": ("say_to_npc", "npc_id"),
+    "obtain_item": ("take_item", "item_id"),
+    "deliver_item": ("give_item", "item_id"),
+}
+EVENT_TARGETS: Dict[str, str] = {event_type: field for event_type, field in OBJECTIVE_EVENTS.values()}
+
 class QuestManager:
     _instance = None
     
     def __init__(self):
         self.templates: Dict[str, QuestTemplate] = {}
+        # (event type, target) -> [(template, stage index)] whose stage has an objective it can satisfy
+        self._objective_index: Dict[Tuple[str, str], List[Tuple[QuestTemplate, int]]] = defaultdict(list)
+        # Stages without objectives advance on any event
+        self._open_stages: List[Tuple[QuestTemplate, int]] = []
         
     @classmethod
     def get_instance(cls):
@@ -20,7 +39,35 @@ class QuestManager:
         
     def register_template(self, template: QuestTemplate):
         """Register a quest definition."""
+        previous = self.templates.get(template.id)
+        if previous is not None:
+            self._unindex_template(previous)
         self.templates[template.id] = template
+        self._index_template(template)
+    
+    def _index_template(self, template: QuestTemplate):
+        """Index every stage's objectives by the event that satisfies them."""
+        for stage_index, stage in enumerate(template.stages):
+            objectives = stage.get("objectives", [])
+            if not objectives:
+                self._open_stages.append((template, stage_index))
+            keys = set()
+            for objective in objectives:
+                event = OBJECTIVE_EVENTS.get(objective.get("type"))
+                if event:
+                    keys.add((event[0], objective.get(event[1])))
+            for key in keys:
+                self._objective_index[key].append((template, stage_index))
+    
+    def _unindex_template(self, template: QuestTemplate):
+        """Remove a replaced template from the objective index."""
+        for key in list(self._objective_index):
+            entries = [entry for entry in self._objective_index[key] if entry[0] is not template]
+            if entries:
+                self._objective_index[key] = entries
+            else:
+                del self._objective_index[key]
+        self._open_stages = [entry for entry in self._open_stages if entry[0] is not template]
         
     def get_template(self, quest_id: str) -> Optional[QuestTemplate]:
         return self.templates.get(quest_id)
@@ -233,22 +280,25 @@ class QuestManager:
 
     def handle_event(self, player: Player, event: Dict[str, Any], game_state: Dict[str, Any]):
         """
-        Dispatch an event to all of the player's active quests.
+        Dispatch an event to the player's active quests it can advance.
+        
+        Looks up the current-stage objectives the event can satisfy in the
+        objective index instead of checking every active quest.
         """
-        for quest in player.quests.values():
-            if quest.status == "active":
-                changed = quest.update(event, game_state)
-                if changed:
-                    # Notify player of update
-                    # This requires a way to send message to player. 
-                    # For now we might just rely on the return value or side effects.
-                    pass
-                    
-                # Check for completion
-                if quest.current_stage_index >= len(quest.template.stages):
-                    # Auto-complete if no final interaction needed?
-                    # Usually we wait for a "complete_quest" trigger or talk to NPC
-                    pass
+        event_type = event.get("type")
+        target_field = EVENT_TARGETS.get(event_type)
+        entries = self._objective_index.get((event_type, event.get(target_field))) if target_field else None
+        
+        # Collect first: an update may advance a quest into another indexed stage
+        quests = []
+        for template, stage_index in (entries or []) + self._open_stages:
+            quest = player.quests.get(template.id)
+            if (quest is not None and quest.template is template and quest.status == "active"
+                    and quest.current_stage_index == stage_index and quest not in quests):
+                quests.append(quest)
+        
+        for quest in quests:
+            quest.update(event, game_state)
 
     def _on_quest_start(self, quest: Quest):
         """Handle side effects of starting a quest (e.g. spawning items)."""
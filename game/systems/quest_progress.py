@@ -0,0 +1,262 @@
+"""
+Quest Progress Engine
+Advances quests directly on the legacy per-player quest dicts
+(game["quests"][quest_id]) instead of rebuilding Player and Quest objects
+for every take, move, talk and give event.
+
+- each template's objectives are compiled once into matchers, grouped per
+  stage by the event type that can satisfy them
+- each player has a compact QuestProgress: pending objective counters keyed
+  by event type and target (an event nothing waits for returns at once, an
+  event only touches the quests waiting on its room/NPC/item) and a min-heap
+  of quest deadlines for tick_quests()
+- only the quest entries an event changes are written back
+
+Progress rules are the same as Quest.update(): a stage advances once all its
+objectives are done, at most one stage per event, and a stage without
+objectives advances on any event.
+"""
+import heapq
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from game.models.quest import QuestTemplate
+from game.systems.quest_manager import EVENT_TARGETS, OBJECTIVE_EVENTS
+
+# (objective id, completion note, event type, target, matcher(event) -> bool)
+CompiledObjective = Tuple[str, str, str, Any, Callable[[Dict[str, Any]], bool]]
+
+
+def _field_equals(field: str, value: Any) -> Callable[[Dict[str, Any]], bool]:
+    return lambda event: event.get(field) == value
+
+
+def compile_objective(objective: Dict[str, Any]) -> Optional[CompiledObjective]:
+    """
+    Compile an objective into the event type that can satisfy it and a matcher.
+
+    Returns:
+        CompiledObjective, or None for objective types no event satisfies
+    """
+    obj_type = objective.get("type")
+    if obj_type not in OBJECTIVE_EVENTS:
+        return None
+    event_type, target_field = OBJECTIVE_EVENTS[obj_type]
+    target = objective.get(target_field)
+    if obj_type == "say_to_npc":
+        keywords = [keyword.lower() for keyword in objective.get("keywords", [])]
+
+        def match(event, npc_id=target, keywords=keywords):
+            if event.get("npc_id") != npc_id:
+                return False
+            text = event.get("text", "").lower()
+            return not keywords or any(keyword in text for keyword in keywords)
+    elif obj_type == "deliver_item":
+        item_id, npc_id = target, objective.get("npc_id")
+        match = lambda event: event.get("item_id") == item_id and event.get("npc_id") == npc_id
+    else:
+        match = _field_equals(target_field, target)
+    note = f"Completed: {objective.get('description', 'Objective')}"
+    return (objective.get("id", ""), note, event_type, target, match)
+
+
+class CompiledStage:
+    """A stage's objectives as matchers."""
+
+    def __init__(self, stage: Dict[str, Any]):
+        objectives = stage.get("objectives", [])
+        self.objective_ids: List[str] = [objective.get("id", "") for objective in objectives]
+        self.matchers: List[CompiledObjective] = [
+            compiled for compiled in map(compile_objective, objectives) if compiled is not None
+        ]
+        self.open = not objectives  # Advances on any event
+        self.description: str = stage.get("description", "Continue quest.")
+
+
+class QuestProgress:
+    """Compact per-player quest progress state."""
+
+    def __init__(self, quests: Dict[str, Dict[str, Any]]):
+        self.quests = quests  # The game["quests"] dict this describes
+        self.size = len(quests)
+        # event type -> target -> {quest_id: pending objectives}
+        self.waiting: Dict[str, Dict[Any, Dict[str, int]]] = defaultdict(dict)
+        self.watched: Dict[str, List[Tuple[str, Any]]] = {}  # quest_id -> (event type, target) it is counted under
+        self.open_quests: set = set()  # Quests on a stage without objectives
+        self.deadlines: List[Tuple[int, str]] = []  # Min-heap of (expires_at_tick, quest_id)
+
+
+class QuestProgressEngine:
+    """Event-driven quest progression on the legacy game dict."""
+
+    def __init__(self, template_fn: Optional[Callable[[str], Optional[QuestTemplate]]] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            template_fn: quest_id -> template (defaults to QuestManager's registry)
+        """
+        if template_fn is None:
+            from game.systems.quest_manager import QuestManager
+            template_fn = lambda quest_id: QuestManager.get_instance().get_template(quest_id)
+        self._template_fn = template_fn
+        self._compiled: Dict[str, Tuple[QuestTemplate, List[CompiledStage]]] = {}
+        self._progress: Dict[str, QuestProgress] = {}  # username -> progress
+
+    def compiled_stages(self, quest_id: str) -> Optional[List[CompiledStage]]:
+        """Compiled stages of a quest's template (compiled once per template)."""
+        template = self._template_fn(quest_id)
+        if template is None:
+            return None
+        cached = self._compiled.get(quest_id)
+        if cached is None or cached[0] is not template:
+            cached = self._compiled[quest_id] = (template, [CompiledStage(stage) for stage in template.stages])
+        return cached[1]
+
+    def progress_for(self, game: Dict[str, Any]) -> QuestProgress:
+        """The player's progress state, rebuilt if their quest dict was replaced or resized."""
+        username = game.get("username", "unknown")
+        quests = game["quests"]
+        progress = self._progress.get(username)
+        if progress is None or progress.quests is not quests or progress.size != len(quests):
+            progress = self._progress[username] = QuestProgress(quests)
+            for quest_id, instance in quests.items():
+                self._watch(progress, quest_id, instance)
+                expires_at_tick = instance.get("expires_at_tick")
+                if expires_at_tick and instance.get("status") == "active":
+                    heapq.heappush(progress.deadlines, (expires_at_tick, quest_id))
+        return progress
+
+    def invalidate(self, username: str) -> None:
+        """Forget a player's progress state (logout, or after editing their quests in place)."""
+        self._progress.pop(username, None)
+
+    def _watch(self, progress: QuestProgress, quest_id: str, instance: Dict[str, Any]) -> None:
+        """Count the pending objectives of a quest's current stage."""
+        if instance.get("status") != "active":
+            return
+        stages = self.compiled_stages(quest_id)
+        stage_index = instance.get("current_stage_index", 0)
+        if stages is None or stage_index >= len(stages):
+            return
+        stage = stages[stage_index]
+        if stage.open:
+            progress.open_quests.add(quest_id)
+            return
+        done = instance.get("objectives_state", {}).get(stage_index, {})
+        keys = []
+        for obj_id, _note, event_type, target, _match in stage.matchers:
+            if not done.get(obj_id, False):
+                counts = progress.waiting[event_type].setdefault(target, {})
+                counts[quest_id] = counts.get(quest_id, 0) + 1
+                if (event_type, target) not in keys:
+                    keys.append((event_type, target))
+        progress.watched[quest_id] = keys
+
+    def _unwatch(self, progress: QuestProgress, quest_id: str) -> None:
+        progress.open_quests.discard(quest_id)
+        for event_type, target in progress.watched.pop(quest_id, ()):
+            targets = progress.waiting[event_type]
+            counts = targets[target]
+            counts.pop(quest_id, None)
+            if not counts:
+                del targets[target]
+                if not targets:
+                    del progress.waiting[event_type]
+
+    def handle_event(self, game: Dict[str, Any], event: Dict[str, Any]) -> List[str]:
+        """
+        Advance the player's quests that wait on an event.
+
+        Args:
+            game: Player's game state dict (updated in place)
+            event: Quest event ({"type", "room_id", "npc_id", "item_id", "text", ...})
+
+        Returns:
+            IDs of the quests whose state changed
+        """
+        if not game.get("quests"):
+            return []
+        progress = self.progress_for(game)
+        event_type = event.get("type")
+        targets = progress.waiting.get(event_type)
+        candidates = list(targets.get(event.get(EVENT_TARGETS[event_type]), ())) if targets else []
+        candidates.extend(quest_id for quest_id in progress.open_quests if quest_id not in candidates)
+
+        changed = []
+        for quest_id in candidates:
+            instance = progress.quests.get(quest_id)
+            if instance is not None and self._advance(quest_id, instance, event):
+                self._unwatch(progress, quest_id)
+                self._watch(progress, quest_id, instance)
+                changed.append(quest_id)
+        return changed
+
+    def _advance(self, quest_id: str, instance: Dict[str, Any], event: Dict[str, Any]) -> bool:
+        """Apply an event to one quest instance (see Quest.update). Returns True if it changed."""
+        stages = self.compiled_stages(quest_id)
+        stage_index = instance.get("current_stage_index", 0)
+        if instance.get("status") != "active" or stages is None or stage_index >= len(stages):
+            return False
+        stage = stages[stage_index]
+        done = instance.setdefault("objectives_state", {}).setdefault(stage_index, {})
+        notes = instance.setdefault("notes", [])
+
+        event_type = event.get("type")
+        matchers = {obj_id: (note, match) for obj_id, note, obj_event, _target, match in stage.matchers
+                    if obj_event == event_type}
+        stage_completed = True
+        changed = False
+        for obj_id in stage.objective_ids:
+            if done.get(obj_id, False):
+                continue
+            matcher = matchers.get(obj_id)
+            if matcher is not None and matcher[1](event):
+                done[obj_id] = True
+                notes.append(matcher[0])
+                changed = True
+            else:
+                stage_completed = False
+
+        if stage_completed:
+            instance["current_stage_index"] = stage_index + 1
+            changed = True
+            if stage_index + 1 < len(stages):
+                notes.append(f"New Objective: {stages[stage_index + 1].description}")
+        return changed
+
+    def expired_quests(self, game: Dict[str, Any], current_tick: int) -> List[str]:
+        """
+        Pop the player's quests whose deadline has passed.
+
+        Args:
+            game: Player's game state dict
+            current_tick: Current game tick
+
+        Returns:
+            IDs of active quests with expires_at_tick <= current_tick
+        """
+        if not game.get("quests"):
+            return []
+        progress = self.progress_for(game)
+        deadlines = progress.deadlines
+        expired = []
+        while deadlines and deadlines[0][0] <= current_tick:
+            expires_at_tick, quest_id = heapq.heappop(deadlines)
+            instance = progress.quests.get(quest_id)
+            if (instance is not None and instance.get("status") == "active"
+                    and instance.get("expires_at_tick") == expires_at_tick):
+                expired.append(quest_id)
+        return expired
+
+
+# Global engine instance
+_quest_progress_engine: Optional[QuestProgressEngine] = None
+
+
+def get_quest_progress_engine() -> QuestProgressEngine:
+    """Get global quest progress engine."""
+    global _quest_progress_engine
+    if _quest_progress_engine is None:
+        _quest_progress_engine = QuestProgressEngine()
+    return _quest_progress_engine
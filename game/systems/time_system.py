@@ -14,6 +14,50 @@ TICKS_PER_MINUTE = 1
 MINUTES_PER_HOUR = 60
 HOURS_PER_DAY = 24
 DAYS_PER_YEAR = 120  # Short in-game year for gameplay
+GAME_MINUTES_PER_REAL_MINUTE = 12.0
+
+# Sunrise and sunset by season (in minutes from midnight)
+SUNRISE_TIMES = {
+    "spring": 6 * 60 + 30,    # 6:30am
+    "summer": 6 * 60,          # 6:00am
+    "autumn": 6 * 60 + 30,    # 6:30am
+    "winter": 7 * 60,          # 7:00am
+}
+SUNSET_TIMES = {
+    "spring": 19 * 60 + 30,   # 7:30pm
+    "summer": 20 * 60,         # 8:00pm
+    "autumn": 19 * 60 + 30,   # 7:30pm
+    "winter": 19 * 60,         # 7:00pm
+}
+
+
+def time_of_day_at(minutes_in_day: int, sunrise_min: int, sunset_min: int) -> str:
+    """
+    Classify a minute of the day as night, dawn, day or dusk.
+
+    Dawn and dusk run from 30 minutes before to 30 minutes after sunrise/sunset.
+
+    Args:
+        minutes_in_day: Minutes from midnight (0-1439)
+        sunrise_min: Sunrise in minutes from midnight
+        sunset_min: Sunset in minutes from midnight
+
+    Returns:
+        str: "night", "dawn", "day", or "dusk"
+    """
+    dawn_start = max(0, sunrise_min - 30)
+    dawn_end = sunrise_min + 30
+    dusk_start = max(0, sunset_min - 30)
+    dusk_end = min(HOURS_PER_DAY * MINUTES_PER_HOUR, sunset_min + 30)
+
+    if dawn_start <= minutes_in_day < dawn_end:
+        return "dawn"
+    elif dawn_end <= minutes_in_day < dusk_start:
+        return "day"
+    elif dusk_start <= minutes_in_day < dusk_end:
+        return "dusk"
+    else:
+        return "night"
 
 
 class TimeSystem:
@@ -25,40 +69,17 @@ class TimeSystem:
         
     def get_current_minutes(self) -> int:
         """
-        Calculate current game time in minutes based on elapsed real-world time.
-        Uses GAME_TIME from game.state to ensure consistency with legacy system.
+        Get the current game time in minutes from the shared world clock.
         
         Time conversion rate:
         - 1 in-game day = 2 real-world hours = 120 real-world minutes
-        - 1 in-game day = 24 in-game hours = 1440 in-game minutes
         - Therefore: 1 in-game minute = 1/12 real-world minutes = 5 real-world seconds
-        - Or: 1 real-world minute = 12 in-game minutes
         
         Returns:
             int: Total in-game minutes elapsed since game start
         """
-        # Use GAME_TIME from game.state (shared with legacy system) to ensure perfect sync
-        from game.state import GAME_TIME
-        
-        # Ensure start_timestamp is synced
-        if not self.start_timestamp or (GAME_TIME.get("start_timestamp") and GAME_TIME["start_timestamp"] != self.start_timestamp):
-            if GAME_TIME.get("start_timestamp"):
-                self.start_timestamp = GAME_TIME["start_timestamp"]
-            elif self.start_timestamp:
-                GAME_TIME["start_timestamp"] = self.start_timestamp
-        
-        # Use GAME_TIME timestamp if available, otherwise use self.start_timestamp
-        timestamp_to_use = GAME_TIME.get("start_timestamp") or self.start_timestamp
-        
-        # Calculate elapsed real-world time since start
-        start_time = datetime.fromisoformat(timestamp_to_use)
-        elapsed_real_seconds = (datetime.now() - start_time).total_seconds()
-        elapsed_real_minutes = elapsed_real_seconds / 60.0
-        
-        # Convert to in-game minutes: 1 real-world minute = 12 in-game minutes
-        elapsed_game_minutes = elapsed_real_minutes * 12.0
-        
-        return int(elapsed_game_minutes)
+        from game.systems.world_clock import get_world_clock
+        return get_world_clock().snapshot().total_minutes
     
     def get_current_tick(self) -> int:
         """
@@ -121,24 +142,8 @@ class TimeSystem:
         Returns:
             tuple: (sunrise_minutes, sunset_minutes) from midnight
         """
-        # Sunrise times (in minutes from midnight)
-        sunrise_times = {
-            "spring": 6 * 60 + 30,    # 6:30am
-            "summer": 6 * 60,          # 6:00am
-            "autumn": 6 * 60 + 30,    # 6:30am
-            "winter": 7 * 60,          # 7:00am
-        }
-        
-        # Sunset times (in minutes from midnight)
-        sunset_times = {
-            "spring": 19 * 60 + 30,   # 7:30pm
-            "summer": 20 * 60,         # 8:00pm
-            "autumn": 19 * 60 + 30,   # 7:30pm
-            "winter": 19 * 60,         # 7:00pm
-        }
-        
-        return (sunrise_times.get(season, 6 * 60), 
-                sunset_times.get(season, 20 * 60))
+        return (SUNRISE_TIMES.get(season, 6 * 60),
+                SUNSET_TIMES.get(season, 20 * 60))
     
     def get_time_of_day(self, season: str) -> str:
         """
@@ -150,25 +155,8 @@ class TimeSystem:
         Returns:
             str: "night", "dawn", "day", or "dusk"
         """
-        minutes_in_day = self.get_current_hour_in_minutes()
         sunrise_min, sunset_min = self.get_sunrise_sunset_times(season)
-        
-        # Dawn: 30 minutes before sunrise to 30 minutes after sunrise
-        dawn_start = max(0, sunrise_min - 30)
-        dawn_end = sunrise_min + 30
-        
-        # Dusk: 30 minutes before sunset to 30 minutes after sunset
-        dusk_start = max(0, sunset_min - 30)
-        dusk_end = min(HOURS_PER_DAY * MINUTES_PER_HOUR, sunset_min + 30)
-        
-        if dawn_start <= minutes_in_day < dawn_end:
-            return "dawn"
-        elif dawn_end <= minutes_in_day < dusk_start:
-            return "day"
-        elif dusk_start <= minutes_in_day < dusk_end:
-            return "dusk"
-        else:
-            return "night"
+        return time_of_day_at(self.get_current_hour_in_minutes(), sunrise_min, sunset_min)
     
     def to_dict(self) -> Dict[str, Any]:
         """Serialize to dictionary for persistence."""
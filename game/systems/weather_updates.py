@@ -28,7 +28,6 @@ def update_all_weather_statuses(
     """
     try:
         from game.systems.atmospheric_manager import get_atmospheric_manager
-        from game.models.player import Player
         from game.world.manager import WorldManager
         from game_engine import NPC_STATE
         
@@ -45,9 +44,9 @@ def update_all_weather_statuses(
                 continue
                 
             try:
-                # Create Player object from game state
-                player_obj = Player(username or "adventurer")
-                player_obj.load_from_state(game)
+                # Use the live session Player; only resync weather so a command
+                # in flight on the same player is not clobbered
+                player_obj = WorldManager.get_instance().get_player(username, game, sections=("weather",))
                 
                 # Update weather status
                 if player_obj.location:
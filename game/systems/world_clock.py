@@ -0,0 +1,226 @@
+"""
+World Clock - One shared, per-tick snapshot of in-game time.
+
+Game time is derived from real-world time elapsed since GAME_TIME["start_timestamp"]
+(1 in-game minute = 5 real-world seconds). Rather than every time-dependent system
+parsing that ISO timestamp and calling datetime.now() on its own, the clock keeps
+the epoch as a float (re-parsed only when the timestamp changes, e.g. after a
+snapshot restore) and computes an immutable ClockSnapshot with everything derived
+from the current minute - hour, day, season, month, time of day, sunrise/sunset
+and moon phase - at most once per in-game minute (one tick).
+
+The legacy game_engine time functions, TimeSystem and AtmosphericManager all read
+the same snapshot, so a look, the time command and ambiance can no longer
+disagree about the hour or season when a call straddles a minute boundary.
+"""
+import time
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from core.persistence import mark_section_dirty
+
+from game.systems.time_system import (
+    TICKS_PER_MINUTE, MINUTES_PER_HOUR, HOURS_PER_DAY, DAYS_PER_YEAR,
+    GAME_MINUTES_PER_REAL_MINUTE, SUNRISE_TIMES, SUNSET_TIMES, time_of_day_at,
+)
+from game.systems.season_system import SeasonSystem
+from game.systems.lunar_system import LunarSystem, MOON_CYCLE_DAYS
+
+MINUTES_PER_DAY = HOURS_PER_DAY * MINUTES_PER_HOUR
+
+_SEASONS = SeasonSystem()
+
+
+class ClockSnapshot(NamedTuple):
+    """Everything derived from the current in-game minute (immutable)."""
+    total_minutes: int      # In-game minutes since the game started
+    tick: int               # Game tick (total_minutes * TICKS_PER_MINUTE)
+    minute_of_day: int      # Minutes from midnight (0-1439)
+    hour: int               # Hour of the day (0-23)
+    minute: int             # Minute of the hour (0-59)
+    hour_12: int            # Hour in 12-hour format (1-12)
+    days_elapsed: int       # Whole in-game days since the game started
+    day_of_year: int        # Day of the year (0 to DAYS_PER_YEAR-1)
+    season: str             # "spring", "summer", "autumn" or "winter"
+    month: str              # Month name (e.g. "Firstmoon")
+    day_of_month: int       # Day of the month (1-based)
+    sunrise: int            # Sunrise in minutes from midnight
+    sunset: int             # Sunset in minutes from midnight
+    time_of_day: str        # "night", "dawn", "day" or "dusk"
+    moon_phase: str         # Moon phase name (e.g. "waxing_crescent")
+    moon_description: str   # Human-readable moon phase (e.g. "waxing crescent moon")
+
+
+def build_snapshot(total_minutes: int, lunar_cycle_start_day: int) -> ClockSnapshot:
+    """
+    Compute the clock snapshot for an in-game minute.
+
+    Args:
+        total_minutes: In-game minutes since the game started
+        lunar_cycle_start_day: Day of year on which the current lunar cycle started
+
+    Returns:
+        ClockSnapshot: Derived calendar, daylight and moon values
+    """
+    minute_of_day = total_minutes % MINUTES_PER_DAY
+    hour, minute = divmod(minute_of_day, MINUTES_PER_HOUR)
+    days_elapsed = total_minutes // MINUTES_PER_DAY
+    day_of_year = days_elapsed % DAYS_PER_YEAR
+    season = _SEASONS.get_season(day_of_year)
+    sunrise = SUNRISE_TIMES.get(season, 6 * 60)
+    sunset = SUNSET_TIMES.get(season, 20 * 60)
+
+    # Divide the lunar cycle into 8 phases (approx 3.75 days per phase)
+    days_in_cycle = (day_of_year - lunar_cycle_start_day) % MOON_CYCLE_DAYS
+    moon_phase = LunarSystem.PHASES[int(days_in_cycle / (MOON_CYCLE_DAYS / 8)) % 8]
+
+    return ClockSnapshot(
+        total_minutes=total_minutes,
+        tick=total_minutes * TICKS_PER_MINUTE,
+        minute_of_day=minute_of_day,
+        hour=hour,
+        minute=minute,
+        hour_12=hour % 12 or 12,
+        days_elapsed=days_elapsed,
+        day_of_year=day_of_year,
+        season=season,
+        month=_SEASONS.get_month(day_of_year),
+        day_of_month=_SEASONS.get_day_of_month(day_of_year),
+        sunrise=sunrise,
+        sunset=sunset,
+        time_of_day=time_of_day_at(minute_of_day, sunrise, sunset),
+        moon_phase=moon_phase,
+        moon_description=LunarSystem.PHASE_DESCRIPTIONS.get(moon_phase, "moon"),
+    )
+
+
+class WorldClock:
+    """Shared game clock; snapshot() is recomputed at most once per in-game minute."""
+
+    def __init__(self, game_time: Optional[Callable[[], Dict[str, Any]]] = None,
+                 world_clock: Optional[Callable[[], Dict[str, Any]]] = None):
+        """
+        Initialize the clock.
+
+        Args:
+            game_time: Callable returning the GAME_TIME dict (holds "start_timestamp")
+            world_clock: Callable returning the WORLD_CLOCK dict (holds "start_time"
+                         for the day/night periods and "lunar_cycle_start_day")
+
+        Both default to the dicts in game.state. Callables rather than dicts so a
+        module that rebinds its state on snapshot restore is always read fresh.
+        """
+        self._game_time = game_time or _state_game_time
+        self._world_clock = world_clock or _state_world_clock
+        self._epochs: Dict[str, tuple] = {}  # {key: (iso string, epoch seconds)}
+        self._snapshot: Optional[ClockSnapshot] = None
+        self._snapshot_key: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self.computed = 0  # Snapshots built (for the admin view / benchmarks)
+
+    def bind(self, game_time: Callable[[], Dict[str, Any]], world_clock: Callable[[], Dict[str, Any]]) -> None:
+        """Point the clock at a module's GAME_TIME / WORLD_CLOCK dicts."""
+        with self._lock:
+            self._game_time = game_time
+            self._world_clock = world_clock
+            self._epochs.clear()
+            self._snapshot = None
+            self._snapshot_key = None
+
+    def _epoch(self, state: Dict[str, Any], key: str, section: str) -> float:
+        """
+        Epoch seconds for state[key], parsed only when the ISO string changes.
+
+        An unset timestamp starts the clock now (as the legacy functions did) and
+        marks the persisted section holding it ("game_time" / "world_clock") dirty.
+        """
+        iso = state.get(key)
+        if not iso:
+            now = datetime.now()
+            iso = state[key] = now.isoformat()
+            mark_section_dirty(section)
+            self._epochs[key] = (iso, now.timestamp())
+            return self._epochs[key][1]
+        cached = self._epochs.get(key)
+        if cached is None or cached[0] != iso:
+            cached = self._epochs[key] = (iso, datetime.fromisoformat(iso).timestamp())
+        return cached[1]
+
+    def total_minutes(self, now: Optional[float] = None) -> int:
+        """
+        In-game minutes elapsed since the game started.
+
+        Args:
+            now: Real-world time in epoch seconds (defaults to time.time())
+
+        Returns:
+            int: Total in-game minutes
+        """
+        elapsed = (time.time() if now is None else now) - self._epoch(self._game_time(), "start_timestamp", "game_time")
+        return int(elapsed / 60.0 * GAME_MINUTES_PER_REAL_MINUTE)
+
+    def in_game_hours(self, hour_duration: float, now: Optional[float] = None) -> float:
+        """
+        In-game hours since WORLD_CLOCK["start_time"] (the day/night period clock).
+
+        Args:
+            hour_duration: Real-world hours per in-game hour
+            now: Real-world time in epoch seconds (defaults to time.time())
+
+        Returns:
+            float: Elapsed in-game hours (fractional)
+        """
+        elapsed = (time.time() if now is None else now) - self._epoch(self._world_clock(), "start_time", "world_clock")
+        return elapsed / 3600.0 / hour_duration
+
+    def snapshot(self, now: Optional[float] = None) -> ClockSnapshot:
+        """
+        The clock snapshot for the current in-game minute.
+
+        Args:
+            now: Real-world time in epoch seconds (defaults to time.time())
+
+        Returns:
+            ClockSnapshot: Shared immutable snapshot (rebuilt when the minute changes)
+        """
+        total = self.total_minutes(now)
+        world_clock = self._world_clock()
+        lunar_start = world_clock.get("lunar_cycle_start_day")
+        key = (total, lunar_start)
+        snapshot = self._snapshot
+        if snapshot is not None and key == self._snapshot_key:
+            return snapshot
+
+        with self._lock:
+            if lunar_start is None:
+                # The lunar cycle starts on the first day the moon is observed
+                lunar_start = world_clock["lunar_cycle_start_day"] = (total // MINUTES_PER_DAY) % DAYS_PER_YEAR
+                mark_section_dirty("world_clock")
+            snapshot = build_snapshot(total, lunar_start)
+            self._snapshot = snapshot
+            self._snapshot_key = (total, lunar_start)
+            self.computed += 1
+        return snapshot
+
+
+def _state_game_time() -> Dict[str, Any]:
+    from game.state import GAME_TIME
+    return GAME_TIME
+
+
+def _state_world_clock() -> Dict[str, Any]:
+    from game.state import WORLD_CLOCK
+    return WORLD_CLOCK
+
+
+# Global world clock
+_world_clock: Optional[WorldClock] = None
+
+
+def get_world_clock() -> WorldClock:
+    """Get the global world clock (bound to game_engine's state when it is imported)."""
+    global _world_clock
+    if _world_clock is None:
+        _world_clock = WorldClock()
+    return _world_clock
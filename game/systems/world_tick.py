@@ -0,0 +1,212 @@
+"""
+Server-wide world tick scheduler.
+
+World upkeep (atmosphere, NPC weather, sunrise/sunset, buried item cleanup,
+time-based exits, NPC movement) runs here at a fixed cadence instead of inside
+every player command, so its cost scales with time rather than command rate.
+"""
+
+import time
+import logging
+import threading
+from contextlib import nullcontext
+from typing import Optional, Dict, Any, Callable, List, ContextManager
+
+logger = logging.getLogger(__name__)
+
+# Default seconds between world ticks (1 real second = 12 game seconds)
+DEFAULT_TICK_INTERVAL = 1.0
+
+
+class WorldSystem:
+    """A periodic world system and its timing counters."""
+
+    def __init__(self, name: str, fn: Callable[[], Any], every: int = 1):
+        """
+        Initialize a world system.
+
+        Args:
+            name: Unique system name (used for stats)
+            fn: Callable run when the system is due
+            every: Run every N world ticks
+        """
+        self.name = name
+        self.fn = fn
+        self.every = max(1, int(every))
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return timing counters for this system."""
+        return {
+            "every": self.every,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+        }
+
+
+class WorldTickScheduler:
+    """
+    Runs registered world systems on a fixed tick cadence.
+
+    Systems run in registration order. When the background loop is running,
+    maybe_tick() is a no-op; otherwise it ticks on demand at most once per
+    interval (scripts and tests that call handle_command directly).
+    """
+
+    def __init__(self, interval: float = DEFAULT_TICK_INTERVAL):
+        """
+        Initialize scheduler.
+
+        Args:
+            interval: Seconds between world ticks
+        """
+        self.interval = interval
+        self.tick_count = 0
+        self.overruns = 0
+        self.last_tick_ms = 0.0
+        self._systems: List[WorldSystem] = []
+        self._lock = threading.Lock()
+        self._last_tick_time = 0.0
+        self._running = False
+        # Optional factory for a context wrapping each tick (e.g. an event batch)
+        self.tick_context: Optional[Callable[[], ContextManager]] = None
+
+    @property
+    def systems(self) -> List[str]:
+        """Names of registered systems, in run order."""
+        return [system.name for system in self._systems]
+
+    @property
+    def running(self) -> bool:
+        """True while the background loop is active."""
+        return self._running
+
+    def register(self, name: str, fn: Callable[[], Any], every: int = 1) -> None:
+        """
+        Register (or replace) a world system.
+
+        Args:
+            name: Unique system name
+            fn: Callable with no arguments
+            every: Run every N world ticks
+        """
+        system = WorldSystem(name, fn, every)
+        for i, existing in enumerate(self._systems):
+            if existing.name == name:
+                self._systems[i] = system
+                return
+        self._systems.append(system)
+
+    def unregister(self, name: str) -> None:
+        """Remove a world system if registered."""
+        self._systems = [system for system in self._systems if system.name != name]
+
+    def tick(self) -> None:
+        """Run one world tick: every system that is due, each timed independently."""
+        if not self._lock.acquire(blocking=False):
+            # Previous tick still running - skip rather than pile up
+            self.overruns += 1
+            return
+        try:
+            started = time.perf_counter()
+            self._last_tick_time = time.time()
+            self.tick_count += 1
+            with self.tick_context() if self.tick_context else nullcontext():
+                for system in list(self._systems):
+                    if self.tick_count % system.every:
+                        continue
+                    system_started = time.perf_counter()
+                    try:
+                        system.fn()
+                    except Exception as e:
+                        system.errors += 1
+                        logger.error(f"Error in world system '{system.name}': {e}", exc_info=True)
+                    elapsed_ms = (time.perf_counter() - system_started) * 1000.0
+                    system.calls += 1
+                    system.total_ms += elapsed_ms
+                    system.last_ms = elapsed_ms
+                    system.max_ms = max(system.max_ms, elapsed_ms)
+            self.last_tick_ms = (time.perf_counter() - started) * 1000.0
+            if self.last_tick_ms > self.interval * 1000.0:
+                self.overruns += 1
+        finally:
+            self._lock.release()
+
+    def maybe_tick(self) -> bool:
+        """
+        Tick on demand if no background loop is running and a tick is due.
+
+        Returns:
+            True if a tick was run
+        """
+        if self._running:
+            return False
+        if time.time() - self._last_tick_time < self.interval:
+            return False
+        self.tick()
+        return True
+
+    def start(self, socketio=None) -> None:
+        """
+        Start the fixed-cadence tick loop.
+
+        Args:
+            socketio: Flask-SocketIO instance (runs as its background task);
+                      falls back to a daemon thread when not provided
+        """
+        if self._running:
+            return
+        self._running = True
+        sleep = socketio.sleep if socketio else time.sleep
+
+        def tick_task():
+            logger.info(f"World tick scheduler started ({self.interval}s interval)")
+            while self._running:
+                tick_started = time.time()
+                self.tick()
+                sleep(max(0.0, self.interval - (time.time() - tick_started)))
+
+        if socketio:
+            socketio.start_background_task(tick_task)
+        else:
+            threading.Thread(target=tick_task, name="world-tick", daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop the background loop."""
+        self._running = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler and per-system timing counters.
+
+        Returns:
+            Dictionary with tick totals and a per-system breakdown
+        """
+        return {
+            "interval": self.interval,
+            "running": self._running,
+            "ticks": self.tick_count,
+            "overruns": self.overruns,
+            "last_tick_ms": round(self.last_tick_ms, 3),
+            "systems": {system.name: system.to_dict() for system in self._systems},
+        }
+
+
+# Global scheduler instance
+_scheduler: Optional[WorldTickScheduler] = None
+
+
+def get_world_tick_scheduler() -> WorldTickScheduler:
+    """Get global world tick scheduler instance."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = WorldTickScheduler()
+    return _scheduler
@@ -14,6 +14,10 @@ except (FileNotFoundError, ValueError, json.JSONDecodeError) as e:
     print("The game will not function correctly until world data is available.", file=sys.stderr)
     WORLD = {}
 
+# Precompute room adjacency / distance caches for the loaded world
+from game.world.graph import get_world_graph
+get_world_graph().build(WORLD)
+
 def register_room_in_realm(oid, name, description, exits, realm="shadowfen", outdoor=False):
     """
     Register a new room in the world data structure.
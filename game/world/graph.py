@@ -0,0 +1,267 @@
+"""
+World Graph
+Precomputed room adjacency for distance and pathfinding queries.
+
+Built once from WORLD when the world loads. Bounded-radius neighbourhoods are
+computed with a single BFS per (center, radius) and cached, so bell tolling
+and similar "everything within N rooms" queries no longer run one BFS per room.
+
+Two views of the graph are kept:
+- the physical view (every exit; sound and light travel through closed doors)
+- the passable view (exits an NPC can walk through right now), which drops
+  statically locked/hidden exits and exits locked or hidden in EXIT_STATES.
+  Cached passable results are invalidated whenever an exit's state changes.
+"""
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Tuple, Set
+
+# Maximum number of cached neighbourhoods / paths per view
+MAX_CACHED_QUERIES = 4096
+
+
+def _exit_target(exit_def) -> Optional[str]:
+    """Resolve an exit definition (string or dict) to its target room id."""
+    if isinstance(exit_def, str):
+        return exit_def
+    if isinstance(exit_def, dict):
+        return exit_def.get("target")
+    return None
+
+
+def _blocks_npcs(exit_def) -> bool:
+    """Whether a static exit definition is closed to NPCs (mirrors is_exit_accessible)."""
+    if not isinstance(exit_def, dict):
+        return False
+    if exit_def.get("locked", False) and not (exit_def.get("key_required") and exit_def.get("npc_can_unlock", False)):
+        return True
+    if exit_def.get("hidden", False) and not exit_def.get("npc_can_see_hidden", False):
+        return True
+    return False
+
+
+class WorldGraph:
+    """Adjacency lists plus cached BFS results for the world's rooms."""
+
+    def __init__(self):
+        """Initialize an empty graph."""
+        self._lock = threading.Lock()
+        # room_id -> [(direction, target_room_id)] in exit definition order
+        self.adjacency: Dict[str, List[Tuple[str, str]]] = {}
+        self.outdoor_rooms: Set[str] = set()
+        self._static_blocked: Set[Tuple[str, str]] = set()
+        self._exit_blocked: Set[Tuple[str, str]] = set()
+        self._physical_cache: "OrderedDict[Tuple[str, int], Dict[str, int]]" = OrderedDict()
+        self._passable_cache: "OrderedDict[Tuple[str, int], Dict[str, int]]" = OrderedDict()
+        self._step_cache: "OrderedDict[Tuple[str, str, int], Tuple[Optional[str], Optional[str]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def build(self, world: Dict[str, Dict[str, Any]]) -> None:
+        """
+        (Re)build the adjacency lists from a WORLD dict.
+
+        Args:
+            world: WORLD dict keyed by room_id
+        """
+        adjacency = {}
+        outdoor_rooms = set()
+        static_blocked = set()
+        for room_id, room_def in world.items():
+            if not isinstance(room_def, dict):
+                continue
+            edges = []
+            for direction, exit_def in (room_def.get("exits") or {}).items():
+                target = _exit_target(exit_def)
+                if target is None or target not in world:
+                    continue
+                edges.append((direction, target))
+                if _blocks_npcs(exit_def):
+                    static_blocked.add((room_id, direction))
+            adjacency[room_id] = edges
+            outdoor_val = room_def.get("outdoor", False)
+            if isinstance(outdoor_val, str):
+                outdoor_val = outdoor_val.lower() in ("true", "1", "yes")
+            if outdoor_val:
+                outdoor_rooms.add(room_id)
+        with self._lock:
+            self.adjacency = adjacency
+            self.outdoor_rooms = outdoor_rooms
+            self._static_blocked = static_blocked
+            self._clear_caches(physical=True)
+
+    def _clear_caches(self, physical: bool) -> None:
+        if physical:
+            self._physical_cache.clear()
+        self._passable_cache.clear()
+        self._step_cache.clear()
+        self.stats["invalidations"] += 1
+
+    def set_exit_state(self, room_id: str, direction: str, state: Optional[Dict[str, Any]]) -> None:
+        """
+        Record the dynamic state of an exit (from EXIT_STATES).
+
+        Passable-view caches are only dropped when the exit actually opens or closes.
+
+        Args:
+            room_id: Room ID
+            direction: Direction
+            state: EXIT_STATES[room_id][direction] dict (or None if cleared)
+        """
+        blocked = bool(state) and bool(state.get("locked", False) or state.get("hidden", False))
+        key = (room_id, direction)
+        with self._lock:
+            if blocked == (key in self._exit_blocked):
+                return
+            if blocked:
+                self._exit_blocked.add(key)
+            else:
+                self._exit_blocked.discard(key)
+            self._clear_caches(physical=False)
+
+    def load_exit_states(self, exit_states: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        """Replace all dynamic exit states (startup / snapshot reload)."""
+        exit_blocked = set()
+        for room_id, directions in (exit_states or {}).items():
+            for direction, state in directions.items():
+                if state and (state.get("locked", False) or state.get("hidden", False)):
+                    exit_blocked.add((room_id, direction))
+        with self._lock:
+            self._exit_blocked = exit_blocked
+            self._clear_caches(physical=False)
+
+    def is_outdoor(self, room_id: str) -> bool:
+        """Whether a room is outdoors."""
+        return room_id in self.outdoor_rooms
+
+    def neighbours(self, room_id: str, passable: bool = False) -> List[Tuple[str, str]]:
+        """
+        Get (direction, target_room_id) pairs for a room.
+
+        Args:
+            room_id: Room ID
+            passable: Only include exits an NPC can currently walk through
+        """
+        edges = self.adjacency.get(room_id, [])
+        if not passable:
+            return edges
+        return [(direction, target) for direction, target in edges
+                if (room_id, direction) not in self._static_blocked
+                and (room_id, direction) not in self._exit_blocked]
+
+    def _cache_get(self, cache: OrderedDict, key):
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+            return value
+
+    def _cache_put(self, cache: OrderedDict, key, value) -> None:
+        with self._lock:
+            cache[key] = value
+            if len(cache) > MAX_CACHED_QUERIES:
+                cache.popitem(last=False)
+
+    def rooms_within(self, center_room_id: str, max_distance: int, passable: bool = False) -> Dict[str, int]:
+        """
+        Get every room within max_distance steps of a room (single BFS, cached).
+
+        Args:
+            center_room_id: Center room ID
+            max_distance: Maximum number of steps
+            passable: Walk only exits an NPC can currently use
+
+        Returns:
+            dict: {room_id: distance} including the center at distance 0.
+                  Shared with the cache - do not mutate.
+        """
+        if center_room_id not in self.adjacency:
+            return {}
+        cache = self._passable_cache if passable else self._physical_cache
+        key = (center_room_id, max_distance)
+        found = self._cache_get(cache, key)
+        if found is not None:
+            return found
+
+        found = {center_room_id: 0}
+        queue = deque([center_room_id])
+        while queue:
+            room_id = queue.popleft()
+            distance = found[room_id]
+            if distance >= max_distance:
+                continue
+            for _, target in self.neighbours(room_id, passable):
+                if target not in found:
+                    found[target] = distance + 1
+                    queue.append(target)
+        self._cache_put(cache, key, found)
+        return found
+
+    def distance(self, start_room_id: str, target_room_id: str, max_distance: int = 10,
+                 passable: bool = False) -> Optional[int]:
+        """
+        Get the shortest number of steps between two rooms.
+
+        Returns:
+            int: Distance in rooms, or None if unreachable within max_distance
+        """
+        if start_room_id == target_room_id:
+            return 0
+        return self.rooms_within(start_room_id, max_distance, passable).get(target_room_id)
+
+    def next_step(self, start_room_id: str, goal_room_id: str,
+                  max_distance: int = 10) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Get the first step of the shortest passable path between two rooms.
+
+        Args:
+            start_room_id: Room the NPC is in
+            goal_room_id: Room the NPC is heading for
+            max_distance: Maximum path length to search
+
+        Returns:
+            tuple: (next_room_id, direction) or (None, None) if there is no path
+        """
+        if start_room_id == goal_room_id or start_room_id not in self.adjacency:
+            return None, None
+        key = (start_room_id, goal_room_id, max_distance)
+        with self._lock:
+            if key in self._step_cache:
+                self._step_cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._step_cache[key]
+            self.stats["misses"] += 1
+
+        step = (None, None)
+        # first_step[room] = (room, direction) of the first move on the path to room
+        first_step = {start_room_id: None}
+        queue = deque([(start_room_id, 0)])
+        while queue:
+            room_id, distance = queue.popleft()
+            if distance >= max_distance:
+                continue
+            for direction, target in self.neighbours(room_id, passable=True):
+                if target in first_step:
+                    continue
+                first_step[target] = first_step[room_id] or (target, direction)
+                if target == goal_room_id:
+                    step = first_step[target]
+                    queue.clear()
+                    break
+                queue.append((target, distance + 1))
+        self._cache_put(self._step_cache, key, step)
+        return step
+
+
+# Global graph instance
+_world_graph: Optional[WorldGraph] = None
+
+
+def get_world_graph() -> WorldGraph:
+    """Get global world graph."""
+    global _world_graph
+    if _world_graph is None:
+        _world_graph = WorldGraph()
+    return _world_graph
@@ -7,6 +7,18 @@ from game.models.room import Room
 from game.models.entity import Entity
 from game.world.data import WORLD
 from game.state import ROOM_STATE, NPC_STATE
+from game.systems.inventory import get_item_prototype
+from game.models.item import Item, Weapon, Armor, Container, Consumable
+
+# Item type -> model class (anything else is a plain Item)
+ITEM_CLASSES = {
+    "weapon": Weapon,
+    "armor": Armor,
+    "container": Container,
+    "food": Consumable,
+    "potion": Consumable,
+    "consumable": Consumable,
+}
 
 class WorldManager:
     _instance = None
@@ -14,6 +26,8 @@ class WorldManager:
     def __init__(self):
         self.active_rooms: Dict[str, Room] = {}
         self.active_npcs: Dict[str, Entity] = {}
+        self.active_players: Dict[str, Entity] = {}
+        self.player_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
 
     @classmethod
     def get_instance(cls):
@@ -87,8 +101,9 @@ class WorldManager:
                 current_npcs.append(npc_id)
         
         # Then add any NPCs that have moved here
-        for npc_id, state in NPC_STATE.items():
-            if state.get("room") == room_id and npc_id not in current_npcs:
+        from game.world.npc_index import get_npc_index
+        for npc_id in get_npc_index().npcs_in(room_id):
+            if npc_id not in current_npcs:
                 current_npcs.append(npc_id)
                 
         room.npcs = current_npcs
@@ -135,31 +150,12 @@ class WorldManager:
     def get_item(self, item_id: str) -> Optional[Entity]:
         """
         Create an Item object from its ID.
-        Items are currently transient (re-created on load), but could be cached if unique.
+        Items are transient (re-created on load) but share one immutable
+        prototype per item id, so creating one copies no definition data.
         """
-        from game_engine import get_item_def
-        from game.models.item import Item, Weapon, Armor, Container, Consumable
-        
-        item_def = get_item_def(item_id)
-        if not item_def:
-            return None
-            
-        item_type = item_def.get("type", "misc")
-        
-        # Factory logic
-        if item_type == "weapon":
-            item = Weapon(item_id, item_def.get("name", item_id))
-        elif item_type == "armor":
-            item = Armor(item_id, item_def.get("name", item_id))
-        elif item_type == "container":
-            item = Container(item_id, item_def.get("name", item_id))
-        elif item_type in ["food", "potion", "consumable"]:
-            item = Consumable(item_id, item_def.get("name", item_id))
-        else:
-            item = Item(item_id, item_def.get("name", item_id))
-            
-        item.load_from_def(item_def)
-        return item
+        prototype = get_item_prototype(item_id)
+        item_class = ITEM_CLASSES.get(prototype.item_type, Item)
+        return item_class.from_prototype(prototype)
 
     def tick_room(self, room_id: str):
         """Tick a specific room (update items, etc)."""
@@ -167,12 +163,49 @@ class WorldManager:
         if room:
             room.tick()
 
-    def get_player(self, username: str) -> Optional[Entity]:
+    def get_player(self, username: str, state: Optional[Dict] = None,
+                   sections: Optional[tuple] = None) -> Optional[Entity]:
         """
-        Get a Player object.
-        This is a bit different as players are loaded from DB/Redis usually.
-        For now, we'll assume the legacy dict is passed in or loaded elsewhere.
+        Get the live Player object for an online user.
+        
+        Players are cached for the length of their session and refreshed
+        incrementally from their legacy game dict (only changed sections are
+        rehydrated). Call evict_player() on logout / idle timeout.
+        
+        Args:
+            username: Player username (None/empty returns an uncached Player)
+            state: Legacy game state dict to sync from
+            sections: Only refresh these sections of a cached player (see Player.refresh_from_state)
+        
+        Returns:
+            Player object, or None if not cached and no state was given
         """
-        # This is a placeholder for the full player loading logic
-        # In the full refactor, this would talk to the StateManager
-        pass
+        from game.models.player import Player
+        
+        if not username:
+            if state is None:
+                return None
+            player = Player("adventurer")
+            player.load_from_state(state)
+            return player
+        
+        player = self.active_players.get(username)
+        if player is None:
+            if state is None:
+                return None
+            player = Player(username)
+            self.active_players[username] = player
+            self.player_cache_stats["misses"] += 1
+        else:
+            self.player_cache_stats["hits"] += 1
+        
+        if state is not None:
+            player.refresh_from_state(state, sections)
+        return player
+
+    def evict_player(self, username: str) -> None:
+        """Drop a player's cached Player object (logout / idle timeout)."""
+        if self.active_players.pop(username, None) is not None:
+            self.player_cache_stats["evictions"] += 1
+        from game.systems.quest_progress import get_quest_progress_engine
+        get_quest_progress_engine().invalidate(username)
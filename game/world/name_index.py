@@ -0,0 +1,199 @@
+"""
+Name Resolution Index
+Shared lookup structure for resolving player input ("coin", "old map",
+"mara", "anvil") to item ids, NPC ids and room detail ids.
+
+Each indexed key carries pre-normalised name forms. The index keeps:
+- an alias map (normalised form -> keys) for exact matches
+- a prefix trie over the forms for startswith matches
+- a word map (word -> keys) for word-level matches
+
+Keys can be added and removed one at a time, so an index follows its
+contents incrementally instead of being rebuilt. Results are returned in
+the order the keys were added, which is what the "first match wins" rules
+of the old linear scans relied on.
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Hashable
+
+# Maximum number of cached per-collection indexes (e.g. NPC line-ups per room)
+MAX_CACHED_INDEXES = 512
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace."""
+    return " ".join(text.lower().split())
+
+
+class _TrieNode:
+    __slots__ = ("children", "keys")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # key -> number of the key's forms passing through this node
+        self.keys: Dict[Hashable, int] = {}
+
+
+class NameIndex:
+    """Exact, prefix and word lookups over keys with precomputed name forms."""
+
+    def __init__(self):
+        self._order: Dict[Hashable, int] = {}
+        self._next = 0
+        self._forms: Dict[Hashable, Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]] = {}
+        self._exact: Dict[str, Dict[Hashable, None]] = {}
+        self._words: Dict[str, Dict[Hashable, None]] = {}
+        self._trie = _TrieNode()
+
+    def __contains__(self, key) -> bool:
+        return key in self._order
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def keys(self) -> List[Hashable]:
+        """Indexed keys in insertion order."""
+        return list(self._order)
+
+    def add(self, key: Hashable, names: Iterable[str], words: Iterable[str] = (),
+            prefixes: Optional[Iterable[str]] = None) -> None:
+        """
+        Index a key (re-adding a key replaces its forms but keeps its position).
+
+        Args:
+            key: Item id, NPC id, detail id, ...
+            names: Forms that match exactly (id, name, aliases)
+            words: Words that count as a word-level match
+            prefixes: Forms that match by prefix (defaults to names)
+        """
+        names = tuple(dict.fromkeys(normalize(name) for name in names if name))
+        words = tuple(dict.fromkeys(word.lower() for word in words if word))
+        prefixes = names if prefixes is None else tuple(dict.fromkeys(normalize(p) for p in prefixes if p))
+        if key in self._order:
+            self._unlink(key)
+        else:
+            self._order[key] = self._next
+            self._next += 1
+        self._forms[key] = (names, words, prefixes)
+        for name in names:
+            self._exact.setdefault(name, {})[key] = None
+        for word in words:
+            self._words.setdefault(word, {})[key] = None
+        for form in prefixes:
+            node = self._trie
+            for char in form:
+                node = node.children.setdefault(char, _TrieNode())
+                node.keys[key] = node.keys.get(key, 0) + 1
+
+    def remove(self, key: Hashable) -> None:
+        """Forget a key (no-op if it isn't indexed)."""
+        if key not in self._order:
+            return
+        self._unlink(key)
+        del self._order[key]
+        del self._forms[key]
+
+    def _unlink(self, key: Hashable) -> None:
+        names, words, prefixes = self._forms[key]
+        for name in names:
+            self._discard(self._exact, name, key)
+        for word in words:
+            self._discard(self._words, word, key)
+        for form in prefixes:
+            path = []
+            node = self._trie
+            for char in form:
+                child = node.children[char]
+                path.append((node, char, child))
+                node = child
+            for parent, char, child in path:
+                count = child.keys[key] - 1
+                if count:
+                    child.keys[key] = count
+                else:
+                    del child.keys[key]
+                if not child.keys:
+                    del parent.children[char]
+                    break
+
+    @staticmethod
+    def _discard(mapping: Dict[str, Dict[Hashable, None]], form: str, key: Hashable) -> None:
+        keys = mapping.get(form)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del mapping[form]
+
+    def _sorted(self, keys: Iterable[Hashable]) -> List[Hashable]:
+        order = self._order
+        return sorted(keys, key=order.__getitem__)
+
+    def exact(self, text: str) -> List[Hashable]:
+        """Keys with a name form equal to the text, in insertion order."""
+        keys = self._exact.get(normalize(text))
+        return self._sorted(keys) if keys else []
+
+    def prefixed(self, text: str) -> List[Hashable]:
+        """Keys with a prefix form starting with the text, in insertion order."""
+        node = self._trie
+        for char in normalize(text):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return self._sorted(node.keys) if node is not self._trie else []
+
+    def with_words(self, words: Iterable[str]) -> List[Hashable]:
+        """Keys having any of the words, in insertion order."""
+        found = {}
+        for word in words:
+            keys = self._words.get(word.lower())
+            if keys:
+                found.update(keys)
+        return self._sorted(found)
+
+    def forms(self, key: Hashable) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]:
+        """(names, words, prefixes) indexed for a key."""
+        return self._forms[key]
+
+    def first(self, candidates: List[Hashable], allowed: Optional[Dict[Hashable, int]] = None) -> Optional[Hashable]:
+        """
+        Pick the first candidate, optionally restricted to (and ordered by) a collection.
+
+        Args:
+            candidates: Keys from exact()/prefixed()/with_words()
+            allowed: {key: position} of the collection being searched
+        """
+        if allowed is None:
+            return candidates[0] if candidates else None
+        present = [key for key in candidates if key in allowed]
+        if not present:
+            return None
+        return min(present, key=allowed.__getitem__)
+
+
+class IndexCache:
+    """LRU cache of indexes built for a particular collection (e.g. a room's NPC ids)."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_INDEXES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, NameIndex]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, key: Hashable) -> Optional[NameIndex]:
+        index = self._entries.get(key)
+        if index is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return index
+
+    def put(self, key: Hashable, index: NameIndex) -> NameIndex:
+        self._entries[key] = index
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return index
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,102 @@
+"""
+NPC Location Index
+Answers "which NPCs are in room X" and "where is NPC Y" in O(1) without
+scanning NPC_STATE. NPC_STATE stays the persisted source of truth; every
+code path that moves, kills or reloads NPCs updates the index as well.
+"""
+from typing import Dict, Optional, Any, List, Set
+
+
+class NPCIndex:
+    _instance = None
+
+    def __init__(self):
+        # room_id -> {npc_id: None} (dict keeps insertion order, like NPC_STATE scans did)
+        self.rooms: Dict[str, Dict[str, None]] = {}
+        self.locations: Dict[str, str] = {}
+        self.dead: Set[str] = set()
+
+    @classmethod
+    def get_instance(cls):
+        if not cls._instance:
+            cls._instance = cls()
+        return cls._instance
+
+    def place(self, npc_id: str, room_id: Optional[str]) -> None:
+        """Record that an NPC is now in room_id (None removes it from every room)."""
+        old_room = self.locations.get(npc_id)
+        if old_room == room_id:
+            return
+        if old_room is not None:
+            members = self.rooms.get(old_room)
+            if members is not None:
+                members.pop(npc_id, None)
+                if not members:
+                    del self.rooms[old_room]
+        if room_id:
+            self.locations[npc_id] = room_id
+            self.rooms.setdefault(room_id, {})[npc_id] = None
+        else:
+            self.locations.pop(npc_id, None)
+
+    def set_alive(self, npc_id: str, alive: bool) -> None:
+        """Record an NPC's alive flag (dead NPCs stay placed but can be filtered out)."""
+        if alive:
+            self.dead.discard(npc_id)
+        else:
+            self.dead.add(npc_id)
+
+    def remove(self, npc_id: str) -> None:
+        """Forget an NPC entirely."""
+        self.place(npc_id, None)
+        self.dead.discard(npc_id)
+
+    def npcs_in(self, room_id: str, alive_only: bool = False) -> List[str]:
+        """Get NPC ids in a room, optionally skipping dead NPCs."""
+        members = self.rooms.get(room_id)
+        if not members:
+            return []
+        if alive_only and self.dead:
+            return [npc_id for npc_id in members if npc_id not in self.dead]
+        return list(members)
+
+    def room_of(self, npc_id: str) -> Optional[str]:
+        """Get the room an NPC is in, or None."""
+        return self.locations.get(npc_id)
+
+    def sync(self, npc_id: str, state: Dict[str, Any]) -> None:
+        """Re-index one NPC from its NPC_STATE record."""
+        self.place(npc_id, state.get("room"))
+        self.set_alive(npc_id, state.get("alive", True))
+
+    def rebuild(self, npc_state: Dict[str, Dict[str, Any]]) -> None:
+        """Rebuild the whole index from NPC_STATE (startup / snapshot reload)."""
+        self.rooms = {}
+        self.locations = {}
+        self.dead = set()
+        for npc_id, state in npc_state.items():
+            self.sync(npc_id, state)
+
+    def check_consistency(self, npc_state: Dict[str, Dict[str, Any]]) -> List[str]:
+        """
+        Compare the index against NPC_STATE.
+
+        Returns:
+            List of human-readable problems (empty if consistent)
+        """
+        problems = []
+        for npc_id, state in npc_state.items():
+            room_id = state.get("room") or None
+            if self.locations.get(npc_id) != room_id:
+                problems.append(f"{npc_id} indexed in {self.locations.get(npc_id)} but is in {room_id}")
+            if (npc_id in self.dead) == state.get("alive", True):
+                problems.append(f"{npc_id} alive flag out of date")
+        for npc_id in self.locations:
+            if npc_id not in npc_state:
+                problems.append(f"{npc_id} is indexed but has no NPC_STATE")
+        return problems
+
+
+def get_npc_index() -> NPCIndex:
+    """Get the global NPC location index."""
+    return NPCIndex.get_instance()
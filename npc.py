@@ -7,12 +7,18 @@ This module defines the NPC class and provides NPC matching and interaction logi
 from collections import defaultdict
 from typing import Optional, Tuple, Callable, Dict, Any
 from game.models.entity import Entity
+from game.world.name_index import IndexCache, NameIndex, normalize
+from game.systems.world_clock import get_world_clock
+from core.dialogue_service import get_dialogue_service
+from core.message_buffer import get_message_buffers
+from core.persistence import mark_npc_dirty, mark_player_dirty
 
 # Safe import of AI client (optional)
 try:
-    from ai_client import generate_npc_reply
+    from ai_client import generate_npc_reply, request_npc_reply
 except ImportError:
     generate_npc_reply = None
+    request_npc_reply = None
 
 
 class NPC(Entity):
@@ -117,11 +123,9 @@ class NPC(Entity):
         
         is_outdoor = getattr(self.location, 'outdoor', False)
         weather_state = atmos_manager.weather.get_state()
-        day_of_year = atmos_manager.time.get_day_of_year()
-        season = atmos_manager.seasons.get_season(day_of_year)
-        current_tick = atmos_manager.time.get_current_tick()
+        clock = get_world_clock().snapshot()
         
-        self.weather_status.update(current_tick, is_outdoor, weather_state, season)
+        self.weather_status.update(clock.tick, is_outdoor, weather_state, clock.season)
     
     def get_weather_description(self, pronoun: str = None) -> str:
         """Get weather status description for this NPC."""
@@ -969,6 +973,10 @@ def load_npcs() -> dict:
 # Load NPCs on module import
 NPCS = load_npcs()
 
+# Name indexes for NPC targeting (per room line-up, and every NPC for global lookups)
+_ROOM_NPC_INDEXES = IndexCache()
+_ALL_NPC_INDEX: Optional[NameIndex] = None
+
 
 # NPC attack callback system
 # Signature: (game, username, npc_id) -> str (message to show to the player)
@@ -1006,6 +1014,7 @@ def _innkeeper_on_attack(game: dict, username: str, npc_id: str) -> str:
     """
     # Import here to avoid circular imports
     from game_engine import adjust_reputation, NPC_STATE, set_npc_talk_cooldown
+    from game.world.npc_index import get_npc_index
     
     # Decrease reputation
     adjust_reputation(game, npc_id, -10, "attacked")
@@ -1016,6 +1025,8 @@ def _innkeeper_on_attack(game: dict, username: str, npc_id: str) -> str:
         if npc_id not in NPC_STATE:
             NPC_STATE[npc_id] = {}
         NPC_STATE[npc_id]["room"] = npc.home
+        get_npc_index().place(npc_id, npc.home)
+        mark_npc_dirty(npc_id)
     
     # Set talk cooldown for 1 in-game hour (60 minutes)
     set_npc_talk_cooldown(game, npc_id, 60)
@@ -1030,6 +1041,7 @@ def _old_storyteller_on_attack(game: dict, username: str, npc_id: str) -> str:
     """
     # Import here to avoid circular imports
     from game_engine import adjust_reputation, NPC_STATE, set_npc_talk_cooldown
+    from game.world.npc_index import get_npc_index
     
     # Decrease reputation
     adjust_reputation(game, npc_id, -15, "attacked")
@@ -1040,6 +1052,8 @@ def _old_storyteller_on_attack(game: dict, username: str, npc_id: str) -> str:
         if npc_id not in NPC_STATE:
             NPC_STATE[npc_id] = {}
         NPC_STATE[npc_id]["room"] = npc.home
+        get_npc_index().place(npc_id, npc.home)
+        mark_npc_dirty(npc_id)
     
     # Set talk cooldown for 1 in-game hour (60 minutes)
     set_npc_talk_cooldown(game, npc_id, 60)
@@ -1052,17 +1066,51 @@ register_npc_on_attack_callback("innkeeper", _innkeeper_on_attack)
 register_npc_on_attack_callback("old_storyteller", _old_storyteller_on_attack)
 
 
+def _index_npc(index: NameIndex, npc_id: str) -> None:
+    """Add an NPC's id, names and title words to a name index."""
+    npc = NPCS[npc_id]
+    shortname = npc.shortname or ""
+    index.add(
+        npc_id,
+        names=(npc_id, npc.name, shortname),
+        words=npc.name.lower().split() + (npc.title or "").lower().split() + [shortname.lower()],
+    )
+
+
+def _room_npc_index(npc_ids: tuple) -> NameIndex:
+    """Return the (cached) name index for a particular line-up of NPCs."""
+    index = _ROOM_NPC_INDEXES.get(npc_ids)
+    if index is None:
+        index = NameIndex()
+        for npc_id in npc_ids:
+            _index_npc(index, npc_id)
+        _ROOM_NPC_INDEXES.put(npc_ids, index)
+    return index
+
+
+def _exact_rule(npc_id: str, target: str) -> int:
+    """Which of the exact rules (1 = id, 2 = name, 3 = shortname) an exact hit satisfied."""
+    npc = NPCS[npc_id]
+    if target == normalize(npc_id):
+        return 1
+    if target == normalize(npc.name):
+        return 2
+    return 3
+
+
 def match_npc_in_room(room_npc_ids: list, target_text: str) -> Tuple[Optional[str], Optional[NPC]]:
     """
     Match a target text against NPCs present in a room.
     
-    Matching rules (in order):
+    Matching rules (in order, across every NPC in the room):
     1. Exact id match
     2. Exact full name match
     3. Exact shortname match
     4. Startswith match on id/name/shortname
     5. Word-level matches
     
+    Ties within a rule go to the NPC listed first in the room.
+    
     Args:
         room_npc_ids: List of NPC IDs present in the room
         target_text: The text to match against (lowercased)
@@ -1070,52 +1118,47 @@ def match_npc_in_room(room_npc_ids: list, target_text: str) -> Tuple[Optional[st
     Returns:
         tuple: (npc_id, NPC) if match found, (None, None) otherwise
     """
-    target_lower = target_text.lower().strip()
+    npc_ids = tuple(npc_id for npc_id in dict.fromkeys(room_npc_ids) if npc_id in NPCS)
+    if not npc_ids:
+        return None, None
     
-    for npc_id in room_npc_ids:
-        if npc_id not in NPCS:
-            continue
-        
-        # Use WorldManager to get NPC with loaded state (includes weather_status)
-        from game.world.manager import WorldManager
-        wm = WorldManager.get_instance()
-        npc = wm.get_npc(npc_id) or NPCS[npc_id]
-        npc_id_lower = npc_id.lower()
-        npc_name_lower = npc.name.lower()
-        npc_shortname_lower = npc.shortname.lower()
-        npc_title_lower = (npc.title or "").lower()
-        
-        # Rule 1: Exact id match
-        if target_lower == npc_id_lower:
-            return npc_id, npc
-        
-        # Rule 2: Exact full name match
-        if target_lower == npc_name_lower:
-            return npc_id, npc
-        
-        # Rule 3: Exact shortname match
-        if target_lower == npc_shortname_lower:
-            return npc_id, npc
-        
-        # Rule 4: Startswith match on id/name/shortname
-        if (npc_id_lower.startswith(target_lower) or
-            npc_name_lower.startswith(target_lower) or
-            npc_shortname_lower.startswith(target_lower)):
-            return npc_id, npc
-        
-        # Rule 5: Word-level matches
-        target_words = set(target_lower.split())
-        name_words = set(npc_name_lower.split())
-        title_words = set(npc_title_lower.split())
-        shortname_words = {npc_shortname_lower}
-        
-        if (target_words.intersection(name_words) or
-            target_words.intersection(title_words) or
-            target_words.intersection(shortname_words) or
-            target_lower in npc_name_lower.split()):
-            return npc_id, npc
+    index = _room_npc_index(npc_ids)
+    target = normalize(target_text)
     
-    return None, None
+    # Rules 1-3: exact matches, best rule first
+    matched = index.exact(target)
+    if matched:
+        npc_id = min(matched, key=lambda key: _exact_rule(key, target))
+    else:
+        # Rule 4: startswith, then rule 5: word-level matches
+        matched = (index.prefixed(target) if target else index.keys()) or index.with_words(target.split())
+        if not matched:
+            return None, None
+        npc_id = matched[0]
+    
+    # Use WorldManager to get NPC with loaded state (includes weather_status)
+    from game.world.manager import WorldManager
+    npc = WorldManager.get_instance().get_npc(npc_id) or NPCS[npc_id]
+    return npc_id, npc
+
+
+def find_npc_by_name(target_text: str) -> Optional[str]:
+    """
+    Find any NPC in the world by exact id, name or shortname.
+    
+    Args:
+        target_text: The text to match against
+    
+    Returns:
+        str or None: The first matching NPC ID in definition order
+    """
+    global _ALL_NPC_INDEX
+    if _ALL_NPC_INDEX is None or len(_ALL_NPC_INDEX) != len(NPCS):
+        _ALL_NPC_INDEX = NameIndex()
+        for npc_id in NPCS:
+            _index_npc(_ALL_NPC_INDEX, npc_id)
+    matched = _ALL_NPC_INDEX.exact(target_text)
+    return matched[0] if matched else None
 
 
 def get_npc_reaction(npc_id: str, verb: str) -> Optional[str]:
@@ -1146,6 +1189,60 @@ def get_npc_reaction(npc_id: str, verb: str) -> Optional[str]:
     return text
 
 
+def remember_npc_interaction(game: dict, npc_id: str, entry: dict) -> None:
+    """
+    Record an interaction in the player's memory of an NPC (last 20 kept).
+    
+    Args:
+        game: The game state dictionary
+        npc_id: The NPC ID string
+        entry: Memory entry (e.g. {"type": "talked", "player_input": ..., "response": ...})
+    """
+    memory = game.setdefault("npc_memory", {}).setdefault(npc_id, [])
+    memory.append(entry)
+    if len(memory) > 20:
+        game["npc_memory"][npc_id] = memory[-20:]
+
+
+def request_npc_dialogue(npc_id: str, room_id: str, room: dict, game: dict, username: str,
+                         player_input: str, memory_entry: dict, recent_log: Optional[list] = None,
+                         user_id: Optional[int] = None, db_conn=None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Ask an AI NPC for a line without holding the command for the model.
+    
+    Args:
+        npc_id: The NPC ID string (must use AI)
+        room_id: Room the reply is delivered to
+        room: Room definition dict from WORLD
+        game: The game state dictionary
+        username: Player talking to the NPC
+        player_input: What the player said or did
+        memory_entry: npc_memory entry recorded with a queued reply (its "response" is filled in)
+        recent_log: Optional recent log lines
+        user_id: Optional user ID for token budget tracking
+        db_conn: Optional database connection for token budget tracking
+    
+    Returns:
+        tuple: (response, error_message) when the reply is known straight away, or
+               (None, None) when it is queued - it is then remembered and delivered to
+               the room (room_message) once the model answers
+    """
+    def on_reply(ai_response, error_message):
+        if not ai_response or not ai_response.strip():
+            return
+        remember_npc_interaction(game, npc_id, dict(memory_entry, response=ai_response))
+        # The command has already returned (and saved), so queue the new memory ourselves
+        mark_player_dirty(username)
+        get_dialogue_service().deliver(room_id, ai_response)
+    
+    # Store NPC ID in game for AI client to access
+    game["_current_npc_id"] = npc_id
+    return request_npc_reply(
+        NPCS[npc_id].to_dict(), room, game, username, player_input, on_reply,
+        recent_log=recent_log, user_id=user_id, db_conn=db_conn
+    )
+
+
 def generate_npc_line(npc_id: str, game: dict, username: Optional[str] = None,
                       user_id: Optional[int] = None, db_conn=None) -> str:
     """
@@ -1178,33 +1275,25 @@ def generate_npc_line(npc_id: str, game: dict, username: Optional[str] = None,
             player_input = f"talk to {npc.name}"
             
             # Collect recent log lines (last 10 entries)
-            recent_log = game.get("log", [])[-10:] if game.get("log") else None
+            recent_log = get_message_buffers().recent(game.get("username"), 10) or None
             
-            # Store NPC ID in game for AI client to access
-            game["_current_npc_id"] = npc_id
-            
-            # Convert NPC to dict for AI client (backward compatibility)
-            npc_dict = npc.to_dict()
-            
-            # Call AI function (now returns tuple: response, error_message)
-            ai_response, error_message = generate_npc_reply(
-                npc_dict, room, game, username or "adventurer", player_input, 
-                recent_log, user_id=user_id, db_conn=db_conn
+            # Ask for the AI line without waiting for the model
+            ai_response, error_message = request_npc_dialogue(
+                npc_id, loc_id, room, game, username or "adventurer", player_input,
+                {"type": "talked", "player_input": player_input},
+                recent_log=recent_log, user_id=user_id, db_conn=db_conn
             )
+            if ai_response is None:
+                # The reply is delivered to the room when it arrives
+                return f"{npc.name} considers you for a moment."
             
             # If AI returned a non-empty string, use it
-            if ai_response and ai_response.strip():
-                # Update memory with this interaction
-                if npc_id not in game.get("npc_memory", {}):
-                    game.setdefault("npc_memory", {})[npc_id] = []
-                game["npc_memory"][npc_id].append({
+            if ai_response.strip():
+                remember_npc_interaction(game, npc_id, {
                     "type": "talked",
                     "player_input": player_input,
                     "response": ai_response,
                 })
-                # Keep memory from growing too large
-                if len(game["npc_memory"][npc_id]) > 20:
-                    game["npc_memory"][npc_id] = game["npc_memory"][npc_id][-20:]
                 
                 # If there's an error message, append it to the response
                 if error_message:
@@ -1277,10 +1366,7 @@ def get_time_of_day_greeting():
     Returns:
         str: Greeting phrase like "good morning", "good afternoon", etc.
     """
-    from game_engine import get_current_hour_in_minutes, MINUTES_PER_HOUR
-    
-    current_minutes = get_current_hour_in_minutes()
-    hour_of_day = int(current_minutes // MINUTES_PER_HOUR) % 24
+    hour_of_day = get_world_clock().snapshot().hour
     
     if hour_of_day >= 5 and hour_of_day < 12:
         return "good morning"
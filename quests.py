@@ -19,6 +19,8 @@ from typing import Dict, List, Optional, TypedDict, Any
 from dataclasses import dataclass
 from collections import defaultdict
 
+from core.persistence import mark_room_dirty, mark_section_dirty
+
 
 # --- Quest Template Model ---
 
@@ -50,15 +52,44 @@ class QuestTemplate:
 # Global quest template registry
 QUEST_TEMPLATES: Dict[str, QuestTemplate] = {}
 
+# Offer source indexes, kept in registration order by register_quest_template()
+NOTICEBOARD_QUESTS: Dict[str, List[str]] = defaultdict(list)  # room_id -> quest ids posted there
+NPC_QUEST_OFFERS: Dict[str, List[tuple]] = defaultdict(list)  # npc_id -> [(quest_id, offer_source)]
+
 
 def get_quest_template(quest_id: str) -> Optional[QuestTemplate]:
     """Get a quest template by ID."""
     return QUEST_TEMPLATES.get(quest_id)
 
 
+def _index_quest_template(template: QuestTemplate):
+    """Add a template's noticeboard and NPC dialogue offer sources to the indexes."""
+    for offer_source in template.offer_sources:
+        source_type = offer_source.get("type")
+        if source_type == "noticeboard":
+            room_quests = NOTICEBOARD_QUESTS[offer_source.get("room_id", "")]
+            if template.id not in room_quests:
+                room_quests.append(template.id)
+        elif source_type == "npc_dialogue":
+            NPC_QUEST_OFFERS[offer_source.get("npc_id", "")].append((template.id, offer_source))
+
+
+def rebuild_quest_indexes():
+    """Rebuild the offer source indexes from QUEST_TEMPLATES (after editing it directly)."""
+    NOTICEBOARD_QUESTS.clear()
+    NPC_QUEST_OFFERS.clear()
+    for template in QUEST_TEMPLATES.values():
+        _index_quest_template(template)
+
+
 def register_quest_template(template: QuestTemplate):
-    """Register a quest template."""
+    """Register a quest template in the global registry."""
+    replacing = template.id in QUEST_TEMPLATES
     QUEST_TEMPLATES[template.id] = template
+    if replacing:
+        rebuild_quest_indexes()
+    else:
+        _index_quest_template(template)
 
 
 # --- Quest Availability System ---
@@ -197,6 +228,8 @@ def is_quest_available_to_player(game: Dict, username: str, quest_id: str, activ
                 except Exception:
                     pass  # If we can't verify, remove stale entry
             
+            if verified_active != active_players:
+                mark_section_dirty("quest_global_state")
             active_players = verified_active
             quest_state["active_players"] = active_players
         except Exception:
@@ -270,6 +303,7 @@ def add_quest_owner(quest_id: str, username: str):
         # Track when first player took it (for rotation/reset later if needed)
         if quest_state.get("first_taken_at") is None:
             quest_state["first_taken_at"] = GAME_TIME.get("tick", 0)
+        mark_section_dirty("quest_global_state")
 
 
 def remove_quest_owner(quest_id: str, username: str):
@@ -287,6 +321,7 @@ def remove_quest_owner(quest_id: str, username: str):
             # If no more active players, reset first_taken_at for future rotation
             if not active_players:
                 quest_state["first_taken_at"] = None
+            mark_section_dirty("quest_global_state")
 
 
 def record_quest_completion(quest_id: str, username: str):
@@ -307,6 +342,7 @@ def record_quest_completion(quest_id: str, username: str):
         completions[username] = 0
     completions[username] += 1
     quest_state["completions"] = completions
+    mark_section_dirty("quest_global_state")
 
 
 # --- Quest Event Model ---
@@ -338,12 +374,11 @@ def start_quest(game: Dict, username: str, quest_id: str, source: str, active_pl
         str: Player-facing message
     """
     # Bridge to OO QuestManager
-    from game.models.player import Player
+    from game.world.manager import WorldManager
     from game.systems.quest_manager import QuestManager
     
-    # Create temp player and load state
-    player = Player(username)
-    player.load_from_state(game)
+    # Use the live session player; only quests are read here
+    player = WorldManager.get_instance().get_player(username, game, sections=("quests",))
     
     # Start quest via QuestManager
     qm = QuestManager.get_instance()
@@ -351,9 +386,7 @@ def start_quest(game: Dict, username: str, quest_id: str, source: str, active_pl
     
     if success:
         # Sync state back to game dict
-        updated_state = player.to_state()
-        if "quests" in updated_state:
-            game["quests"] = updated_state["quests"]
+        player.sync_to_state(game, "quests")
             
         # Track quest ownership globally (legacy requirement)
         add_quest_owner(quest_id, username)
@@ -372,6 +405,7 @@ def start_quest(game: Dict, username: str, quest_id: str, source: str, active_pl
                 ROOM_STATE[tavern_room_id]["items"] = []
             if "lost_package" not in ROOM_STATE[tavern_room_id]["items"]:
                 ROOM_STATE[tavern_room_id]["items"].append("lost_package")
+                mark_room_dirty(tavern_room_id)
     
     return message
     
@@ -479,14 +513,9 @@ def complete_quest(game: Dict, username: str, quest_id: str) -> str:
             
             # Mark quest items in item definitions
             if is_quest_item and item_id:
-                from game_engine import ITEM_DEFS
-                if item_id in ITEM_DEFS:
-                    # Add quest flag and make non-droppable
-                    if "flags" not in ITEM_DEFS[item_id]:
-                        ITEM_DEFS[item_id]["flags"] = []
-                    if "quest" not in ITEM_DEFS[item_id]["flags"]:
-                        ITEM_DEFS[item_id]["flags"].append("quest")
-                    ITEM_DEFS[item_id]["droppable"] = False
+                from game.systems.inventory import mark_quest_item
+                # Add quest flag and make non-droppable
+                mark_quest_item(item_id)
             
             # Special handling for Mara's lost item quest - player already has the knife
             if quest_id == "mara_lost_item" and item_id == "mara_kitchen_knife":
@@ -602,27 +631,10 @@ def handle_quest_event(game: Dict, event: QuestEvent):
     Called from game_engine whenever something notable happens.
     Updates active quests based on event type and objectives.
     """
-    # Bridge to OO QuestManager
-    from game.models.player import Player
-    from game.systems.quest_manager import QuestManager
-    
-    # Create temp player and load state
-    # We use a dummy username if not present, but it should be there
-    username = game.get("username", "unknown")
-    player = Player(username)
-    player.load_from_state(game)
-    
-    # Dispatch event via QuestManager
-    qm = QuestManager.get_instance()
-    qm.handle_event(player, event, game)
-    
-    # Sync state back to game dict
-    # This ensures any updates to quests are persisted in the legacy dict
-    updated_state = player.to_state()
-    if "quests" in updated_state:
-        game["quests"] = updated_state["quests"]
-    if "completed_quests" in updated_state:
-        game["completed_quests"] = updated_state["completed_quests"]
+    # Progress is applied directly to game["quests"] with QuestManager's
+    # templates; the live Player picks the changes up on its next refresh
+    from game.systems.quest_progress import get_quest_progress_engine
+    get_quest_progress_engine().handle_event(game, event)
         
     # Legacy logic below is now bypassed/replaced by the above
     return
@@ -781,18 +793,12 @@ def tick_quests(game: Dict, current_tick: int):
         game: Game state dict
         current_tick: Current game tick
     """
-    active_quests = get_active_quests(game)
-    if not active_quests:
-        return
-    
-    for instance in active_quests:
-        quest_id = instance["id"]
-        expires_at_tick = instance.get("expires_at_tick")
-        
-        if expires_at_tick and current_tick >= expires_at_tick:
-            # Quest expired
-            username = "adventurer"  # Default, should be passed in context
-            fail_quest(game, username, quest_id, "You ran out of time.")
+    # Deadlines come off the player's min-heap, so no active quest is scanned
+    from game.systems.quest_progress import get_quest_progress_engine
+    for quest_id in get_quest_progress_engine().expired_quests(game, current_tick):
+        # Quest expired
+        username = "adventurer"  # Default, should be passed in context
+        fail_quest(game, username, quest_id, "You ran out of time.")
 
 
 # --- Quest Offering System ---
@@ -907,6 +913,7 @@ def reset_quest_for_player(game: Dict, username: str, quest_id: str) -> str:
             old_count = completions[username]
             del completions[username]
             quest_state["completions"] = completions
+            mark_section_dirty("quest_global_state")
             messages.append(f"Reset completion count (was {old_count})")
     
     # Clean up quest-specific items
@@ -950,58 +957,44 @@ def maybe_offer_npc_quest(game: Dict, username: str, npc_id: str, player_text: s
     if game.get("pending_quest_offer"):
         return None
     
+    # Only quests with a dialogue offer from this NPC are candidates
     # Prioritize certain quests by checking them first
     # mara_lost_item should be checked before lost_package since they have overlapping keywords
     priority_quest_ids = ["mara_lost_item"]  # Add more priority quests here if needed
-    
-    # Build list of quests to check: priority first, then rest
-    quests_to_check = []
-    for quest_id in priority_quest_ids:
-        if quest_id in QUEST_TEMPLATES:
-            quests_to_check.append((quest_id, QUEST_TEMPLATES[quest_id]))
-    for quest_id, template in QUEST_TEMPLATES.items():
-        if quest_id not in priority_quest_ids:
-            quests_to_check.append((quest_id, template))
-    
-    # Check all quest templates for NPC-based offers
-    for quest_id, template in quests_to_check:
-        # Skip if player already has this quest active
-        if quest_id in game.get("quests", {}):
-            quest_instance = game["quests"][quest_id]
-            if quest_instance.get("status") == "active":
-                continue
-        
-        # Check availability before offering
-        is_available, reason = is_quest_available_to_player(game, username, quest_id, active_players_fn)
-        if not is_available:
+    offers = sorted(NPC_QUEST_OFFERS.get(npc_id, ()), key=lambda offer: offer[0] not in priority_quest_ids)
+    
+    text_lower = player_text.lower()
+    checked = {}  # quest_id -> available to this player
+    for quest_id, offer_source in offers:
+        if quest_id not in checked:
+            # Skip if player already has this quest active
+            quest_instance = game.get("quests", {}).get(quest_id)
+            if quest_instance and quest_instance.get("status") == "active":
+                checked[quest_id] = False
+            else:
+                # Check availability before offering
+                checked[quest_id] = is_quest_available_to_player(game, username, quest_id, active_players_fn)[0]
+        if not checked[quest_id]:
             continue  # Don't offer unavailable quests
         
-        # Check if this quest has an NPC offer source for this NPC
-        for offer_source in template.offer_sources:
-            if offer_source.get("type") == "npc_dialogue":
-                source_npc_id = offer_source.get("npc_id", "")
-                if source_npc_id == npc_id:
-                    # Check trigger conditions
-                    trigger = offer_source.get("trigger", {})
-                    trigger_kind = trigger.get("kind", "")
-                    
-                    if trigger_kind == "say_contains":
-                        keywords = trigger.get("keywords", [])
-                        text_lower = player_text.lower()
-                        
-                        # Check if player text contains any keyword
-                        if keywords and any(keyword.lower() in text_lower for keyword in keywords):
-                            # Get the NPC's dialogue text
-                            npc_dialogue = offer_source.get("offer_text", "")
-                            
-                            # Offer the quest (this stores it as pending and returns full message)
-                            quest_message = offer_quest_to_player(game, username, quest_id, f"npc:{npc_id}")
-                            
-                            # Combine NPC dialogue with quest offer message
-                            if npc_dialogue:
-                                return f"{npc_dialogue}\n\n{quest_message}"
-                            else:
-                                return quest_message
+        # Check trigger conditions
+        trigger = offer_source.get("trigger", {})
+        if trigger.get("kind", "") == "say_contains":
+            keywords = trigger.get("keywords", [])
+            
+            # Check if player text contains any keyword
+            if keywords and any(keyword.lower() in text_lower for keyword in keywords):
+                # Get the NPC's dialogue text
+                npc_dialogue = offer_source.get("offer_text", "")
+                
+                # Offer the quest (this stores it as pending and returns full message)
+                quest_message = offer_quest_to_player(game, username, quest_id, f"npc:{npc_id}")
+                
+                # Combine NPC dialogue with quest offer message
+                if npc_dialogue:
+                    return f"{npc_dialogue}\n\n{quest_message}"
+                else:
+                    return quest_message
     
     return None
 
@@ -1240,25 +1233,17 @@ def get_noticeboard_quests_for_room(game: Dict, room_id: str, current_tick: int,
     available = []
     username = username or game.get("username", "adventurer")
     
-    for quest_id, template in QUEST_TEMPLATES.items():
+    # Only quests posted on this room's noticeboard
+    for quest_id in NOTICEBOARD_QUESTS.get(room_id, ()):
+        template = QUEST_TEMPLATES.get(quest_id)
+        if template is None:
+            continue
         # Skip if player already has this quest active (completed quests can be repeatable)
         if quest_id in game.get("quests", {}):
             quest_instance = game["quests"][quest_id]
             if quest_instance.get("status") == "active":
                 continue
         
-        # Check if this quest has a noticeboard offer source for this room
-        has_noticeboard_source = False
-        for offer_source in template.offer_sources:
-            if offer_source.get("type") == "noticeboard":
-                source_room_id = offer_source.get("room_id", "")
-                if source_room_id == room_id:
-                    has_noticeboard_source = True
-                    break
-        
-        if not has_noticeboard_source:
-            continue
-        
         # Check availability to this player
         is_available, reason = is_quest_available_to_player(game, username, quest_id, active_players_fn)
         if is_available:
@@ -1465,11 +1450,6 @@ def initialize_quests():
     register_quest_template(mara_lost_item_template)
 
 
-def register_quest_template(template: QuestTemplate):
-    """Register a quest template in the global registry."""
-    QUEST_TEMPLATES[template.id] = template
-
-
 # Initialize quests when module is imported
 initialize_quests()
 
@@ -45,10 +45,11 @@ def belltower_touch(game, username, room_id, detail_id):
     Returns:
         str: Response message to display to the player
     """
-    from game_engine import get_current_hour_12h, get_time_of_day
+    from game.systems.world_clock import get_world_clock
     
-    hour = get_current_hour_12h()
-    time_of_day = get_time_of_day()
+    clock = get_world_clock().snapshot()
+    hour = clock.hour_12
+    time_of_day = clock.time_of_day
     
     messages = [
         f"You touch the cool stone of the belltower. The bell hangs silently above, last tolling at {hour} o'clock.",
@@ -73,10 +74,11 @@ def belltower_look(game, username, room_id, detail_id):
     Returns:
         str: Response message to display to the player
     """
-    from game_engine import get_current_hour_12h, get_time_of_day
+    from game.systems.world_clock import get_world_clock
     
-    hour = get_current_hour_12h()
-    time_of_day = get_time_of_day()
+    clock = get_world_clock().snapshot()
+    hour = clock.hour_12
+    time_of_day = clock.time_of_day
     
     time_desc = {
         "dawn": "The bell catches the first rays of morning light.",
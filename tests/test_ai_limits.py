@@ -0,0 +1,129 @@
+"""
+Tests for AI rate limiting and batched token-budget accounting.
+"""
+import sqlite3
+import unittest
+from unittest import mock
+
+import ai_client
+from core.ai_limits import RedisWindowLimiter, SlidingWindowLimiter, UsageLedger
+
+try:
+    import fakeredis
+    REDIS_AVAILABLE = True
+except ImportError:  # redis package not installed
+    REDIS_AVAILABLE = False
+
+
+def _make_db():
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        """
+        CREATE TABLE ai_usage (
+            user_id INTEGER PRIMARY KEY,
+            token_budget INTEGER DEFAULT 10000,
+            tokens_used INTEGER DEFAULT 0,
+            requests_count INTEGER DEFAULT 0,
+            last_reset TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    return conn
+
+
+class TestSlidingWindowLimiter(unittest.TestCase):
+    def test_requests_expire_with_their_slice(self):
+        limiter = SlidingWindowLimiter(limit=3, window=60, buckets=6)
+        with mock.patch("core.ai_limits.time.time", return_value=1000.0):
+            for _ in range(3):
+                limiter.hit("alice")
+            self.assertFalse(limiter.allow("alice"))
+            self.assertTrue(limiter.allow("bob"))
+        with mock.patch("core.ai_limits.time.time", return_value=1055.0):
+            limiter.hit("alice")
+            self.assertEqual(limiter.count("alice"), 4)
+        with mock.patch("core.ai_limits.time.time", return_value=1061.0):
+            self.assertEqual(limiter.count("alice"), 1)
+            self.assertEqual(limiter.counts(), {"alice": 1})
+
+    def test_counts_reports_every_requested_key(self):
+        limiter = SlidingWindowLimiter(limit=3, window=60, buckets=6)
+        with mock.patch("core.ai_limits.time.time", return_value=1000.0):
+            limiter.hit("alice")
+            limiter.hit("alice")
+            self.assertEqual(limiter.counts(["alice", "bob"]), {"alice": 2, "bob": 0})
+
+    def test_rate_limit_check_uses_the_limiter(self):
+        limiter = SlidingWindowLimiter(limit=1)
+        with mock.patch.object(ai_client, "get_rate_limiter", return_value=limiter):
+            self.assertEqual(ai_client._check_rate_limit("alice"), (True, None))
+            limiter.hit("alice")
+            allowed, message = ai_client._check_rate_limit("alice")
+        self.assertFalse(allowed)
+        self.assertIn("Maximum 1 AI requests", message)
+
+
+@unittest.skipUnless(REDIS_AVAILABLE, "redis package not installed")
+class TestRedisWindowLimiter(unittest.TestCase):
+    def test_counts_reads_every_user_in_one_round_trip(self):
+        cache = fakeredis.FakeRedis()
+        limiter = RedisWindowLimiter(limit=3, window=60, buckets=6)
+        with mock.patch("core.redis_manager.get_cache_connection", return_value=cache), \
+                mock.patch("core.ai_limits.time.time", return_value=1000.0):
+            limiter.hit("alice")
+            limiter.hit("alice")
+            limiter.hit("bob")
+            with mock.patch.object(cache, "execute_command", wraps=cache.execute_command) as direct, \
+                    mock.patch.object(cache, "pipeline", wraps=cache.pipeline) as pipeline:
+                counts = limiter.counts(["alice", "bob", "carol"])
+        self.assertEqual(counts, {"alice": 2, "bob": 1, "carol": 0})
+        pipeline.assert_called_once_with(transaction=False)
+        direct.assert_not_called()
+
+
+class TestUsageLedger(unittest.TestCase):
+    def setUp(self):
+        self.conn = _make_db()
+        self.ledger = UsageLedger()
+
+    def test_usage_is_batched_and_checks_stay_current(self):
+        self.conn.execute("INSERT INTO ai_usage (user_id, token_budget, tokens_used) VALUES (1, 100, 40)")
+        self.assertEqual(self.ledger.check(1, self.conn), (True, 60))
+        self.ledger.record(1, 30)
+        self.ledger.record(1, 30)
+        self.assertEqual(self.ledger.check(1, self.conn), (False, 0))
+        # Nothing written until the flush
+        self.assertEqual(self.conn.execute("SELECT tokens_used FROM ai_usage").fetchone()[0], 40)
+        self.assertEqual(self.ledger.flush(self.conn), 1)
+        row = self.conn.execute("SELECT tokens_used, requests_count FROM ai_usage").fetchone()
+        self.assertEqual(tuple(row), (100, 2))
+        self.assertEqual(self.ledger.get_usage(1, self.conn), (100, 100))
+        self.assertEqual(self.ledger.get_stats()["loads"], 1)
+
+    def test_new_users_get_the_default_budget(self):
+        with mock.patch.dict("os.environ", {"AI_DEFAULT_TOKEN_BUDGET": "500"}):
+            self.assertEqual(self.ledger.check(7, self.conn), (True, 500))
+            self.ledger.flush(self.conn)
+        row = self.conn.execute("SELECT token_budget, tokens_used FROM ai_usage WHERE user_id = 7").fetchone()
+        self.assertEqual(tuple(row), (500, 0))
+
+    def test_budget_changes_are_picked_up(self):
+        self.conn.execute("INSERT INTO ai_usage (user_id, token_budget, tokens_used) VALUES (1, 100, 100)")
+        self.assertFalse(self.ledger.check(1, self.conn)[0])
+        self.conn.execute("UPDATE ai_usage SET token_budget = 200 WHERE user_id = 1")
+        self.ledger.invalidate(1)
+        self.assertEqual(self.ledger.check(1, self.conn), (True, 100))
+
+    def test_failed_flush_keeps_the_deltas(self):
+        self.ledger.record(1, 25)
+        broken = mock.Mock()
+        broken.executemany.side_effect = sqlite3.OperationalError("database is locked")
+        self.assertEqual(self.ledger.flush(broken), 0)
+        self.assertTrue(self.ledger.has_pending())
+        self.assertEqual(self.ledger.flush(self.conn), 1)
+        self.assertEqual(self.conn.execute("SELECT tokens_used FROM ai_usage").fetchone()[0], 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
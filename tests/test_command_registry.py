@@ -0,0 +1,61 @@
+"""
+Tests for the command registry: grammar checks, dispatch and per-verb counters.
+"""
+import game_engine
+from game_engine import EMOTES, dispatch_command, new_game_state
+from command_registry import get_command, get_command_stats, reset_command_stats
+
+
+def _dispatch(text, game):
+    tokens = text.lower().split()
+    return dispatch_command(tokens[0], tokens, text, game, username="tester")
+
+
+def test_every_verb_is_registered():
+    for verb in ["look", "l", "go", "n", "north", "say", "tell", "buy", "give", "talk",
+                 "attack", "board", "accept", "weather", "quit", "yes", "setweather", "help"]:
+        assert get_command(verb) is not None, verb
+    # Emotes win over verbs that are also emotes
+    assert get_command("examine").handler is get_command("smile").handler
+    assert get_command("hit").verb == "hit"
+
+
+def test_grammar_mismatch_is_unknown_command():
+    game = new_game_state("tester")
+    response, game = _dispatch("go", game)
+    assert "nonsense" in response
+    response, game = _dispatch("quit now", game)
+    assert "nonsense" in response
+    response, game = _dispatch("accept it", game)
+    assert "nonsense" in response
+    response, game = _dispatch("yes", game)
+    assert "nonsense" in response
+
+
+def test_logout_confirmation_flow():
+    game = new_game_state("tester")
+    response, game = _dispatch("quit", game)
+    assert game.get("pending_quit")
+    response, game = _dispatch("no", game)
+    assert not game.get("pending_quit")
+    _dispatch("quit", game)
+    response, game = _dispatch("y", game)
+    assert response == "__LOGOUT__"
+
+
+def test_raw_command_keeps_case():
+    game = new_game_state("tester")
+    response, game = _dispatch("say Hello There", game)
+    assert "Hello There" in response
+
+
+def test_per_verb_counters():
+    reset_command_stats()
+    game = new_game_state("tester")
+    for text in ["look", "l", "smile", "frobnicate"]:
+        _dispatch(text, game)
+    stats = get_command_stats()
+    assert stats["look"]["calls"] == 2
+    assert stats["smile"]["calls"] == 1
+    assert stats["<unknown>"]["calls"] == 1
+    assert stats["look"]["max_ms"] >= stats["look"]["avg_ms"] >= 0
@@ -0,0 +1,82 @@
+"""
+Tests for the SQLite connection pool.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from core.db_pool import ConnectionPool, PoolTimeout
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "pool.db")
+        self.pool = ConnectionPool(self.path, size=2, checkout_timeout=0.2)
+        conn = self.pool.acquire()
+        conn.execute("CREATE TABLE kv (key TEXT PRIMARY KEY, value TEXT)")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.pool.close_all()
+        for name in os.listdir(self.tmpdir):
+            os.remove(os.path.join(self.tmpdir, name))
+        os.rmdir(self.tmpdir)
+
+    def test_connections_are_reused_with_pragmas(self):
+        """close() returns the connection; the next checkout gets it back with pragmas applied."""
+        first = self.pool.acquire()
+        raw = first.raw
+        first.close()
+        second = self.pool.acquire()
+        self.assertIs(second.raw, raw)
+        self.assertEqual(second.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(second.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        self.assertIsInstance(second.execute("SELECT 1 AS one").fetchone(), sqlite3.Row)
+        second.close()
+        self.assertEqual(self.pool.get_stats()["connections_opened"], 1)
+
+    def test_checkout_is_bounded(self):
+        """A full pool times out, and a returned connection wakes a waiter."""
+        a, b = self.pool.acquire(), self.pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            self.pool.acquire(timeout=0.05)
+
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(self.pool.acquire(timeout=2.0)))
+        waiter.start()
+        a.close()
+        waiter.join()
+        self.assertEqual(len(got), 1)
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["max_in_use"], 2)
+        self.assertLessEqual(stats["open"], 2)
+        got[0].close()
+        b.close()
+
+    def test_uncommitted_work_is_rolled_back_on_return(self):
+        """Returning a connection discards its open transaction, like sqlite3 close() did."""
+        conn = self.pool.acquire()
+        conn.execute("INSERT INTO kv VALUES ('a', '1')")
+        conn.close()
+        conn = self.pool.acquire()
+        self.assertIsNone(conn.execute("SELECT value FROM kv WHERE key = 'a'").fetchone())
+        conn.close()
+
+    def test_shared_connection_returns_after_last_holder(self):
+        """retain() lets one request share a connection; it goes back when the last holder closes."""
+        conn = self.pool.acquire()
+        conn.retain()
+        conn.close()
+        self.assertFalse(conn.closed)
+        self.assertEqual(self.pool.get_stats()["in_use"], 1)
+        conn.close()
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.pool.get_stats()["in_use"], 0)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+if __name__ == "__main__":
+    unittest.main()
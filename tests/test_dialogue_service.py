@@ -0,0 +1,180 @@
+"""
+Tests for the non-blocking NPC dialogue service.
+"""
+import os
+import json
+import time
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+from unittest import mock
+
+import ai_client
+import game_engine  # noqa: F401  (generate_npc_line imports it lazily; keep that out of the timings)
+from core.dialogue_service import DialogueService, get_dialogue_service
+from core.response_cache import get_response_cache
+from core.ai_limits import get_rate_limiter
+from npc import generate_npc_line
+
+
+class _MockCompletionHandler(BaseHTTPRequestHandler):
+    """Answers /v1/chat/completions like the OpenAI API would."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        time.sleep(self.server.delay)
+        payload = json.dumps({
+            "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "nods slowly. 'Well met.'"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class _FakeCompletions:
+    """Stands in for client.chat.completions, with a configurable delay."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        usage = SimpleNamespace(total_tokens=15, prompt_tokens=10, completion_tokens=5)
+        message = SimpleNamespace(content="grunts. 'What do you want?'")
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=message)])
+
+
+class TestDialogueService(unittest.TestCase):
+    def setUp(self):
+        self.service = DialogueService(max_concurrency=2, timeout=1.0)
+        self.service.start()
+
+    def test_identical_jobs_are_coalesced(self):
+        calls, results = [], []
+        release = threading.Event()
+
+        def work(timeout):
+            calls.append(timeout)
+            release.wait(1)
+            return "reply"
+
+        self.assertFalse(self.service.submit("k", work, lambda: "fallback", results.append))
+        self.assertTrue(self.service.submit("k", work, lambda: "fallback", results.append))
+        release.set()
+        self.assertTrue(self.service.wait_idle(2))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["reply", "reply"])
+        self.assertEqual(self.service.get_stats()["coalesced"], 1)
+
+    def test_concurrency_is_capped(self):
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def work(timeout):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return "ok"
+
+        results = []
+        for i in range(6):
+            self.service.submit(i, work, lambda: "fallback", results.append)
+        self.assertTrue(self.service.wait_idle(2))
+        self.assertEqual(results, ["ok"] * 6)
+        self.assertEqual(peak[0], 2)
+
+    def test_slow_and_failing_jobs_fall_back(self):
+        self.service.timeout = 0.05
+        results = []
+        self.service.submit("slow", lambda timeout: time.sleep(0.1) or "late", lambda: "fallback", results.append)
+        self.service.submit("broken", lambda timeout: 1 / 0, lambda: "fallback", results.append)
+        self.assertTrue(self.service.wait_idle(2))
+        self.assertEqual(results.count("fallback"), 2)
+        stats = self.service.get_stats()
+        self.assertEqual((stats["timeouts"], stats["errors"]), (1, 1))
+
+
+class TestNonBlockingNpcReplies(unittest.TestCase):
+    def setUp(self):
+        self.service = get_dialogue_service()
+        self.delivered = []
+        self.service.start(deliver=lambda room_id, text: self.delivered.append((room_id, text)))
+        get_response_cache().clear()
+        get_rate_limiter().clear()
+        self.env = mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.service.wait_idle(5)
+        self.service.stop()
+        self.service.start()  # reset the deliver hook
+        self.service.stop()
+
+    def test_talk_returns_before_the_model_answers(self):
+        completions = _FakeCompletions(delay=0.2)
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        game = {"location": "tavern", "npc_memory": {}, "reputation": {}}
+        with mock.patch.object(ai_client, "OPENAI_AVAILABLE", True), \
+                mock.patch.object(ai_client, "get_openai_client", return_value=client), \
+                mock.patch("npc.mark_player_dirty") as mark_player_dirty:
+            started = time.perf_counter()
+            line = generate_npc_line("innkeeper", game, username="tester")
+            self.assertLess(time.perf_counter() - started, 0.1)
+            self.assertEqual(line, "Mara considers you for a moment.")
+            self.assertTrue(self.service.wait_idle(2))
+        self.assertEqual(completions.calls, 1)
+        mark_player_dirty.assert_called_once_with("tester")
+        self.assertEqual(self.delivered, [("tavern", "Mara grunts. 'What do you want?'")])
+        self.assertEqual(game["npc_memory"]["innkeeper"][-1]["type"], "talked")
+
+    def test_identical_prompts_share_one_completion(self):
+        completions = _FakeCompletions(delay=0.1)
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        npc = {"name": "Mara", "personality": "kind"}
+        replies = []
+        with mock.patch.object(ai_client, "OPENAI_AVAILABLE", True), \
+                mock.patch.object(ai_client, "get_openai_client", return_value=client):
+            for _ in range(3):
+                game = {"_current_npc_id": "innkeeper"}
+                pending = ai_client.request_npc_reply(npc, {"name": "Tavern"}, game, "tester", "hello",
+                                                      lambda *reply: replies.append(reply))
+                self.assertEqual(pending, (None, None))
+            self.assertTrue(self.service.wait_idle(2))
+        self.assertEqual(completions.calls, 1)
+        self.assertEqual(len(replies), 3)
+
+    @unittest.skipUnless(ai_client.OPENAI_AVAILABLE, "openai package not installed")
+    def test_against_local_mock_completion_server(self):
+        server = HTTPServer(("127.0.0.1", 0), _MockCompletionHandler)
+        server.requests, server.delay = [], 0.1
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        replies = []
+        try:
+            with mock.patch.dict(os.environ, {"OPENAI_BASE_URL": f"http://127.0.0.1:{server.server_port}/v1"}):
+                game = {"_current_npc_id": "blacksmith"}
+                pending = ai_client.request_npc_reply({"name": "Blacksmith"}, {"name": "Forge"}, game, "tester",
+                                                      "talk to Blacksmith", lambda *reply: replies.append(reply))
+                self.assertEqual(pending, (None, None))
+                self.assertTrue(self.service.wait_idle(5))
+        finally:
+            server.shutdown()
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(replies, [("Blacksmith nods slowly. 'Well met.'", None)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests for the event bus across workers (two buses sharing one Redis).
+"""
+import unittest
+
+from core.local_broker import LocalBroker
+
+try:
+    import fakeredis
+    import core.redis_manager as redis_manager
+    from core.event_bus import EventBus
+    from core.event_codec import decode_events
+    REDIS_AVAILABLE = True
+except ImportError:  # redis / fakeredis packages not installed
+    REDIS_AVAILABLE = False
+
+
+@unittest.skipUnless(REDIS_AVAILABLE, "redis and fakeredis packages not installed")
+class TestEventBusAcrossWorkers(unittest.TestCase):
+    def setUp(self):
+        redis_manager._redis_available = False  # Keep EventBus() from opening its own connections
+        self.server = fakeredis.FakeServer()
+        self.worker_a = self._make_bus()
+        self.worker_b = self._make_bus()
+        self.listener = fakeredis.FakeRedis(server=self.server).pubsub(ignore_subscribe_messages=True)
+
+    def tearDown(self):
+        self.listener.close()
+
+    def _make_bus(self):
+        bus = EventBus(backend="local", local=LocalBroker())
+        bus._redis = fakeredis.FakeRedis(server=self.server)
+        return bus
+
+    def _received(self):
+        events = []
+        while True:
+            message = self.listener.get_message(timeout=0.05)
+            if message is None:
+                return events
+            events.extend(event["type"] for event in decode_events(message["data"]))
+
+    def test_subscriber_on_another_worker_gets_events_on_idle_channel(self):
+        """Only droppable events skip a channel that had no subscribers."""
+        self.assertTrue(self.worker_a.publish_user("bob", "quest_update", {}))
+        self.assertTrue(self.worker_a.publish_user("bob", "system_message", {"message_type": "state_update"}))
+        self.assertEqual(self.worker_a.stats["skipped"], 1)
+
+        # Bob's socket lands on worker B, which subscribes to his channel
+        self.listener.subscribe("user:bob")
+        self.worker_b.channel_subscribed("user:bob")
+        self.listener.get_message(timeout=0.05)
+
+        # Worker A hasn't heard from B yet: the state update is still skipped, nothing else is
+        self.worker_a.publish_user("bob", "system_message", {"message_type": "state_update"})
+        self.worker_a.publish_user("bob", "quest_update", {"quest_id": "q1"})
+        self.worker_a.publish_user("bob", "system_message", {"message_type": "private_message"})
+        self.assertEqual(self._received(), ["quest_update", "system_message"])
+        self.assertEqual(self.worker_a.stats["skipped"], 2)
+
+        # The delivered publish unmuted the channel: state updates flow again
+        self.worker_a.publish_user("bob", "system_message", {"message_type": "state_update"})
+        self.assertEqual(self._received(), ["system_message"])
+        self.assertEqual(self.worker_a.stats["skipped"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Tests for the compact event envelope.
+"""
+import json
+import struct
+import unittest
+from datetime import datetime
+
+from core.event_codec import ENVELOPE_VERSION, decode_events, encode_events
+
+
+class TestEventCodec(unittest.TestCase):
+    def test_batch_round_trip(self):
+        events = [
+            ("player_move", {"username": "alice", "from_room": "town_square", "to_room": "tavern"}, 1700000000.25),
+            ("system_message", {"message_type": "state_update"}, 1700000000.5),
+            ("custom_event", {"value": 3}, 1700000001.0),
+        ]
+        payload = encode_events(events)
+        self.assertIsInstance(payload, bytes)
+        self.assertEqual(decode_events(payload), [
+            {"type": event_type, "data": data, "timestamp": timestamp} for event_type, data, timestamp in events
+        ])
+
+    def test_json_debug_mode_and_legacy_payloads(self):
+        events = [("npc_action", {"text": "Mara waves."}, 1700000000.0)]
+        payload = encode_events(events, debug_json=True)
+        self.assertEqual(json.loads(payload)[0]["type"], "npc_action")
+        self.assertEqual(decode_events(payload), decode_events(encode_events(events)))
+        # Single-event JSON dicts published before the envelope existed
+        legacy = json.dumps({"type": "npc_action", "data": {"text": "hi"}, "timestamp": "2024-01-01T00:00:00"})
+        self.assertEqual(decode_events(legacy)[0]["data"], {"text": "hi"})
+
+    def test_smaller_than_the_json_envelope(self):
+        data = {"message_type": "state_update"}
+        legacy = json.dumps({"type": "system_message", "data": data, "timestamp": datetime.utcnow().isoformat()})
+        self.assertLess(len(encode_events([("system_message", data, 1700000000.0)])), len(legacy))
+
+    def test_unknown_version_and_truncation_are_rejected(self):
+        payload = encode_events([("npc_action", {"text": "hi"}, 1.0)])
+        with self.assertRaises(ValueError):
+            decode_events(payload[:1] + struct.pack(">B", ENVELOPE_VERSION + 1) + payload[2:])
+        with self.assertRaises((ValueError, struct.error)):
+            decode_events(payload[:-3])
+
+
+if __name__ == "__main__":
+    unittest.main()
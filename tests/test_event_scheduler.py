@@ -0,0 +1,71 @@
+"""
+Tests for the heap-based room event scheduler.
+"""
+import unittest
+from core.event_scheduler import (
+    RoomEventScheduler, NPC_ACTION, AMBIANCE, WEATHER_AMBIANCE, NPC_WEATHER_REACTION,
+)
+
+OUTDOOR = {"town_square"}
+
+class TestRoomEventScheduler(unittest.TestCase):
+    def setUp(self):
+        self.saved = []
+        self.scheduler = RoomEventScheduler(save_fn=self.saved.append, flush_interval=30.0)
+        self.is_outdoor = lambda room_id: room_id in OUTDOOR
+
+    def test_only_listened_rooms_are_scheduled(self):
+        """Rooms are scheduled while listened; indoor rooms get no weather events."""
+        self.scheduler.set_listened_rooms(["town_square", "tavern"], self.is_outdoor, now=0.0)
+        self.assertEqual(sorted(self.scheduler.active_rooms), ["tavern", "town_square"])
+        self.assertIsNotNone(self.scheduler.next_due("town_square", WEATHER_AMBIANCE))
+        self.assertIsNone(self.scheduler.next_due("tavern", WEATHER_AMBIANCE))
+        self.scheduler.set_listened_rooms(["town_square"], self.is_outdoor, now=1.0)
+        self.assertEqual(self.scheduler.active_rooms, ["town_square"])
+
+    def test_pop_due_returns_only_due_events(self):
+        """Only events whose time has come are returned, once each."""
+        self.scheduler.set_listened_rooms(["town_square", "tavern"], self.is_outdoor, now=0.0)
+        # Weather ambiance fires on arrival; NPC actions and ambiance wait a full interval
+        first = self.scheduler.pop_due(now=0.0)
+        self.assertIn(("town_square", WEATHER_AMBIANCE), first)
+        self.assertNotIn(("tavern", AMBIANCE), first)
+        self.assertEqual(self.scheduler.pop_due(now=0.0), [])
+        due = first + self.scheduler.pop_due(now=1000.0)
+        self.assertEqual(len(due), 6)
+        self.assertEqual(set(due), {
+            ("town_square", WEATHER_AMBIANCE),
+            ("town_square", NPC_ACTION), ("town_square", AMBIANCE), ("town_square", NPC_WEATHER_REACTION),
+            ("tavern", NPC_ACTION), ("tavern", AMBIANCE),
+        })
+        self.scheduler.reschedule("tavern", NPC_ACTION, now=1000.0)
+        self.assertGreaterEqual(self.scheduler.next_due("tavern", NPC_ACTION), 1030.0)
+
+    def test_dropped_rooms_stop_firing(self):
+        """Heap entries of rooms without listeners are skipped; timers return with listeners."""
+        self.scheduler.set_listened_rooms(["tavern"], self.is_outdoor, now=0.0)
+        due_at = self.scheduler.next_due("tavern", AMBIANCE)
+        self.scheduler.set_listened_rooms([], self.is_outdoor, now=1.0)
+        self.assertEqual(self.scheduler.pop_due(now=1000.0), [])
+        self.scheduler.set_listened_rooms(["tavern"], self.is_outdoor, now=2.0)
+        self.assertEqual(self.scheduler.next_due("tavern", AMBIANCE), due_at)
+
+    def test_flush_batches_changes(self):
+        """Timers are handed to save_fn in one batch per flush interval."""
+        self.scheduler.set_listened_rooms(["town_square", "tavern"], self.is_outdoor, now=0.0)
+        self.assertEqual(self.scheduler.flush(now=100.0), 2)
+        self.assertEqual(sorted(self.saved[0]), ["tavern", "town_square"])
+        self.scheduler.reschedule("tavern", NPC_ACTION, now=101.0)
+        self.assertEqual(self.scheduler.flush(now=101.0), 0)
+        self.assertEqual(self.scheduler.flush(now=131.0), 1)
+        self.assertEqual(len(self.saved), 2)
+
+    def test_saved_timers_are_loaded(self):
+        """A room with saved timers resumes them instead of starting fresh."""
+        scheduler = RoomEventScheduler(load_fn=lambda room_ids: {room_id: {AMBIANCE: 5.0} for room_id in room_ids})
+        scheduler.set_listened_rooms(["tavern"], self.is_outdoor, now=0.0)
+        self.assertEqual(scheduler.next_due("tavern", AMBIANCE), 5.0)
+        self.assertEqual(scheduler.pop_due(now=5.0), [("tavern", AMBIANCE)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for shared item prototypes (flyweight item definitions).
+"""
+import unittest
+from game.models.item import Corpse, Weapon
+from game.systems.inventory import (
+    ITEM_DEFS,
+    calculate_inventory_weight,
+    get_item_def,
+    get_item_prototype,
+    group_inventory_items,
+    mark_quest_item,
+)
+from game.world.manager import WorldManager
+
+class TestItemPrototypes(unittest.TestCase):
+    def tearDown(self):
+        ITEM_DEFS.pop("proto_test_blade", None)
+
+    def test_definitions_are_shared_and_read_only(self):
+        """Lookups return the same pre-normalised mapping, which can't be changed."""
+        first = get_item_def("bread")
+        self.assertIs(first, get_item_def("bread"))
+        self.assertTrue(first["droppable"])
+        with self.assertRaises(TypeError):
+            first["weight"] = 99
+
+    def test_unknown_items_get_defaults(self):
+        prototype = get_item_prototype("mystery_box")
+        self.assertEqual(prototype.name, "mystery box")
+        self.assertEqual(prototype.weight, 0.1)
+        self.assertEqual(prototype.item_type, "misc")
+
+    def test_replaced_and_updated_defs_rebuild_prototypes(self):
+        ITEM_DEFS["proto_test_blade"] = {"name": "test blade", "type": "weapon", "damage": 4}
+        self.assertEqual(get_item_prototype("proto_test_blade").weight, 0.1)
+        ITEM_DEFS["proto_test_blade"] = {"name": "test blade", "type": "weapon", "weight": 2.0}
+        self.assertEqual(get_item_prototype("proto_test_blade").weight, 2.0)
+        mark_quest_item("proto_test_blade")
+        prototype = get_item_prototype("proto_test_blade")
+        self.assertTrue(prototype.is_quest)
+        self.assertFalse(prototype.droppable)
+
+    def test_precomputed_names_and_weights(self):
+        self.assertEqual(group_inventory_items(["bread", "bread", "iron_sword"]),
+                         ["2 loaves of bread", "an iron sword"])
+        self.assertAlmostEqual(calculate_inventory_weight(["bread", "iron_sword", "unknown_thing"]), 5.6)
+
+    def test_hydrated_items_share_the_prototype(self):
+        wm = WorldManager.get_instance()
+        first, second = wm.get_item("iron_sword"), wm.get_item("iron_sword")
+        self.assertIsInstance(first, Weapon)
+        self.assertIsNot(first, second)
+        self.assertIs(first.prototype, second.prototype)
+        self.assertEqual(first.adjectives, ["iron"])
+        first.adjectives.append("chipped")
+        self.assertEqual(second.adjectives, ["iron"])
+
+    def test_first_hydrated_item_does_not_leak_into_later_ones(self):
+        """Changing the first item built from a prototype leaves later ones untouched."""
+        wm = WorldManager.get_instance()
+        ITEM_DEFS["proto_test_blade"] = {"name": "test blade", "type": "weapon"}
+        first = wm.get_item("proto_test_blade")
+        first.properties["lit"] = True
+        first.flags.append("cursed")
+        first.adjectives.append("chipped")
+        second = wm.get_item("proto_test_blade")
+        self.assertEqual(second.properties, {})
+        self.assertNotIn("cursed", second.flags)
+        self.assertEqual(second.adjectives, ["test"])
+
+    def test_decay_state(self):
+        """Decay counters live in the slotted ItemState, which items that don't rot never create."""
+        corpse = Corpse("corpse_1", "Corpse of a rat")
+        self.assertEqual(corpse.decay_ticks, 60)
+        corpse.tick()
+        self.assertEqual(corpse.state.decay_ticks, 59)
+        with self.assertRaises(AttributeError):
+            corpse.state.colour = "green"
+        self.assertIsNone(WorldManager.get_instance().get_item("iron_sword")._state)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for the in-process event broker.
+"""
+import threading
+import time
+import unittest
+
+from core.local_broker import BLOCK, DROP_NEWEST, DROP_OLDEST, LocalBroker, LocalSubscriber
+
+try:
+    from core.event_bus import EventBus
+    EVENT_BUS_AVAILABLE = True
+except ImportError:  # redis package not installed
+    EVENT_BUS_AVAILABLE = False
+
+
+def event(n):
+    return {"type": "npc_action", "data": {"n": n}, "timestamp": float(n)}
+
+
+class TestLocalBroker(unittest.TestCase):
+    def test_exact_and_wildcard_routing(self):
+        broker = LocalBroker()
+        tavern, rooms, everything = [], [], []
+        broker.subscribe("room:tavern", tavern.append)
+        broker.subscribe("room:*", rooms.append)
+        broker.subscribe("*", everything.append)
+
+        self.assertEqual(broker.publish("room:tavern", event(1)), 3)
+        self.assertEqual(broker.publish("room:market", event(2)), 2)
+        self.assertEqual(broker.publish("user:alice", event(3)), 1)
+        self.assertEqual([e["data"]["n"] for e in tavern], [1])
+        self.assertEqual([e["data"]["n"] for e in rooms], [1, 2])
+        self.assertEqual([e["data"]["n"] for e in everything], [1, 2, 3])
+
+    def test_unsubscribe_invalidates_cached_routes(self):
+        broker = LocalBroker()
+        received = []
+        subscription = broker.subscribe("room:*", received.append)
+        broker.publish("room:tavern", event(1))
+        subscription.close()
+        self.assertFalse(broker.has_subscribers("room:tavern"))
+        self.assertEqual(broker.publish("room:tavern", event(2)), 0)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(broker.stats["unrouted"], 1)
+
+    def test_failing_callback_does_not_stop_delivery(self):
+        broker = LocalBroker()
+        received = []
+
+        def broken(_event):
+            raise RuntimeError("boom")
+
+        broker.subscribe("global", broken)
+        broker.subscribe("global", received.append)
+        self.assertEqual(broker.publish("global", event(1)), 1)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(broker.stats["dropped"], 1)
+
+    def test_drop_policies(self):
+        broker = LocalBroker()
+        oldest = broker.subscribe("room:tavern", maxsize=2, policy=DROP_OLDEST)
+        newest = broker.subscribe("room:tavern", maxsize=2, policy=DROP_NEWEST)
+        for n in range(4):
+            broker.publish("room:tavern", event(n))
+        self.assertEqual([e["data"]["n"] for e in oldest.drain()], [2, 3])
+        self.assertEqual([e["data"]["n"] for e in newest.drain()], [0, 1])
+        self.assertEqual((oldest.dropped, newest.dropped), (2, 2))
+        self.assertIsNone(oldest.get(timeout=0))
+
+    def test_block_policy_applies_backpressure(self):
+        broker = LocalBroker()
+        slow = broker.subscribe("room:tavern", maxsize=1, policy=BLOCK, block_timeout=2.0)
+        received = []
+
+        def consume():
+            for _ in range(3):
+                time.sleep(0.02)
+                received.append(slow.get(timeout=1.0))
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for n in range(3):
+            self.assertEqual(broker.publish("room:tavern", event(n)), 1)
+        consumer.join()
+        self.assertEqual([e["data"]["n"] for e in received], [0, 1, 2])
+        self.assertEqual(slow.dropped, 0)
+
+        # Nobody draining: the publisher gives up after block_timeout
+        slow.block_timeout = 0.01
+        broker.publish("room:tavern", event(3))
+        self.assertEqual(broker.publish("room:tavern", event(4)), 0)
+        self.assertEqual(slow.dropped, 1)
+
+    def test_local_subscriber_is_ref_counted(self):
+        broker = LocalBroker()
+        received = []
+        subscriber = LocalSubscriber(broker, handler=lambda channel, e: received.append(channel))
+        self.assertTrue(subscriber.acquire("room:tavern"))
+        self.assertFalse(subscriber.acquire("room:tavern"))
+        broker.publish("room:tavern", event(1))
+        self.assertFalse(subscriber.release("room:tavern"))
+        self.assertTrue(subscriber.release("room:tavern"))
+        broker.publish("room:tavern", event(2))
+        self.assertEqual(received, ["room:tavern"])
+        self.assertEqual(subscriber.channels, [])
+
+
+@unittest.skipUnless(EVENT_BUS_AVAILABLE, "redis package not installed")
+class TestLocalEventBus(unittest.TestCase):
+    def test_publishes_without_redis(self):
+        bus = EventBus(backend="local", local=LocalBroker())
+        self.assertEqual(bus.backend, "local")
+        received = []
+        bus.subscribe("room:*", received.append)
+        self.assertTrue(bus.publish_room("tavern", "npc_action", {"text": "Mara waves."}))
+        self.assertTrue(bus.publish_user("alice", "quest_update", {}))
+        self.assertEqual([e["type"] for e in received], ["npc_action"])
+        self.assertEqual(received[0]["data"], {"text": "Mara waves."})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Tests for the sequence-numbered per-player message buffers.
+"""
+import threading
+import time
+import unittest
+
+from core.message_buffer import MessageBuffer, MessageBuffers
+
+
+class TestMessageBuffer(unittest.TestCase):
+    def test_take_delivers_each_message_once(self):
+        buffer = MessageBuffer(capacity=10)
+        buffer.extend(["a", "b"])
+        self.assertEqual(buffer.take(), [(1, "a"), (2, "b")])
+        self.assertEqual(buffer.take(), [])
+        buffer.append("c")
+        self.assertEqual(buffer.take(), [(3, "c")])
+
+    def test_client_cursor_makes_retries_idempotent(self):
+        buffer = MessageBuffer(capacity=10)
+        buffer.extend(["a", "b", "c"])
+        self.assertEqual(buffer.take(after=1), [(2, "b"), (3, "c")])
+        # The response was lost; the client retries with the same cursor
+        self.assertEqual(buffer.take(after=1), [(2, "b"), (3, "c")])
+        # A cursor from before a server restart is ahead of the buffer
+        self.assertEqual(buffer.take(after=500), [])
+        buffer.append("d")
+        self.assertEqual(buffer.take(after=500), [(4, "d")])
+
+    def test_truncation_skips_dropped_messages(self):
+        buffer = MessageBuffer(capacity=3)
+        buffer.extend(f"line {i}" for i in range(1, 8))
+        self.assertEqual(buffer.first_seq, 5)
+        self.assertEqual(buffer.since(2), [(5, "line 5"), (6, "line 6"), (7, "line 7")])
+        self.assertEqual(buffer.since(6), [(7, "line 7")])
+        self.assertEqual(buffer.texts(2), ["line 6", "line 7"])
+
+    def test_reset_keeps_sequence_numbers_increasing(self):
+        buffer = MessageBuffer(capacity=10)
+        buffer.extend(["old 1", "old 2"])
+        buffer.reset(["welcome"])
+        self.assertEqual(buffer.texts(), ["welcome"])
+        self.assertEqual(buffer.take(after=2), [(3, "welcome")])
+
+
+class TestMessageBuffers(unittest.TestCase):
+    def test_post_notifies_listeners(self):
+        buffers = MessageBuffers(capacity=10)
+        notified = []
+        buffers.add_listener(notified.append)
+        buffers.post("alice", "hello", "there")
+        buffers.post("alice", "> look", "You see a room.", notify=False)
+        self.assertEqual(buffers.post("", "ignored"), 0)
+        self.assertEqual(notified, ["alice"])
+        self.assertEqual(buffers.recent("alice", 3), ["there", "> look", "You see a room."])
+        self.assertEqual(buffers.recent("bob", 3), [])
+
+    def test_long_poll_wakes_on_post(self):
+        buffers = MessageBuffers(capacity=10)
+        buffer = buffers.get("alice")
+        result = {}
+
+        def poll():
+            result["entries"] = buffer.take(timeout=5.0)
+            result["at"] = time.monotonic()
+
+        poller = threading.Thread(target=poll)
+        poller.start()
+        time.sleep(0.05)
+        # A command's own echo and response (delivered by /command) do not wake the poll
+        buffers.post("alice", "> look", "You see a room.", notify=False)
+        time.sleep(0.05)
+        self.assertTrue(poller.is_alive())
+        posted = time.monotonic()
+        buffers.post("alice", "Bob arrives.")
+        poller.join(2.0)
+        self.assertFalse(poller.is_alive())
+        self.assertEqual(result["entries"], [(1, "> look"), (2, "You see a room."), (3, "Bob arrives.")])
+        self.assertLess(result["at"] - posted, 1.0)
+
+    def test_long_poll_times_out_empty(self):
+        buffer = MessageBuffer(capacity=10)
+        self.assertEqual(buffer.take(timeout=0.05), [])
+
+    def test_legacy_log_is_adopted_as_delivered_history(self):
+        buffers = MessageBuffers(capacity=2)
+        game = {"location": "town_square", "log": ["one", "two", "three"]}
+        buffers.adopt_legacy_log("alice", game)
+        self.assertNotIn("log", game)
+        self.assertEqual(buffers.get("alice").texts(), ["two", "three"])
+        self.assertEqual(buffers.get("alice").take(), [])
+
+    def test_dropped_buffer_is_forgotten_and_cursors_stay_valid(self):
+        buffers = MessageBuffers(capacity=10)
+        buffers.post("alice", "a", "b", "c")
+        cursor = buffers.get("alice").take()[-1][0]
+        buffers.drop("alice")
+        self.assertIsNone(buffers.peek("alice"))
+        self.assertEqual(len(buffers), 0)
+        # A client that kept its cursor still sees what is posted after a new login
+        buffers.post("alice", "welcome back")
+        self.assertEqual(buffers.get("alice").take(after=cursor), [(cursor + 1, "welcome back")])
+        buffers.drop("nobody")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for indexed name resolution of items, NPCs and room details.
+"""
+import unittest
+from game.world.name_index import IndexCache, NameIndex
+from game.systems.inventory import ITEM_DEFS, match_item_name_in_collection
+from game_engine import resolve_room_detail
+from npc import find_npc_by_name, match_npc_in_room
+
+class TestNameIndex(unittest.TestCase):
+    def test_exact_prefix_and_word_lookups(self):
+        index = NameIndex()
+        index.add("old_map", names=["old_map", "Old  Map"], words=["old", "map"])
+        index.add("map_case", names=["map_case", "map case"], words=["map", "case"])
+        self.assertEqual(index.exact("old map"), ["old_map"])
+        self.assertEqual(index.prefixed("ma"), ["map_case"])
+        self.assertEqual(index.with_words(["map"]), ["old_map", "map_case"])
+        self.assertEqual(index.first(index.with_words(["map"]), {"map_case": 0, "old_map": 1}), "map_case")
+
+    def test_incremental_remove_and_readd(self):
+        index = NameIndex()
+        index.add("a", names=["anvil"])
+        index.add("b", names=["anvils"])
+        index.remove("a")
+        self.assertEqual(index.prefixed("anvil"), ["b"])
+        self.assertEqual(index.exact("anvil"), [])
+        index.add("b", names=["bellows"])
+        self.assertEqual(index.prefixed("anv"), [])
+        self.assertEqual(index.prefixed("bel"), ["b"])
+
+    def test_index_cache_evicts_least_recently_used(self):
+        cache = IndexCache(max_entries=2)
+        cache.put(("a",), NameIndex())
+        cache.put(("b",), NameIndex())
+        cache.get(("a",))
+        cache.put(("c",), NameIndex())
+        self.assertIsNone(cache.get(("b",)))
+        self.assertIsNotNone(cache.get(("a",)))
+
+
+class TestNameResolution(unittest.TestCase):
+    def tearDown(self):
+        ITEM_DEFS.pop("name_test_lantern", None)
+
+    def test_item_priorities(self):
+        # Long enough to go through the index rather than the short-list scan
+        items = ["copper_coin", "silver_coin", "bread", "copper_coin"] * 5
+        self.assertEqual(match_item_name_in_collection("silver coin", items), "silver_coin")
+        self.assertEqual(match_item_name_in_collection("coin", items), "copper_coin")
+        self.assertEqual(match_item_name_in_collection("loaf", items), "bread")
+        self.assertEqual(match_item_name_in_collection("stale coin", ["bread"] * 20 + ["gold_coin"]), "gold_coin")
+        self.assertIsNone(match_item_name_in_collection("sword", items))
+
+    def test_item_names_follow_replaced_defs(self):
+        items = ["bread"] * 20 + ["name_test_lantern"]
+        ITEM_DEFS["name_test_lantern"] = {"name": "brass lantern", "type": "misc"}
+        self.assertEqual(match_item_name_in_collection("brass lantern", items), "name_test_lantern")
+        ITEM_DEFS["name_test_lantern"] = {"name": "tin lamp", "type": "misc"}
+        self.assertEqual(match_item_name_in_collection("tin lamp", items), "name_test_lantern")
+        self.assertIsNone(match_item_name_in_collection("brass", items))
+
+    def test_npc_rules_apply_across_the_room(self):
+        room = ["old_storyteller", "innkeeper", "blacksmith"]
+        self.assertEqual(match_npc_in_room(room, "Mara")[0], "innkeeper")
+        self.assertEqual(match_npc_in_room(room, "black")[0], "blacksmith")
+        self.assertEqual(match_npc_in_room(room, "rusty")[0], "innkeeper")
+        self.assertEqual(match_npc_in_room(room, "nobody"), (None, None))
+        # An exact shortname beats a word match on an NPC listed earlier
+        self.assertEqual(match_npc_in_room(["watch_guard", "patrolling_guard"], "guard")[0], "patrolling_guard")
+
+    def test_global_npc_lookup(self):
+        self.assertEqual(find_npc_by_name("mara"), "innkeeper")
+        self.assertIsNone(find_npc_by_name("mar"))
+
+    def test_room_details(self):
+        game = {"location": "town_square"}
+        self.assertEqual(resolve_room_detail(game, "Bell Tower")[0], "belltower")
+        self.assertEqual(resolve_room_detail(game, "tower")[0], "watchtower")
+        self.assertEqual(resolve_room_detail(game, "noticeboard")[0], "notice_board")
+        self.assertEqual(resolve_room_detail(game, "statue"), (None, None, None))
+
+if __name__ == "__main__":
+    unittest.main()
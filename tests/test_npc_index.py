@@ -0,0 +1,70 @@
+"""
+Tests for the NPC location index.
+"""
+import copy
+import unittest
+import game_engine
+from game_engine import (
+    get_npcs_in_room, move_npc, reset_npc_to_home,
+    get_global_state_snapshot, load_global_state_snapshot,
+)
+from game.world.npc_index import NPCIndex, get_npc_index
+
+class TestNPCIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NPCIndex()
+        self.npc_state = {
+            "mara": {"room": "tavern", "alive": True},
+            "guard": {"room": "town_square", "alive": True},
+            "rat": {"room": "tavern", "alive": False},
+        }
+        self.index.rebuild(self.npc_state)
+
+    def test_lookups(self):
+        """Room membership and NPC location are answered from the index."""
+        self.assertEqual(self.index.npcs_in("tavern"), ["mara", "rat"])
+        self.assertEqual(self.index.npcs_in("tavern", alive_only=True), ["mara"])
+        self.assertEqual(self.index.room_of("guard"), "town_square")
+        self.assertEqual(self.index.npcs_in("forest"), [])
+
+    def test_place_moves_between_rooms(self):
+        """Placing an NPC removes it from its previous room."""
+        self.npc_state["mara"]["room"] = "town_square"
+        self.index.place("mara", "town_square")
+        self.assertEqual(self.index.npcs_in("tavern"), ["rat"])
+        self.assertEqual(self.index.npcs_in("town_square"), ["guard", "mara"])
+        self.assertEqual(self.index.check_consistency(self.npc_state), [])
+
+    def test_consistency_checker_reports_drift(self):
+        """Unindexed changes to NPC_STATE are reported."""
+        self.npc_state["guard"]["room"] = "forest"
+        self.npc_state["mara"]["alive"] = False
+        self.assertEqual(len(self.index.check_consistency(self.npc_state)), 2)
+
+class TestEngineKeepsIndexCurrent(unittest.TestCase):
+    def test_move_and_reset(self):
+        """move_npc and reset_npc_to_home update the global index."""
+        npc_id = "innkeeper"
+        home = game_engine.NPC_STATE[npc_id]["room"]
+        move_npc(npc_id, "town_square")
+        try:
+            self.assertIn(npc_id, get_npcs_in_room("town_square"))
+            self.assertNotIn(npc_id, get_npcs_in_room(home))
+        finally:
+            reset_npc_to_home(npc_id)
+        self.assertEqual(get_npc_index().check_consistency(game_engine.NPC_STATE), [])
+
+    def test_survives_snapshot_reload(self):
+        """load_global_state_snapshot re-indexes the reloaded NPC_STATE."""
+        original = copy.deepcopy(get_global_state_snapshot())
+        modified = copy.deepcopy(original)
+        modified["npc_state"]["innkeeper"]["room"] = "town_square"
+        try:
+            load_global_state_snapshot(modified)
+            self.assertEqual(get_npc_index().room_of("innkeeper"), "town_square")
+            self.assertEqual(get_npc_index().check_consistency(game_engine.NPC_STATE), [])
+        finally:
+            load_global_state_snapshot(original)
+
+if __name__ == '__main__':
+    unittest.main()
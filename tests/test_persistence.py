@@ -0,0 +1,156 @@
+"""
+Tests for incremental write-behind world persistence.
+"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from core import persistence
+from core.persistence import WorldPersistence
+
+class TestWorldPersistence(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.tmpdir, "mud_state.json")
+        self.players = {"alice": {"location": "town_square", "log": ["hi"], "_transient": 1}}
+        self.world = {
+            "room_state": {"town_square": {"items": ["rock"]}},
+            "npc_state": {"mara": {"room": "tavern", "hp": 10}},
+            "buried_items": {},
+            "weather_state": {"type": "clear"},
+        }
+        self.engine = self._make_engine()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _make_engine(self, **kwargs):
+        return WorldPersistence(
+            self.state_file,
+            snapshot_fn=lambda: self.world,
+            players_fn=lambda: self.players,
+            **kwargs
+        )
+
+    def test_flush_writes_only_dirty_entries(self):
+        """Only marked players, rooms and sections are appended."""
+        self.players["bob"] = {"location": "tavern"}
+        self.engine.mark_player_dirty("bob")
+        written = self.engine.flush()
+        self.assertEqual(written, 1)
+
+        with open(self.engine.log_file, encoding="utf-8") as f:
+            last = json.loads(f.readlines()[-1])
+        self.assertEqual(last["s"], "players")
+        self.assertEqual(last["k"], "bob")
+
+    def test_nothing_dirty_writes_nothing(self):
+        """A flush with no changes appends no records."""
+        self.assertEqual(self.engine.flush(), 0)
+
+    def test_world_state_read_only_when_dirty(self):
+        """Player-only flushes don't read the world state; sections are written when marked."""
+        reads = []
+        engine = WorldPersistence(
+            self.state_file,
+            snapshot_fn=lambda: reads.append(1) or self.world,
+            players_fn=lambda: self.players,
+        )
+        engine.mark_player_dirty("alice")
+        self.assertEqual(engine.flush(), 1)
+        self.assertEqual(reads, [])
+
+        self.world["weather_state"]["type"] = "rain"
+        engine.mark_section_dirty("weather_state")
+        self.assertEqual(engine.flush(), 1)
+        self.assertEqual(len(reads), 1)
+        with open(engine.log_file, encoding="utf-8") as f:
+            last = json.loads(f.readlines()[-1])
+        self.assertEqual((last["s"], last["v"]), ("weather_state", {"type": "rain"}))
+        self.assertEqual(engine.flush(), 0)
+
+    def test_load_replays_log(self):
+        """Snapshot plus replayed deltas restore the latest state."""
+        self.engine.mark_player_dirty("alice")
+        self.engine.compact()
+
+        self.world["room_state"]["town_square"]["items"].append("coin")
+        self.world["npc_state"]["mara"]["room"] = "town_square"
+        self.world["weather_state"]["type"] = "rain"
+        self.engine.mark_room_dirty("town_square")
+        self.engine.mark_npc_dirty("mara")
+        self.engine.mark_section_dirty("weather_state")
+        self.engine.flush()
+
+        data = self._make_engine().load()
+        global_state = data["global_state"]
+        self.assertEqual(global_state["room_state"]["town_square"]["items"], ["rock", "coin"])
+        self.assertEqual(global_state["npc_state"]["mara"]["room"], "town_square")
+        self.assertEqual(global_state["weather_state"]["type"], "rain")
+        self.assertNotIn("_transient", data["players"]["alice"])
+
+    def test_removed_player_is_deleted(self):
+        """Players no longer active are removed from the restored state."""
+        self.engine.compact()
+        self.players.pop("alice")
+        self.engine.mark_player_dirty("alice")
+        self.engine.flush()
+        data = self._make_engine().load()
+        self.assertNotIn("alice", data["players"])
+
+    def test_compaction_truncates_log(self):
+        """Reaching compact_every folds the log into the snapshot file."""
+        engine = self._make_engine(compact_every=2)
+        engine.mark_player_dirty("alice")
+        engine.mark_room_dirty("town_square")
+        engine.flush()
+        self.assertEqual(os.path.getsize(engine.log_file), 0)
+        with open(self.state_file, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertIn("alice", data["players"])
+        self.assertEqual(engine.stats["compactions"], 1)
+
+    def test_crash_before_log_truncation_does_not_roll_back(self):
+        """Records already folded into a snapshot are not replayed over it."""
+        self.engine.compact()
+        self.players["alice"]["location"] = "tavern"
+        self.engine.mark_player_dirty("alice")
+        self.engine.flush()
+
+        self.players["alice"]["location"] = "market"
+        real_write = persistence._atomic_write
+
+        def crash_on_truncate(path, text):
+            if path == self.engine.log_file:
+                raise OSError("simulated crash")
+            real_write(path, text)
+
+        with mock.patch("core.persistence._atomic_write", side_effect=crash_on_truncate):
+            with self.assertRaises(OSError):
+                self.engine.compact()
+        self.assertGreater(os.path.getsize(self.engine.log_file), 0)
+
+        engine = self._make_engine()
+        data = engine.load()
+        self.assertEqual(data["players"]["alice"]["location"], "market")
+        self.assertNotIn("log_generation", data)
+
+        # Records written after the restart are still replayed
+        self.players["alice"]["location"] = "docks"
+        engine.mark_player_dirty("alice")
+        engine.flush()
+        self.assertEqual(self._make_engine().load()["players"]["alice"]["location"], "docks")
+
+    def test_torn_tail_record_is_skipped(self):
+        """A partially written last line does not prevent loading."""
+        self.engine.mark_player_dirty("alice")
+        self.engine.flush()
+        with open(self.engine.log_file, "a", encoding="utf-8") as f:
+            f.write('{"s": "players", "k": "bo')
+        data = self._make_engine().load()
+        self.assertIn("alice", data["players"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game_engine import new_game_state
+from game.world.manager import WorldManager
+
+def make_game(username):
+    game = new_game_state(username)
+    game["inventory"] = ["bread", "torch", "rope"]
+    return game
+
+def test_player_is_cached_per_session():
+    wm = WorldManager.get_instance()
+    game = make_game("cache_user")
+    p1 = wm.get_player("cache_user", game)
+    p2 = wm.get_player("cache_user", game)
+    assert p1 is p2
+    assert [i.oid for i in p1.inventory] == ["bread", "torch", "rope"]
+    wm.evict_player("cache_user")
+
+def test_unchanged_inventory_is_not_rebuilt():
+    wm = WorldManager.get_instance()
+    game = make_game("cache_user2")
+    player = wm.get_player("cache_user2", game)
+    items = list(player.inventory.contents)
+    wm.get_player("cache_user2", game)
+    assert all(a is b for a, b in zip(items, player.inventory.contents))
+    wm.evict_player("cache_user2")
+
+def test_dict_changes_are_picked_up():
+    wm = WorldManager.get_instance()
+    game = make_game("cache_user3")
+    player = wm.get_player("cache_user3", game)
+    game["inventory"].append("lantern")
+    game["location"] = "tavern"
+    game["hp"] = 7
+    wm.get_player("cache_user3", game)
+    assert [i.oid for i in player.inventory][-1] == "lantern"
+    assert player.location.oid == "tavern"
+    assert player.hp == 7
+    wm.evict_player("cache_user3")
+
+def test_partial_refresh_keeps_live_changes():
+    wm = WorldManager.get_instance()
+    game = make_game("cache_user4")
+    player = wm.get_player("cache_user4", game)
+    # Mid-command change not yet written back to the dict
+    player.location = wm.get_room("tavern")
+    wm.get_player("cache_user4", game, sections=("quests",))
+    assert player.location.oid == "tavern"
+    wm.evict_player("cache_user4")
+
+def test_evict_drops_player():
+    wm = WorldManager.get_instance()
+    game = make_game("cache_user5")
+    p1 = wm.get_player("cache_user5", game)
+    wm.evict_player("cache_user5")
+    assert wm.get_player("cache_user5") is None
+    assert wm.get_player("cache_user5", game) is not p1
+    wm.evict_player("cache_user5")
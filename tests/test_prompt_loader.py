@@ -0,0 +1,64 @@
+"""
+Tests for the compiled prompt template registry.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from utils.prompt_loader import PROMPT_FIELDS, PromptRegistry, PromptTemplate, render_template
+
+
+class TestPromptTemplate(unittest.TestCase):
+    def test_partial_matches_a_full_format(self):
+        text = "You are {npc_name} ({title}). {{json: {{}}}} Player: {username}, rep {reputation:+d}"
+        template = PromptTemplate("t.txt", text)
+        static = template.partial(npc_name="Mara {the} Innkeeper", title="host")
+        self.assertEqual(static.fields, {"username", "reputation"})
+        self.assertEqual(static.render(username="bob", reputation=5),
+                         text.format(npc_name="Mara {the} Innkeeper", title="host", username="bob", reputation=5))
+
+    def test_missing_values_fall_back(self):
+        template = PromptTemplate("t.txt", "Hello {username}")
+        self.assertEqual(render_template(template, "Hi {username}", other=1), "Hi {username}")
+        self.assertEqual(render_template(None, "Hi {username}", username="bob"), "Hi bob")
+
+
+class TestPromptRegistry(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, text):
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_unknown_placeholders_are_reported_at_load(self):
+        self.write("greet.txt", "Hello {username}, I am {npc_nmae}.")
+        self.write("bad.txt", "Broken {username")
+        registry = PromptRegistry(self.directory, {"greet.txt": frozenset({"username", "npc_name"}),
+                                                   "farewell.txt": frozenset({"username"})})
+        problems = registry.load()
+        self.assertIn("npc_nmae", problems["greet.txt"])
+        self.assertIn("invalid template syntax", problems["bad.txt"])
+        self.assertEqual(problems["farewell.txt"], "template file is missing")
+        self.assertIsNone(registry.get("greet.txt"))
+
+    def test_changed_templates_are_reloaded(self):
+        self.write("greet.txt", "Hello {username}")
+        registry = PromptRegistry(self.directory, {})
+        self.assertEqual(registry.partial("greet.txt").render(username="bob"), "Hello bob")
+        self.write("greet.txt", "Welcome back, {username}")
+        os.utime(os.path.join(self.directory, "greet.txt"), (0, 12345))
+        self.assertEqual(registry.reload_changed(), ["greet.txt"])
+        self.assertEqual(registry.partial("greet.txt").render(username="bob"), "Welcome back, bob")
+
+    def test_shipped_templates_are_valid(self):
+        registry = PromptRegistry()
+        self.assertEqual(registry.load(), {})
+        for name, fields in PROMPT_FIELDS.items():
+            self.assertEqual(registry.get(name).fields, fields, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
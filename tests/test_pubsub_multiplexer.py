@@ -0,0 +1,119 @@
+"""
+Tests for the shared, reference-counted Redis subscriber.
+"""
+import json
+import time
+import unittest
+from collections import deque
+
+from core.pubsub_multiplexer import PubSubMultiplexer
+
+
+class FakePubSub:
+    """Records subscriptions; messages are queued by the test."""
+
+    def __init__(self, server):
+        self.server = server
+        self.channels = set()
+        self.closed = False
+
+    def subscribe(self, *channels):
+        self.channels.update(channels)
+
+    def unsubscribe(self, *channels):
+        self.channels.difference_update(channels)
+
+    def get_message(self, timeout=0.0):
+        if self.server.fail_reads:
+            self.server.fail_reads -= 1
+            raise ConnectionError("connection reset")
+        for channel, data in list(self.server.queue):
+            self.server.queue.remove((channel, data))
+            if channel in self.channels:
+                return {"type": "message", "channel": channel, "data": data}
+        time.sleep(min(timeout, 0.01))
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def __init__(self):
+        self.subscribers = []
+        self.queue = deque()
+        self.fail_reads = 0
+        self.down = 0
+
+    def connect(self):
+        if self.down:
+            self.down -= 1
+            return None
+        return self
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = FakePubSub(self)
+        self.subscribers.append(pubsub)
+        return pubsub
+
+    def publish(self, channel, event):
+        self.queue.append((channel, json.dumps(event)))
+
+
+class TestPubSubMultiplexer(unittest.TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.received = []
+        self.mux = PubSubMultiplexer(handler=lambda channel, event: self.received.append((channel, event)),
+                                     connect_fn=self.redis.connect, backoff_initial=0.01, backoff_max=0.05,
+                                     poll_timeout=0.01)
+
+    def test_channels_are_reference_counted_on_one_connection(self):
+        self.assertTrue(self.mux.acquire("room:town_square"))
+        self.mux.poll()
+        self.assertFalse(self.mux.acquire("room:town_square"))
+        self.assertTrue(self.mux.acquire("user:alice"))
+        subscriber = self.redis.subscribers[0]
+        self.assertEqual(subscriber.channels, {"room:town_square", "user:alice"})
+
+        self.assertFalse(self.mux.release("room:town_square"))
+        self.assertIn("room:town_square", subscriber.channels)
+        self.assertTrue(self.mux.release("room:town_square"))
+        self.assertEqual(subscriber.channels, {"user:alice"})
+        self.assertFalse(self.mux.release("room:town_square"))
+        self.assertEqual(len(self.redis.subscribers), 1)
+
+    def test_events_are_decoded_once_and_dispatched(self):
+        self.mux.acquire("room:town_square")
+        self.redis.publish("room:town_square", {"type": "npc_action", "data": {"text": "Mara waves."}})
+        self.redis.publish("room:elsewhere", {"type": "ignored"})
+        self.assertTrue(self.mux.poll())
+        self.assertFalse(self.mux.poll())
+        self.assertEqual(self.received, [("room:town_square", {"type": "npc_action", "data": {"text": "Mara waves."}})])
+        self.assertEqual(self.mux.stats["messages"], 1)
+
+    def test_reconnects_with_backoff_and_resubscribes(self):
+        self.redis.down = 2
+        self.mux.acquire("user:alice")
+        self.mux.start()
+        self.addCleanup(self.mux.stop)
+        deadline = time.time() + 2.0
+        while not self.mux.connected and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(self.mux.connected)
+        self.assertEqual(self.mux.stats["reconnects"], 2)
+
+        # The connection drops; the channel in use is subscribed again on a new one
+        self.redis.fail_reads = 1
+        while len(self.redis.subscribers) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        self.redis.publish("user:alice", {"type": "tell"})
+        while not self.received and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.redis.subscribers[-1].channels, {"user:alice"})
+        self.assertTrue(self.redis.subscribers[0].closed)
+        self.assertEqual(self.received, [("user:alice", {"type": "tell"})])
+
+
+if __name__ == "__main__":
+    unittest.main()
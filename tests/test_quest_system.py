@@ -10,7 +10,9 @@ sys.path.append(os.getcwd())
 from game.models.player import Player
 from game.models.quest import Quest, QuestTemplate
 from game.systems.quest_manager import QuestManager
-from game_engine import new_game_state
+from game.systems.quest_progress import QuestProgressEngine
+from game_engine import new_game_state, QUEST_GLOBAL_STATE
+import quests
 
 class TestQuestSystem(unittest.TestCase):
     def setUp(self):
@@ -112,5 +114,100 @@ class TestQuestSystem(unittest.TestCase):
         self.assertIsInstance(loaded_quest, Quest)
         self.assertEqual(loaded_quest.current_stage_index, 1)
 
+    def test_events_dispatch_through_objective_index(self):
+        """Events only advance quests whose current stage they satisfy, one stage per event."""
+        twice = QuestTemplate(
+            id="test_twice", name="Twice", description="Visit the test room twice.",
+            giver_id="npc:tester", difficulty="Easy", category="Test", timed=False,
+            time_limit_minutes=None, actors=["tester"],
+            stages=[
+                {"id": "s1", "objectives": [{"id": "o1", "type": "go_to_room", "room_id": "test_room"}]},
+                {"id": "s2", "objectives": [{"id": "o2", "type": "go_to_room", "room_id": "test_room"}]},
+            ],
+            rewards={}, offer_sources=[]
+        )
+        self.qm.register_template(twice)
+        self.qm.start_quest(self.player, "test_quest")
+        self.qm.start_quest(self.player, "test_twice")
+        
+        self.qm.handle_event(self.player, {"type": "talk_to_npc", "npc_id": "npc:tester"}, self.game_state)
+        self.assertEqual(self.player.quests["test_quest"].current_stage_index, 0)
+        
+        self.qm.handle_event(self.player, {"type": "enter_room", "room_id": "test_room"}, self.game_state)
+        self.assertEqual(self.player.quests["test_quest"].current_stage_index, 1)
+        self.assertEqual(self.player.quests["test_twice"].current_stage_index, 1)
+        
+        self.qm.handle_event(self.player, {"type": "talk_to_npc", "npc_id": "npc:tester"}, self.game_state)
+        self.assertEqual(self.player.quests["test_quest"].current_stage_index, 2)
+        self.assertEqual(self.player.quests["test_twice"].current_stage_index, 1)
+
+    def test_offer_source_indexes(self):
+        """Noticeboard and NPC offers come from the indexes built at registration."""
+        template = quests.QuestTemplate(
+            id="test_posting", name="Test Posting", description="Posted for testing.",
+            giver_id="noticeboard:test_square", difficulty="Easy", category="Test", timed=False,
+            time_limit_minutes=None, actors=["tester"], stages=[], rewards={},
+            offer_sources=[
+                {"type": "noticeboard", "room_id": "test_square"},
+                {"type": "npc_dialogue", "npc_id": "tester",
+                 "trigger": {"kind": "say_contains", "keywords": ["work"]}, "offer_text": "Tester nods."},
+            ]
+        )
+        quests.register_quest_template(template)
+        try:
+            self.assertIn("test_posting", quests.NOTICEBOARD_QUESTS["test_square"])
+            board = quests.get_noticeboard_quests_for_room(self.game_state, "test_square", 0, "QuestTester")
+            self.assertEqual([t.id for t in board], ["test_posting"])
+            self.assertEqual(quests.get_noticeboard_quests_for_room(self.game_state, "nowhere", 0, "QuestTester"), [])
+            
+            self.assertIsNone(quests.maybe_offer_npc_quest(self.game_state, "QuestTester", "tester", "hello", 0))
+            offer = quests.maybe_offer_npc_quest(self.game_state, "QuestTester", "tester", "Any work?", 0)
+            self.assertTrue(offer.startswith("Tester nods."))
+        finally:
+            del quests.QUEST_TEMPLATES["test_posting"]
+            quests.rebuild_quest_indexes()
+            QUEST_GLOBAL_STATE.pop("test_posting", None)
+        self.assertNotIn("test_posting", quests.NOTICEBOARD_QUESTS.get("test_square", []))
+
+    def test_progress_engine_updates_game_dict(self):
+        """The progress engine advances quests in the game dict like Quest.update."""
+        engine = QuestProgressEngine()
+        self.qm.start_quest(self.player, "test_quest")
+        self.player.sync_to_state(self.game_state, "quests")
+        instance = self.game_state["quests"]["test_quest"]
+        
+        progress = engine.progress_for(self.game_state)
+        self.assertEqual(dict(progress.waiting), {"enter_room": {"test_room": {"test_quest": 1}}})
+        self.assertEqual(engine.handle_event(self.game_state, {"type": "talk_to_npc", "npc_id": "npc:tester"}), [])
+        self.assertEqual(engine.handle_event(self.game_state, {"type": "enter_room", "room_id": "wrong_room"}), [])
+        self.assertEqual(instance["current_stage_index"], 0)
+        
+        self.assertEqual(engine.handle_event(self.game_state, {"type": "enter_room", "room_id": "test_room"}), ["test_quest"])
+        self.assertIs(self.game_state["quests"]["test_quest"], instance)
+        self.assertEqual(instance["current_stage_index"], 1)
+        self.assertEqual(instance["notes"][-1], "New Objective: Talk to the tester.")
+        self.assertEqual(dict(progress.waiting), {"talk_to_npc": {"npc:tester": {"test_quest": 1}}})
+        
+        engine.handle_event(self.game_state, {"type": "talk_to_npc", "npc_id": "npc:tester"})
+        self.assertEqual(instance["current_stage_index"], 2)
+        self.assertEqual(dict(progress.waiting), {})
+
+    def test_tick_quests_pops_expired_deadlines(self):
+        """Expired quests come off the per-player deadline heap and fail."""
+        self.game_state["quests"] = {
+            quest_id: {"id": quest_id, "status": "active", "current_stage_index": 0,
+                       "expires_at_tick": expires, "notes": []}
+            for quest_id, expires in (("lost_package", 50), ("mara_lost_item", 100))
+        }
+        engine = QuestProgressEngine()
+        self.assertEqual(engine.expired_quests(self.game_state, 49), [])
+        self.assertEqual(engine.expired_quests(self.game_state, 60), ["lost_package"])
+        self.assertEqual(engine.expired_quests(self.game_state, 60), [])
+        
+        quests.tick_quests(self.game_state, 100)
+        self.assertEqual(self.game_state["completed_quests"]["lost_package"]["status"], "failed")
+        self.assertEqual(self.game_state["completed_quests"]["mara_lost_item"]["status"], "failed")
+        self.assertEqual(self.game_state["quests"], {})
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for the tiered AI response cache and its cache keys.
+"""
+import sqlite3
+import unittest
+from unittest import mock
+
+import ai_client
+from core.response_cache import LocalTier, SQLiteTier, TieredResponseCache
+
+
+class _SharedConnection:
+    """Keeps one in-memory database alive across connect()/close() calls."""
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:")
+        SQLiteTier.create_tables(self.conn)
+
+    def __call__(self):
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def close(self):
+        pass
+
+
+class TestLocalTier(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        tier = LocalTier(max_entries=2)
+        tier.set("a", "1")
+        tier.set("b", "2")
+        self.assertEqual(tier.get("a"), "1")
+        tier.set("c", "3")
+        self.assertIsNone(tier.get("b"))
+        self.assertEqual(tier.get("a"), "1")
+        self.assertEqual(tier.get_stats()["evictions"], 1)
+
+    def test_entries_expire(self):
+        tier = LocalTier(ttl=10)
+        with mock.patch("core.response_cache.time.time", return_value=1000.0):
+            tier.set("a", "1")
+        with mock.patch("core.response_cache.time.time", return_value=1011.0):
+            self.assertIsNone(tier.get("a"))
+        self.assertEqual(tier.get_stats()["expired"], 1)
+        self.assertEqual(len(tier), 0)
+
+
+class TestTieredResponseCache(unittest.TestCase):
+    def test_shared_hits_are_promoted(self):
+        shared = SQLiteTier(_SharedConnection(), ttl=60)
+        writer = TieredResponseCache(LocalTier(), shared)
+        reader = TieredResponseCache(LocalTier(), shared)
+        writer.set("k", "reply")
+        self.assertEqual(reader.get("k"), "reply")
+        self.assertEqual(reader.local.get_stats()["size"], 1)
+        self.assertEqual(reader.get("k"), "reply")
+        self.assertEqual(shared.get_stats()["hits"], 1)
+        stats = reader.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["shared_backend"]), (2, 0, "sqlite"))
+
+    def test_sqlite_tier_is_pruned_to_size(self):
+        connect = _SharedConnection()
+        shared = SQLiteTier(connect, ttl=60, max_entries=5)
+        shared.PRUNE_EVERY = 10
+        for i in range(10):
+            shared.set(f"k{i}", str(i))
+        count = connect.execute("SELECT COUNT(*) FROM ai_response_cache").fetchone()[0]
+        self.assertEqual(count, 5)
+        self.assertEqual(shared.get_stats()["evictions"], 5)
+
+
+class TestReplyCacheKeys(unittest.TestCase):
+    def test_equivalent_inputs_share_a_key(self):
+        key = ai_client.make_reply_cache_key("innkeeper", "Hello there!", 0, [])
+        self.assertEqual(key, ai_client.make_reply_cache_key("innkeeper", "um, hello   THERE", 0, []))
+        self.assertNotEqual(key, ai_client.make_reply_cache_key("blacksmith", "hello there", 0, []))
+
+    def test_reputation_band_and_memory_change_the_key(self):
+        key = ai_client.make_reply_cache_key("innkeeper", "hello", 30, [])
+        self.assertEqual(key, ai_client.make_reply_cache_key("innkeeper", "hello", 45, []))
+        self.assertNotEqual(key, ai_client.make_reply_cache_key("innkeeper", "hello", 60, []))
+        memory = [{"type": "talked", "player_input": "hi", "response": "Mara waves."}]
+        self.assertNotEqual(key, ai_client.make_reply_cache_key("innkeeper", "hello", 30, memory))
+        # Only conversation turns reach the prompt
+        self.assertEqual(key, ai_client.make_reply_cache_key("innkeeper", "hello", 30, [{"type": "gave"}]))
+
+    def test_reputation_bands(self):
+        bands = [ai_client._reputation_band(r) for r in (150, 50, 30, 15, 10, 5, 0, -5, -20, -50, -80)]
+        self.assertEqual(bands, list(range(11)))
+
+    def test_cached_replies_are_readdressed(self):
+        with mock.patch.object(ai_client, "get_response_cache", return_value=TieredResponseCache()):
+            ai_client._add_to_cache("k", "Mara smiles at alice. 'Welcome, alice!'", "alice")
+            self.assertEqual(ai_client._check_cache("k", "bob"), "Mara smiles at bob. 'Welcome, bob!'")
+
+
+if __name__ == "__main__":
+    unittest.main()
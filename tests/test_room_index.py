@@ -0,0 +1,53 @@
+"""
+Tests for the in-process room membership index.
+"""
+import unittest
+from core.room_index import RoomIndex
+
+class TestRoomIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = RoomIndex()
+        self.active_games = {
+            "alice": {"location": "town_square"},
+            "bob": {"location": "town_square"},
+            "carol": {"location": "tavern"},
+        }
+        self.index.rebuild(self.active_games)
+
+    def test_players_in_room(self):
+        """players_in returns only the players in that room."""
+        self.assertEqual(sorted(self.index.players_in("town_square")), ["alice", "bob"])
+        self.assertEqual(self.index.players_in("tavern"), ["carol"])
+        self.assertEqual(self.index.players_in("forest"), [])
+
+    def test_movement_updates_both_sides(self):
+        """Moving a player removes them from the old room and adds them to the new one."""
+        self.active_games["alice"]["location"] = "tavern"
+        self.assertTrue(self.index.relocate("alice", "tavern"))
+        self.assertEqual(self.index.players_in("town_square"), ["bob"])
+        self.assertEqual(sorted(self.index.players_in("tavern")), ["alice", "carol"])
+        self.assertEqual(self.index.room_of("alice"), "tavern")
+        self.assertEqual(self.index.check_consistency(self.active_games), [])
+
+    def test_relocate_ignores_offline_players(self):
+        """relocate() does not add players that never logged in."""
+        self.assertFalse(self.index.relocate("dave", "tavern"))
+        self.assertNotIn("dave", self.index)
+
+    def test_logout_removes_player_and_empty_room(self):
+        """Removing the last player in a room drops the room from occupied_rooms."""
+        self.active_games.pop("carol")
+        self.index.remove("carol")
+        self.assertNotIn("tavern", self.index.occupied_rooms())
+        self.assertEqual(self.index.check_consistency(self.active_games), [])
+
+    def test_consistency_checker_reports_drift(self):
+        """Unindexed movement and stale entries are reported."""
+        self.active_games["bob"]["location"] = "forest"
+        self.active_games["erin"] = {"location": "tavern"}
+        self.active_games.pop("alice")
+        problems = self.index.check_consistency(self.active_games)
+        self.assertEqual(len(problems), 3)
+
+if __name__ == '__main__':
+    unittest.main()
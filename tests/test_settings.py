@@ -0,0 +1,67 @@
+"""
+Tests for the in-process game settings cache.
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from core.settings import SettingsService
+
+class TestSettingsService(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.connections = 0
+        conn = self.connect()
+        conn.execute(
+            "CREATE TABLE game_settings (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "description TEXT, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+        conn.execute("INSERT INTO game_settings (key, value, description) VALUES ('poll_interval', '3', 'Poll')")
+        SettingsService.create_tables(conn)
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def connect(self):
+        self.connections += 1
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def test_reads_do_not_touch_the_database(self):
+        """After load(), typed reads are served from memory."""
+        settings = SettingsService(self.connect)
+        settings.load()
+        before = self.connections
+        for _ in range(100):
+            self.assertEqual(settings.get_float("poll_interval", 1.0), 3.0)
+            self.assertEqual(settings.get_int("missing", 7), 7)
+        self.assertEqual(self.connections, before)
+
+    def test_set_updates_cache_and_version(self):
+        """Writes are visible immediately and bump the version."""
+        settings = SettingsService(self.connect)
+        settings.load()
+        version = settings.version
+        settings.set("poll_interval", 5)
+        self.assertEqual(settings.get("poll_interval"), "5")
+        self.assertEqual(settings.version, version + 1)
+        self.assertFalse(settings.refresh_if_changed())
+
+    def test_other_worker_changes_are_picked_up(self):
+        """A change made through another service is seen after a version check."""
+        worker_a = SettingsService(self.connect)
+        worker_b = SettingsService(self.connect)
+        worker_a.load()
+        worker_b.load()
+        worker_b.set("npc_action_interval_min", "45", "NPC min")
+        self.assertIsNone(worker_a.get("npc_action_interval_min"))
+        self.assertTrue(worker_a.refresh_if_changed())
+        self.assertEqual(worker_a.get_float("npc_action_interval_min", 30.0), 45.0)
+        self.assertEqual(worker_a.all()["npc_action_interval_min"]["description"], "NPC min")
+
+if __name__ == '__main__':
+    unittest.main()
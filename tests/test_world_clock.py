@@ -0,0 +1,101 @@
+"""
+Tests for the shared world clock snapshot.
+"""
+import unittest
+from unittest import mock
+from datetime import datetime, timedelta
+
+import game_engine
+from game.systems.atmospheric_manager import get_atmospheric_manager
+from game.systems.world_clock import WorldClock, build_snapshot
+
+# 1 in-game minute = 5 real-world seconds
+GAME_MINUTE = 5.0
+
+
+def _clock(start):
+    game_time = {"start_timestamp": start.isoformat()}
+    world_clock = {"start_time": start.isoformat()}
+    return WorldClock(lambda: game_time, lambda: world_clock), game_time, world_clock
+
+
+class TestBuildSnapshot(unittest.TestCase):
+    def test_calendar_and_daylight(self):
+        # Day 31 (summer, Flameheart 2nd), 5:59am: before the 6:00am summer sunrise
+        snapshot = build_snapshot(31 * 1440 + 5 * 60 + 59, lunar_cycle_start_day=0)
+        self.assertEqual((snapshot.hour, snapshot.minute, snapshot.hour_12), (5, 59, 5))
+        self.assertEqual((snapshot.day_of_year, snapshot.season), (31, "summer"))
+        self.assertEqual((snapshot.month, snapshot.day_of_month), ("Flameheart", 2))
+        self.assertEqual((snapshot.sunrise, snapshot.sunset, snapshot.time_of_day), (360, 1200, "dawn"))
+        self.assertEqual(snapshot.moon_phase, "new")
+        self.assertEqual(build_snapshot(12 * 60, 0).hour_12, 12)
+        self.assertEqual(build_snapshot(0, 0).hour_12, 12)
+        self.assertEqual(build_snapshot(22 * 60, 0).time_of_day, "night")
+
+    def test_moon_phase_follows_the_lunar_cycle(self):
+        self.assertEqual(build_snapshot(15 * 1440, lunar_cycle_start_day=0).moon_phase, "full")
+        self.assertEqual(build_snapshot(15 * 1440, lunar_cycle_start_day=15).moon_description, "new moon")
+
+
+class TestWorldClock(unittest.TestCase):
+    def test_snapshot_is_computed_once_per_minute(self):
+        start = datetime(2024, 1, 1, 12, 0, 0)
+        clock, _, _ = _clock(start)
+        epoch = start.timestamp()
+        first = clock.snapshot(epoch + 1)
+        self.assertIs(clock.snapshot(epoch + 4.9), first)
+        self.assertEqual(clock.computed, 1)
+        later = clock.snapshot(epoch + 61 * GAME_MINUTE)
+        self.assertEqual((later.total_minutes, later.hour, later.minute), (61, 1, 1))
+        self.assertEqual(clock.computed, 2)
+
+    def test_restored_timestamp_is_picked_up(self):
+        start = datetime(2024, 1, 1, 12, 0, 0)
+        clock, game_time, world_clock = _clock(start)
+        now = start.timestamp() + 10 * GAME_MINUTE
+        self.assertEqual(clock.snapshot(now).total_minutes, 10)
+        self.assertEqual(world_clock["lunar_cycle_start_day"], 0)
+        # A snapshot restore replaces the start timestamp with an older one
+        game_time["start_timestamp"] = (start - timedelta(hours=2)).isoformat()
+        self.assertEqual(clock.snapshot(now).total_minutes, 1440 + 10)
+        self.assertAlmostEqual(clock.in_game_hours(1.0, now), 50 / 3600.0)
+
+    def test_unset_timestamp_starts_the_clock(self):
+        game_time = {"start_timestamp": None}
+        clock = WorldClock(lambda: game_time, lambda: {})
+        with mock.patch("game.systems.world_clock.mark_section_dirty") as mark_section_dirty:
+            self.assertEqual(clock.snapshot().total_minutes, 0)
+        self.assertIsNotNone(game_time["start_timestamp"])
+        mark_section_dirty.assert_any_call("game_time")
+
+
+class TestSharedClock(unittest.TestCase):
+    def test_legacy_functions_and_atmospheric_manager_agree(self):
+        saved = game_engine.GAME_TIME["start_timestamp"]
+        self.addCleanup(game_engine.GAME_TIME.__setitem__, "start_timestamp", saved)
+        # Move the clock to 7:45pm on day 45 (summer dusk)
+        game_engine.GAME_TIME["start_timestamp"] = (
+            datetime.now() - timedelta(seconds=(45 * 1440 + 19 * 60 + 45) * GAME_MINUTE + 1)
+        ).isoformat()
+        atmos = get_atmospheric_manager()
+        self.assertEqual(game_engine.get_current_hour_in_minutes(), 19 * 60 + 45)
+        self.assertEqual(atmos.time.get_current_hour_in_minutes(), 19 * 60 + 45)
+        self.assertEqual(game_engine.get_season(), "summer")
+        self.assertEqual(game_engine.get_time_of_day(), "dusk")
+        self.assertEqual(atmos.time.get_time_of_day(game_engine.get_season()), "dusk")
+        self.assertEqual(atmos.get_combined_description(is_outdoor=False),
+                         "Evening light fades as darkness settles outside.")
+
+    def test_lunar_cycle_start_survives_a_restart(self):
+        saved = game_engine.WORLD_CLOCK
+        self.addCleanup(game_engine.load_global_state_snapshot, {"world_clock": saved})
+        game_engine.load_global_state_snapshot({"world_clock": dict(saved, lunar_cycle_start_day=17)})
+        snapshot = game_engine.get_global_state_snapshot()
+        self.assertEqual(snapshot["world_clock"]["lunar_cycle_start_day"], 17)
+        game_engine.load_global_state_snapshot({"world_clock": {"lunar_cycle_start_day": 3}})
+        game_engine.load_global_state_snapshot(snapshot)
+        self.assertEqual(game_engine.WORLD_CLOCK["lunar_cycle_start_day"], 17)
+
+
+if __name__ == "__main__":
+    unittest.main()
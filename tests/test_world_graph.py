@@ -0,0 +1,52 @@
+"""
+Tests for the precomputed world graph.
+"""
+import unittest
+from game.world.graph import WorldGraph
+
+WORLD = {
+    "a": {"exits": {"east": "b"}, "outdoor": True},
+    "b": {"exits": {"west": "a", "east": "c", "north": {"target": "d", "hidden": True}}},
+    "c": {"exits": {"west": "b", "north": "d"}},
+    "d": {"exits": {"south": "c", "west": {"target": "b", "locked": True}}},
+}
+
+class TestWorldGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = WorldGraph()
+        self.graph.build(WORLD)
+
+    def test_rooms_within(self):
+        """Neighbourhoods follow every exit, including hidden/locked ones."""
+        self.assertEqual(self.graph.rooms_within("a", 2), {"a": 0, "b": 1, "c": 2, "d": 2})
+        self.assertEqual(self.graph.distance("a", "d", max_distance=1), None)
+        self.assertEqual(self.graph.distance("d", "a"), 2)
+        self.assertTrue(self.graph.is_outdoor("a"))
+        self.assertFalse(self.graph.is_outdoor("b"))
+
+    def test_next_step_skips_blocked_exits(self):
+        """NPC paths avoid statically hidden/locked exits."""
+        self.assertEqual(self.graph.next_step("a", "d"), ("b", "east"))
+        self.assertEqual(self.graph.next_step("b", "d"), ("c", "east"))
+        self.assertEqual(self.graph.next_step("d", "a"), ("c", "south"))
+
+    def test_exit_state_invalidates_paths(self):
+        """Locking an exit reroutes NPCs; unlocking restores the path."""
+        self.assertEqual(self.graph.distance("a", "c", passable=True), 2)
+        self.graph.set_exit_state("b", "east", {"locked": True})
+        self.assertEqual(self.graph.next_step("a", "c"), (None, None))
+        self.assertIsNone(self.graph.distance("a", "c", passable=True))
+        # Sound still carries through the locked door
+        self.assertEqual(self.graph.distance("a", "c"), 2)
+        self.graph.set_exit_state("b", "east", {"locked": False})
+        self.assertEqual(self.graph.next_step("a", "c"), ("b", "east"))
+
+    def test_load_exit_states(self):
+        """Reloading EXIT_STATES replaces the dynamic blocks."""
+        self.graph.load_exit_states({"c": {"north": {"hidden": True}}})
+        self.assertEqual(self.graph.next_step("c", "d"), (None, None))
+        self.graph.load_exit_states({})
+        self.assertEqual(self.graph.next_step("c", "d"), ("d", "north"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests for the server-wide world tick scheduler.
+"""
+import unittest
+from game.systems.world_tick import WorldTickScheduler
+import game_engine
+from game_engine import handle_command, new_game_state, register_world_tick_systems
+
+class TestWorldTickScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = WorldTickScheduler(interval=60.0)
+        self.calls = []
+
+    def test_systems_run_on_their_cadence(self):
+        """Systems with every=N only run on every Nth tick."""
+        self.scheduler.register("fast", lambda: self.calls.append("fast"))
+        self.scheduler.register("slow", lambda: self.calls.append("slow"), every=3)
+        for _ in range(6):
+            self.scheduler.tick()
+        self.assertEqual(self.calls.count("fast"), 6)
+        self.assertEqual(self.calls.count("slow"), 2)
+        stats = self.scheduler.get_stats()
+        self.assertEqual(stats["ticks"], 6)
+        self.assertEqual(stats["systems"]["slow"]["calls"], 2)
+
+    def test_failing_system_does_not_stop_tick(self):
+        """An exception in one system is counted and the others still run."""
+        def boom():
+            raise RuntimeError("boom")
+        self.scheduler.register("boom", boom)
+        self.scheduler.register("ok", lambda: self.calls.append("ok"))
+        self.scheduler.tick()
+        self.assertEqual(self.calls, ["ok"])
+        self.assertEqual(self.scheduler.get_stats()["systems"]["boom"]["errors"], 1)
+
+    def test_register_replaces_by_name(self):
+        """Registering an existing name replaces the system in place."""
+        self.scheduler.register("a", lambda: self.calls.append("old"))
+        self.scheduler.register("a", lambda: self.calls.append("new"))
+        self.scheduler.tick()
+        self.assertEqual(self.scheduler.systems, ["a"])
+        self.assertEqual(self.calls, ["new"])
+
+    def test_maybe_tick_is_bounded_by_interval(self):
+        """On-demand ticking runs at most once per interval, and never while the loop runs."""
+        self.scheduler.register("a", lambda: self.calls.append("a"))
+        self.assertTrue(self.scheduler.maybe_tick())
+        self.assertFalse(self.scheduler.maybe_tick())
+        self.scheduler._last_tick_time = 0.0
+        self.scheduler._running = True
+        self.assertFalse(self.scheduler.maybe_tick())
+        self.assertEqual(self.calls, ["a"])
+
+    def test_world_systems_registered(self):
+        """The game engine registers every world upkeep system."""
+        register_world_tick_systems(self.scheduler)
+        self.assertEqual(self.scheduler.systems, [
+            "atmosphere", "npc_weather", "sunrise_sunset",
+            "buried_items", "exit_states", "npc_movements", "bell_tolling",
+        ])
+
+class TestCommandPath(unittest.TestCase):
+    def test_commands_do_not_run_world_upkeep(self):
+        """Repeated commands within one interval trigger at most one world tick."""
+        scheduler = game_engine.get_world_tick_scheduler()
+        ran = []
+        register_world_tick_systems(scheduler)
+        scheduler.register("probe", lambda: ran.append(1))
+        try:
+            game = new_game_state("Tester")
+            for _ in range(5):
+                handle_command("look", game, username="Tester")
+            self.assertLessEqual(len(ran), 1)
+        finally:
+            scheduler.unregister("probe")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,37 +2,325 @@
 Shared prompt loader utility.
 
 Loads prompt templates from the prompts/ directory and formats them with provided values.
+
+Templates are compiled once by the PromptRegistry (on first use, or at startup
+via get_prompt_registry().load()) rather than read from disk on every call:
+
+- each template is parsed once; its placeholders are checked against the
+  fields its callers supply (PROMPT_FIELDS) and problems are logged at load
+  time, so a typo in a template shows up when the server starts instead of
+  as a silent fallback on every request
+- partial() pre-renders the static part of a template (e.g. an NPC's name and
+  personality) once, leaving only the per-request fields to format
+- an optional watcher reloads templates whose files change, for prompt authors
 """
 
 import os
+import string
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "prompts"))
+
+# Fields each template's callers pass in; placeholders outside this set are load errors
+PROMPT_FIELDS = {
+    "npc_dialogue_system.txt": frozenset({
+        "npc_name", "npc_title", "personality", "room_name", "room_description",
+        "npc_home", "reputation_desc", "reputation", "username",
+    }),
+    "npc_dialogue_user_talk.txt": frozenset({"username", "player_input"}),
+    "npc_dialogue_user_reaction.txt": frozenset({"username", "player_input"}),
+    "purchase_intent_system.txt": frozenset({"items_text"}),
+    "purchase_intent_user.txt": frozenset({"text"}),
+    "npc_charity_system.txt": frozenset({"items_text", "player_currency", "reputation", "personality"}),
+    "npc_charity_user.txt": frozenset({"text", "player_currency", "reputation"}),
+}
+
+_FORMATTER = string.Formatter()
+
+
+class PromptTemplate:
+    """A parsed prompt template; render() is a single str.format call."""
+
+    __slots__ = ("name", "text", "fields", "_parts", "_format")
+
+    def __init__(self, name: str, text: str, parts: Optional[List[Tuple]] = None):
+        """
+        Initialize the template.
+
+        Args:
+            name: Template name (path relative to prompts/)
+            text: Template source
+            parts: Already parsed parts (used by partial())
+
+        Raises:
+            ValueError: If the template is not valid str.format syntax
+        """
+        self.name = name
+        self.text = text
+        if parts is None:
+            parts = [(literal, field, spec, conversion)
+                     for literal, field, spec, conversion in _FORMATTER.parse(text)]
+        self._parts = parts
+        self.fields = frozenset(field for _, field, _, _ in parts if field is not None)
+        if "" in self.fields or any(not field.isidentifier() for field in self.fields):
+            raise ValueError(f"positional or compound placeholder in {name}")
+        self._format = _compile(parts).format
+
+    def render(self, **values) -> str:
+        """Format the template (KeyError if a placeholder has no value)."""
+        return self._format(**values)
+
+    def partial(self, **values) -> "PromptTemplate":
+        """
+        Pre-render some fields, returning a template for the rest.
+
+        Args:
+            **values: Values for the static placeholders
+
+        Returns:
+            PromptTemplate: Template whose placeholders are the remaining fields
+        """
+        parts = []
+        pending = ""
+        for literal, field, spec, conversion in self._parts:
+            pending += literal
+            if field is None:
+                continue
+            if field in values:
+                value = values[field]
+                if conversion:
+                    value = {"r": repr, "s": str, "a": ascii}[conversion](value)
+                pending += format(value, spec or "")
+            else:
+                parts.append((pending, field, spec, conversion))
+                pending = ""
+        if pending:
+            parts.append((pending, None, None, None))
+        return PromptTemplate(self.name, self.text, parts)
+
+
+def _compile(parts: List[Tuple]) -> str:
+    """Rebuild a str.format pattern from parsed parts (literal braces re-escaped)."""
+    pieces = []
+    for literal, field, spec, conversion in parts:
+        pieces.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is not None:
+            pieces.append("{" + field + ("!" + conversion if conversion else "") + (":" + spec if spec else "") + "}")
+    return "".join(pieces)
+
+
+class PromptRegistry:
+    """Every template under prompts/, compiled and validated once."""
+
+    def __init__(self, directory: str = PROMPTS_DIR, expected_fields: Optional[Dict[str, frozenset]] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            directory: Directory holding the templates
+            expected_fields: {name: fields the callers pass} (defaults to PROMPT_FIELDS)
+        """
+        self.directory = directory
+        self.expected_fields = PROMPT_FIELDS if expected_fields is None else expected_fields
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._partials: Dict[tuple, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._watching = False
+        self._wake = threading.Event()
+        self.problems: Dict[str, str] = {}
+
+    def load(self) -> Dict[str, str]:
+        """
+        (Re)load every template and validate its placeholders.
+
+        Returns:
+            dict: {template name: problem} for templates that failed validation
+        """
+        mtimes = self._scan()
+        templates, problems = {}, {}
+        for name in sorted(mtimes):
+            template, problem = self._load_one(name)
+            if template is not None:
+                templates[name] = template
+            if problem:
+                problems[name] = problem
+        for name in self.expected_fields:
+            if name not in mtimes:
+                problems[name] = "template file is missing"
+        for name, problem in problems.items():
+            logger.error(f"Prompt template {name}: {problem} (the built-in fallback will be used)")
+        with self._lock:
+            self._templates = templates
+            self._mtimes = mtimes
+            self._partials.clear()
+            self.problems = problems
+            self._loaded = True
+        logger.info(f"Loaded {len(templates)} prompt templates from {self.directory}")
+        return problems
+
+    def _scan(self) -> Dict[str, float]:
+        """{template name: mtime} for every .txt file under the directory."""
+        mtimes = {}
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if filename.endswith(".txt"):
+                    path = os.path.join(root, filename)
+                    name = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                    mtimes[name] = os.path.getmtime(path)
+        return mtimes
+
+    def _load_one(self, name: str) -> Tuple[Optional[PromptTemplate], Optional[str]]:
+        """Read and compile one template; returns (template or None, problem or None)."""
+        try:
+            with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                text = f.read().strip()
+        except (IOError, UnicodeDecodeError) as e:
+            return None, f"unreadable ({e})"
+        if not text:
+            return None, "template is empty"
+        try:
+            template = PromptTemplate(name, text)
+        except ValueError as e:
+            return None, f"invalid template syntax ({e})"
+        expected = self.expected_fields.get(name)
+        if expected is not None:
+            unknown = template.fields - expected
+            if unknown:
+                return None, f"placeholders not supplied by the game: {', '.join(sorted(unknown))}"
+        return template, None
+
+    def get(self, name: str) -> Optional[PromptTemplate]:
+        """Compiled template by name (None if missing or invalid)."""
+        if not self._loaded:
+            self.load()
+        return self._templates.get(name)
+
+    def partial(self, name: str, **values) -> Optional[PromptTemplate]:
+        """
+        Template with some fields pre-rendered, cached until the next reload.
+
+        Args:
+            name: Template name
+            **values: Static values (e.g. the NPC's name, title and personality)
+
+        Returns:
+            PromptTemplate or None if the template is missing or invalid
+        """
+        key = (name, tuple(sorted(values.items())))
+        template = self._partials.get(key)
+        if template is None:
+            base = self.get(name)
+            if base is None:
+                return None
+            template = base.partial(**values)
+            with self._lock:
+                self._partials[key] = template
+        return template
+
+    def reload_changed(self) -> List[str]:
+        """Reload if any template file was added, removed or modified; returns the changed names."""
+        current = self._scan()
+        changed = sorted(name for name in set(current) | set(self._mtimes)
+                         if current.get(name) != self._mtimes.get(name))
+        if changed:
+            logger.info(f"Prompt templates changed: {', '.join(changed)}")
+            self.load()
+        return changed
+
+    def start_watcher(self, interval: float = 2.0, socketio=None) -> None:
+        """
+        Poll the prompts directory and reload templates when files change.
+
+        Args:
+            interval: Seconds between polls
+            socketio: Flask-SocketIO instance (runs as its background task);
+                      falls back to a daemon thread when not provided
+        """
+        if self._watching:
+            return
+        self._watching = True
+
+        def watch_task():
+            logger.info("Prompt template watcher started")
+            while self._watching:
+                # Event.wait is green under eventlet's monkey patching
+                self._wake.wait(interval)
+                self._wake.clear()
+                if not self._watching:
+                    break
+                try:
+                    self.reload_changed()
+                except Exception as e:
+                    logger.error(f"Error reloading prompt templates: {e}", exc_info=True)
+
+        if socketio:
+            socketio.start_background_task(watch_task)
+        else:
+            threading.Thread(target=watch_task, name="prompt-watcher", daemon=True).start()
+
+    def stop_watcher(self) -> None:
+        self._watching = False
+        self._wake.set()
+
+
+# Global prompt registry
+_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Get the global prompt registry (templates are loaded on first use)."""
+    global _registry
+    if _registry is None:
+        _registry = PromptRegistry()
+    return _registry
+
+
+def _format_fallback(fallback_text, kwargs):
+    try:
+        return fallback_text.format(**kwargs) if kwargs else fallback_text
+    except (KeyError, ValueError, IndexError):
+        return fallback_text
+
+
+def render_template(template, fallback_text="", **kwargs):
+    """
+    Format a compiled template, falling back like load_prompt does.
+
+    Args:
+        template: PromptTemplate (or None if missing/invalid)
+        fallback_text: Text to use if the template is unavailable or can't be formatted
+        **kwargs: Values for the template's placeholders
+
+    Returns:
+        str: Formatted prompt text
+    """
+    if template is None:
+        return _format_fallback(fallback_text, kwargs)
+    if not kwargs:
+        return template.text
+    try:
+        return template.render(**kwargs)
+    except (KeyError, ValueError, IndexError) as e:
+        logger.error(f"Could not format prompt template {template.name}: {e!r}")
+        return _format_fallback(fallback_text, kwargs)
 
 
 def load_prompt(filename, fallback_text="", **kwargs):
     """
     Load a prompt template from the prompts directory and format it with provided values.
-    
+
     Args:
         filename: Name of the prompt file (e.g., "npc_dialogue_system.txt")
         fallback_text: Text to return if file is missing or unreadable
         **kwargs: Values to interpolate into the template using str.format()
-    
+
     Returns:
         str: Formatted prompt text, or fallback_text if file cannot be loaded
     """
-    prompt_path = os.path.join(os.path.dirname(__file__), "..", "prompts", filename)
-    try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            template = f.read().strip()
-            if template and kwargs:
-                return template.format(**kwargs)
-            return template if template else fallback_text
-    except (FileNotFoundError, IOError, KeyError, ValueError) as e:
-        # File missing, unreadable, or formatting error - use fallback
-        if fallback_text:
-            # Format fallback text if kwargs provided
-            try:
-                return fallback_text.format(**kwargs) if kwargs else fallback_text
-            except (KeyError, ValueError):
-                return fallback_text
-        return fallback_text
-
+    return render_template(get_prompt_registry().get(filename), fallback_text, **kwargs)